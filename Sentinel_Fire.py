@@ -3,19 +3,26 @@
 
 
 # Importações necessárias para o sistema
-import heapq  # Para fila prioritária (usada para implementar estruturas de dados como filas de prioridade)
-from collections import deque  # Para filas de equipes e drones (estrutura de dados eficiente para filas)
+from array import array  # Instantes compactos dos índices do histórico de drones
+from bisect import bisect_left, bisect_right  # Busca por intervalo de tempo nos índices
+from collections import OrderedDict, deque  # Filas de equipes e drones; ocorrências resolvidas em ordem
 
-import folium  # Biblioteca para criação de mapas interativos (usada para visualização geográfica)
-
-from mapa_monitoramento import MapaMonitoramento  # Módulo personalizado para monitoramento de mapas
-from typing import List, Dict, Optional  # Para type hints (anotações de tipo para melhor legibilidade do código)
+from mapa_monitoramento import MapaMonitoramento  # Mapa de monitoramento (folium é importado só no primeiro uso)
+from typing import Dict, Iterable, List, Optional, Tuple  # Para type hints (anotações de tipo para melhor legibilidade do código)
 import random  # Para simulação de dados aleatórios
-import threading  # Para processamento paralelo (permite execução concorrente)
+import threading  # Trava que protege a fila prioritária entre threads
 import time  # Para controle de tempo (pausas, medição de tempo, etc.)
-from modelos import Ocorrencia, ContatoEmergencia  # Classes personalizadas para modelagem de dados
+from modelos import Ocorrencia, ContatoEmergencia, avancar_ids  # Classes personalizadas para modelagem de dados
 
 from sistema_alerta import SistemaAlerta  # Módulo personalizado para sistema de alertas
+from agendador import Agendador  # Agendador asyncio único para os serviços em segundo plano
+from temporizador import ServicoTemporizadores, Temporizador  # Temporizadores das missões de drones
+from rastreamento import RastreadorIncidentes  # Linha do tempo e latência por estágio das ocorrências
+from arquivo import ArquivoOcorrencias  # Arquivo compacto de ocorrências resolvidas antigas
+from analise import SeriesIncendios  # Séries por hora/dia/semana atualizadas a cada transição
+from particoes import FilaParticionada  # Ocorrências ativas particionadas por região, com trabalhador por região
+import eventos  # Histórico do sistema em eventos tipados e compactos
+# despacho (NumPy/SciPy) é importado no primeiro despacho: construir o sistema não carrega essas bibliotecas
 
 
 # ==================== Estruturas de Dados ====================
@@ -38,6 +45,11 @@ class LinkedList:
         """Inicializa uma lista ligada vazia"""
         self.head: Optional[Node] = None  # Ponteiro para o primeiro nó
         self.tail: Optional[Node] = None  # Ponteiro para o último nó (otimiza append)
+        self.tamanho = 0  # Quantidade de nós (mantida no append para len() em O(1))
+
+    def __len__(self):
+        """Retorna a quantidade de elementos em O(1)"""
+        return self.tamanho
 
     def append(self, data):
         """Adiciona novo nó ao final da lista
@@ -48,6 +60,7 @@ class LinkedList:
         Complexidade: O(1) - tempo constante devido ao ponteiro tail
         """
         new_node = Node(data)  # Cria novo nó com o dado
+        self.tamanho += 1
 
         # Caso lista vazia
         if not self.head:
@@ -58,6 +71,15 @@ class LinkedList:
             self.tail.next = new_node  # Liga último nó ao novo
             self.tail = new_node  # Atualiza tail para o novo nó
 
+    def __iter__(self):
+        """Percorre os dados sem montar uma lista (para até o tamanho do início da iteração)"""
+        current = self.head
+        for _ in range(self.tamanho):
+            if current is None:
+                break
+            yield current.data
+            current = current.next
+
     def to_list(self) -> List:
         """Converte a lista ligada para lista Python padrão
 
@@ -77,6 +99,36 @@ class LinkedList:
         return result
 
 
+class IndiceTemporal:
+    """Registros em ordem de instante, com busca por intervalo em O(log n + k)
+
+    Os instantes ficam em um `array` compacto, paralelo à lista de registros.
+    Inserções em ordem (o caso normal) são apêndices; fora de ordem usam bisect.
+    """
+
+    def __init__(self):
+        self.instantes = array('d')
+        self.registros: List = []
+
+    def __len__(self):
+        return len(self.registros)
+
+    def adicionar(self, instante: float, registro):
+        if not self.instantes or instante >= self.instantes[-1]:
+            self.instantes.append(instante)
+            self.registros.append(registro)
+        else:
+            posicao = bisect_right(self.instantes, instante)
+            self.instantes.insert(posicao, instante)
+            self.registros.insert(posicao, registro)
+
+    def intervalo(self, de: float = None, ate: float = None) -> List:
+        """Registros com de <= instante <= ate, em ordem cronológica"""
+        inicio = 0 if de is None else bisect_left(self.instantes, de)
+        fim = len(self.instantes) if ate is None else bisect_right(self.instantes, ate)
+        return self.registros[inicio:fim]
+
+
 class TreeNode:
     """Nó para árvore binária de regiões
 
@@ -178,9 +230,20 @@ class DroneTracker:
     e análise posterior.
     """
 
-    def __init__(self):
-        """Inicializa o rastreador com histórico vazio"""
+    def __init__(self, relogio=time.time):
+        """Inicializa o rastreador com histórico vazio
+
+        Args:
+            relogio: Fonte do horário dos registros (relógio virtual na simulação)
+        """
         self.historico = LinkedList()  # Usa LinkedList para armazenamento eficiente
+        self.relogio = relogio
+        self.persistencia = None  # PersistenciaSQLite opcional (gravação em segundo plano)
+        # Índices secundários: todos os registros, por drone e por ocorrência, em ordem de instante
+        self._trava = threading.Lock()
+        self._por_instante = IndiceTemporal()
+        self._por_drone: Dict[str, IndiceTemporal] = {}
+        self._por_ocorrencia: Dict[int, IndiceTemporal] = {}
 
     def registrar(self, drone_id: str, acao: str, ocorrencia_id: int = None):
         """Registra uma ação no histórico com timestamp
@@ -196,13 +259,21 @@ class DroneTracker:
         - Tipo de ação
         - Ocorrência associada (quando relevante)
         """
+        instante = self.relogio()
         registro = {
-            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),  # Data/hora atual
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(instante)),  # Data/hora atual
             "drone": drone_id,
             "acao": acao,
             "ocorrencia": ocorrencia_id  # Pode ser None
         }
-        self.historico.append(registro)  # Adiciona ao final da lista
+        with self._trava:
+            self.historico.append(registro)  # Adiciona ao final da lista
+            self._por_instante.adicionar(instante, registro)
+            self._indice(self._por_drone, drone_id).adicionar(instante, registro)
+            if ocorrencia_id is not None:
+                self._indice(self._por_ocorrencia, ocorrencia_id).adicionar(instante, registro)
+        if self.persistencia is not None:
+            self.persistencia.salvar_acao_drone(drone_id, acao, ocorrencia_id, instante)
 
     def obter_historico(self) -> List[dict]:
         """Retorna o histórico completo de ações
@@ -217,6 +288,38 @@ class DroneTracker:
         """
         return self.historico.to_list()  # Converte LinkedList para lista Python
 
+    @staticmethod
+    def _indice(indices: dict, chave) -> IndiceTemporal:
+        indice = indices.get(chave)
+        if indice is None:
+            indice = indices[chave] = IndiceTemporal()
+        return indice
+
+    def consultar(self, drone: str = None, ocorrencia=None, de: float = None, ate: float = None,
+                  limite: Optional[int] = None) -> List[dict]:
+        """Ações filtradas por drone, ocorrência e intervalo de instantes (epoch), em ordem cronológica
+
+        Usa o índice do drone ou da ocorrência (o menor, se os dois forem
+        pedidos) e busca o intervalo por bisect: o custo acompanha o tamanho
+        do resultado, não o do histórico.
+
+        Args:
+            limite: Máximo de registros (os mais recentes)
+        """
+        with self._trava:
+            candidatos = [self._por_drone.get(drone) if drone is not None else None,
+                          self._por_ocorrencia.get(ocorrencia) if ocorrencia is not None else None]
+            if (drone is not None and candidatos[0] is None) or (ocorrencia is not None and candidatos[1] is None):
+                return []
+            indices = [indice for indice in candidatos if indice is not None]
+            indice = min(indices, key=len) if indices else self._por_instante
+            registros = indice.intervalo(de, ate)
+        if drone is not None and ocorrencia is not None:
+            registros = [r for r in registros if r["drone"] == drone and r["ocorrencia"] == ocorrencia]
+        if limite is not None:
+            registros = registros[-limite:] if limite > 0 else []
+        return registros
+
     def registrar_acao(self, acao: str, local: list, detalhes: str = ""):
         """Método simplificado para registrar ações genéricas
 
@@ -238,11 +341,42 @@ class DroneTracker:
 class SistemaEmergencia:
     """Sistema integrado de gerenciamento de emergências"""
 
-    def __init__(self):
-        """Inicializa todos os componentes do sistema"""
+    def __init__(self, relogio=None, temporizadores=None, persistencia=None):
+        """Inicializa todos os componentes do sistema
 
-        # Heap para gerenciamento prioritário de ocorrências
-        self.fila_prioritaria: List[Ocorrencia] = []  # Usa heapq para priorização
+        Args:
+            relogio: Função que retorna o horário atual em segundos (padrão: time.time).
+                A simulação de eventos discretos injeta um relógio virtual.
+            temporizadores: Serviço com `agendar(atraso, callback, *args)` e `parar()`
+                (padrão: ServicoTemporizadores com 4 workers)
+            persistencia: PersistenciaSQLite opcional para consultas históricas
+        """
+        self.relogio = relogio or time.time
+        self.persistencia = persistencia
+
+        # Fontes de aleatoriedade (o módulo random por padrão; a simulação usa fluxos com semente)
+        self.rng_ocorrencias = random  # Geração de ocorrências simuladas
+        self.rng_missoes = random  # Resultado das missões de verificação
+        self.rng_fogos = random  # Extinção dos fogos ativos
+
+        # Ocorrências em três camadas:
+        # - ativas: um heap por região com as ocorrências em andamento (Pendente, Em verificação,
+        #   Fogo ativo); despacho, missões e verificações de fogo de cada região rodam no
+        #   trabalhador da sua partição (ver particoes.py)
+        # - resolvidas: "Fogo apagado"/"Verificado", em ordem de resolução (id -> (instante, ocorrência))
+        # - arquivo: resolvidas há mais de `idade_arquivamento` segundos, em formato compacto
+        # Os laços quentes (despacho, verificação de fogos, mapa) percorrem apenas as ativas.
+        self.fila_prioritaria = FilaParticionada()  # Lida como lista; escritas vão para a partição da região
+        self.resolvidas: "OrderedDict[int, tuple]" = OrderedDict()
+        self.arquivo = ArquivoOcorrencias()
+        self.idade_arquivamento = 3600.0  # Segundos até uma ocorrência resolvida ser arquivada
+        self.intervalo_arquivamento = 60.0  # Período da tarefa de arquivamento
+        self._trava = threading.RLock()  # Protege as camadas de resolvidas e arquivo (cada partição tem a sua)
+        self._trava_drones = threading.Lock()  # Reserva de drones disputada pelas partições
+
+        # Agendador único (asyncio) para todas as tarefas periódicas e por evento
+        self.agendador = Agendador()
+        self._servicos_registrados = False
 
         # Sistema de monitoramento geográfico
         self.monitoramento = MapaMonitoramento(self)  # Mapa com integração ao sistema
@@ -251,11 +385,28 @@ class SistemaEmergencia:
         self.equipes_disponiveis = deque([f"Equipe {i}" for i in range(1, 6)])  # 5 equipes
         self.drones_disponiveis = deque([f"Drone {i}" for i in range(1, 4)])  # 3 drones
 
+        # Bases dos drones ([lat, lon]); drones sem base cadastrada recebem uma de BASES em rodízio
+        self.bases_drones: Dict[str, tuple] = {}
+        self.velocidade_drone_kmh = 120.0  # Velocidade usada no custo da atribuição
+        self.metodo_despacho = "auto"  # "hungaro", "guloso" ou "auto"
+
+        # Projeção da propagação do fogo (+1 h e +6 h) que entra na prioridade; o modelo
+        # (NumPy) é criado no primeiro uso, lendo os arquivos de vento e combustível se houver
+        self.arquivo_vento: Optional[str] = None
+        self.arquivo_combustivel: Optional[str] = None
+        self._modelo_propagacao = None
+
+        # Pontuação de prioridade em lote (priorizacao.py): substituível por qualquer objeto
+        # com `pontuar(colunas)`; criada no primeiro uso (padrão: PontuacaoPadrao)
+        self.pontuacao = None
+        self.tolerancia_prioridade = 0.01  # Mudanças menores não mexem no heap
+        self.intervalo_priorizacao = 5.0  # Mesmo ciclo do despacho
+
         # Pilha para tarefas não urgentes
         self.tarefas_pendentes = []  # LIFO para tarefas secundárias
 
         # Sistema de registros históricos
-        self.historico = LinkedList()  # Lista encadeada para histórico completo
+        self.historico = eventos.HistoricoEventos()  # Histórico completo em eventos compactos
 
         # Estrutura de organização geográfica
         self.regioes = BinarySearchTree()  # Árvore binária de busca para regiões
@@ -264,8 +415,26 @@ class SistemaEmergencia:
             self.regioes.insert(regiao)  # Popula a árvore com biomas brasileiros
 
         # Rastreador de atividades de drones
-        self.drone_tracker = DroneTracker()  # Monitoramento individual de drones
-        self.drone_em_missao = False  # Flag de status
+        self.drone_tracker = DroneTracker(self.relogio)  # Monitoramento individual de drones
+        self.drone_tracker.persistencia = persistencia
+        # Telemetria de alta frequência (posição, bateria, temperatura) em buffers
+        # circulares por drone; criada no primeiro uso (NumPy)
+        self._telemetria = None
+
+        # Rastreamento do ciclo de vida das ocorrências (relógio monotônico, ou o virtual na simulação)
+        self.rastreador = RastreadorIncidentes(
+            relogio_ns=time.monotonic_ns if relogio is None else (lambda: int(self.relogio() * 1e9))
+        )
+        self.series = SeriesIncendios()  # Agregados por balde de tempo (novas, confirmadas, extintas)
+        self.drone_em_missao = False  # Flag de status (há algum drone em missão)
+        self._drones_em_missao = set()
+
+        # Temporizadores das missões (heap + pool fixo de workers, sem thread por missão)
+        self.temporizadores = temporizadores or ServicoTemporizadores(workers=4)
+        self.tempo_missao = 3.0  # Tempo de voo até a conclusão da verificação (segundos)
+        self.tempo_retorno_base = 0.0  # Tempo de retorno à base após a missão (segundos)
+        self.intervalo_verificacao_fogo = 10.0  # Intervalo entre verificações de fogo apagado
+        self._verificacoes_fogo: Dict[int, Temporizador] = {}  # id(ocorrência) -> temporizador
 
         # Subsistema de alertas
         self.sistema_alerta = SistemaAlerta(self)  # Gerenciador de notificações
@@ -304,7 +473,7 @@ class SistemaEmergencia:
 
         # Adiciona cada contato ao sistema de alerta
         for contato in contatos_iniciais:
-            self.sistema_alerta.adicionar_contato(contato)
+            self.sistema_alerta.adicionar_contato(contato, persistir=False)
 
 
 
@@ -314,42 +483,55 @@ class SistemaEmergencia:
         # 1. Gestão de regiões (se região nova, cadastra automaticamente)
         if not self.regioes.search(regiao):
             self.regioes.insert(regiao)  # Adiciona à árvore de regiões
-            self.historico.append(f"Nova região cadastrada: {regiao}")  # Audit
+            self._registrar_evento(eventos.REGIAO_CADASTRADA, regiao=regiao)  # Audit
 
         # 2. Cria objeto da ocorrência (ID automático pelo Ocorrencia.__init__)
         nova_ocorrencia = Ocorrencia(
-            id=0,  # Valor temporário (geralmente sobrescrito pelo ORM/banco)
+            prioridade=0,  # Ajustada automaticamente no __post_init__
             local=local,
             severidade=severidade,
-            regiao=regiao
+            regiao=regiao,
+            registrada_em=self.relogio()
         )
 
-        # 3. Adiciona à fila prioritária (heap)
-        heapq.heappush(self.fila_prioritaria, nova_ocorrencia)
+        # 3. Adiciona à fila prioritária da região (heap)
+        self.fila_prioritaria.inserir(nova_ocorrencia)
+        self._transicao(nova_ocorrencia, "registro")
 
         # 4. Registro histórico
-        self.historico.append(f"Nova ocorrência ID {nova_ocorrencia.id}")
+        self._registrar_evento(eventos.OCORRENCIA_REGISTRADA, ocorrencia=nova_ocorrencia.id,
+                               regiao=regiao)
+        self.agendador.disparar("nova_ocorrencia", regiao)
 
         # 5. Cria tarefa secundária (relatório)
         self.tarefas_pendentes.append(f"Gerar relatório para {regiao}")
 
         return nova_ocorrencia
 
-    def enviar_drone(self, ocorrencia: Ocorrencia) -> Dict:
-        """Gerencia o envio de drones para verificação de ocorrências com simulação de missão"""
+    def enviar_drone(self, ocorrencia: Ocorrencia, drone: str = None) -> Dict:
+        """Gerencia o envio de drones para verificação de ocorrências com simulação de missão
 
-        # 1. Verificação de disponibilidade
-        if not self.drones_disponiveis or self.drone_em_missao:
-            return {
-                "status": "error",
-                "message": "Nenhum drone disponível no momento",
-                "drone": None
-            }
+        Args:
+            ocorrencia: Ocorrência a verificar
+            drone: Drone escolhido pela atribuição em lote (padrão: o primeiro da fila)
+        """
 
-        # 2. Alocação de recursos
-        self.drone_em_missao = True  # Bloqueia outros envios
-        drone = self.drones_disponiveis.popleft()  # Remove drone da fila
+        # 1. Verificação de disponibilidade e 2. alocação, juntas: partições disputam os mesmos drones
+        with self._trava_drones:
+            if not self.drones_disponiveis or (drone is not None and drone not in self.drones_disponiveis):
+                return {
+                    "status": "error",
+                    "message": "Nenhum drone disponível no momento",
+                    "drone": None
+                }
+            if drone is None:
+                drone = self.drones_disponiveis.popleft()  # Remove drone da fila
+            else:
+                self.drones_disponiveis.remove(drone)
+            self._drones_em_missao.add(drone)
+            self.drone_em_missao = True
         ocorrencia.status = "Em verificação"  # Atualiza estado
+        self._transicao(ocorrencia, "despacho")
 
         # 3. Registro no histórico
         self.drone_tracker.registrar(
@@ -365,65 +547,9 @@ class SistemaEmergencia:
 
             )
 
-        # 5. Função de simulação de missão (executada em thread separada)
-        def simular_missao():
-            """Simula o processo completo de verificação pelo drone"""
-            try:
-                # Simula tempo de voo (3 segundos)
-                time.sleep(3)
-
-                # 80% de chance de confirmar fogo (para teste)
-                ocorrencia.fogo_confirmado = random.random() > 0.2
-
-                if ocorrencia.fogo_confirmado:
-                    # Atualiza status e registra confirmação
-                    ocorrencia.status = "Fogo ativo"
-                    ocorrencia.tempo_inicio_fogo = time.time()
-
-                    # Eleva severidade mínima para 4 (emergência)
-                    ocorrencia.severidade = max(ocorrencia.severidade, 4)
-
-                    self.drone_tracker.registrar(
-                        drone,
-                        "Incêndio confirmado",
-                        ocorrencia.id
-                    )
-
-                    # Dispara alertas completos
-                    self.sistema_alerta.enviar_alertas(
-                        ocorrencia,
-                        'alerta_confirmado'
-                    )
-
-                    # Processa tarefas pendentes (LIFO)
-                    while self.tarefas_pendentes:
-                        tarefa = self.tarefas_pendentes.pop()
-                        self.historico.append(
-                            f"Tarefa concluída: {tarefa} "
-                            f"para ocorrência {ocorrencia.id}"
-                        )
-                else:
-                    # Caso sem fogo detectado
-                    ocorrencia.status = "Verificado"
-                    self.drone_tracker.registrar(
-                        drone,
-                        "Nenhum incêndio detectado",
-                        ocorrencia.id
-                    )
-
-            finally:
-                # 6. Liberação do drone (garantido pelo finally)
-                self.drones_disponiveis.append(drone)
-                self.drone_em_missao = False
-                self.historico.append(
-                    f"Drone {drone} retornou à base"
-                )
-
-        # Inicia simulação em thread paralela
-        threading.Thread(
-            target=simular_missao,
-            daemon=True
-        ).start()
+        # 5. Agenda a conclusão da missão (sem thread por missão); ela roda no trabalhador da região
+        self.temporizadores.agendar(self.tempo_missao, self._na_particao, "missao", ocorrencia,
+                                    self.simular_missao, drone)
 
         # 7. Retorno imediato
         return {
@@ -432,71 +558,410 @@ class SistemaEmergencia:
             "drone": drone
         }
 
-    def verificar_fogos_apagados(self):
-        # Loop infinito que ficará verificando constantemente
-        while True:
-            try:
-                # Pausa a execução por 10 segundos entre cada verificação
-                time.sleep(10)  # Verifica a cada 10 segundos
-
-                # Percorre todas as ocorrências da fila prioritária
-                for oc in self.fila_prioritaria:
-                    # Verifica se o objeto tem o atributo 'status', se o status é "Fogo ativo"
-                    # e se um valor aleatório (entre 0 e 1) for maior que 0.4 (ou seja, 60% de chance)
-                    if (hasattr(oc, 'status') and
-                            oc.status == "Fogo ativo" and
-                            random.random() > 0.4):
-                        # Marca que o fogo foi apagado
-                        oc.fogo_apagado = True
-                        # Atualiza o status da ocorrência para "Fogo apagado"
-                        oc.status = "Fogo apagado"
-                        # Define a severidade como 1 (mínima, pois o fogo já está apagado)
-                        oc.severidade = 1
-
-                        # Registra essa ação no rastreador de drones
-                        self.drone_tracker.registrar(
-                            drone_id="Sistema",  # Ação realizada pelo sistema automaticamente
-                            acao=f"Fogo apagado na ocorrência {oc.id}",  # Mensagem da ação
-                            ocorrencia_id=oc.id  # ID da ocorrência tratada
-                        )
-
-            # Se ocorrer qualquer erro durante a execução do bloco try
-            except Exception as e:
-                # Exibe a mensagem de erro
-                print(f"Erro na verificação de fogos apagados: {str(e)}")
-                # Aguarda 30 segundos antes de tentar novamente
-                time.sleep(30)
+    def _na_particao(self, tipo: str, ocorrencia: Ocorrencia, funcao, *args):
+        """Callback de temporizador: repassa `funcao(ocorrencia, *args)` ao trabalhador da região"""
+        self.fila_prioritaria.particao(ocorrencia.regiao).executar(tipo, funcao, ocorrencia, *args)
 
-    def verificar_drones_automaticamente(self):
-        """Verifica automaticamente se precisa enviar drones"""
+    def simular_missao(self, ocorrencia: Ocorrencia, drone: str):
+        """Conclui a missão de verificação do drone (callback do temporizador)
 
-        # Inicia um loop infinito que verifica a cada 5 segundos
-        while True:
-            time.sleep(5)  # Pausa de 5 segundos entre as verificações
+        Executada `tempo_missao` segundos após o despacho, no trabalhador da
+        partição da região. O retorno à base é agendado como outro
+        temporizador, mesmo em caso de erro.
+        """
+        try:
+            # Ocorrência atendida enquanto o drone estava em voo: nada a confirmar
+            if ocorrencia.status != "Em verificação":
+                return
+
+            # Fogo já confirmado (reenvio manual): a nova visita não desfaz a confirmação
+            if ocorrencia.fogo_confirmado:
+                ocorrencia.status = "Fogo ativo"
+                self._agendar_verificacao_fogo(ocorrencia)
+                return
+
+            # 80% de chance de confirmar fogo (para teste)
+            ocorrencia.fogo_confirmado = self.rng_missoes.random() > 0.2
+
+            if ocorrencia.fogo_confirmado:
+                # Atualiza status e registra confirmação
+                ocorrencia.status = "Fogo ativo"
+                ocorrencia.tempo_inicio_fogo = self.relogio()
+
+                # Eleva severidade mínima para 4 (emergência) e reposiciona no heap
+                ocorrencia.severidade = max(ocorrencia.severidade, 4)
+                self.repriorizar([ocorrencia])
+                self._transicao(ocorrencia, "confirmado")
+
+                self.drone_tracker.registrar(
+                    drone,
+                    "Incêndio confirmado",
+                    ocorrencia.id
+                )
 
-            try:
-                # Verifica se há drones disponíveis e se há ocorrências na fila prioritária
-                if self.drones_disponiveis and self.fila_prioritaria:
+                # Agenda a primeira verificação de fogo apagado para esta ocorrência
+                self._agendar_verificacao_fogo(ocorrencia)
 
-                    # Filtra apenas as ocorrências com severidade alta e status relevante
-                    ocorrencias = [oc for oc in self.fila_prioritaria
-                                   if hasattr(oc, 'severidade') and
-                                   hasattr(oc, 'status') and
-                                   oc.severidade > 3 and  # Severidade maior que 3 é considerada alta
-                                   oc.status in ["Pendente", "Fogo ativo"]]  # Ocorrências ainda não resolvidas
+                # Dispara alertas completos
+                self.sistema_alerta.enviar_alertas(
+                    ocorrencia,
+                    'alerta_confirmado'
+                )
 
-                    if ocorrencias:
-                        # Ordena as ocorrências por severidade (do maior para o menor)
-                        ocorrencias.sort(key=lambda x: x.severidade, reverse=True)
+                # Processa tarefas pendentes (LIFO)
+                while self.tarefas_pendentes:
+                    tarefa = self.tarefas_pendentes.pop()
+                    self._registrar_evento(eventos.TAREFA_CONCLUIDA, ocorrencia=ocorrencia.id,
+                                           ator=drone, texto=tarefa)
+            else:
+                # Caso sem fogo detectado
+                ocorrencia.status = "Verificado"
+                self._transicao(ocorrencia, "descartado")
+                self.drone_tracker.registrar(
+                    drone,
+                    "Nenhum incêndio detectado",
+                    ocorrencia.id
+                )
+                self._resolver(ocorrencia)
+
+        finally:
+            # 6. Retorno à base (garantido pelo finally)
+            self.temporizadores.agendar(self.tempo_retorno_base, self._retornar_base, drone)
+
+    def _retornar_base(self, drone: str):
+        """Libera o drone ao chegar na base (callback do temporizador)"""
+        with self._trava_drones:  # Mesma trava do envio: a fila e o conjunto em missão mudam juntos
+            self.drones_disponiveis.append(drone)
+            self._drones_em_missao.discard(drone)
+            self.drone_em_missao = bool(self._drones_em_missao)
+        self._registrar_evento(eventos.DRONE_RETORNOU, ator=drone)
+        self.agendador.disparar("drone_disponivel")
+
+    def _transicao(self, ocorrencia: Ocorrencia, evento: str):
+        """Registra uma mudança de estado da ocorrência
+
+        Marca o evento na linha do tempo, atualiza as séries agregadas e, se
+        houver persistência, enfileira o novo estado para a thread escritora
+        (sem E/S no caminho quente).
+        """
+        instante = self.relogio()
+        self.rastreador.marcar(ocorrencia.id, evento)
+        self.series.registrar(ocorrencia, evento, instante)
+        if self.persistencia is not None:
+            self.persistencia.salvar_ocorrencia(ocorrencia, instante)
+
+    def _registrar_evento(self, codigo: int, ocorrencia: int = None, ator: str = None, regiao: str = None,
+                          valor: int = 0, local=None, texto: str = None):
+        """Adiciona um evento ao histórico do sistema (e à persistência, se houver)
+
+        Os códigos e o significado de cada campo estão em eventos.py; o texto
+        legível só é montado quando a entrada é servida (ou persistida).
+        """
+        instante = self.relogio()
+        posicao = self.historico.registrar(codigo, instante, ocorrencia, ator, regiao, valor, local, texto)
+        if self.persistencia is not None:
+            self.persistencia.salvar_historico(self.historico.renderizar(posicao), instante, eventos.TIPOS[codigo])
 
-                        # Envia um drone para a ocorrência mais grave (primeira da lista)
-                        self.enviar_drone(ocorrencias[0])
+    def _registrar_historico(self, entrada):
+        """Adiciona uma entrada de texto livre ao histórico (eventos conhecidos usam `_registrar_evento`)"""
+        self._registrar_evento(eventos.TEXTO, texto=str(entrada))
 
-            except Exception as e:
-                # Em caso de erro, imprime a mensagem
-                print(f"Erro na verificação automática de drones: {str(e)}")
-                # Aguarda 10 segundos antes de tentar novamente
-                time.sleep(10)
+    def _resolver(self, ocorrencia: Ocorrencia):
+        """Move uma ocorrência da camada ativa para a de resolvidas
+
+        Custo O(ativas da região): localiza a ocorrência na partição e refaz o heap.
+        """
+        self.fila_prioritaria.remover(ocorrencia)
+        with self._trava:
+            self.resolvidas[ocorrencia.id] = (self.relogio(), ocorrencia)
+
+    def _resolver_lote(self, ocorrencias: List[Ocorrencia]):
+        """Move várias ocorrências para a camada de resolvidas (uma passada por região)"""
+        self.fila_prioritaria.remover_varias(ocorrencias)
+        agora = self.relogio()
+        with self._trava:
+            for ocorrencia in ocorrencias:
+                self.resolvidas[ocorrencia.id] = (agora, ocorrencia)
+
+    def elevar_severidades(self, elevacoes: Iterable[Tuple[Ocorrencia, int]]) -> List[Ocorrencia]:
+        """Eleva a severidade de várias ocorrências (nunca reduz) e reposiciona no heap
+
+        Usada quando novas detecções são fundidas em ocorrências existentes.
+        As alteradas são repontuadas juntas e só elas voltam para o heap
+        (ver `repriorizar`).
+
+        Args:
+            elevacoes: Pares (ocorrência, nova severidade)
+
+        Returns:
+            List[Ocorrencia]: Ocorrências cuja severidade mudou
+        """
+        elevadas = []
+        with self._trava:
+            for ocorrencia, severidade in elevacoes:
+                if severidade > ocorrencia.severidade:
+                    ocorrencia.severidade = severidade
+                    elevadas.append(ocorrencia)
+        if elevadas:
+            self.repriorizar(elevadas)
+        for ocorrencia in elevadas:
+            self._transicao(ocorrencia, "severidade")
+        return elevadas
+
+    def arquivar_resolvidas(self) -> int:
+        """Move para o arquivo as ocorrências resolvidas há mais de `idade_arquivamento`
+
+        Agendada a cada `intervalo_arquivamento` segundos. Percorre apenas as
+        resolvidas mais antigas (o dicionário está em ordem de resolução).
+
+        Returns:
+            int: Quantidade de ocorrências arquivadas
+        """
+        limite = self.relogio() - self.idade_arquivamento
+        arquivadas = 0
+        with self._trava:
+            while self.resolvidas:
+                ocorrencia_id, (resolvida_em, ocorrencia) = next(iter(self.resolvidas.items()))
+                if resolvida_em > limite:
+                    break
+                del self.resolvidas[ocorrencia_id]
+                self.arquivo.arquivar(ocorrencia, resolvida_em)
+                arquivadas += 1
+        return arquivadas
+
+    def buscar_ocorrencia(self, ocorrencia_id: int):
+        """Busca uma ocorrência em qualquer camada
+
+        Returns:
+            Ocorrencia (ativa ou resolvida), dict (arquivada) ou None
+        """
+        resolvida = self.resolvidas.get(ocorrencia_id)
+        if resolvida is not None:
+            return resolvida[1]
+        for oc in self.fila_prioritaria:
+            if oc.id == ocorrencia_id:
+                return oc
+        return self.arquivo.obter(ocorrencia_id)
+
+    def _agendar_verificacao_fogo(self, ocorrencia: Ocorrencia):
+        """Agenda (ou reagenda) a verificação de fogo apagado de uma ocorrência"""
+        anterior = self._verificacoes_fogo.pop(id(ocorrencia), None)
+        if anterior is not None:
+            anterior.cancelar()  # Evita duas cadeias de verificação para o mesmo fogo
+        self._verificacoes_fogo[id(ocorrencia)] = self.temporizadores.agendar(
+            self.intervalo_verificacao_fogo, self._na_particao, "verificacao_fogo", ocorrencia, self._verificar_fogo
+        )
+
+    def _verificar_fogo(self, ocorrencia: Ocorrencia):
+        """Verifica um único fogo e reagenda enquanto ele continuar ativo"""
+        self._verificacoes_fogo.pop(id(ocorrencia), None)
+        self.verificar_fogos_apagados([ocorrencia])
+        if ocorrencia.status == "Fogo ativo":
+            self._agendar_verificacao_fogo(ocorrencia)
+
+    def verificar_fogos_apagados(self, ocorrencias: List[Ocorrencia] = None):
+        """Verifica se fogos ativos foram apagados
+
+        Chamada pelos temporizadores de verificação de cada fogo confirmado
+        (a cada `intervalo_verificacao_fogo` segundos, no trabalhador da região). Sem argumentos,
+        verifica toda a fila prioritária.
+        """
+        # Percorre as ocorrências informadas (ou todas as ativas; cópia, pois as apagadas saem da fila)
+        for oc in (list(self.fila_prioritaria) if ocorrencias is None else ocorrencias):
+            # Verifica se o objeto tem o atributo 'status', se o status é "Fogo ativo"
+            # e se um valor aleatório (entre 0 e 1) for maior que 0.4 (ou seja, 60% de chance)
+            if (hasattr(oc, 'status') and
+                    oc.status == "Fogo ativo" and
+                    self.rng_fogos.random() > 0.4):
+                # Marca que o fogo foi apagado
+                oc.fogo_apagado = True
+                # Atualiza o status da ocorrência para "Fogo apagado"
+                oc.status = "Fogo apagado"
+                # Define a severidade como 1 (mínima, pois o fogo já está apagado)
+                oc.severidade = 1
+                oc.tempo_fim_fogo = self.relogio()  # Marca o tempo em que o fogo foi apagado
+                self._transicao(oc, "extinto")
+
+                # Registra essa ação no rastreador de drones
+                self.drone_tracker.registrar(
+                    drone_id="Sistema",  # Ação realizada pelo sistema automaticamente
+                    acao=f"Fogo apagado na ocorrência {oc.id}",  # Mensagem da ação
+                    ocorrencia_id=oc.id  # ID da ocorrência tratada
+                )
+                self._resolver(oc)  # Sai da camada ativa
+
+    @property
+    def telemetria(self):
+        """ArmazemTelemetria dos drones, criado no primeiro uso"""
+        if self._telemetria is None:
+            from telemetria import ArmazemTelemetria
+            self._telemetria = ArmazemTelemetria(relogio=self.relogio)
+        return self._telemetria
+
+    @property
+    def modelo_propagacao(self):
+        """ModeloPropagacao com os campos de vento e combustível, criado no primeiro uso"""
+        if self._modelo_propagacao is None:
+            from propagacao import CamposAmbientais, ModeloPropagacao
+            campos = CamposAmbientais()
+            if self.arquivo_vento:
+                campos.carregar_vento(self.arquivo_vento)
+            if self.arquivo_combustivel:
+                campos.carregar_combustivel(self.arquivo_combustivel)
+            self._modelo_propagacao = ModeloPropagacao(campos)
+        return self._modelo_propagacao
+
+    def atualizar_projecoes(self) -> int:
+        """Projeta a área queimada em +1 h e +6 h de todas as ocorrências ativas
+
+        O modelo roda em lote sobre todas as ativas fora da trava; a área entra
+        na prioridade na próxima repontuação (ver `atualizar_prioridades`).
+
+        Returns:
+            int: Quantidade de ocorrências projetadas
+        """
+        ativas = list(self.fila_prioritaria)
+        if not ativas:
+            return 0
+        areas = self.modelo_propagacao.projetar([oc.local for oc in ativas], [oc.severidade for oc in ativas],
+                                                [oc.regiao for oc in ativas])
+        for ocorrencia, (area_1h, area_6h) in zip(ativas, areas.tolist()):
+            ocorrencia.area_projetada_1h = area_1h
+            ocorrencia.area_projetada_6h = area_6h
+        return len(ativas)
+
+    def repriorizar(self, ocorrencias: List[Ocorrencia] = None) -> int:
+        """Recalcula em lote a prioridade das ocorrências (padrão: todas as ativas)
+
+        A pontuação (`self.pontuacao`, padrão PontuacaoPadrao) roda fora da
+        trava sobre colunas NumPy. Só as ocorrências cuja prioridade mudou mais
+        que `tolerancia_prioridade` voltam para o heap da sua região, a partir
+        da posição em que estão; mudanças pequenas (como a idade avançando) se
+        acumulam até passar da tolerância.
+
+        Returns:
+            int: Quantidade de ocorrências reposicionadas
+        """
+        from priorizacao import PontuacaoPadrao, alteradas, colunas_ocorrencias, reposicionar
+
+        if self.pontuacao is None:
+            self.pontuacao = PontuacaoPadrao()
+        if ocorrencias is None:
+            ocorrencias = list(self.fila_prioritaria)
+        if not ocorrencias:
+            return 0
+        colunas = colunas_ocorrencias(ocorrencias, self.relogio())
+        mudancas = alteradas(ocorrencias, colunas["prioridade"], -self.pontuacao.pontuar(colunas),
+                             self.tolerancia_prioridade)
+        if not mudancas:
+            return 0
+        por_regiao: Dict[str, Tuple[list, list]] = {}
+        for ocorrencia, prioridade in mudancas:
+            alteradas_regiao, prioridades = por_regiao.setdefault(ocorrencia.regiao, ([], []))
+            alteradas_regiao.append(ocorrencia)
+            prioridades.append(prioridade)
+        reposicionadas = 0
+        for regiao, (alteradas_regiao, prioridades) in por_regiao.items():
+            particao = self.fila_prioritaria.particao(regiao)
+            with particao.trava:
+                reposicionadas += reposicionar(particao.fila, alteradas_regiao, prioridades)
+        return reposicionadas
+
+    def atualizar_prioridades(self) -> int:
+        """Ciclo de priorização: projeta a propagação e repontua todas as ativas
+
+        Agendada a cada `intervalo_priorizacao` segundos (o mesmo ciclo do despacho).
+
+        Returns:
+            int: Quantidade de ocorrências reposicionadas
+        """
+        self.atualizar_projecoes()
+        return self.repriorizar()
+
+    def verificar_drones_automaticamente(self, regiao: str = None):
+        """Executa um ciclo de verificação automática de envio de drones
+
+        Agendada a cada 5 segundos e também disparada pelos eventos
+        "nova_ocorrencia" (só a região da ocorrência, para que ocorrências
+        graves não esperem o próximo ciclo) e "drone_disponivel". O despacho
+        de cada região roda no trabalhador da sua partição; sem região, é uma
+        rodada por todas as partições, começando por uma diferente a cada vez.
+        """
+        if not self.drones_disponiveis:
+            return
+        if regiao is not None:
+            particao = self.fila_prioritaria.particao(regiao)
+            particao.executar("despacho", self._despachar_particao, particao, unico=True)
+            return
+        rodada = self.fila_prioritaria.nova_rodada()
+        for particao in self.fila_prioritaria.em_rodizio():
+            particao.executar("despacho", self._despachar_particao, particao, rodada, unico=True)
+
+    def _despachar_particao(self, particao, rodada: int = None) -> List[Dict]:
+        """Despacha drones para as ocorrências graves de uma região
+
+        A região leva no máximo a sua cota dos drones livres: a divisão pelas
+        partições que têm ocorrências a atender (na rodada, pelas que ainda não
+        foram atendidas), para que uma região em rajada não fique com todos.
+        """
+        livres = len(self.drones_disponiveis)
+        if not livres or not particao.fila:
+            return []
+
+        # Filtra apenas as ocorrências com severidade alta e status relevante
+        with particao.trava:
+            ocorrencias = [oc for oc in particao.fila
+                           if oc.severidade > 3 and  # Severidade maior que 3 é considerada alta
+                           oc.status == "Pendente"]  # Ainda não verificadas (fogos confirmados seguem pelas verificações de fogo)
+        particao.com_candidatos = bool(ocorrencias)
+        concorrentes = self.fila_prioritaria.disputando(rodada)
+        if rodada is not None:
+            particao.rodada = rodada
+        if not ocorrencias:
+            return []
+        cota = -(-livres // max(1, concorrentes))  # Arredonda para cima: nenhum drone sobra na rodada
+        return self.despachar_lote(ocorrencias, particao, cota)
+
+    def base_do_drone(self, drone: str) -> tuple:
+        """Posição [lat, lon] da base do drone (cadastra uma base padrão na primeira consulta)"""
+        base = self.bases_drones.get(drone)
+        if base is None:
+            from despacho import BASES
+            _, lat, lon = BASES[len(self.bases_drones) % len(BASES)]
+            base = self.bases_drones[drone] = (lat, lon)
+        return base
+
+    def despachar_lote(self, ocorrencias: List[Ocorrencia], particao=None, maximo: int = None) -> List[Dict]:
+        """Atribui todos os drones livres às ocorrências de uma vez
+
+        Monta a matriz de custos (tempo de viagem desde a base / severidade)
+        entre drones livres e ocorrências e resolve a atribuição em uma
+        passada (ver despacho.py). As missões são enviadas da ocorrência
+        mais grave para a menos grave.
+
+        Args:
+            ocorrencias: Ocorrências candidatas
+            particao: Partição da região; a atribuição roda no seu processo, se houver
+            maximo: Envia no máximo esta quantidade de missões (as mais graves)
+
+        Returns:
+            List[Dict]: Resultado de cada envio
+        """
+        from despacho import atribuir
+
+        drones = list(self.drones_disponiveis)
+        argumentos = (
+            [self.base_do_drone(drone) for drone in drones],
+            [oc.local for oc in ocorrencias],
+            [oc.severidade for oc in ocorrencias],
+            self.velocidade_drone_kmh,
+            self.metodo_despacho
+        )
+        pares = atribuir(*argumentos) if particao is None else particao.calcular(atribuir, *argumentos)
+        pares.sort(key=lambda par: (-ocorrencias[par[1]].severidade, par[1]))
+        if maximo is not None:
+            pares = pares[:maximo]
+        return [self.enviar_drone(ocorrencias[j], drones[i]) for i, j in pares]
 
 
     def adicionar_marcador(self, lat, lon, cor='red', popup=''):
@@ -511,6 +976,8 @@ class SistemaEmergencia:
 
         # Resto do método para criar o marcador
         if cor == 'red':
+            import folium  # Importado sob demanda: só quem desenha o mapa paga a importação
+
             # Se a cor for vermelha, cria um marcador com essas coordenadas no mapa
             # A parte "..." deve ser substituída pela criação real do marcador com Folium
             folium.Marker(
@@ -527,25 +994,22 @@ class SistemaEmergencia:
             return None
 
         try:
-            # Remove a primeira ocorrência da fila (a mais prioritária)
-            ocorrencia = self.fila_prioritaria.pop(0)
+            # Remove a ocorrência mais prioritária entre os heaps de todas as regiões
+            ocorrencia = self.fila_prioritaria.retirar()
+            if ocorrencia is None:
+                return None
 
             # Atualiza o status da ocorrência para indicar que o fogo foi apagado
             ocorrencia.status = "Fogo apagado"
             ocorrencia.fogo_apagado = True
-            ocorrencia.tempo_fim_fogo = time.time()  # Marca o tempo em que o fogo foi apagado
-
-            # Cria um dicionário de registro histórico do atendimento
-            registro = {
-                "tipo": "Atendimento",  # Tipo de ação
-                "descricao": f"Fogo apagado em {ocorrencia.regiao}",  # Descrição do evento
-                "severidade": ocorrencia.severidade,  # Nível de severidade do incêndio
-                "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),  # Data e hora atual formatada
-                "local": ocorrencia.local  # Local onde o fogo foi apagado
-            }
+            ocorrencia.tempo_fim_fogo = self.relogio()  # Marca o tempo em que o fogo foi apagado
+            self._transicao(ocorrencia, "atendimento")
+            with self._trava:
+                self.resolvidas[ocorrencia.id] = (self.relogio(), ocorrencia)
 
-            # Adiciona o registro ao histórico do sistema
-            self.historico.append(registro)
+            # Registra o atendimento no histórico (servido como dicionário com descrição e horário)
+            self._registrar_evento(eventos.ATENDIMENTO, ocorrencia=ocorrencia.id, regiao=ocorrencia.regiao,
+                                   valor=ocorrencia.severidade, local=ocorrencia.local)
 
             # Registra a ação no rastreador de drones (mesmo que feita pela equipe)
             self.drone_tracker.registrar(
@@ -570,8 +1034,18 @@ class SistemaEmergencia:
             print(f"Erro ao atender ocorrência: {str(e)}")
             return None
 
-    def simular_ocorrencias(self, quantidade=1):
-        """Simula novas ocorrências de incêndio"""
+    def simular_ocorrencias(self, quantidade=1, verboso: bool = True) -> List[Ocorrencia]:
+        """Simula novas ocorrências de incêndio
+
+        Args:
+            quantidade: Ocorrências a criar
+            verboso: Imprime e dispara "nova_ocorrencia" a cada ocorrência; em lote
+                (False) não imprime e dispara o evento uma vez ao final
+
+        Returns:
+            List[Ocorrencia]: Ocorrências criadas
+        """
+        criadas = []
 
         # Lista de regiões brasileiras onde o incêndio pode ocorrer
         regioes = ["Amazônia", "Cerrado", "Mata Atlântica", "Caatinga", "Pampa"]
@@ -580,92 +1054,193 @@ class SistemaEmergencia:
         for _ in range(quantidade):
             try:
                 # Gera latitude e longitude dentro dos limites aproximados do Brasil
-                lat = random.uniform(-33.75, 5.27)  # Sul ao Norte do Brasil
-                lon = random.uniform(-73.99, -34.79)  # Oeste ao Leste do Brasil
+                lat = self.rng_ocorrencias.uniform(-33.75, 5.27)  # Sul ao Norte do Brasil
+                lon = self.rng_ocorrencias.uniform(-73.99, -34.79)  # Oeste ao Leste do Brasil
 
                 # Cria uma nova ocorrência de incêndio
                 nova_ocorrencia = Ocorrencia(
                     prioridade=0,  # A prioridade será ajustada automaticamente no __post_init__
                     local=[lat, lon],  # Coordenadas geográficas da ocorrência
-                    severidade=random.randint(1, 5),  # Severidade aleatória de 1 (leve) a 5 (grave)
-                    regiao=random.choice(regioes)  # Seleciona uma região aleatória do Brasil
+                    severidade=self.rng_ocorrencias.randint(1, 5),  # Severidade aleatória de 1 (leve) a 5 (grave)
+                    regiao=self.rng_ocorrencias.choice(regioes),  # Seleciona uma região aleatória do Brasil
+                    registrada_em=self.relogio()
                 )
 
-                # Adiciona a nova ocorrência à fila prioritária
-                self.fila_prioritaria.append(nova_ocorrencia)
+                # Adiciona a nova ocorrência à fila prioritária da região (heap)
+                self.fila_prioritaria.inserir(nova_ocorrencia)
+                self._transicao(nova_ocorrencia, "registro")
+                criadas.append(nova_ocorrencia)
 
-                # Imprime uma mensagem informando que a ocorrência foi simulada
-                print(f"Ocorrência {nova_ocorrencia.id} simulada na região {nova_ocorrencia.regiao}")
+                if verboso:
+                    # Imprime uma mensagem informando que a ocorrência foi simulada
+                    print(f"Ocorrência {nova_ocorrencia.id} simulada na região {nova_ocorrencia.regiao}")
+                    self.agendador.disparar("nova_ocorrencia", nova_ocorrencia.regiao)
 
             except Exception as e:
                 # Caso ocorra algum erro durante a simulação, exibe a mensagem de erro
                 print(f"Erro ao simular ocorrência: {str(e)}")
 
+        if not verboso and criadas:
+            self.agendador.disparar("nova_ocorrencia")  # Uma rodada de despacho para o lote inteiro
+
         # Observação: Pode ser chamada dentro de uma thread para gerar ocorrências de forma periódica
+        return criadas
 
     def simular_ocorrencias_periodicamente(self):
-        """Simula ocorrências periodicamente em segundo plano"""
-
-        # Loop infinito para simular constantemente
-        while True:
-            try:
-                time.sleep(5)  # Espera 5 segundos entre uma simulação e outra
-
-                # Simula uma nova ocorrência de incêndio
-                self.simular_ocorrencias(1)
-
-                # Se a fila tiver pelo menos uma ocorrência, pega a mais recente
-                if self.fila_prioritaria:
-                    ultima_ocorrencia = self.fila_prioritaria[-1]
-
-                    # Cria uma mensagem de log mais informativa com ID, região e severidade
-                    log_msg = (
-                        f"[{time.strftime('%H:%M:%S')}] "
-                        f"Ocorrência simulada - ID: {getattr(ultima_ocorrencia, 'id', 'N/A')} | "
-                        f"Região: {getattr(ultima_ocorrencia, 'regiao', 'N/A')} | "
-                        f"Severidade: {getattr(ultima_ocorrencia, 'severidade', 'N/A')}"
-                    )
-                    print(log_msg)
-                else:
-                    # Caso a fila esteja vazia após a simulação (pouco provável), exibe alerta
-                    print(f"[{time.strftime('%H:%M:%S')}] Tentativa de simulação falhou - fila vazia")
-
-            except Exception as e:
-                # Se ocorrer algum erro durante a simulação, exibe a mensagem de erro com horário
-                print(f"[{time.strftime('%H:%M:%S')}] Erro na simulação periódica: {str(e)}")
-                time.sleep(10)  # Espera 10 segundos antes de tentar novamente após erro
-
-    def iniciar_servicos(self):
-        """Inicia threads de serviços em segundo plano"""
-
-        # Lista de threads para verificação automática de drones e verificação de fogos apagados
-        threads = [
-            threading.Thread(
-                target=self.verificar_drones_automaticamente,  # Verifica se há drones disponíveis para enviar
-                daemon=True,  # Thread daemon: encerra junto com o programa principal
-                name="drone_checker"  # Nome da thread para facilitar identificação
-            ),
-            threading.Thread(
-                target=self.verificar_fogos_apagados,  # Verifica se o fogo foi apagado automaticamente
-                daemon=True,
-                name="fire_checker"
-            ),
-        ]
-
-        # Cria e inicia uma thread separada para simular ocorrências periodicamente
-        threading.Thread(
-            target=self.simular_ocorrencias_periodicamente,
-            daemon=True,
-            name="simulador_ocorrencias"
-        ).start()
-
-        # Inicia todas as threads listadas acima
-        for t in threads:
-            t.start()
-            print(f"Iniciada thread {t.name}")  # Mensagem de log indicando que o serviço começou
+        """Executa um ciclo da simulação periódica de ocorrências
 
+        Agendada a cada 5 segundos pelo agendador em `iniciar_servicos`.
+        """
+        # Simula uma nova ocorrência de incêndio
+        criadas = self.simular_ocorrencias(1)
+
+        # Se a simulação criou a ocorrência, registra a mais recente
+        if criadas:
+            ultima_ocorrencia = criadas[-1]
+
+            # Cria uma mensagem de log mais informativa com ID, região e severidade
+            log_msg = (
+                f"[{time.strftime('%H:%M:%S')}] "
+                f"Ocorrência simulada - ID: {getattr(ultima_ocorrencia, 'id', 'N/A')} | "
+                f"Região: {getattr(ultima_ocorrencia, 'regiao', 'N/A')} | "
+                f"Severidade: {getattr(ultima_ocorrencia, 'severidade', 'N/A')}"
+            )
+            print(log_msg)
+        else:
+            # Caso a simulação não tenha criado a ocorrência, exibe alerta
+            print(f"[{time.strftime('%H:%M:%S')}] Tentativa de simulação falhou")
 
+    def _registrar_servicos(self):
+        """Registra as tarefas periódicas e por evento no agendador (uma única vez)"""
+        if self._servicos_registrados:
+            return
 
+        # Tarefas periódicas: (nome, intervalo em segundos, função, pausa extra após erro)
+        self.agendador.registrar_periodica("drone_checker", 5, self.verificar_drones_automaticamente, atraso_erro=10)
+        self.agendador.registrar_periodica("simulador_ocorrencias", 5, self.simular_ocorrencias_periodicamente,
+                                           atraso_erro=10)
+        self.agendador.registrar_periodica("arquivamento", self.intervalo_arquivamento, self.arquivar_resolvidas)
+        self.agendador.registrar_periodica("priorizacao", self.intervalo_priorizacao, self.atualizar_prioridades,
+                                           atraso_erro=10)
+        self.monitoramento.iniciar_simulacao()  # Atualização do mapa a cada 3 segundos
+
+        # Tarefas disparadas por evento
+        self.agendador.registrar_evento("nova_ocorrencia", self.verificar_drones_automaticamente,
+                                        nome="drone_checker:nova_ocorrencia")
+        self.agendador.registrar_evento("drone_disponivel", self.verificar_drones_automaticamente,
+                                        nome="drone_checker:drone_disponivel")
+
+        self._servicos_registrados = True
+
+    def restaurar(self) -> int:
+        """Reconstrói o estado em memória a partir da persistência (ao assumir a liderança)
+
+        Descarta o que houver em memória (de uma liderança anterior deste
+        processo) e recarrega as ocorrências ativas, as resolvidas ainda não
+        arquivadas e os contatos cadastrados. Cada drone em voo volta a ficar
+        ocupado e a conclusão da missão é reagendada para o restante do tempo
+        de voo (na hora, se já venceu); ocorrências em verificação sem missão
+        conhecida voltam a pendentes, e os fogos ativos voltam a ser verificados.
 
+        Returns:
+            int: Quantidade de ocorrências ativas restauradas
+        """
+        if self.persistencia is None:
+            return 0
+        self.persistencia.descarregar()  # O que este processo ainda não gravou
+        agora = self.relogio()
+        estado = self.persistencia.carregar_estado(agora - self.idade_arquivamento)
+        avancar_ids(estado["ultimo_id"])  # Novas ocorrências não reutilizam IDs gravados
+
+        for temporizador in self._verificacoes_fogo.values():
+            temporizador.cancelar()
+        self._verificacoes_fogo.clear()
+        self.fila_prioritaria.clear()
+
+        ativas = [self._ocorrencia_persistida(linha) for linha in estado["ativas"]]
+        for ocorrencia in ativas:
+            if not self.regioes.search(ocorrencia.regiao):
+                self.regioes.insert(ocorrencia.regiao)
+            self.fila_prioritaria.inserir(ocorrencia)
+        with self._trava:
+            self.resolvidas.clear()
+            for linha in estado["resolvidas"]:
+                self.resolvidas[linha["id"]] = (linha["atualizada_em"], self._ocorrencia_persistida(linha))
+
+        # Drones: os em voo continuam ocupados até a missão reagendada concluir
+        with self._trava_drones:
+            drones = list(self.drones_disponiveis) + sorted(self._drones_em_missao)
+            em_voo = {}
+            for ocorrencia in ativas:
+                missao = estado["missoes"].get(ocorrencia.id)
+                if ocorrencia.status != "Em verificação":
+                    continue
+                if missao is None or missao[0] not in drones or missao[0] in em_voo:
+                    ocorrencia.status = "Pendente"  # Drone desconhecido: volta ao despacho
+                    self.persistencia.salvar_ocorrencia(ocorrencia, agora)
+                    continue
+                em_voo[missao[0]] = (ocorrencia, missao[1])
+            self.drones_disponiveis = deque(drone for drone in drones if drone not in em_voo)
+            self._drones_em_missao = set(em_voo)
+            self.drone_em_missao = bool(em_voo)
+        for drone, (ocorrencia, despachada_em) in em_voo.items():
+            self.temporizadores.agendar(max(0.0, self.tempo_missao - (agora - despachada_em)), self._na_particao,
+                                        "missao", ocorrencia, self.simular_missao, drone)
+        for ocorrencia in ativas:
+            if ocorrencia.status == "Fogo ativo":
+                self._agendar_verificacao_fogo(ocorrencia)
+
+        existentes = {(contato.nome, contato.email) for contato in self.sistema_alerta.contatos.to_list()}
+        for linha in estado["contatos"]:
+            if (linha["nome"], linha["email"]) not in existentes:
+                self.sistema_alerta.adicionar_contato(ContatoEmergencia(
+                    nome=linha["nome"], email=linha["email"], telefone=linha["telefone"], tipo=linha["tipo"],
+                    regioes=linha["regioes"], areas=linha["areas"]), persistir=False)
+
+        print(f"Estado restaurado: {len(ativas)} ocorrências ativas, {len(em_voo)} missões em voo")
+        return len(ativas)
+
+    @staticmethod
+    def _ocorrencia_persistida(linha: dict) -> Ocorrencia:
+        """Ocorrência a partir de uma linha da tabela de ocorrências da persistência"""
+        return Ocorrencia(
+            prioridade=0,
+            local=[linha["latitude"], linha["longitude"]],
+            severidade=linha["severidade"],
+            regiao=linha["regiao"],
+            id=linha["id"],
+            status=linha["status"],
+            fogo_confirmado=bool(linha["fogo_confirmado"]),
+            fogo_apagado=linha["status"] == "Fogo apagado",
+            tempo_inicio_fogo=linha["tempo_inicio_fogo"] or 0.0,
+            tempo_fim_fogo=linha["tempo_fim_fogo"] or 0.0,
+            registrada_em=linha["timestamp"] or 0.0
+        )
 
+    def iniciar_servicos(self, loop=None):
+        """Inicia os serviços em segundo plano no agendador asyncio
 
+        Args:
+            loop: Event loop já em execução (ex.: servidor ASGI). Quando omitido,
+                o agendador cria um loop próprio em uma única thread.
+        """
+        self._registrar_servicos()
+        self.fila_prioritaria.iniciar()  # Trabalhadores das partições (as novas já nascem iniciadas)
+        self.agendador.iniciar(loop)
+        if self.sistema_alerta.caixa_saida is not None:
+            # Só quem executa os serviços (o líder) recupera o que ficou em envio na execução anterior
+            self.sistema_alerta.caixa_saida.iniciar(recuperar=True)
+        for metrica in self.agendador.metricas():
+            print(f"Iniciada tarefa {metrica['nome']}")  # Mensagem de log indicando que o serviço começou
+
+    def parar_servicos(self, timeout: float = 5.0):
+        """Cancela todas as tarefas em segundo plano e encerra o agendador"""
+        self.agendador.parar(timeout)
+        # Partições antes dos temporizadores: um trabalho em andamento (missão, verificação de
+        # fogo) agenda novos temporizadores e religaria o serviço depois de parado
+        self.fila_prioritaria.parar(timeout)
+        self.temporizadores.parar()
+        if self.persistencia is not None:
+            self.persistencia.parar(timeout)
+        if self.sistema_alerta.caixa_saida is not None:
+            self.sistema_alerta.caixa_saida.parar(timeout)
@@ -0,0 +1,235 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Controle de admissão das rotas que criam ocorrências em massa (/simular e
+# /ingestao/focos).
+#
+# - Limites de tamanho por requisição (quantidade simulada e bytes do CSV).
+# - Pedidos pequenos rodam na própria requisição; os grandes viram trabalhos
+#   em uma fila limitada, executados por uma única thread, com id e progresso
+#   consultáveis. Fila cheia: 429 com Retry-After estimado.
+# - Um limitador global (balde de tokens em registros/s) compassa os trabalhos
+#   em lotes e recusa pedidos síncronos quando está em dívida, para que as
+#   rotas de leitura continuem com a mesma latência durante uma enxurrada.
+
+import itertools
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional
+
+from metricas import REGISTRO
+from sistema_alerta import BaldeTokens
+
+ADMISSOES = REGISTRO.contador(
+    "sentinel_admissao", "Pedidos das rotas de ingestão por decisão da admissão", ("rota", "resultado"))
+
+_proximo_trabalho = itertools.count(1)
+
+BYTES_POR_LINHA_FOCOS = 80  # Tamanho típico de uma linha do CSV do FIRMS (estimativa do custo)
+
+
+class LimitadorIngestao:
+    """Balde de tokens global, em registros por segundo, compartilhado pelas rotas de ingestão
+
+    Args:
+        taxa: Registros por segundo sustentados
+        rajada: Registros aceitos de uma vez com o balde cheio
+    """
+
+    def __init__(self, taxa: float, rajada: float = None, relogio: Callable[[], float] = time.monotonic):
+        self._balde = BaldeTokens(rajada if rajada is not None else taxa, taxa, relogio)
+        self._trava = threading.Lock()
+
+    @property
+    def taxa(self) -> float:
+        return self._balde.taxa
+
+    def tentar(self, quantidade: float) -> float:
+        """Consome `quantidade` se houver saldo; senão retorna os segundos de espera (nada é consumido)"""
+        with self._trava:
+            espera = self._balde.espera(quantidade)
+            if espera == 0:
+                self._balde.consumir(quantidade)
+            return espera
+
+    def reservar(self, quantidade: float) -> float:
+        """Consome `quantidade` mesmo em dívida; retorna quanto o chamador deve esperar para pagá-la"""
+        with self._trava:
+            self._balde.consumir(quantidade)
+            return self._balde.espera(0)
+
+    def aguardar(self, quantidade: float):
+        """Compassa um trabalho: reserva e dorme até a dívida ser paga"""
+        espera = self.reservar(quantidade)
+        if espera > 0:
+            time.sleep(espera)
+
+
+class Trabalho:
+    """Pedido de ingestão executado em segundo plano"""
+
+    def __init__(self, tipo: str, funcao: Callable[['Trabalho'], dict], custo: float):
+        self.id = next(_proximo_trabalho)
+        self.tipo = tipo
+        self.funcao = funcao
+        self.custo = custo  # Registros estimados (Retry-After)
+        self.estado = "na_fila"  # na_fila, executando, concluido, falhou
+        self.progresso: dict = {}
+        self.resultado: Optional[dict] = None
+        self.erro: Optional[str] = None
+        self.criado_em = time.time()
+        self.iniciado_em: Optional[float] = None
+        self.concluido_em: Optional[float] = None
+
+    def para_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "tipo": self.tipo,
+            "estado": self.estado,
+            "progresso": self.progresso,
+            "resultado": self.resultado,
+            "erro": self.erro,
+            "criado_em": self.criado_em,
+            "iniciado_em": self.iniciado_em,
+            "concluido_em": self.concluido_em,
+        }
+
+
+class FilaTrabalhos:
+    """Fila limitada de trabalhos executados em ordem por uma thread (criada no primeiro envio)
+
+    Args:
+        limitador: Ritmo global, usado para estimar o Retry-After
+        capacidade: Trabalhos aguardando (além do que está em execução)
+        historico: Trabalhos terminados mantidos para consulta
+    """
+
+    def __init__(self, limitador: LimitadorIngestao, capacidade: int = 8, historico: int = 200):
+        self.limitador = limitador
+        self.capacidade = capacidade
+        self.historico = historico
+        self._fila: deque = deque()
+        self._trabalhos: "OrderedDict[int, Trabalho]" = OrderedDict()
+        self._em_execucao: Optional[Trabalho] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self):
+        return len(self._fila)
+
+    def submeter(self, tipo: str, funcao: Callable[[Trabalho], dict], custo: float) -> Optional[Trabalho]:
+        """Enfileira um trabalho; None se a fila estiver cheia"""
+        with self._cond:
+            if len(self._fila) >= self.capacidade:
+                return None
+            trabalho = Trabalho(tipo, funcao, custo)
+            self._fila.append(trabalho)
+            self._trabalhos[trabalho.id] = trabalho
+            self._descartar_terminados()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, name="trabalhos-ingestao", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return trabalho
+
+    def espera_estimada(self) -> int:
+        """Segundos (arredondados para cima) até a fila escoar no ritmo do limitador"""
+        with self._cond:
+            pendente = sum(trabalho.custo for trabalho in self._fila)
+            if self._em_execucao is not None:
+                pendente += max(self._em_execucao.custo - self._em_execucao.progresso.get("registros", 0), 0)
+        return max(1, math.ceil(pendente / self.limitador.taxa)) if self.limitador.taxa > 0 else 60
+
+    def obter(self, trabalho_id: int) -> Optional[Trabalho]:
+        return self._trabalhos.get(trabalho_id)
+
+    def listar(self) -> List[dict]:
+        with self._cond:
+            return [trabalho.para_dict() for trabalho in reversed(self._trabalhos.values())]
+
+    def estatisticas(self) -> Dict[str, int]:
+        contagem: Dict[str, int] = {}
+        for trabalho in list(self._trabalhos.values()):
+            contagem[trabalho.estado] = contagem.get(trabalho.estado, 0) + 1
+        return contagem
+
+    def _descartar_terminados(self):
+        excedente = len(self._trabalhos) - self.historico
+        for trabalho_id in list(self._trabalhos):
+            if excedente <= 0:
+                break
+            if self._trabalhos[trabalho_id].estado in ("concluido", "falhou"):
+                del self._trabalhos[trabalho_id]
+                excedente -= 1
+
+    def _executar(self):
+        while True:
+            with self._cond:
+                while not self._fila:
+                    self._cond.wait()
+                trabalho = self._em_execucao = self._fila.popleft()
+            trabalho.estado = "executando"
+            trabalho.iniciado_em = time.time()
+            try:
+                trabalho.resultado = trabalho.funcao(trabalho)
+                trabalho.estado = "concluido"
+            except Exception as e:
+                trabalho.erro = str(e)
+                trabalho.estado = "falhou"
+                print(f"Erro no trabalho {trabalho.id} ({trabalho.tipo}): {str(e)}")
+            trabalho.concluido_em = time.time()
+            with self._cond:
+                self._em_execucao = None
+
+
+def simulacao_em_lotes(sistema, quantidade: int, limitador: LimitadorIngestao,
+                       lote: int = 100) -> Callable[[Trabalho], dict]:
+    """Função de trabalho que simula `quantidade` ocorrências em lotes compassados"""
+    def executar(trabalho: Trabalho) -> dict:
+        criadas = 0
+        while criadas < quantidade:
+            n = min(lote, quantidade - criadas)
+            limitador.aguardar(n)
+            criadas += len(sistema.simular_ocorrencias(n, verboso=False))
+            trabalho.progresso = {"registros": criadas, "total": quantidade}
+        print(f"Trabalho {trabalho.id}: {criadas} ocorrências simuladas")
+        return {"criadas": criadas}
+    return executar
+
+
+def gravar_temporario(fluxo, limite_bytes: int, bloco: int = 1 << 20) -> Optional[str]:
+    """Copia o corpo da requisição para um arquivo temporário; None (e nada gravado) se passar do limite"""
+    descritor, caminho = tempfile.mkstemp(prefix="sentinel_ingestao_", suffix=".csv")
+    total = 0
+    with os.fdopen(descritor, "wb") as destino:
+        while True:
+            dados = fluxo.read(bloco)
+            if not dados:
+                break
+            total += len(dados)
+            if total > limite_bytes:
+                break
+            destino.write(dados)
+    if total > limite_bytes:
+        os.remove(caminho)
+        return None
+    return caminho
+
+
+def ingestao_de_arquivo(ingestor, caminho: str, limitador: LimitadorIngestao) -> Callable[[Trabalho], dict]:
+    """Função de trabalho que ingere um CSV já gravado, compassando cada lote no limitador"""
+    def executar(trabalho: Trabalho) -> dict:
+        def progresso(parcial: dict):
+            limitador.aguardar(parcial["linhas"] - trabalho.progresso.get("registros", 0))
+            trabalho.progresso = dict(parcial, registros=parcial["linhas"])
+
+        try:
+            with open(caminho, "rb") as arquivo:
+                return ingestor.ingerir_binario(arquivo, progresso)
+        finally:
+            os.remove(caminho)
+    return executar
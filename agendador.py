@@ -0,0 +1,273 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from metricas import REGISTRO
+
+DURACAO_TAREFAS = REGISTRO.histograma(
+    "sentinel_servico_iteracao_segundos", "Duração de cada execução das tarefas em segundo plano", ("tarefa",))
+FALHAS_TAREFAS = REGISTRO.contador(
+    "sentinel_servico_falhas", "Execuções de tarefas em segundo plano que falharam", ("tarefa",))
+
+
+class MetricasTarefa:
+    """Métricas de execução de uma tarefa agendada"""
+
+    def __init__(self, nome: str, tipo: str, intervalo: Optional[float] = None):
+        self.nome = nome
+        self.tipo = tipo  # "periodica" ou "evento"
+        self.intervalo = intervalo
+        self.execucoes = 0
+        self.falhas = 0
+        self.tempo_total = 0.0
+        self.tempo_maximo = 0.0
+        self.ultima_duracao = 0.0
+        self.ultima_execucao: Optional[float] = None
+        self.ultimo_erro: Optional[str] = None
+
+    def registrar(self, duracao: float, erro: Optional[Exception] = None):
+        """Contabiliza uma execução da tarefa"""
+        self.execucoes += 1
+        self.tempo_total += duracao
+        self.ultima_duracao = duracao
+        self.ultima_execucao = time.time()
+        if duracao > self.tempo_maximo:
+            self.tempo_maximo = duracao
+        if erro is not None:
+            self.falhas += 1
+            self.ultimo_erro = str(erro)
+
+    def to_dict(self) -> dict:
+        return {
+            "nome": self.nome,
+            "tipo": self.tipo,
+            "intervalo": self.intervalo,
+            "execucoes": self.execucoes,
+            "falhas": self.falhas,
+            "tempo_total": round(self.tempo_total, 6),
+            "tempo_medio": round(self.tempo_total / self.execucoes, 6) if self.execucoes else 0.0,
+            "tempo_maximo": round(self.tempo_maximo, 6),
+            "ultima_duracao": round(self.ultima_duracao, 6),
+            "ultima_execucao": self.ultima_execucao,
+            "ultimo_erro": self.ultimo_erro
+        }
+
+
+class _TarefaPeriodica:
+    def __init__(self, nome: str, intervalo: float, funcao: Callable, atraso_erro: float):
+        self.nome = nome
+        self.intervalo = intervalo
+        self.funcao = funcao
+        self.atraso_erro = atraso_erro
+        self.metricas = MetricasTarefa(nome, "periodica", intervalo)
+
+
+class _TarefaEvento:
+    def __init__(self, nome: str, evento: str, funcao: Callable):
+        self.nome = nome
+        self.evento = evento
+        self.funcao = funcao
+        self.metricas = MetricasTarefa(nome, "evento")
+
+
+class Agendador:
+    """Agendador único baseado em asyncio para os serviços em segundo plano
+
+    Substitui as várias threads com laços `while True: time.sleep(...)` por
+    um único event loop com tarefas periódicas e tarefas disparadas por
+    evento. O loop pode ser próprio (executado em uma thread dedicada) ou
+    o loop de um servidor ASGI já em execução. Funções síncronas rodam no
+    executor padrão do loop (`asyncio.to_thread`), para não travar o loop
+    (no ASGI, o mesmo que atende as requisições); corrotinas rodam no loop.
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._periodicas: Dict[str, _TarefaPeriodica] = {}
+        self._eventos: Dict[str, List[_TarefaEvento]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._pendentes: set = set()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_proprio = False
+        self._ativo = False
+
+    # ---------- Registro ----------
+
+    def registrar_periodica(self, nome: str, intervalo: float, funcao: Callable, atraso_erro: float = None):
+        """Registra uma tarefa executada a cada `intervalo` segundos
+
+        Args:
+            nome: Identificação da tarefa (usada nas métricas)
+            intervalo: Intervalo entre execuções, em segundos
+            funcao: Função ou corrotina sem argumentos
+            atraso_erro: Pausa extra após uma falha (padrão: nenhuma)
+        """
+        if nome in self._periodicas:
+            raise ValueError(f"Tarefa já registrada: {nome}")
+        tarefa = _TarefaPeriodica(nome, intervalo, funcao, atraso_erro or 0.0)
+        self._periodicas[nome] = tarefa
+        if self.em_execucao:
+            self.loop.call_soon_threadsafe(self._iniciar_periodica, tarefa)
+
+    def registrar_evento(self, evento: str, funcao: Callable, nome: str = None):
+        """Registra uma tarefa executada sempre que `evento` for disparado"""
+        tarefa = _TarefaEvento(nome or f"{evento}:{getattr(funcao, '__name__', 'tarefa')}", evento, funcao)
+        self._eventos.setdefault(evento, []).append(tarefa)
+
+    def disparar(self, evento: str, *args):
+        """Dispara um evento (pode ser chamado de qualquer thread)
+
+        Sem loop em execução o evento é ignorado, assim como ocorria antes
+        de `iniciar_servicos` ser chamado.
+        """
+        if not self.em_execucao or evento not in self._eventos:
+            return
+        if self._no_loop():
+            self._agendar_evento(evento, args)
+        else:
+            self.loop.call_soon_threadsafe(self._agendar_evento, evento, args)
+
+    # ---------- Ciclo de vida ----------
+
+    @property
+    def em_execucao(self) -> bool:
+        return self._ativo and self.loop is not None and not self.loop.is_closed()
+
+    def iniciar(self, loop: asyncio.AbstractEventLoop = None):
+        """Inicia o agendador
+
+        Args:
+            loop: Loop já em execução (ex.: de um servidor ASGI). Quando
+                omitido, cria um loop próprio em uma thread daemon.
+        """
+        if self.em_execucao:
+            return
+
+        if loop is not None:
+            self.loop = loop
+            self._loop_proprio = False
+            if loop.is_running() and not self._no_loop():
+                loop.call_soon_threadsafe(self._iniciar_tarefas)
+            else:
+                self._iniciar_tarefas()
+            return
+
+        self.loop = asyncio.new_event_loop()
+        self._loop_proprio = True
+        pronto = threading.Event()
+
+        def executar():
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(pronto.set)
+            self._iniciar_tarefas()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
+
+        self._thread = threading.Thread(target=executar, daemon=True, name="agendador")
+        self._thread.start()
+        pronto.wait()
+
+    def parar(self, timeout: float = 5.0):
+        """Cancela todas as tarefas e encerra o loop próprio, se houver"""
+        if not self.em_execucao:
+            return
+
+        if self._loop_proprio:
+            futuro = asyncio.run_coroutine_threadsafe(self._cancelar_tarefas(), self.loop)
+            try:
+                futuro.result(timeout)
+            finally:
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                if self._thread is not None:
+                    self._thread.join(timeout)
+                self._thread = None
+        else:
+            if not self._no_loop():
+                asyncio.run_coroutine_threadsafe(self._cancelar_tarefas(), self.loop).result(timeout)
+            else:
+                for task in self._tasks + list(self._pendentes):
+                    task.cancel()
+                self._tasks.clear()
+                self._pendentes.clear()
+                self._ativo = False
+
+        self.loop = None
+
+    async def parar_async(self):
+        """Versão assíncrona de `parar` para uso dentro do próprio loop"""
+        await self._cancelar_tarefas()
+        self.loop = None
+
+    def metricas(self) -> List[dict]:
+        """Retorna as métricas de execução de todas as tarefas registradas"""
+        resultado = [t.metricas.to_dict() for t in self._periodicas.values()]
+        for tarefas in self._eventos.values():
+            resultado.extend(t.metricas.to_dict() for t in tarefas)
+        return resultado
+
+    # ---------- Internos ----------
+
+    def _no_loop(self) -> bool:
+        """Indica se a chamada atual está sendo feita de dentro do loop do agendador"""
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _iniciar_tarefas(self):
+        self._ativo = True
+        for tarefa in self._periodicas.values():
+            self._iniciar_periodica(tarefa)
+
+    def _iniciar_periodica(self, tarefa: _TarefaPeriodica):
+        task = self.loop.create_task(self._executar_periodica(tarefa), name=tarefa.nome)
+        self._tasks.append(task)
+
+    def _agendar_evento(self, evento: str, args: tuple):
+        for tarefa in self._eventos.get(evento, []):
+            task = self.loop.create_task(self._executar(tarefa.funcao, tarefa.metricas, args))
+            self._pendentes.add(task)
+            task.add_done_callback(self._pendentes.discard)
+
+    async def _executar(self, funcao: Callable, metricas: MetricasTarefa, args: tuple = ()) -> Optional[Exception]:
+        inicio = time.perf_counter()
+        erro = None
+        try:
+            if asyncio.iscoroutinefunction(funcao):
+                await funcao(*args)
+            else:
+                resultado = await asyncio.to_thread(funcao, *args)
+                if asyncio.iscoroutine(resultado):
+                    await resultado
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            erro = e
+            print(f"Erro na tarefa {metricas.nome}: {str(e)}")
+        duracao = time.perf_counter() - inicio
+        metricas.registrar(duracao, erro)
+        DURACAO_TAREFAS.observar(duracao, (metricas.nome,))
+        if erro is not None:
+            FALHAS_TAREFAS.inc(rotulos=(metricas.nome,))
+        return erro
+
+    async def _executar_periodica(self, tarefa: _TarefaPeriodica):
+        while True:
+            await asyncio.sleep(tarefa.intervalo)
+            erro = await self._executar(tarefa.funcao, tarefa.metricas)
+            if erro is not None and tarefa.atraso_erro:
+                await asyncio.sleep(tarefa.atraso_erro)
+
+    async def _cancelar_tarefas(self):
+        tarefas = self._tasks + list(self._pendentes)
+        for task in tarefas:
+            task.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        self._tasks.clear()
+        self._pendentes.clear()
+        self._ativo = False
@@ -0,0 +1,130 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Séries temporais pré-agregadas das ocorrências.
+#
+# Cada transição de estado (registro, confirmação, extinção) atualiza em O(1)
+# os baldes de hora, dia e semana da região e o agregado de todas as regiões.
+# As consultas apenas localizam o intervalo pedido por busca binária nos
+# inícios de balde: nunca relêem os eventos brutos.
+
+import bisect
+import threading
+from typing import Dict, List, Optional
+
+TODAS_REGIOES = "*"
+
+# Granularidades: nome -> (duração em segundos, deslocamento do alinhamento)
+# As semanas começam na segunda-feira (a época Unix caiu numa quinta-feira).
+GRANULARIDADES = {
+    "1h": (3600, 0),
+    "1d": (86400, 0),
+    "1w": (604800, 4 * 86400),
+}
+
+# Posições do acumulador de cada balde
+_NOVAS, _CONFIRMADAS, _EXTINTAS, _SOMA_SEVERIDADE, _SOMA_EXTINCAO, _N_EXTINCAO = range(6)
+
+
+def inicio_balde(instante: float, granularidade: str) -> int:
+    """Início (UTC, em segundos desde a época) do balde que contém o instante"""
+    duracao, deslocamento = GRANULARIDADES[granularidade]
+    return int((instante - deslocamento) // duracao) * duracao + deslocamento
+
+
+class SeriesIncendios:
+    """Tabelas de agregação incrementais por (granularidade, região, balde)
+
+    Cada balde guarda contadores de fogos novos, confirmados e extintos, a
+    soma das severidades no registro e a soma dos tempos até a extinção,
+    de onde saem as médias na consulta.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        # (granularidade, região) -> {início do balde: acumulador}
+        self._baldes: Dict[tuple, Dict[int, list]] = {}
+        # (granularidade, região) -> inícios de balde ordenados (para busca por intervalo)
+        self._inicios: Dict[tuple, List[int]] = {}
+
+    def registrar(self, ocorrencia, evento: str, instante: float):
+        """Atualiza os baldes com uma transição da ocorrência
+
+        Eventos considerados: "registro" (nova), "confirmado", "extinto" e
+        "atendimento" (extinta); os demais são ignorados.
+        """
+        if evento == "registro":
+            posicao, valor = _NOVAS, ocorrencia.severidade
+        elif evento == "confirmado":
+            posicao, valor = _CONFIRMADAS, None
+        elif evento in ("extinto", "atendimento"):
+            posicao, valor = _EXTINTAS, None
+            if ocorrencia.tempo_inicio_fogo > 0 and ocorrencia.tempo_fim_fogo >= ocorrencia.tempo_inicio_fogo:
+                valor = ocorrencia.tempo_fim_fogo - ocorrencia.tempo_inicio_fogo
+        else:
+            return
+
+        with self._trava:
+            for granularidade in GRANULARIDADES:
+                inicio = inicio_balde(instante, granularidade)
+                for regiao in (ocorrencia.regiao, TODAS_REGIOES):
+                    acumulador = self._balde(granularidade, regiao, inicio)
+                    acumulador[posicao] += 1
+                    if valor is None:
+                        continue
+                    if posicao == _NOVAS:
+                        acumulador[_SOMA_SEVERIDADE] += valor
+                    else:
+                        acumulador[_SOMA_EXTINCAO] += valor
+                        acumulador[_N_EXTINCAO] += 1
+
+    def _balde(self, granularidade: str, regiao: str, inicio: int) -> list:
+        chave = (granularidade, regiao)
+        baldes = self._baldes.get(chave)
+        if baldes is None:
+            baldes = self._baldes[chave] = {}
+            self._inicios[chave] = []
+        acumulador = baldes.get(inicio)
+        if acumulador is None:
+            acumulador = baldes[inicio] = [0, 0, 0, 0, 0.0, 0]
+            inicios = self._inicios[chave]
+            # Os eventos chegam quase sempre em ordem: acrescentar no fim é o caso comum
+            if not inicios or inicios[-1] < inicio:
+                inicios.append(inicio)
+            else:
+                bisect.insort(inicios, inicio)
+        return acumulador
+
+    def serie(self, granularidade: str = "1h", regiao: Optional[str] = None, de: float = None,
+              ate: float = None) -> List[dict]:
+        """Série de baldes no intervalo [de, ate], omitindo baldes sem eventos
+
+        Args:
+            granularidade: "1h", "1d" ou "1w"
+            regiao: Região (None para todas)
+            de / ate: Intervalo em segundos desde a época (None para sem limite)
+        """
+        if granularidade not in GRANULARIDADES:
+            raise ValueError(f"Granularidade inválida: {granularidade} (use {', '.join(GRANULARIDADES)})")
+        chave = (granularidade, regiao or TODAS_REGIOES)
+        with self._trava:
+            inicios = self._inicios.get(chave, [])
+            baldes = self._baldes.get(chave, {})
+            primeiro = 0 if de is None else bisect.bisect_left(inicios, inicio_balde(de, granularidade))
+            ultimo = len(inicios) if ate is None else bisect.bisect_right(inicios, ate)
+            selecionados = [(inicio, list(baldes[inicio])) for inicio in inicios[primeiro:ultimo]]
+
+        return [{
+            "inicio": inicio,
+            "novas": acumulador[_NOVAS],
+            "confirmadas": acumulador[_CONFIRMADAS],
+            "extintas": acumulador[_EXTINTAS],
+            "severidade_media": round(acumulador[_SOMA_SEVERIDADE] / acumulador[_NOVAS], 3)
+            if acumulador[_NOVAS] else None,
+            "tempo_medio_extincao_s": round(acumulador[_SOMA_EXTINCAO] / acumulador[_N_EXTINCAO], 3)
+            if acumulador[_N_EXTINCAO] else None
+        } for inicio, acumulador in selecionados]
+
+    def quantidade_baldes(self) -> int:
+        """Total de baldes mantidos (todas as granularidades e regiões)"""
+        return sum(len(baldes) for baldes in self._baldes.values())
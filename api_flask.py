@@ -1,18 +1,138 @@
 #Nome: Larissa Pereira Biusse
 #RM: 564068
 
+import math
 import os
 
-from flask import Flask, jsonify, request, send_from_directory, send_file
+from flask import Flask, Response, g, jsonify, request, send_from_directory, send_file
 from Sentinel_Fire import SistemaEmergencia
-import threading
 import time
+from admissao import (ADMISSOES, BYTES_POR_LINHA_FOCOS, FilaTrabalhos, LimitadorIngestao, gravar_temporario,
+                      ingestao_de_arquivo, simulacao_em_lotes)
+from analise import GRANULARIDADES
+from coordenacao import CoordenadorWorkers
+from estado_compartilhado import criar_estado
+from ingestao import IngestorFocos
+from metricas import REGISTRO, Medidor
+from persistencia import PersistenciaSQLite
 from sistema_alerta import ContatoEmergencia
 from  modelos import Ocorrencia
 
 
 app = Flask(__name__)
-sistema = SistemaEmergencia()
+
+# Persistência histórica opcional: SENTINEL_DB=sentinel.db python api_flask.py
+_caminho_banco = os.environ.get('SENTINEL_DB')
+sistema = SistemaEmergencia(persistencia=PersistenciaSQLite(_caminho_banco) if _caminho_banco else None)
+
+# Caixa de saída durável dos alertas (novas tentativas e mensagens mortas), opcional:
+# SENTINEL_CAIXA_SAIDA=caixa_saida.db python api_flask.py
+_caminho_caixa_saida = os.environ.get('SENTINEL_CAIXA_SAIDA')
+if _caminho_caixa_saida:
+    sistema.sistema_alerta.usar_caixa_saida(_caminho_caixa_saida)
+
+# Partições por região: SENTINEL_PARTICOES_PROCESSOS=1 calcula a atribuição de drones de
+# cada região em um processo próprio (o restante do trabalho da partição fica na sua thread)
+sistema.fila_prioritaria.processos = os.environ.get('SENTINEL_PARTICOES_PROCESSOS', '0') == '1'
+
+# Vento e combustível do modelo de propagação (CSV em grade; ver propagacao.py)
+sistema.arquivo_vento = os.environ.get('SENTINEL_VENTO')
+sistema.arquivo_combustivel = os.environ.get('SENTINEL_COMBUSTIVEL')
+
+# Ingestão de focos de satélite: detecções a até SENTINEL_FOCOS_RAIO_KM e
+# SENTINEL_FOCOS_JANELA_H de outra são fundidas na mesma ocorrência
+ingestor_focos = IngestorFocos(sistema, raio_km=float(os.environ.get('SENTINEL_FOCOS_RAIO_KM', 2.0)),
+                               janela_horas=float(os.environ.get('SENTINEL_FOCOS_JANELA_H', 24.0)))
+
+# Admissão de /simular e /ingestao/focos: limites por requisição, fila de trabalhos
+# e ritmo global de SENTINEL_INGESTAO_TAXA registros por segundo
+limitador_ingestao = LimitadorIngestao(float(os.environ.get('SENTINEL_INGESTAO_TAXA', 5_000)))
+trabalhos = FilaTrabalhos(limitador_ingestao, capacidade=int(os.environ.get('SENTINEL_FILA_TRABALHOS', 8)))
+SIMULAR_MAXIMO = int(os.environ.get('SENTINEL_SIMULAR_MAX', 100_000))
+SIMULAR_SINCRONO = 10  # Até esta quantidade a simulação roda na própria requisição
+INGESTAO_MAXIMO_BYTES = int(os.environ.get('SENTINEL_INGESTAO_MAX_MB', 512)) * 2 ** 20
+INGESTAO_SINCRONA_BYTES = 2 ** 20  # CSVs de até 1 MB são ingeridos na própria requisição
+
+DURACAO_REQUISICOES = REGISTRO.histograma(
+    "sentinel_http_requisicao_segundos", "Latência das requisições HTTP por rota", ("rota", "metodo", "status"))
+
+
+def _ocorrencias_por_status():
+    contagem = {}
+    for oc in sistema.fila_prioritaria:
+        chave = (oc.status,)
+        contagem[chave] = contagem.get(chave, 0) + 1
+    return contagem
+
+
+def _tamanhos_historico():
+    return {
+        ("historico",): len(sistema.historico),
+        ("historico_drones",): len(sistema.drone_tracker.historico),
+        ("contatos",): len(sistema.sistema_alerta.contatos)
+    }
+
+
+# Medidores calculados apenas na coleta (nenhum custo no caminho quente)
+for _medidor in [
+    Medidor("sentinel_fila_ocorrencias", "Ocorrências na fila prioritária por status",
+            _ocorrencias_por_status, ("status",)),
+    Medidor("sentinel_drones_disponiveis", "Drones disponíveis na base",
+            lambda: len(sistema.drones_disponiveis)),
+    Medidor("sentinel_missoes_em_andamento", "Missões de verificação em andamento",
+            lambda: sum(1 for oc in sistema.fila_prioritaria if oc.status == "Em verificação")),
+    Medidor("sentinel_temporizadores_pendentes", "Temporizadores pendentes no serviço de missões",
+            lambda: getattr(sistema.temporizadores, 'pendentes', 0)),
+    Medidor("sentinel_ocorrencias_camada", "Ocorrências em cada camada (ativas, resolvidas, arquivadas)",
+            lambda: {("ativas",): len(sistema.fila_prioritaria), ("resolvidas",): len(sistema.resolvidas),
+                     ("arquivadas",): len(sistema.arquivo)}, ("camada",)),
+    Medidor("sentinel_persistencia_pendentes", "Registros aguardando gravação no SQLite",
+            lambda: sistema.persistencia.pendentes if sistema.persistencia else 0),
+    Medidor("sentinel_caixa_saida_mensagens", "Mensagens na caixa de saída de alertas por estado",
+            lambda: {(estado,): quantidade for estado, quantidade
+                     in sistema.sistema_alerta.caixa_saida.estatisticas().items()}
+            if sistema.sistema_alerta.caixa_saida else {}, ("estado",)),
+    Medidor("sentinel_armazenamento_registros", "Quantidade de registros em cada histórico",
+            _tamanhos_historico, ("armazenamento",)),
+    Medidor("sentinel_particao_ocorrencias", "Ocorrências ativas em cada partição (região)",
+            lambda: {(p.regiao,): len(p) for p in sistema.fila_prioritaria.particoes()}, ("regiao",)),
+    Medidor("sentinel_particao_trabalhos_pendentes", "Trabalhos aguardando o trabalhador de cada partição",
+            lambda: {(p.regiao,): p.pendentes for p in sistema.fila_prioritaria.particoes()}, ("regiao",)),
+    Medidor("sentinel_trabalhos", "Trabalhos de ingestão por estado",
+            lambda: {(estado,): quantidade for estado, quantidade in trabalhos.estatisticas().items()},
+            ("estado",)),
+]:
+    REGISTRO.registrar(_medidor)
+
+
+@app.before_request
+def _iniciar_cronometro():
+    g.inicio_requisicao = time.perf_counter()
+
+
+@app.after_request
+def _registrar_latencia(response):
+    inicio = g.pop('inicio_requisicao', None)
+    if inicio is not None:
+        rota = request.url_rule.rule if request.url_rule else "desconhecida"
+        DURACAO_REQUISICOES.observar(time.perf_counter() - inicio, (rota, request.method, str(response.status_code)))
+    return response
+
+
+# Vários workers: SENTINEL_ESTADO=sqlite:sentinel_estado.db SENTINEL_DB=sentinel.db python servidor.py --workers 4
+# Só o líder executa os serviços; os seguidores leem o estado publicado ou repassam a requisição.
+_estado = criar_estado(os.environ.get('SENTINEL_ESTADO'))
+if _estado.compartilhado and sistema.persistencia is None:
+    raise ValueError("Com vários workers defina SENTINEL_DB: o novo líder reconstrói o estado a partir dele")
+
+
+def _assumir_lideranca():
+    """Reconstrói o estado gravado (ocorrências, missões em voo, contatos) e inicia os serviços"""
+    sistema.restaurar()
+    sistema.iniciar_servicos()
+
+
+coordenador = CoordenadorWorkers(app, _estado, ao_assumir=_assumir_lideranca, ao_deixar=sistema.parar_servicos)
 
 
 @app.route('/')
@@ -21,9 +141,8 @@ def home():
             + "Sistema de Gerenciamento de Queimadas")
 
 
-@app.route('/ocorrencias', methods=['GET'])
-def listar_ocorrencias():
-    ocorrencias = [{
+def _serializar_ocorrencia(oc):
+    return {
         "id": oc.id,
         "local": oc.local,
         "severidade": oc.severidade,
@@ -31,21 +150,183 @@ def listar_ocorrencias():
         "status": oc.status,
         "fogo_confirmado": oc.fogo_confirmado,
         "fogo_apagado": oc.fogo_apagado,
+        "area_projetada_km2": {"1h": round(oc.area_projetada_1h, 3), "6h": round(oc.area_projetada_6h, 3)},
         "tempo_ativo": f"{(time.time() - oc.tempo_inicio_fogo):.1f}s" if oc.tempo_inicio_fogo > 0 else "Não ativo"
-    } for oc in sistema.fila_prioritaria]
+    }
+
+
+@app.route('/ocorrencias', methods=['GET'])
+def listar_ocorrencias():
+    """Ocorrências em memória; ?camada=ativas|resolvidas (padrão: ambas)"""
+    camada = request.args.get('camada')
+    if camada not in (None, 'ativas', 'resolvidas'):
+        return jsonify({"status": "error", "message": "camada deve ser 'ativas' ou 'resolvidas'"}), 400
+    ocorrencias = []
+    if camada in (None, 'ativas'):
+        ocorrencias += [_serializar_ocorrencia(oc) for oc in list(sistema.fila_prioritaria)]
+    if camada in (None, 'resolvidas'):
+        ocorrencias += [_serializar_ocorrencia(oc) for _, oc in list(sistema.resolvidas.values())]
     return jsonify({"ocorrencias": ocorrencias})
 
 
+@app.route('/resumo', methods=['GET'])
+def resumo():
+    """Contagens globais e por região, juntando o resumo de cada partição"""
+    resultado = sistema.fila_prioritaria.resumo()
+    resultado["resolvidas"] = len(sistema.resolvidas)
+    resultado["arquivadas"] = len(sistema.arquivo)
+    resultado["drones_disponiveis"] = len(sistema.drones_disponiveis)
+    return jsonify(resultado)
+
+
+@app.route('/ocorrencias/arquivo', methods=['GET'])
+def consultar_arquivo():
+    """Ocorrências arquivadas, filtradas por regiao, status e intervalo de resolução (de/ate, epoch)"""
+    try:
+        de = request.args.get('de', type=float)
+        ate = request.args.get('ate', type=float)
+        limite = request.args.get('limite', 100, type=int)
+        ocorrencias = sistema.arquivo.consultar(
+            regiao=request.args.get('regiao'), status=request.args.get('status'), de=de, ate=ate, limite=limite)
+        return jsonify({"ocorrencias": ocorrencias, "total_arquivadas": len(sistema.arquivo)})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/ocorrencias/<int:ocorrencia_id>', methods=['GET'])
+def obter_ocorrencia(ocorrencia_id):
+    """Busca uma ocorrência em qualquer camada (ativa, resolvida ou arquivada)"""
+    ocorrencia = sistema.buscar_ocorrencia(ocorrencia_id)
+    if ocorrencia is None:
+        return jsonify({"status": "error", "message": "Ocorrência não encontrada"}), 404
+    if isinstance(ocorrencia, dict):
+        return jsonify(ocorrencia)
+    return jsonify(_serializar_ocorrencia(ocorrencia))
+
+
+def _persistencia_indisponivel():
+    return jsonify({"status": "error",
+                    "message": "Persistência desativada (defina SENTINEL_DB para habilitar)"}), 503
+
+
+@app.route('/consultas/ocorrencias', methods=['GET'])
+def consultar_ocorrencias():
+    """Ocorrências persistidas por regiao, status, severidade_min e instante de registro (de/ate, epoch)"""
+    if sistema.persistencia is None:
+        return _persistencia_indisponivel()
+    try:
+        ocorrencias = sistema.persistencia.consultar_ocorrencias(
+            regiao=request.args.get('regiao'),
+            status=request.args.get('status'),
+            severidade_min=request.args.get('severidade_min', type=int),
+            de=request.args.get('de', type=float),
+            ate=request.args.get('ate', type=float),
+            limite=request.args.get('limite', 100, type=int)
+        )
+        return jsonify({"ocorrencias": ocorrencias, "total": len(ocorrencias)})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/consultas/historico', methods=['GET'])
+def consultar_historico():
+    """Histórico persistido do sistema, filtrado por tipo e intervalo (de/ate, epoch)"""
+    if sistema.persistencia is None:
+        return _persistencia_indisponivel()
+    try:
+        historico = sistema.persistencia.consultar_historico(
+            tipo=request.args.get('tipo'),
+            de=request.args.get('de', type=float),
+            ate=request.args.get('ate', type=float),
+            limite=request.args.get('limite', 100, type=int)
+        )
+        return jsonify({"historico": historico, "total": len(historico)})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/consultas/historico_drones', methods=['GET'])
+def consultar_historico_drones():
+    """Ações persistidas dos drones, filtradas por drone, ocorrencia e intervalo (de/ate, epoch)"""
+    if sistema.persistencia is None:
+        return _persistencia_indisponivel()
+    try:
+        historico = sistema.persistencia.consultar_historico_drones(
+            drone=request.args.get('drone'),
+            ocorrencia_id=request.args.get('ocorrencia', type=int),
+            de=request.args.get('de', type=float),
+            ate=request.args.get('ate', type=float),
+            limite=request.args.get('limite', 100, type=int)
+        )
+        return jsonify({"historico": historico, "total_acoes": len(historico)})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/analytics/series', methods=['GET'])
+def analytics_series():
+    """Série por balde (1h, 1d, 1w) de fogos novos, confirmados e extintos, severidade e tempo até extinção
+
+    Parâmetros: regiao (opcional), bucket (padrão 1h), from/to em segundos desde a
+    época (padrão: as últimas 24 janelas do balde).
+    """
+    bucket = request.args.get('bucket', '1h')
+    if bucket not in GRANULARIDADES:
+        return jsonify({"status": "error",
+                        "message": f"bucket deve ser um de: {', '.join(GRANULARIDADES)}"}), 400
+    ate = request.args.get('to', type=float)
+    if ate is None:
+        ate = sistema.relogio()
+    de = request.args.get('from', type=float)
+    if de is None:
+        de = ate - 24 * GRANULARIDADES[bucket][0]
+    regiao = request.args.get('regiao')
+    return jsonify({
+        "regiao": regiao,
+        "bucket": bucket,
+        "from": de,
+        "to": ate,
+        "series": sistema.series.serie(bucket, regiao, de, ate)
+    })
+
+
 @app.route('/historico', methods=['GET'])
 def historico():
-    return jsonify({"historico": sistema.historico.to_list()})
+    """Histórico do sistema; ?tipo= (um ou mais, separados por vírgula), ocorrencia, de/ate (epoch) e
+    limite filtram no servidor, e ?formato=eventos devolve os eventos estruturados em vez do texto"""
+    filtros = {chave: request.args.get(chave) for chave in ('tipo', 'ocorrencia', 'de', 'ate', 'limite', 'formato')}
+    if all(valor is None for valor in filtros.values()):
+        return jsonify({"historico": sistema.historico.to_list()})
+    if filtros['formato'] not in (None, 'texto', 'eventos'):
+        return jsonify({"status": "error", "message": "formato deve ser texto ou eventos"}), 400
+    try:
+        historico = sistema.historico.consultar(
+            tipos=filtros['tipo'].split(',') if filtros['tipo'] else None,
+            ocorrencia=request.args.get('ocorrencia', type=int),
+            de=request.args.get('de', type=float),
+            ate=request.args.get('ate', type=float),
+            limite=request.args.get('limite', type=int),
+            estruturado=filtros['formato'] == 'eventos')
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({"historico": historico, "total": len(historico)})
 
 
 
 @app.route('/historico_drones', methods=['GET'])
 def historico_drones():
+    """Ações dos drones; ?drone=&ocorrencia=&de=&ate=&limite= consultam os índices (ordem cronológica)"""
+    filtros = {chave: request.args.get(chave) for chave in ('drone', 'ocorrencia', 'de', 'ate', 'limite')}
     try:
-        historico = sistema.drone_tracker.obter_historico()
+        if any(valor is not None for valor in filtros.values()):
+            historico = sistema.drone_tracker.consultar(
+                drone=filtros['drone'],
+                ocorrencia=request.args.get('ocorrencia', type=int),
+                de=request.args.get('de', type=float),
+                ate=request.args.get('ate', type=float),
+                limite=request.args.get('limite', type=int))
+        else:
+            historico = sistema.drone_tracker.obter_historico()
         return jsonify({
             "historico": historico,
             "total_acoes": len(historico)
@@ -57,13 +338,164 @@ def historico_drones():
             "error": str(e)
         }), 500
 
+@app.route('/drones/<drone_id>/telemetria', methods=['POST'])
+def registrar_telemetria(drone_id):
+    """Recebe um lote de amostras de telemetria: lista de amostras ou colunas (ver telemetria.py)"""
+    corpo = request.get_json(silent=True)
+    amostras = corpo.get('amostras', corpo) if isinstance(corpo, dict) else corpo
+    try:
+        resultado = sistema.telemetria.registrar(drone_id, amostras)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({"status": "success", "resultado": resultado})
+
+
+@app.route('/drones/<drone_id>/telemetria', methods=['GET'])
+def consultar_telemetria(drone_id):
+    """Trilha recente de um drone: ?resolucao=bruta|1s|1min (padrão 1s), de/ate (epoch), limite"""
+    try:
+        trilha = sistema.telemetria.trilha(
+            drone_id, resolucao=request.args.get('resolucao', '1s'), de=request.args.get('de', type=float),
+            ate=request.args.get('ate', type=float), limite=request.args.get('limite', 1000, type=int))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if trilha is None:
+        return jsonify({"status": "error", "message": "Drone sem telemetria"}), 404
+    return jsonify({"drone": drone_id, "resolucao": request.args.get('resolucao', '1s'),
+                    "total": len(trilha["instante"]), "amostras": trilha})
+
+
+@app.route('/drones/posicoes', methods=['GET'])
+def posicoes_drones():
+    """Última amostra de telemetria de cada drone"""
+    return jsonify({"drones": sistema.telemetria.posicoes()})
+
+
+@app.route('/export/<conjunto>.<formato>', methods=['GET'])
+def exportar(conjunto, formato):
+    """Exporta em colunas: /export/ocorrencias.arrow|.parquet e /export/historico_drones.arrow|.parquet
+
+    Ocorrências aceitam ?camada=ativas,resolvidas,arquivadas (padrão: ativas e
+    resolvidas, como em /ocorrencias). A resposta sai em pedaços, um lote por vez.
+    """
+    import exportacao
+
+    if formato not in exportacao.FORMATOS or conjunto not in ("ocorrencias", "historico_drones"):
+        return jsonify({"status": "error", "message": "Use /export/ocorrencias ou /export/historico_drones "
+                                                      "com extensão .arrow ou .parquet"}), 404
+    if not exportacao.pyarrow_disponivel():
+        return jsonify({"status": "error", "message": "Exportação indisponível (instale o pyarrow)"}), 503
+    if conjunto == "ocorrencias":
+        camadas = request.args.get('camada', 'ativas,resolvidas').split(',')
+        if not set(camadas) <= set(exportacao.CAMADAS):
+            return jsonify({"status": "error",
+                            "message": f"camada deve combinar: {', '.join(exportacao.CAMADAS)}"}), 400
+        lotes = exportacao.lotes_ocorrencias(sistema, camadas)
+        esquema = exportacao.esquema_ocorrencias()
+    else:
+        lotes = exportacao.lotes_historico_drones(sistema.drone_tracker)
+        esquema = exportacao.esquema_historico_drones()
+    return Response(exportacao.transmitir(lotes, esquema, formato, conjunto),
+                    content_type=exportacao.FORMATOS[formato],
+                    headers={"Content-Disposition": f"attachment; filename={conjunto}.{formato}"})
+
+
+def _recusar(rota: str, resultado: str, status: int, mensagem: str, retry_after: float = None):
+    ADMISSOES.inc(rotulos=(rota, resultado))
+    resposta = jsonify({"status": "error", "message": mensagem})
+    if retry_after is not None:
+        resposta.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return resposta, status
+
+
+def _aceitar_trabalho(rota: str, trabalho):
+    ADMISSOES.inc(rotulos=(rota, "enfileirado"))
+    resposta = jsonify({"status": "accepted", "trabalho": trabalho.para_dict(),
+                        "progresso": f"/trabalhos/{trabalho.id}"})
+    resposta.headers["Location"] = f"/trabalhos/{trabalho.id}"
+    return resposta, 202
+
+
 @app.route('/simular', methods=['POST'])
 def simular():
-    quantidade = request.json.get('quantidade', 1)
-    sistema.simular_ocorrencias(quantidade)
-    return jsonify({"status": "success", "msg": "Nova ocorrência simulada"})
+    """Simula ocorrências: até SIMULAR_SINCRONO na própria requisição, acima disso como trabalho (202)"""
+    corpo = request.get_json(silent=True) or {}
+    quantidade = corpo.get('quantidade', 1)
+    if not isinstance(quantidade, int) or isinstance(quantidade, bool) or quantidade < 1:
+        return _recusar("/simular", "invalido", 400, "quantidade deve ser um inteiro positivo")
+    if quantidade > SIMULAR_MAXIMO:
+        return _recusar("/simular", "grande_demais", 413, f"quantidade máxima por requisição: {SIMULAR_MAXIMO}")
+    if quantidade <= SIMULAR_SINCRONO:
+        espera = limitador_ingestao.tentar(quantidade)
+        if espera > 0:
+            return _recusar("/simular", "limitado", 429, "Limite de ingestão atingido; tente mais tarde", espera)
+        ADMISSOES.inc(rotulos=("/simular", "sincrono"))
+        sistema.simular_ocorrencias(quantidade)
+        return jsonify({"status": "success", "msg": "Nova ocorrência simulada"})
+    trabalho = trabalhos.submeter("simulacao", simulacao_em_lotes(sistema, quantidade, limitador_ingestao),
+                                  quantidade)
+    if trabalho is None:
+        return _recusar("/simular", "fila_cheia", 429, "Fila de trabalhos cheia; tente mais tarde",
+                        trabalhos.espera_estimada())
+    return _aceitar_trabalho("/simular", trabalho)
+
+
+
+@app.route('/ingestao/focos', methods=['POST'])
+def ingerir_focos():
+    """Ingere um CSV de focos de calor (FIRMS) enviado no corpo ou como upload `arquivo`
+
+    CSVs de até 1 MB são ingeridos na própria requisição; maiores são gravados
+    em arquivo temporário e ingeridos como trabalho (202).
+    """
+    tamanho = request.content_length
+    if tamanho is not None and tamanho > INGESTAO_MAXIMO_BYTES:
+        return _recusar("/ingestao/focos", "grande_demais", 413,
+                        f"CSV maior que o máximo de {INGESTAO_MAXIMO_BYTES // 2 ** 20} MB")
+    arquivo = request.files.get('arquivo')
+    fluxo = arquivo.stream if arquivo else request.stream
+    if tamanho is not None and tamanho <= INGESTAO_SINCRONA_BYTES:
+        espera = limitador_ingestao.tentar(tamanho / BYTES_POR_LINHA_FOCOS)
+        if espera > 0:
+            return _recusar("/ingestao/focos", "limitado", 429, "Limite de ingestão atingido; tente mais tarde",
+                            espera)
+        try:
+            resultado = ingestor_focos.ingerir_binario(fluxo)
+        except ValueError as e:
+            return _recusar("/ingestao/focos", "invalido", 400, str(e))
+        ADMISSOES.inc(rotulos=("/ingestao/focos", "sincrono"))
+        return jsonify({"status": "success", "resultado": resultado})
+
+    if len(trabalhos) >= trabalhos.capacidade:  # Recusa antes de receber o arquivo
+        return _recusar("/ingestao/focos", "fila_cheia", 429, "Fila de trabalhos cheia; tente mais tarde",
+                        trabalhos.espera_estimada())
+    caminho = gravar_temporario(fluxo, INGESTAO_MAXIMO_BYTES)
+    if caminho is None:
+        return _recusar("/ingestao/focos", "grande_demais", 413,
+                        f"CSV maior que o máximo de {INGESTAO_MAXIMO_BYTES // 2 ** 20} MB")
+    trabalho = trabalhos.submeter("ingestao_focos", ingestao_de_arquivo(ingestor_focos, caminho, limitador_ingestao),
+                                  os.path.getsize(caminho) / BYTES_POR_LINHA_FOCOS)
+    if trabalho is None:
+        os.remove(caminho)
+        return _recusar("/ingestao/focos", "fila_cheia", 429, "Fila de trabalhos cheia; tente mais tarde",
+                        trabalhos.espera_estimada())
+    return _aceitar_trabalho("/ingestao/focos", trabalho)
 
 
+@app.route('/trabalhos', methods=['GET'])
+def listar_trabalhos():
+    """Trabalhos de ingestão recentes, do mais novo para o mais antigo"""
+    return jsonify({"trabalhos": trabalhos.listar(), "na_fila": len(trabalhos)})
+
+
+@app.route('/trabalhos/<int:trabalho_id>', methods=['GET'])
+def obter_trabalho(trabalho_id):
+    """Estado e progresso de um trabalho de ingestão"""
+    trabalho = trabalhos.obter(trabalho_id)
+    if trabalho is None:
+        return jsonify({"status": "error", "message": "Trabalho não encontrado"}), 404
+    return jsonify(trabalho.para_dict())
+
 
 @app.route('/atender', methods=['POST'])
 def atender():
@@ -95,7 +527,8 @@ def listar_contatos():
             'email': contato.email,
             'telefone': contato.telefone,
             'tipo': contato.tipo,
-            'regioes': contato.regioes
+            'regioes': contato.regioes,
+            'areas': contato.areas
         })
         current = current.next
     return jsonify({"contatos": contatos})
@@ -103,19 +536,25 @@ def listar_contatos():
 
 @app.route('/contatos/adicionar', methods=['POST'])
 def adicionar_contato():
+    """Cadastra um contato que acompanha biomas (regioes) e/ou áreas (circulo ou poligono)"""
     data = request.json
     try:
+        if 'regioes' not in data and 'areas' not in data:
+            raise KeyError('regioes')
         novo_contato = ContatoEmergencia(
             nome=data['nome'],
             email=data['email'],
             telefone=data['telefone'],
             tipo=data['tipo'],
-            regioes=data['regioes']
+            regioes=data.get('regioes', []),
+            areas=data.get('areas', [])
         )
         sistema.sistema_alerta.adicionar_contato(novo_contato)
         return jsonify({"status": "success"})
     except KeyError as e:
         return jsonify({"status": "error", "message": f"Campo faltando: {str(e)}"}), 400
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
 
 @app.route('/testar_sms', methods=['POST'])
@@ -128,12 +567,47 @@ def testar_sms():
             severidade=4,
             regiao=data.get('regiao', 'Amazônia')
         )
-        sistema.sistema_alerta.enviar_alertas(ocorrencia_teste, 'alerta')
+        sistema.sistema_alerta.enviar_alertas(ocorrencia_teste, 'alerta', imediato=True)
         return jsonify({"status": "success", "message": "SMS de teste enviado para contatos da região"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def _caixa_saida_indisponivel():
+    return jsonify({"status": "error",
+                    "message": "Caixa de saída desativada (defina SENTINEL_CAIXA_SAIDA para habilitar)"}), 503
+
+
+@app.route('/alertas/caixa_saida', methods=['GET'])
+def caixa_saida():
+    """Quantidade de mensagens de alerta por estado (pendente, enviando, entregue, morta)"""
+    caixa = sistema.sistema_alerta.caixa_saida
+    if caixa is None:
+        return _caixa_saida_indisponivel()
+    return jsonify({"mensagens": caixa.estatisticas(), "entregues": caixa.entregues, "falhas": caixa.falhas,
+                    "duplicadas": caixa.duplicadas})
+
+
+@app.route('/alertas/mortas', methods=['GET'])
+def alertas_mortos():
+    """Mensagens que esgotaram as tentativas de envio"""
+    caixa = sistema.sistema_alerta.caixa_saida
+    if caixa is None:
+        return _caixa_saida_indisponivel()
+    return jsonify({"mortas": caixa.mortas(request.args.get('limite', 100, type=int))})
+
+
+@app.route('/alertas/mortas/<int:item_id>/reprocessar', methods=['POST'])
+def reprocessar_alerta(item_id):
+    """Devolve uma mensagem morta à caixa de saída"""
+    caixa = sistema.sistema_alerta.caixa_saida
+    if caixa is None:
+        return _caixa_saida_indisponivel()
+    if not caixa.reprocessar(item_id):
+        return jsonify({"status": "error", "message": "Mensagem morta não encontrada"}), 404
+    return jsonify({"status": "success"})
+
+
 @app.route('/mapa')
 def mostrar_mapa():
     try:
@@ -143,7 +617,9 @@ def mostrar_mapa():
         # Gera o mapa com as ocorrências atuais
         sistema.monitoramento.limpar_marcadores()
 
-        for ocorrencia in sistema.fila_prioritaria:
+        # Fogos ativos vêm da camada ativa; os apagados recentes, da camada de resolvidas
+        ocorrencias = list(sistema.fila_prioritaria) + [oc for _, oc in list(sistema.resolvidas.values())]
+        for ocorrencia in ocorrencias:
             if hasattr(ocorrencia, 'local') and isinstance(ocorrencia.local, (list, tuple)):
                 if ocorrencia.status == "Fogo ativo":
                     sistema.monitoramento.adicionar_marcador(
@@ -164,18 +640,42 @@ def mostrar_mapa():
     except Exception as e:
         print(f"ERRO DETALHADO: {str(e)}")
         return jsonify({"error": str(e)}), 500
-def simular_ocorrencias_periodicamente():
-    while True:
-        time.sleep(5)
-        sistema.simular_ocorrencias(1)
-        print(f"[{time.strftime('%H:%M:%S')}] Nova ocorrência simulada")
+@app.route('/servicos', methods=['GET'])
+def servicos():
+    """Métricas de execução das tarefas do agendador e dos trabalhadores das partições"""
+    return jsonify({
+        "em_execucao": sistema.agendador.em_execucao,
+        "tarefas": sistema.agendador.metricas(),
+        "particoes": sistema.fila_prioritaria.estatisticas()
+    })
+
+
+@app.route('/rastreamento/<int:ocorrencia_id>', methods=['GET'])
+def rastreamento_ocorrencia(ocorrencia_id):
+    """Linha do tempo de uma ocorrência (registro, despacho, missão, alertas, atendimento)"""
+    linha = sistema.rastreador.linha_do_tempo(ocorrencia_id)
+    if linha is None:
+        return jsonify({"status": "error", "message": "Ocorrência não rastreada"}), 404
+    return jsonify(linha)
+
+
+@app.route('/rastreamento/estagios', methods=['GET'])
+def rastreamento_estagios():
+    """Distribuição de latência de cada estágio do ciclo de vida das ocorrências"""
+    return jsonify({"estagios": sistema.rastreador.estatisticas()})
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Métricas no formato de texto do Prometheus"""
+    return Response(REGISTRO.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 if __name__ == '__main__':
     print("Iniciando serviços...")
-    sistema.iniciar_servicos()
-    threading.Thread(target=simular_ocorrencias_periodicamente, daemon=True).start()
+    coordenador.iniciar()
 
     print("API disponível em http://localhost:5000/")
     print("Mapa disponível em http://localhost:5000/mapa")
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Modo de depuração do Flask (recarregador e depurador interativo) só com SENTINEL_DEBUG=1
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get('SENTINEL_DEBUG') == '1')
\ No newline at end of file
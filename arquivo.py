@@ -0,0 +1,133 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+import threading
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+from modelos import Ocorrencia
+
+
+class ArquivoOcorrencias:
+    """Arquivo compacto de ocorrências resolvidas
+
+    As ocorrências são guardadas em colunas (`array`) em vez de objetos:
+    regiões e status viram códigos inteiros de uma tabela interna, e cada
+    registro ocupa algumas dezenas de bytes. O arquivo continua consultável
+    por id (índice em dicionário) e por região, status e intervalo de tempo.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.ids = array('q')
+        self.latitudes = array('d')
+        self.longitudes = array('d')
+        self.severidades = array('b')
+        self.regioes = array('H')  # Código na tabela de textos
+        self.status = array('H')  # Código na tabela de textos
+        self.confirmados = array('b')
+        self.inicios_fogo = array('d')
+        self.fins_fogo = array('d')
+        self.resolvidas_em = array('d')
+        self._indice: Dict[int, int] = {}  # id -> posição
+        self._textos: List[str] = []
+        self._codigos: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _codigo(self, texto: str) -> int:
+        codigo = self._codigos.get(texto)
+        if codigo is None:
+            codigo = self._codigos[texto] = len(self._textos)
+            self._textos.append(texto)
+        return codigo
+
+    def arquivar(self, ocorrencia: Ocorrencia, resolvida_em: float):
+        """Adiciona uma ocorrência resolvida ao arquivo"""
+        with self._trava:
+            self._indice[ocorrencia.id] = len(self.ids)
+            self.ids.append(ocorrencia.id)
+            self.latitudes.append(float(ocorrencia.local[0]))
+            self.longitudes.append(float(ocorrencia.local[1]))
+            self.severidades.append(ocorrencia.severidade)
+            self.regioes.append(self._codigo(ocorrencia.regiao))
+            self.status.append(self._codigo(ocorrencia.status))
+            self.confirmados.append(1 if ocorrencia.fogo_confirmado else 0)
+            self.inicios_fogo.append(ocorrencia.tempo_inicio_fogo)
+            self.fins_fogo.append(ocorrencia.tempo_fim_fogo)
+            self.resolvidas_em.append(resolvida_em)
+
+    def _registro(self, i: int) -> dict:
+        status = self._textos[self.status[i]]
+        return {
+            "id": self.ids[i],
+            "local": [self.latitudes[i], self.longitudes[i]],
+            "severidade": self.severidades[i],
+            "regiao": self._textos[self.regioes[i]],
+            "status": status,
+            "fogo_confirmado": bool(self.confirmados[i]),
+            "fogo_apagado": status == "Fogo apagado",
+            "tempo_inicio_fogo": self.inicios_fogo[i],
+            "tempo_fim_fogo": self.fins_fogo[i],
+            "resolvida_em": self.resolvidas_em[i]
+        }
+
+    def obter(self, ocorrencia_id: int) -> Optional[dict]:
+        """Busca uma ocorrência arquivada pelo id (O(1))"""
+        i = self._indice.get(ocorrencia_id)
+        return None if i is None else self._registro(i)
+
+    def consultar(self, regiao: str = None, status: str = None, de: float = None, ate: float = None,
+                  limite: Optional[int] = 100) -> List[dict]:
+        """Consulta o arquivo, das resoluções mais recentes para as mais antigas
+
+        Args:
+            regiao: Filtra pela região
+            status: Filtra pelo status final ("Fogo apagado" ou "Verificado")
+            de / ate: Intervalo do instante de resolução (segundos desde a época)
+            limite: Máximo de registros retornados (None para todos)
+        """
+        resultado = []
+        for i in self._posicoes(regiao, status, de, ate):
+            resultado.append(self._registro(i))
+            if limite is not None and len(resultado) >= limite:
+                break
+        return resultado
+
+    def fatia_colunas(self, inicio: int, fim: int) -> dict:
+        """Cópia das colunas dos registros [inicio, fim) para exportação
+
+        As regiões e os status seguem como códigos, junto com a tabela de
+        textos (vira uma coluna de dicionário sem decodificar registro a registro).
+        """
+        with self._trava:
+            return {
+                "ids": self.ids[inicio:fim],
+                "latitudes": self.latitudes[inicio:fim],
+                "longitudes": self.longitudes[inicio:fim],
+                "severidades": self.severidades[inicio:fim],
+                "regioes": self.regioes[inicio:fim],
+                "status": self.status[inicio:fim],
+                "confirmados": self.confirmados[inicio:fim],
+                "inicios_fogo": self.inicios_fogo[inicio:fim],
+                "fins_fogo": self.fins_fogo[inicio:fim],
+                "resolvidas_em": self.resolvidas_em[inicio:fim],
+                "textos": list(self._textos),
+            }
+
+    def _posicoes(self, regiao, status, de, ate) -> Iterator[int]:
+        codigo_regiao = self._codigos.get(regiao) if regiao is not None else None
+        codigo_status = self._codigos.get(status) if status is not None else None
+        if (regiao is not None and codigo_regiao is None) or (status is not None and codigo_status is None):
+            return
+        for i in range(len(self.ids) - 1, -1, -1):
+            if codigo_regiao is not None and self.regioes[i] != codigo_regiao:
+                continue
+            if codigo_status is not None and self.status[i] != codigo_status:
+                continue
+            if de is not None and self.resolvidas_em[i] < de:
+                continue
+            if ate is not None and self.resolvidas_em[i] > ate:
+                continue
+            yield i
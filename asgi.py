@@ -0,0 +1,38 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Ponto de entrada ASGI: a API Flask e o agendador dos serviços em segundo
+# plano compartilham o mesmo event loop do servidor.
+#
+#   uvicorn asgi:app --host 0.0.0.0 --port 5000
+#
+# Requer o pacote `asgiref` (adaptador WSGI -> ASGI).
+
+import asyncio
+
+from asgiref.wsgi import WsgiToAsgi
+
+from api_flask import app as flask_app, sistema
+
+_api = WsgiToAsgi(flask_app)
+
+
+async def app(scope, receive, send):
+    """Aplicação ASGI com tratamento do protocolo lifespan"""
+    if scope['type'] != 'lifespan':
+        await _api(scope, receive, send)
+        return
+
+    while True:
+        mensagem = await receive()
+        if mensagem['type'] == 'lifespan.startup':
+            try:
+                sistema.iniciar_servicos(loop=asyncio.get_running_loop())
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif mensagem['type'] == 'lifespan.shutdown':
+            await sistema.agendador.parar_async()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
@@ -0,0 +1,126 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark do controle de admissão (admissao.py) durante uma enxurrada de /simular.
+#
+#   python benchmarks/bench_admissao.py [--segundos 10] [--inundadores 4] [--quantidade 100000]
+#
+# Sobe a API em um servidor HTTP com threads e mede a latência de uma rota de
+# leitura (GET /servicos) em três cenários de `segundos` cada:
+#   base:        sem escritas;
+#   sem limite:  `inundadores` threads enviando POST /simular com `quantidade`
+#                sem admissão (tudo síncrono, sem teto nem ritmo, como antes);
+#   com limite:  as mesmas requisições com a admissão padrão (fila de trabalhos,
+#                SENTINEL_INGESTAO_TAXA registros/s, 429 com Retry-After). Os
+#                inundadores esperam o Retry-After, a menos que se passe
+#                --ignorar-retry-after.
+# Reporta p50/p99 da leitura, respostas por status e ocorrências criadas.
+
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))] if ordenados else float('nan')
+
+
+def requisitar(porta, metodo, rota, corpo=None):
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=600)
+    cabecalhos = {"Content-Type": "application/json"} if corpo is not None else {}
+    conexao.request(metodo, rota, body=json.dumps(corpo) if corpo is not None else None, headers=cabecalhos)
+    resposta = conexao.getresponse()
+    resposta.read()
+    conexao.close()
+    return resposta.status, resposta.getheader("Retry-After")
+
+
+def cenario(porta, segundos, inundadores, quantidade, respeitar_retry_after):
+    parar = threading.Event()
+    status = {}
+    trava = threading.Lock()
+
+    def inundar():
+        while not parar.is_set():
+            codigo, retry_after = requisitar(porta, "POST", "/simular", {"quantidade": quantidade})
+            with trava:
+                status[codigo] = status.get(codigo, 0) + 1
+            if retry_after and respeitar_retry_after:
+                parar.wait(float(retry_after))
+
+    threads = [threading.Thread(target=inundar, daemon=True) for _ in range(inundadores)]
+    for thread in threads:
+        thread.start()
+    latencias = []
+    fim = time.perf_counter() + segundos
+    while time.perf_counter() < fim:
+        inicio = time.perf_counter()
+        requisitar(porta, "GET", "/servicos")
+        latencias.append(time.perf_counter() - inicio)
+        time.sleep(0.05)
+    parar.set()
+    for thread in threads:
+        thread.join()  # Requisições em andamento terminam dentro do cenário
+    return latencias, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do controle de admissão")
+    parser.add_argument('--segundos', type=float, default=10.0)
+    parser.add_argument('--inundadores', type=int, default=4)
+    parser.add_argument('--quantidade', type=int, default=100_000)
+    parser.add_argument('--ignorar-retry-after', action='store_true',
+                        help="Inundadores reenviam logo após o 429 (padrão: esperam o Retry-After)")
+    args = parser.parse_args()
+
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # Sem uma linha de log por requisição
+
+    import api_flask
+
+    servidor = make_server("127.0.0.1", 0, api_flask.app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    porta = servidor.server_port
+    sistema = api_flask.sistema
+    configuracao = (api_flask.SIMULAR_MAXIMO, api_flask.SIMULAR_SINCRONO)
+
+    for nome, inundadores, admissao in (("base", 0, True), ("sem limite", args.inundadores, False),
+                                        ("com limite", args.inundadores, True)):
+        with sistema._trava:
+            sistema.fila_prioritaria.clear()
+        if admissao:
+            api_flask.SIMULAR_MAXIMO, api_flask.SIMULAR_SINCRONO = configuracao
+        else:
+            api_flask.SIMULAR_MAXIMO = api_flask.SIMULAR_SINCRONO = 10 ** 9
+            api_flask.limitador_ingestao.tentar = lambda quantidade: 0.0
+        with contextlib.redirect_stdout(io.StringIO()):  # As simulações síncronas imprimem cada ocorrência
+            latencias, status = cenario(porta, args.segundos, inundadores, args.quantidade,
+                                        not args.ignorar_retry_after)
+        if not admissao:
+            del api_flask.limitador_ingestao.tentar
+        criadas = len(sistema.fila_prioritaria)
+        print(f"{nome:<11}: leitura p50 {statistics.median(latencias) * 1000:7.1f} ms, "
+              f"p99 {percentil(latencias, 99) * 1000:7.1f} ms ({len(latencias)} leituras); "
+              f"respostas {dict(sorted(status.items()))}; {criadas:,} ocorrências criadas")
+        if inundadores:
+            # Espera os trabalhos e simulações em andamento terminarem antes do próximo cenário
+            while len(api_flask.trabalhos) or api_flask.trabalhos.estatisticas().get("executando"):
+                time.sleep(0.5)
+            time.sleep(args.segundos / 2)
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
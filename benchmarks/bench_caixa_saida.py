@@ -0,0 +1,192 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark da caixa de saída de alertas contra um servidor SMTP local instável.
+#
+#   python benchmarks/bench_caixa_saida.py [--alertas 1000] [--falha 0.3] [--queda 2.0] [--workers 4]
+#
+# O servidor de teste fala o mínimo do protocolo SMTP (sem TLS nem login) e
+# recusa uma fração das mensagens com 451. São comparados:
+#   1. envio direto (sem caixa de saída): latência de enviar_alertas e alertas perdidos;
+#   2. caixa de saída: latência de enfileiramento, tempo para esvaziar, tentativas e mortas;
+#   3. recuperação: o servidor fica fora do ar por --queda segundos e depois volta;
+#      mede quanto tempo após a volta a caixa leva para entregar tudo.
+
+import argparse
+import os
+import random
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modelos import ContatoEmergencia, Ocorrencia  # noqa: E402
+from Sentinel_Fire import SistemaEmergencia  # noqa: E402
+from sistema_alerta import TransporteMemoria, TransporteSMTP  # noqa: E402
+
+
+class ServidorSMTPInstavel(socketserver.ThreadingTCPServer):
+    """Servidor SMTP mínimo que recusa mensagens aleatoriamente ou fica fora do ar"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, taxa_falha: float, semente: int = 0):
+        super().__init__(("127.0.0.1", 0), _SessaoSMTP)
+        self.taxa_falha = taxa_falha
+        self.rng = random.Random(semente)
+        self.trava = threading.Lock()
+        self.fora_do_ar = False
+        self.recebidas = 0
+        self.recusadas = 0
+
+    @property
+    def porta(self) -> int:
+        return self.server_address[1]
+
+    def falhar(self) -> bool:
+        with self.trava:
+            falha = self.rng.random() < self.taxa_falha
+            if falha:
+                self.recusadas += 1
+            return falha
+
+
+class _SessaoSMTP(socketserver.StreamRequestHandler):
+    def responder(self, linha: str):
+        self.wfile.write((linha + "\r\n").encode())
+
+    def handle(self):
+        servidor = self.server
+        if servidor.fora_do_ar:
+            self.responder("421 servico indisponivel")
+            return
+        self.responder("220 stub SMTP")
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode(errors="replace").strip().upper()
+            if comando.startswith(("EHLO", "HELO")):
+                self.responder("250 stub")
+            elif comando.startswith("MAIL"):
+                if servidor.falhar():
+                    self.responder("451 4.3.0 tente novamente")
+                else:
+                    self.responder("250 ok")
+            elif comando.startswith(("RCPT", "RSET", "NOOP")):
+                self.responder("250 ok")
+            elif comando == "DATA":
+                self.responder("354 fim com .")
+                while self.rfile.readline().rstrip(b"\r\n") != b".":
+                    pass
+                with servidor.trava:
+                    servidor.recebidas += 1
+                self.responder("250 aceita")
+            elif comando == "QUIT":
+                self.responder("221 tchau")
+                return
+            else:
+                self.responder("502 nao implementado")
+
+
+class TemporizadoresNulos:
+    def agendar(self, atraso, callback, *args):
+        return None
+
+    def parar(self, *args, **kwargs):
+        pass
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] if valores else 0.0
+
+
+def novo_sistema(servidor: ServidorSMTPInstavel) -> SistemaEmergencia:
+    sistema = SistemaEmergencia(temporizadores=TemporizadoresNulos())
+    alerta = sistema.sistema_alerta
+    alerta.janela_agrupamento = 0  # Mede a entrega, não o agrupamento
+    alerta.transporte_email = TransporteSMTP({
+        'servidor': '127.0.0.1', 'porta': servidor.porta, 'usuario': 'alerta@queimadas.com', 'tls': False,
+        'timeout': 5
+    })
+    alerta.transporte_sms = TransporteMemoria()
+    alerta.limpar_contatos()
+    alerta.adicionar_contato(ContatoEmergencia("Defesa Civil", "defesa@civil.gov", "+5500000", "autoridade",
+                                               ["Amazônia"]))
+    return sistema
+
+
+def disparar(sistema: SistemaEmergencia, quantidade: int) -> list:
+    """Envia um alerta (severidade 3: apenas e-mail) por ocorrência e retorna as latências"""
+    latencias = []
+    for _ in range(quantidade):
+        ocorrencia = Ocorrencia(prioridade=0, local=[-3.1, -60.0], severidade=3, regiao="Amazônia")
+        inicio = time.perf_counter()
+        sistema.sistema_alerta.enviar_alertas(ocorrencia)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da caixa de saída de alertas")
+    parser.add_argument('--alertas', type=int, default=1000)
+    parser.add_argument('--falha', type=float, default=0.3, help="Fração de mensagens recusadas pelo servidor")
+    parser.add_argument('--queda', type=float, default=2.0, help="Segundos fora do ar no teste de recuperação")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    servidor = ServidorSMTPInstavel(args.falha)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    diretorio = tempfile.mkdtemp(prefix="bench_caixa_saida_")
+    opcoes = dict(workers=args.workers, max_tentativas=10, atraso_base=0.05, atraso_maximo=1.0)
+
+    # 1. Envio direto
+    sistema = novo_sistema(servidor)
+    recebidas_antes = servidor.recebidas
+    latencias = disparar(sistema, args.alertas)
+    entregues = servidor.recebidas - recebidas_antes
+    print(f"Envio direto             : p50 {percentil(latencias, 0.5) * 1000:.2f} ms, "
+          f"p99 {percentil(latencias, 0.99) * 1000:.2f} ms por alerta; "
+          f"{entregues}/{args.alertas} entregues, {args.alertas - entregues} perdidos")
+
+    # 2. Caixa de saída com servidor instável
+    sistema = novo_sistema(servidor)
+    caixa = sistema.sistema_alerta.usar_caixa_saida(os.path.join(diretorio, "instavel.db"), **opcoes)
+    recebidas_antes = servidor.recebidas
+    inicio = time.perf_counter()
+    latencias = disparar(sistema, args.alertas)
+    caixa.descarregar(timeout=120)
+    duracao = time.perf_counter() - inicio
+    estado = caixa.estatisticas()
+    print(f"Caixa de saída           : p50 {percentil(latencias, 0.5) * 1000:.2f} ms, "
+          f"p99 {percentil(latencias, 0.99) * 1000:.2f} ms por alerta (enfileiramento)")
+    print(f"  esvaziada em           : {duracao:.2f} s ({args.alertas / duracao:,.0f} alertas/s)")
+    print(f"  entregues / mortas     : {estado['entregue']} / {estado['morta']} "
+          f"({caixa.falhas} tentativas falhas; servidor recebeu {servidor.recebidas - recebidas_antes})")
+    caixa.parar()
+
+    # 3. Recuperação após queda do servidor
+    sistema = novo_sistema(servidor)
+    caixa = sistema.sistema_alerta.usar_caixa_saida(os.path.join(diretorio, "queda.db"), **opcoes)
+    servidor.fora_do_ar = True
+    disparar(sistema, args.alertas)
+    time.sleep(args.queda)
+    pendentes = caixa.estatisticas()['pendente']
+    servidor.fora_do_ar = False
+    volta = time.perf_counter()
+    caixa.descarregar(timeout=120)
+    recuperacao = time.perf_counter() - volta
+    estado = caixa.estatisticas()
+    print(f"Recuperação ({args.queda:.0f} s fora)   : {pendentes} pendentes na volta, "
+          f"esvaziada {recuperacao:.2f} s depois; entregues / mortas: {estado['entregue']} / {estado['morta']}")
+    caixa.parar()
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
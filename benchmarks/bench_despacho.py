@@ -0,0 +1,106 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark da atribuição em lote de drones a ocorrências.
+#
+#   python benchmarks/bench_despacho.py [--drones 200] [--ocorrencias 10000] [--repeticoes 5]
+#
+# Mede separadamente a matriz de distâncias, a atribuição húngara e a gulosa,
+# e um ciclo completo de verificar_drones_automaticamente (filtragem, matriz,
+# atribuição e envio de todas as missões) contra o intervalo do ciclo (5 s).
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from despacho import atribuir_guloso, atribuir_hungaro, matriz_custos, resolvedor_hungaro  # noqa: E402
+from Sentinel_Fire import SistemaEmergencia  # noqa: E402
+from sistema_alerta import TransporteMemoria  # noqa: E402
+
+REGIOES = ["Amazônia", "Pantanal", "Cerrado", "Mata Atlântica", "Caatinga", "Pampa"]
+INTERVALO_CICLO = 5.0
+
+
+class TemporizadoresNulos:
+    """Missões nunca concluem: o benchmark mede apenas o despacho"""
+
+    def agendar(self, atraso, callback, *args):
+        return None
+
+    def parar(self, *args, **kwargs):
+        pass
+
+
+def cronometrar(funcao, repeticoes: int):
+    """Menor tempo (s) entre as repetições e o último resultado"""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def custo_total(custos, pares) -> float:
+    return float(sum(custos[i, j] for i, j in pares))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da atribuição de drones")
+    parser.add_argument('--drones', type=int, default=200)
+    parser.add_argument('--ocorrencias', type=int, default=10_000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.semente)
+    bases = np.column_stack([rng.uniform(-33.75, 5.27, args.drones), rng.uniform(-73.99, -34.79, args.drones)])
+    locais = np.column_stack([rng.uniform(-33.75, 5.27, args.ocorrencias),
+                              rng.uniform(-73.99, -34.79, args.ocorrencias)])
+    severidades = rng.integers(4, 6, args.ocorrencias)
+
+    # 1. Componentes isolados
+    t_matriz, custos = cronometrar(lambda: matriz_custos(bases, locais, severidades, 120.0), args.repeticoes)
+    t_guloso, pares_guloso = cronometrar(lambda: atribuir_guloso(custos), args.repeticoes)
+    print(f"Drones x ocorrências     : {args.drones} x {args.ocorrencias:,}")
+    print(f"Matriz de custos         : {t_matriz * 1000:.1f} ms")
+    print(f"Atribuição gulosa        : {t_guloso * 1000:.1f} ms (custo {custo_total(custos, pares_guloso):.3f})")
+    if resolvedor_hungaro() is not None:
+        t_hungaro, pares_hungaro = cronometrar(lambda: atribuir_hungaro(custos), args.repeticoes)
+        print(f"Atribuição húngara       : {t_hungaro * 1000:.1f} ms (custo {custo_total(custos, pares_hungaro):.3f})")
+    else:
+        print("Atribuição húngara       : scipy não instalado")
+
+    # 2. Ciclo completo do sistema: todos os drones livres, todas as ocorrências elegíveis
+    tempos = []
+    despachados = 0
+    for _ in range(args.repeticoes):
+        sistema = SistemaEmergencia(temporizadores=TemporizadoresNulos())
+        sistema.sistema_alerta.transporte_email = TransporteMemoria()
+        sistema.sistema_alerta.transporte_sms = TransporteMemoria()
+        sistema.drones_disponiveis.clear()
+        for i in range(args.drones):
+            drone = f"Drone {i + 1}"
+            sistema.drones_disponiveis.append(drone)
+            sistema.bases_drones[drone] = tuple(bases[i])
+        for k in range(args.ocorrencias):
+            sistema.registrar_ocorrencia(list(locais[k]), int(severidades[k]), REGIOES[k % len(REGIOES)])
+
+        inicio = time.perf_counter()
+        sistema.verificar_drones_automaticamente()
+        tempos.append(time.perf_counter() - inicio)
+        despachados = args.drones - len(sistema.drones_disponiveis)
+
+    ciclo = min(tempos)
+    print(f"Ciclo completo           : {ciclo * 1000:.1f} ms, {despachados} missões "
+          f"({ciclo / INTERVALO_CICLO:.1%} do intervalo de {INTERVALO_CICLO:.0f} s)")
+
+
+if __name__ == '__main__':
+    main()
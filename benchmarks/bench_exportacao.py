@@ -0,0 +1,110 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark da exportação em colunas (exportacao.py) contra o JSON de /ocorrencias.
+#
+#   python benchmarks/bench_exportacao.py [--ocorrencias 10000 100000 1000000] [--semente 0]
+#
+# Para cada tamanho, metade das ocorrências fica ativa e metade resolvida (as
+# mesmas linhas que /ocorrencias devolve) e o cliente de teste do Flask mede o
+# caminho completo até o DataFrame do dashboard:
+#   json:    GET /ocorrencias + json + pd.DataFrame(lista de dicionários)
+#   arrow:   GET /export/ocorrencias.arrow + leitura do stream + to_pandas(ArrowDtype)
+#   parquet: GET /export/ocorrencias.parquet + pq.read_table + to_pandas(ArrowDtype)
+# Reporta tempo, bytes da resposta e memória (pico no tracemalloc para os
+# objetos Python, mais o que ficou no pool de memória do Arrow com o DataFrame).
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+import pyarrow as pa  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+LAT = (-33.75, 5.27)
+LON = (-73.99, -34.79)
+REGIOES = ["Amazônia", "Cerrado", "Pantanal", "Mata Atlântica", "Caatinga", "Pampa"]
+
+
+def popular(sistema, quantidade: int, rng: random.Random):
+    """Registra as ocorrências direto nas camadas (sem agendar verificações)"""
+    from modelos import Ocorrencia
+
+    agora = time.time()
+    for i in range(quantidade):
+        ocorrencia = Ocorrencia(prioridade=0, local=[rng.uniform(*LAT), rng.uniform(*LON)],
+                                severidade=rng.randint(1, 5), regiao=rng.choice(REGIOES))
+        ocorrencia.area_projetada_1h = rng.uniform(0, 5)
+        ocorrencia.area_projetada_6h = rng.uniform(0, 80)
+        if i % 2:
+            ocorrencia.status = "Fogo apagado"
+            ocorrencia.fogo_apagado = ocorrencia.fogo_confirmado = True
+            sistema.resolvidas[ocorrencia.id] = (agora, ocorrencia)
+        else:
+            sistema.fila_prioritaria.inserir(ocorrencia)
+
+
+def medir(carregar):
+    """Tempo numa execução sem tracemalloc (que deixa as alocações bem mais lentas) e memória em outra"""
+    inicio = time.perf_counter()
+    tamanho, df = carregar()
+    tempo = time.perf_counter() - inicio
+    linhas = len(df)
+    del df
+
+    pool = pa.default_memory_pool()
+    base_pool = pool.bytes_allocated()
+    tracemalloc.start()
+    _, df = carregar()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow = pool.bytes_allocated() - base_pool
+    del df
+    return tempo, tamanho, pico, arrow, linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da exportação Arrow/Parquet")
+    parser.add_argument('--ocorrencias', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    import api_flask
+
+    cliente = api_flask.app.test_client()
+    sistema = api_flask.sistema
+
+    def via_json():
+        dados = cliente.get('/ocorrencias').get_data()
+        return len(dados), pd.DataFrame(json.loads(dados)["ocorrencias"])
+
+    def via_arrow():
+        dados = cliente.get('/export/ocorrencias.arrow').get_data()
+        return len(dados), pa.ipc.open_stream(dados).read_all().to_pandas(types_mapper=pd.ArrowDtype)
+
+    def via_parquet():
+        dados = cliente.get('/export/ocorrencias.parquet').get_data()
+        return len(dados), pq.read_table(io.BytesIO(dados)).to_pandas(types_mapper=pd.ArrowDtype)
+
+    rng = random.Random(args.semente)
+    for quantidade in args.ocorrencias:
+        sistema.fila_prioritaria.clear()
+        sistema.resolvidas.clear()
+        popular(sistema, quantidade, rng)
+        print(f"{quantidade:,} ocorrências (metade ativas, metade resolvidas)")
+        for nome, carregar in (("json", via_json), ("arrow", via_arrow), ("parquet", via_parquet)):
+            tempo, tamanho, pico, arrow, linhas = medir(carregar)
+            print(f"  {nome:<8} {tempo * 1000:9.0f} ms  {tamanho / 2 ** 20:8.1f} MB na resposta  "
+                  f"pico {pico / 2 ** 20:7.1f} MB (Python) + {arrow / 2 ** 20:6.1f} MB (Arrow)  {linhas:,} linhas")
+
+
+if __name__ == '__main__':
+    main()
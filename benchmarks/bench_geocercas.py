@@ -0,0 +1,118 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark do índice de geocercas dos contatos.
+#
+#   python benchmarks/bench_geocercas.py [--inscricoes 100000] [--consultas 10000] [--semente 0]
+#
+# Gera inscrições aleatórias no território brasileiro (90% círculos de 5 a 50 km,
+# 10% polígonos de 4 a 8 vértices) e mede:
+#   1. construção do índice;
+#   2. consulta de pontos pelo índice contra a varredura de todas as áreas
+#      (a varredura roda em uma amostra e confere que as respostas são iguais);
+#   3. SistemaAlerta.enviar_alertas com os contatos cadastrados (transportes em memória).
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geocerca import IndiceGeocercas, criar_area  # noqa: E402
+from modelos import ContatoEmergencia, Ocorrencia  # noqa: E402
+from Sentinel_Fire import SistemaEmergencia  # noqa: E402
+from sistema_alerta import TransporteMemoria  # noqa: E402
+
+LAT = (-33.75, 5.27)
+LON = (-73.99, -34.79)
+
+
+class TemporizadoresNulos:
+    def agendar(self, atraso, callback, *args):
+        return None
+
+    def parar(self, *args, **kwargs):
+        pass
+
+
+def gerar_area(rng: random.Random) -> dict:
+    lat, lon = rng.uniform(*LAT), rng.uniform(*LON)
+    if rng.random() < 0.9:
+        return {"tipo": "circulo", "centro": [lat, lon], "raio_km": rng.uniform(5, 50)}
+    raio = rng.uniform(0.05, 0.5)
+    angulos = sorted(rng.uniform(0, 2 * math.pi) for _ in range(rng.randint(4, 8)))
+    return {"tipo": "poligono", "vertices": [[lat + raio * math.sin(a), lon + raio * math.cos(a)] for a in angulos]}
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] if valores else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do índice de geocercas")
+    parser.add_argument('--inscricoes', type=int, default=100_000)
+    parser.add_argument('--consultas', type=int, default=10_000)
+    parser.add_argument('--amostra-varredura', type=int, default=200)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semente)
+    areas = [gerar_area(rng) for _ in range(args.inscricoes)]
+    pontos = [(rng.uniform(*LAT), rng.uniform(*LON)) for _ in range(args.consultas)]
+
+    # 1. Construção
+    inicio = time.perf_counter()
+    indice = IndiceGeocercas()
+    for i, dados in enumerate(areas):
+        indice.adicionar(criar_area(dados), i)
+    construcao = time.perf_counter() - inicio
+    print(f"Inscrições              : {args.inscricoes:,} ({len(indice._celulas):,} células, "
+          f"{len(indice._grandes)} grandes)")
+    print(f"Construção do índice    : {construcao:.2f} s")
+
+    # 2. Consultas: índice x varredura
+    tempos = []
+    encontrados = 0
+    for lat, lon in pontos:
+        inicio = time.perf_counter()
+        encontrados += len(indice.consultar(lat, lon))
+        tempos.append(time.perf_counter() - inicio)
+    amostra = pontos[:args.amostra_varredura]
+    inicio = time.perf_counter()
+    divergencias = sum(indice.consultar_varrendo(lat, lon) != indice.consultar(lat, lon) for lat, lon in amostra)
+    varredura = (time.perf_counter() - inicio) / len(amostra)
+    media = sum(tempos) / len(tempos)
+    print(f"Consulta pelo índice    : média {media * 1e6:.1f} us, p50 {percentil(tempos, 0.5) * 1e6:.1f} us, "
+          f"p99 {percentil(tempos, 0.99) * 1e6:.1f} us ({encontrados / len(pontos):.2f} áreas por ponto)")
+    print(f"Varredura (referência)  : média {varredura * 1000:.1f} ms ({varredura / media:,.0f}x mais lenta, "
+          f"{divergencias} divergências em {len(amostra)} pontos)")
+
+    # 3. Alertas com os contatos cadastrados
+    sistema = SistemaEmergencia(temporizadores=TemporizadoresNulos())
+    alerta = sistema.sistema_alerta
+    alerta.transporte_email = TransporteMemoria()
+    alerta.transporte_sms = TransporteMemoria()
+    inicio = time.perf_counter()
+    for i, dados in enumerate(areas):
+        alerta.adicionar_contato(ContatoEmergencia(f"Inscrito {i}", f"inscrito{i}@exemplo.com", f"+55{i:09d}",
+                                                   "comunidade", [], [dados]))
+    cadastro = time.perf_counter() - inicio
+    tempos = []
+    destinatarios = 0
+    for lat, lon in pontos[:2000]:
+        ocorrencia = Ocorrencia(prioridade=0, local=[lat, lon], severidade=4, regiao="Cerrado")
+        inicio = time.perf_counter()
+        alerta.enviar_alertas(ocorrencia)
+        tempos.append(time.perf_counter() - inicio)
+        destinatarios += len(alerta.destinatarios(ocorrencia))
+    print(f"Cadastro de contatos    : {cadastro:.2f} s")
+    print(f"enviar_alertas          : p50 {percentil(tempos, 0.5) * 1000:.3f} ms, "
+          f"p99 {percentil(tempos, 0.99) * 1000:.3f} ms ({destinatarios / len(tempos):.2f} destinatários por alerta)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark do histórico do sistema em eventos compactos (eventos.py).
+#
+#   python benchmarks/bench_historico.py [--entradas 1000000]
+#
+# Grava a mesma sequência de eventos (ocorrências registradas, tarefas,
+# retornos de drones, atendimentos) na lista encadeada de textos e
+# dicionários usada antes e no HistoricoEventos, e compara a memória por
+# entrada (tracemalloc), o custo de servir o histórico inteiro e o de filtrar
+# um tipo de evento (antes, interpretando o texto).
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eventos  # noqa: E402
+from Sentinel_Fire import LinkedList  # noqa: E402
+
+REGIOES = ["Amazônia", "Pantanal", "Cerrado", "Mata Atlântica", "Caatinga", "Pampa"]
+
+
+def sequencia(n: int, semente: int):
+    """Eventos (código, instante, ocorrência, drone, região, severidade, local) com a mistura do sistema"""
+    rng = random.Random(semente)
+    instante = 1_800_000_000.0
+    for i in range(n):
+        instante += rng.random()
+        codigo = rng.choices((eventos.OCORRENCIA_REGISTRADA, eventos.TAREFA_CONCLUIDA, eventos.DRONE_RETORNOU,
+                              eventos.ATENDIMENTO), (4, 2, 3, 1))[0]
+        regiao = rng.choice(REGIOES)
+        yield (codigo, instante, 1000 + i, f"Drone {rng.randrange(1, 4)}", regiao, rng.randint(1, 5),
+               [rng.uniform(-33.75, 5.27), rng.uniform(-73.99, -34.79)])
+
+
+def gravar_lista(entradas) -> LinkedList:
+    """Caminho antigo: uma string (ou um dicionário) por entrada"""
+    lista = LinkedList()
+    for codigo, instante, oc, drone, regiao, severidade, local in entradas:
+        if codigo == eventos.OCORRENCIA_REGISTRADA:
+            lista.append(f"Nova ocorrência ID {oc}")
+        elif codigo == eventos.TAREFA_CONCLUIDA:
+            lista.append(f"Tarefa concluída: Gerar relatório para {regiao} para ocorrência {oc}")
+        elif codigo == eventos.DRONE_RETORNOU:
+            lista.append(f"Drone {drone} retornou à base")
+        else:
+            lista.append({
+                "tipo": "Atendimento",
+                "descricao": f"Fogo apagado em {regiao}",
+                "severidade": severidade,
+                "timestamp": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(instante)),
+                "local": local
+            })
+    return lista
+
+
+def gravar_eventos(entradas) -> eventos.HistoricoEventos:
+    historico = eventos.HistoricoEventos()
+    for codigo, instante, oc, drone, regiao, severidade, local in entradas:
+        if codigo == eventos.OCORRENCIA_REGISTRADA:
+            historico.registrar(codigo, instante, ocorrencia=oc, regiao=regiao)
+        elif codigo == eventos.TAREFA_CONCLUIDA:
+            historico.registrar(codigo, instante, ocorrencia=oc, ator=drone, texto=f"Gerar relatório para {regiao}")
+        elif codigo == eventos.DRONE_RETORNOU:
+            historico.registrar(codigo, instante, ator=drone)
+        else:
+            historico.registrar(codigo, instante, ocorrencia=oc, regiao=regiao, valor=severidade, local=local)
+    return historico
+
+
+def medir(gravar, entradas):
+    """Tempo de gravação (sem tracemalloc) e memória retida pela estrutura (em outra gravação)"""
+    inicio = time.perf_counter()
+    gravar(entradas)
+    tempo = time.perf_counter() - inicio
+    tracemalloc.start()
+    estrutura = gravar(entradas)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return estrutura, tempo, memoria
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do histórico em eventos compactos")
+    parser.add_argument('--entradas', type=int, default=1_000_000)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+    n = args.entradas
+
+    entradas = list(sequencia(n, args.semente))
+    lista, tempo_lista, memoria_lista = medir(gravar_lista, entradas)
+    historico, tempo_eventos, memoria_eventos = medir(gravar_eventos, entradas)
+    print(f"{n:,} entradas")
+    print(f"  lista de textos: {memoria_lista / n:6.0f} bytes por entrada ({memoria_lista / 2 ** 20:.0f} MB), "
+          f"gravação {tempo_lista:.1f} s")
+    print(f"  eventos:         {memoria_eventos / n:6.0f} bytes por entrada ({memoria_eventos / 2 ** 20:.0f} MB), "
+          f"gravação {tempo_eventos:.1f} s ({memoria_lista / memoria_eventos:.1f}x menos memória)")
+
+    antigo, tempo_antigo = cronometrar(lista.to_list)
+    novo, tempo_novo = cronometrar(historico.to_list)
+    assert [e for e in antigo if not isinstance(e, dict)] == [e for e in novo if not isinstance(e, dict)]
+    print(f"Histórico inteiro em texto: lista {tempo_antigo * 1000:.0f} ms, eventos {tempo_novo * 1000:.0f} ms "
+          f"(texto montado na hora)")
+
+    filtrado_antigo, tempo_antigo = cronometrar(
+        lambda: [e for e in lista.to_list() if isinstance(e, str) and e.startswith("Drone ")])
+    filtrado, tempo_novo = cronometrar(lambda: historico.consultar(tipos=["drone_retornou"]))
+    assert filtrado == filtrado_antigo
+    print(f"Filtro por tipo ({len(filtrado):,} retornos de drones): texto interpretado {tempo_antigo * 1000:.0f} ms, "
+          f"eventos {tempo_novo * 1000:.0f} ms")
+    _, tempo_raro = cronometrar(lambda: historico.consultar(tipos=["atendimento"], limite=100))
+    print(f"Últimos 100 atendimentos: {tempo_raro * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark das consultas indexadas do histórico de drones (DroneTracker.consultar).
+#
+#   python benchmarks/bench_historico_drones.py [--acoes 1000000] [--drones 200] [--ocorrencias 100000]
+#
+# Registra as ações em relógio virtual (uma por segundo) e compara, para um
+# drone e uma ocorrência que aparecem no histórico (os da ação do meio) e uma
+# janela de uma hora, a consulta pelos índices com
+# o caminho antigo: obter_historico() inteiro e filtrar. Também mostra o custo
+# de registrar com os índices.
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sentinel_Fire import DroneTracker  # noqa: E402
+
+
+def cronometrar(funcao, repeticoes: int = 5):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return resultado, melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das consultas do histórico de drones")
+    parser.add_argument('--acoes', type=int, default=1_000_000)
+    parser.add_argument('--drones', type=int, default=200)
+    parser.add_argument('--ocorrencias', type=int, default=100_000)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semente)
+    agora = [1_700_000_000.0]
+    tracker = DroneTracker(relogio=lambda: agora[0])
+    inicio = time.perf_counter()
+    for i in range(args.acoes):
+        agora[0] += 1.0
+        drone, ocorrencia = f"Drone {rng.randrange(args.drones)}", rng.randrange(args.ocorrencias)
+        tracker.registrar(drone, "Missão iniciada", ocorrencia)
+        if i == args.acoes // 2:
+            alvo_drone, alvo_ocorrencia = drone, ocorrencia  # Consultados abaixo: têm ao menos um registro
+    tempo = time.perf_counter() - inicio
+    print(f"{args.acoes:,} ações registradas em {tempo:.1f} s ({tempo / args.acoes * 1e6:.1f} µs por ação)")
+
+    fim = agora[0]
+    consultas = {
+        "drone": ({"drone": alvo_drone}, lambda r: r["drone"] == alvo_drone),
+        "ocorrência": ({"ocorrencia": alvo_ocorrencia}, lambda r: r["ocorrencia"] == alvo_ocorrencia),
+        "última hora": ({"de": fim - 3600, "ate": fim}, None),
+        "drone na última hora": ({"drone": alvo_drone, "de": fim - 3600, "ate": fim}, None),
+    }
+    _, tempo_tudo = cronometrar(tracker.obter_historico, 3)
+    for nome, (filtros, filtro) in consultas.items():
+        resultado, tempo_indice = cronometrar(lambda: tracker.consultar(**filtros))
+        referencia = ""
+        if filtro is not None:
+            esperado, tempo_lista = cronometrar(lambda: [r for r in tracker.obter_historico() if filtro(r)], 3)
+            assert esperado == resultado
+            referencia = f", histórico inteiro + filtro {tempo_lista * 1000:.0f} ms"
+        print(f"{nome:<22}: {len(resultado):>6,} registros, índice {tempo_indice * 1000:.3f} ms{referencia}")
+    print(f"obter_historico() com {args.acoes:,} ações: {tempo_tudo * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
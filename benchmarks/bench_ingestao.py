@@ -0,0 +1,134 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark da ingestão de focos de calor (ingestao.py).
+#
+#   python benchmarks/bench_ingestao.py [--linhas 2000000] [--focos 20000] [--dias 10] [--semente 0]
+#
+# Gera um CSV no formato do FIRMS em um diretório temporário: cada incêndio dura
+# de 1 a 4 dias e, a cada passagem de satélite (4 por dia), produz algumas
+# detecções espalhadas a até ~700 m do centro. Mede:
+#   1. vazão da ingestão (linhas por minuto) e ocorrências criadas contra o
+#      número real de incêndios (a fusão deveria chegar perto de 1 por incêndio);
+#   2. memória: maior número de detecções guardadas no índice durante a leitura
+#      e pico do tracemalloc ingerindo metade e o arquivo inteiro (o índice não
+#      cresce com o arquivo; o que cresce são as ocorrências registradas).
+
+import argparse
+import csv
+import itertools
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingestao import IngestorFocos  # noqa: E402
+from Sentinel_Fire import SistemaEmergencia  # noqa: E402
+
+LAT = (-25.0, 0.0)
+LON = (-65.0, -40.0)
+PASSAGENS = ("0412", "1636", "0530", "1742")  # Horários (UTC) das passagens de cada dia
+
+
+class TemporizadoresNulos:
+    def agendar(self, atraso, callback, *args):
+        return None
+
+    def parar(self, *args, **kwargs):
+        pass
+
+
+def gerar_csv(caminho: str, linhas: int, focos: int, dias: int, rng: random.Random) -> int:
+    """Escreve o CSV em ordem de aquisição; retorna o número de incêndios que aparecem nele"""
+    incendios = []
+    for _ in range(focos):
+        inicio = rng.randrange(dias * len(PASSAGENS))
+        incendios.append((rng.uniform(*LAT), rng.uniform(*LON), inicio, inicio + rng.randint(4, 16)))
+    passagens = dias * len(PASSAGENS)
+    ativos_por_passagem = sum(min(fim, passagens) - inicio for _, _, inicio, fim in incendios)
+    deteccoes = max(1, round(linhas / ativos_por_passagem))
+
+    vistos = set()
+    escritas = 0
+    with open(caminho, "w", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(["latitude", "longitude", "bright_ti4", "scan", "track", "acq_date", "acq_time",
+                           "satellite", "instrument", "confidence", "version", "bright_ti5", "frp", "daynight"])
+        for passagem in range(passagens):
+            data = time.strftime("%Y-%m-%d", time.gmtime(1_720_000_000 + (passagem // len(PASSAGENS)) * 86400))
+            hora = PASSAGENS[passagem % len(PASSAGENS)]
+            for i, (lat, lon, inicio, fim) in enumerate(incendios):
+                if not inicio <= passagem < fim:
+                    continue
+                vistos.add(i)
+                for _ in range(deteccoes):
+                    if escritas >= linhas:
+                        return len(vistos)
+                    angulo, distancia = rng.uniform(0, 2 * math.pi), rng.uniform(0, 0.0063)
+                    escritor.writerow([f"{lat + distancia * math.sin(angulo):.5f}",
+                                       f"{lon + distancia * math.cos(angulo):.5f}",
+                                       f"{rng.uniform(300, 367):.2f}", "0.39", "0.36", data, hora, "N", "VIIRS",
+                                       rng.choice("lnnhh"), "2.0NRT", f"{rng.uniform(280, 310):.2f}",
+                                       f"{rng.expovariate(1 / 20):.2f}", "D" if hora < "1200" else "N"])
+                    escritas += 1
+    return len(vistos)
+
+
+def ingerir(caminho: str, limite: int = None, rastrear: bool = False) -> dict:
+    sistema = SistemaEmergencia(temporizadores=TemporizadoresNulos())
+    ingestor = IngestorFocos(sistema)
+    maior_indice = [0]
+
+    def progresso(parcial):
+        maior_indice[0] = max(maior_indice[0], ingestor.entradas)
+
+    if rastrear:
+        tracemalloc.start()
+    with open(caminho, newline="") as arquivo:
+        if limite is not None:
+            arquivo = itertools.islice(arquivo, limite + 1)  # Cabeçalho + `limite` linhas, sem copiar
+        resultado = ingestor.ingerir(arquivo, progresso)
+    if rastrear:
+        resultado["pico_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    resultado["maior_indice"] = maior_indice[0]
+    resultado["ocorrencias"] = len(sistema.fila_prioritaria)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da ingestão de focos de calor")
+    parser.add_argument('--linhas', type=int, default=2_000_000)
+    parser.add_argument('--focos', type=int, default=20_000)
+    parser.add_argument('--dias', type=int, default=10)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(prefix="bench_ingestao_"), "focos.csv")
+    inicio = time.perf_counter()
+    incendios = gerar_csv(caminho, args.linhas, args.focos, args.dias, random.Random(args.semente))
+    print(f"CSV gerado              : {args.linhas:,} linhas, {os.path.getsize(caminho) / 2 ** 20:.0f} MB, "
+          f"{incendios:,} incêndios em {args.dias} dias ({time.perf_counter() - inicio:.1f} s)")
+
+    # 1. Vazão e fusão
+    resultado = ingerir(caminho)
+    print(f"Ingestão                : {resultado['segundos']:.1f} s, "
+          f"{resultado['linhas'] / resultado['segundos'] * 60 / 1e6:.2f} milhões de linhas/min")
+    print(f"Ocorrências             : {resultado['novas']:,} novas ({resultado['novas'] / incendios:.2f} por incêndio), "
+          f"{resultado['fundidas']:,} fundidas, {resultado['severidade_elevada']:,} elevações de severidade, "
+          f"{resultado['invalidas']} inválidas")
+
+    # 2. Memória
+    for limite in (args.linhas // 2, args.linhas):
+        medicao = ingerir(caminho, limite, rastrear=True)
+        print(f"Memória ({limite:>9,} linhas): pico {medicao['pico_mb']:.1f} MB (tracemalloc, inclui leitura), "
+              f"índice com até {medicao['maior_indice']:,} detecções, {medicao['ocorrencias']:,} ocorrências")
+
+
+if __name__ == '__main__':
+    main()
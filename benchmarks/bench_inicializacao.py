@@ -0,0 +1,91 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark do tempo de inicialização: importação dos módulos e construção do sistema.
+#
+#   python benchmarks/bench_inicializacao.py [--repeticoes 5] [--raiz outro/checkout]
+#
+# Cada medição roda em um interpretador novo (sem cache de módulos):
+#   1. `python -X importtime -c "import <módulo>"` para Sentinel_Fire e api_flask,
+#      com os módulos que mais pesam na importação;
+#   2. tempo de SistemaEmergencia(), threads vivas e bibliotecas pesadas já
+#      carregadas depois da construção;
+#   3. custo adiado: primeiro desenho do mapa (importa o folium).
+# --raiz aponta para outro checkout do projeto (ex.: um `git worktree` da versão
+# anterior) para comparar as duas árvores.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADAS = ("folium", "pandas", "twilio", "smtplib", "numpy", "scipy")
+
+CONSTRUCAO = """
+import json, sys, threading, time
+inicio = time.perf_counter()
+import Sentinel_Fire
+importado = time.perf_counter()
+sistema = Sentinel_Fire.SistemaEmergencia()
+construido = time.perf_counter()
+carregadas = [m for m in {pesadas!r} if m in sys.modules]
+threads = threading.active_count()
+sistema.monitoramento.salvar_mapa()
+mapa = time.perf_counter()
+print(json.dumps({{"importacao": importado - inicio, "construcao": construido - importado,
+                  "primeiro_mapa": mapa - construido, "threads": threads, "carregadas": carregadas}}))
+"""
+
+
+def importtime(raiz: str, modulo: str, diretorio: str):
+    """Tempo cumulativo (s) da importação do módulo e as maiores importações internas"""
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"], cwd=diretorio,
+                           env=dict(os.environ, PYTHONPATH=raiz), capture_output=True, text=True, check=True).stderr
+    linhas = []
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        partes = linha[len("import time:"):].split("|")
+        try:
+            linhas.append((int(partes[1]), partes[2].rstrip()))
+        except ValueError:
+            continue  # Cabeçalho
+    total = next(cumulativo for cumulativo, nome in linhas if nome.strip() == modulo)
+    # Módulos de primeiro nível abaixo do principal (recuo de 2 espaços no importtime)
+    filhos = sorted(((c, n.strip()) for c, n in linhas if n.startswith("   ") and not n.startswith("     ")),
+                    reverse=True)
+    return total / 1e6, filhos[:5]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação e construção do sistema")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--raiz', default=RAIZ, help="Checkout do projeto a medir")
+    args = parser.parse_args()
+    raiz = os.path.abspath(args.raiz)
+    diretorio = tempfile.mkdtemp(prefix="bench_inicializacao_")  # api_flask cria arquivos no diretório atual
+
+    print(f"Árvore: {raiz} ({args.repeticoes} repetições, mediana)")
+    for modulo in ("Sentinel_Fire", "api_flask"):
+        medicoes = [importtime(raiz, modulo, diretorio) for _ in range(args.repeticoes)]
+        total = statistics.median(t for t, _ in medicoes)
+        maiores = ", ".join(f"{nome} {cumulativo / 1000:.0f} ms" for cumulativo, nome in medicoes[-1][1])
+        print(f"import {modulo:<14}: {total * 1000:7.1f} ms  (maiores: {maiores})")
+
+    resultados = []
+    for _ in range(args.repeticoes):
+        saida = subprocess.run([sys.executable, "-c", CONSTRUCAO.format(pesadas=PESADAS)], cwd=diretorio,
+                               env=dict(os.environ, PYTHONPATH=raiz), capture_output=True, text=True, check=True)
+        resultados.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    for chave, rotulo in (("construcao", "SistemaEmergencia()"), ("primeiro_mapa", "primeiro mapa (adiado)")):
+        print(f"{rotulo:<21}: {statistics.median(r[chave] for r in resultados) * 1000:7.1f} ms")
+    print(f"threads após construir: {resultados[-1]['threads']}")
+    print(f"bibliotecas carregadas: {', '.join(resultados[-1]['carregadas']) or 'nenhuma das pesadas'}")
+
+
+if __name__ == '__main__':
+    main()
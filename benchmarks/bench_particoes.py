@@ -0,0 +1,143 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark das partições por região (particoes.py) com um bioma em rajada.
+#
+#   python benchmarks/bench_particoes.py [--rajada 20000] [--ciclos 50] [--trabalhos 200]
+#
+# A Amazônia recebe uma rajada de ocorrências graves e o Pampa umas poucas.
+#   1. Despacho: com 3 drones que voltam à base a cada ciclo, compara o
+#      despacho global de antes (uma atribuição sobre todas as ativas) com as
+#      rodadas por partição: missões enviadas ao Pampa, ciclos até a primeira
+#      e duração do ciclo.
+#   2. Trabalhadores: com a fila de trabalho da Amazônia cheia, mede a espera
+#      de um trabalho do Pampa na mesma fila (uma fila única) e na sua própria
+#      partição.
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sentinel_Fire import SistemaEmergencia  # noqa: E402
+from sistema_alerta import TransporteMemoria  # noqa: E402
+
+AMAZONIA = ((-9.0, 2.0), (-70.0, -50.0))
+PAMPA = ((-33.0, -28.5), (-57.0, -50.0))
+
+
+class TemporizadoresNulos:
+    """Missões nunca concluem: o benchmark devolve os drones à base a cada ciclo"""
+
+    def agendar(self, atraso, callback, *args):
+        return None
+
+    def parar(self, *args, **kwargs):
+        pass
+
+
+def criar_sistema(rajada: int, pampa: int, semente: int) -> SistemaEmergencia:
+    rng = random.Random(semente)
+    sistema = SistemaEmergencia(temporizadores=TemporizadoresNulos())
+    sistema.sistema_alerta.transporte_email = TransporteMemoria()
+    sistema.sistema_alerta.transporte_sms = TransporteMemoria()
+    for regiao, quantidade, (lat, lon) in (("Amazônia", rajada, AMAZONIA), ("Pampa", pampa, PAMPA)):
+        for _ in range(quantidade):
+            sistema.registrar_ocorrencia([rng.uniform(*lat), rng.uniform(*lon)], rng.randint(4, 5), regiao)
+    return sistema
+
+
+def liberar_drones(sistema: SistemaEmergencia):
+    for drone in list(sistema._drones_em_missao):
+        sistema.drones_disponiveis.append(drone)
+    sistema._drones_em_missao.clear()
+
+
+def despacho_global(sistema: SistemaEmergencia):
+    """Ciclo de antes: todas as ativas elegíveis em uma única atribuição"""
+    ocorrencias = [oc for oc in sistema.fila_prioritaria
+                   if oc.severidade > 3 and oc.status == "Pendente"]
+    if ocorrencias:
+        sistema.despachar_lote(ocorrencias)
+
+
+def simular_ciclos(sistema: SistemaEmergencia, ciclo, ciclos: int) -> dict:
+    enviados = {}
+    enviar_drone = sistema.enviar_drone
+
+    def contar(ocorrencia, drone=None):
+        resultado = enviar_drone(ocorrencia, drone)
+        if resultado["status"] == "success":
+            enviados[ocorrencia.regiao] = enviados.get(ocorrencia.regiao, 0) + 1
+            if ocorrencia.regiao == "Pampa" and "primeiro_pampa" not in enviados:
+                enviados["primeiro_pampa"] = n
+        return resultado
+
+    sistema.enviar_drone = contar
+    tempos = []
+    for n in range(1, ciclos + 1):
+        liberar_drones(sistema)
+        inicio = time.perf_counter()
+        ciclo(sistema)
+        tempos.append(time.perf_counter() - inicio)
+    return {
+        "pampa": enviados.get("Pampa", 0),
+        "total": enviados.get("Pampa", 0) + enviados.get("Amazônia", 0),
+        "primeiro_pampa": enviados.get("primeiro_pampa"),
+        "ciclo_ms": statistics.median(tempos) * 1000,
+    }
+
+
+def espera_pampa(sistema: SistemaEmergencia, trabalhos: int, fila_unica: bool) -> float:
+    """Espera (s) de um trabalho do Pampa enfileirado logo após a rajada de trabalhos da Amazônia"""
+    amazonia = sistema.fila_prioritaria.particao("Amazônia")
+    pampa = amazonia if fila_unica else sistema.fila_prioritaria.particao("Pampa")
+
+    def varrer():  # O mesmo filtro do despacho sobre as ativas da região
+        with amazonia.trava:
+            return [oc for oc in amazonia.fila if oc.severidade > 3 and oc.status == "Pendente"]
+
+    concluido = threading.Event()
+    sistema.fila_prioritaria.iniciar()
+    try:
+        for _ in range(trabalhos):
+            amazonia.executar("rajada", varrer)
+        inicio = time.perf_counter()
+        pampa.executar("despacho", concluido.set)
+        concluido.wait()
+        return time.perf_counter() - inicio
+    finally:
+        sistema.fila_prioritaria.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das partições por região com um bioma em rajada")
+    parser.add_argument('--rajada', type=int, default=20_000, help="Ocorrências graves na Amazônia")
+    parser.add_argument('--pampa', type=int, default=20, help="Ocorrências graves no Pampa")
+    parser.add_argument('--ciclos', type=int, default=50)
+    parser.add_argument('--trabalhos', type=int, default=200, help="Trabalhos na fila da Amazônia")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Amazônia: {args.rajada:,} ocorrências graves; Pampa: {args.pampa}; 3 drones; {args.ciclos} ciclos")
+    for nome, ciclo in (("despacho global", despacho_global),
+                        ("partições", lambda sistema: sistema.verificar_drones_automaticamente())):
+        resultado = simular_ciclos(criar_sistema(args.rajada, args.pampa, args.semente), ciclo, args.ciclos)
+        primeiro = resultado["primeiro_pampa"]
+        print(f"  {nome:<16}: {resultado['pampa']:3d} de {resultado['total']} missões no Pampa, "
+              f"primeira no ciclo {primeiro if primeiro is not None else '-'}, "
+              f"ciclo {resultado['ciclo_ms']:.1f} ms")
+
+    sistema = criar_sistema(args.rajada, args.pampa, args.semente)
+    print(f"Trabalho do Pampa atrás de {args.trabalhos} trabalhos da Amazônia:")
+    for nome, fila_unica in (("fila única", True), ("partições", False)):
+        print(f"  {nome:<16}: espera {espera_pampa(sistema, args.trabalhos, fila_unica) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark da pontuação de prioridade em lote (priorizacao.py).
+#
+#   python benchmarks/bench_priorizacao.py [--ocorrencias 100000] [--alteradas 0.01] [--semente 0]
+#
+# Com N ocorrências ativas (relógio virtual) mede:
+#   1. colunas + pontuação vetorizada de todas as ocorrências;
+#   2. primeira repontuação (quase todas mudam: o heap é refeito);
+#   3. ciclo seguinte 5 s depois (a idade avança abaixo da tolerância: nada muda);
+#   4. ciclo com uma fração das ocorrências confirmadas (só elas voltam para o
+#      heap), comparado a atribuir todas as prioridades e refazer o heap.
+# Depois de cada ciclo confere que a fila continua sendo um heap válido.
+
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from priorizacao import PontuacaoPadrao, colunas_ocorrencias  # noqa: E402
+from Sentinel_Fire import SistemaEmergencia  # noqa: E402
+
+LAT = (-33.75, 5.27)
+LON = (-73.99, -34.79)
+REGIOES = ["Amazônia", "Cerrado", "Pantanal", "Mata Atlântica", "Caatinga", "Pampa"]
+
+
+class TemporizadoresNulos:
+    def agendar(self, atraso, callback, *args):
+        return None
+
+    def parar(self, *args, **kwargs):
+        pass
+
+
+def heap_valido(fila_particionada) -> bool:
+    """Confere o heap de cada partição (região)"""
+    return all(not fila[i] < fila[(i - 1) // 2]
+               for fila in (p.fila for p in fila_particionada.particoes()) for i in range(1, len(fila)))
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da pontuação de prioridade em lote")
+    parser.add_argument('--ocorrencias', type=int, default=100_000)
+    parser.add_argument('--alteradas', type=float, default=0.01, help="Fração confirmada no ciclo 4")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semente)
+    agora = [1_700_000_000.0]
+    sistema = SistemaEmergencia(relogio=lambda: agora[0], temporizadores=TemporizadoresNulos())
+    for _ in range(args.ocorrencias):
+        agora[0] += rng.uniform(0, 0.4)  # Idades de até ~11 h ao fim do cadastro
+        sistema.registrar_ocorrencia([rng.uniform(*LAT), rng.uniform(*LON)], rng.randint(1, 5), rng.choice(REGIOES))
+    ativas = list(sistema.fila_prioritaria)
+    print(f"Ocorrências ativas      : {len(ativas):,}")
+
+    # 1. Pontuação vetorizada
+    pontuacao = PontuacaoPadrao()
+    colunas, tempo_colunas = cronometrar(lambda: colunas_ocorrencias(ativas, agora[0]))
+    _, tempo_pontuar = cronometrar(lambda: pontuacao.pontuar(colunas))
+    print(f"Colunas + pontuação     : {tempo_colunas * 1000:.0f} ms + {tempo_pontuar * 1000:.0f} ms")
+
+    # 2. Primeira repontuação
+    quantidade, tempo = cronometrar(sistema.repriorizar)
+    print(f"Primeira repontuação    : {tempo * 1000:.0f} ms, {quantidade:,} reposicionadas "
+          f"(heap válido: {heap_valido(sistema.fila_prioritaria)})")
+
+    # 3. Ciclo seguinte: só a idade avançou
+    agora[0] += 5.0
+    quantidade, tempo = cronometrar(sistema.repriorizar)
+    print(f"Ciclo sem mudanças      : {tempo * 1000:.0f} ms, {quantidade:,} reposicionadas")
+
+    # 4. Parte das ocorrências confirmada
+    confirmadas = rng.sample(ativas, int(len(ativas) * args.alteradas))
+    for ocorrencia in confirmadas:
+        ocorrencia.fogo_confirmado = True
+    agora[0] += 5.0
+    quantidade, tempo = cronometrar(sistema.repriorizar)
+    print(f"Ciclo com confirmações  : {tempo * 1000:.0f} ms, {quantidade:,} reposicionadas "
+          f"(heap válido: {heap_valido(sistema.fila_prioritaria)})")
+
+    # Referência: atribuir todas as prioridades e refazer o heap no mesmo cenário
+    for ocorrencia in confirmadas:
+        ocorrencia.fogo_confirmado = False
+    sistema.repriorizar()
+    for ocorrencia in confirmadas:
+        ocorrencia.fogo_confirmado = True
+
+    def tudo():
+        colunas = colunas_ocorrencias(ativas, agora[0])
+        for ocorrencia, prioridade in zip(ativas, (-sistema.pontuacao.pontuar(colunas)).tolist()):
+            ocorrencia.prioridade = prioridade
+        for particao in sistema.fila_prioritaria.particoes():
+            heapq.heapify(particao.fila)
+
+    _, tempo = cronometrar(tudo)
+    print(f"Referência (tudo+heapify): {tempo * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark do modelo de propagação do fogo (propagacao.py).
+#
+#   python benchmarks/bench_propagacao.py [--ocorrencias 1000 2000 5000 10000] [--repeticoes 3] [--semente 0]
+#
+# Gera arquivos de vento e combustível em grade de 0,25° sobre o Brasil, cria
+# ocorrências ativas aleatórias e mede SistemaEmergencia.atualizar_prioridades
+# (autômato em lote, pontuação e heap) comparado ao ciclo de despacho de 5 s. Também mostra quanto a projeção muda o topo da fila.
+
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from propagacao import MODELOS_COMBUSTIVEL  # noqa: E402
+from Sentinel_Fire import SistemaEmergencia  # noqa: E402
+
+LAT = (-33.75, 5.27)
+LON = (-73.99, -34.79)
+REGIOES = ["Amazônia", "Cerrado", "Pantanal", "Mata Atlântica", "Caatinga", "Pampa"]
+
+
+class TemporizadoresNulos:
+    def agendar(self, atraso, callback, *args):
+        return None
+
+    def parar(self, *args, **kwargs):
+        pass
+
+
+def gerar_campos(diretorio: str, rng: random.Random):
+    """Escreve vento.csv e combustivel.csv em grade de 0,25°"""
+    vento = os.path.join(diretorio, "vento.csv")
+    combustivel = os.path.join(diretorio, "combustivel.csv")
+    modelos = list(MODELOS_COMBUSTIVEL)
+    with open(vento, "w", newline="") as arquivo_vento, open(combustivel, "w", newline="") as arquivo_combustivel:
+        escritor_vento = csv.writer(arquivo_vento)
+        escritor_combustivel = csv.writer(arquivo_combustivel)
+        escritor_vento.writerow(["lat", "lon", "velocidade_kmh", "direcao_graus"])
+        escritor_combustivel.writerow(["lat", "lon", "modelo", "umidade"])
+        lat = LAT[0]
+        while lat <= LAT[1]:
+            lon = LON[0]
+            while lon <= LON[1]:
+                escritor_vento.writerow([f"{lat:.2f}", f"{lon:.2f}", f"{rng.uniform(0, 35):.1f}",
+                                         f"{rng.uniform(0, 360):.0f}"])
+                escritor_combustivel.writerow([f"{lat:.2f}", f"{lon:.2f}", rng.choice(modelos),
+                                               f"{rng.uniform(0.03, 0.2):.3f}"])
+                lon += 0.25
+            lat += 0.25
+    return vento, combustivel
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do modelo de propagação do fogo")
+    parser.add_argument('--ocorrencias', type=int, nargs='+', default=[1000, 2000, 5000, 10000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semente)
+    vento, combustivel = gerar_campos(tempfile.mkdtemp(prefix="bench_propagacao_"), rng)
+
+    for quantidade in args.ocorrencias:
+        sistema = SistemaEmergencia(temporizadores=TemporizadoresNulos())
+        sistema.arquivo_vento, sistema.arquivo_combustivel = vento, combustivel
+        inicio = time.perf_counter()
+        sistema.modelo_propagacao  # Carrega os arquivos fora da medição
+        carga = time.perf_counter() - inicio
+        for _ in range(quantidade):
+            sistema.registrar_ocorrencia([rng.uniform(*LAT), rng.uniform(*LON)], rng.randint(1, 5),
+                                         rng.choice(REGIOES))
+        topo_antes = {oc.id for oc in sorted(sistema.fila_prioritaria)[:100]}
+
+        tempos = []
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            sistema.atualizar_prioridades()
+            tempos.append(time.perf_counter() - inicio)
+        ativas = sistema.fila_prioritaria
+        area_1h = statistics.median(oc.area_projetada_1h for oc in ativas)
+        area_6h = statistics.median(oc.area_projetada_6h for oc in ativas)
+        maior_6h = max(oc.area_projetada_6h for oc in ativas)
+        topo_depois = {oc.id for oc in sorted(ativas)[:100]}
+        mediana = statistics.median(tempos)
+        print(f"{quantidade:>6,} ativas: {mediana * 1000:7.1f} ms por ciclo ({mediana / 5.0:5.1%} do ciclo de 5 s), "
+              f"área mediana {area_1h:.2f} km² (+1 h) / {area_6h:.1f} km² (+6 h), maior {maior_6h:.0f} km², "
+              f"{len(topo_depois - topo_antes)} das 100 mais urgentes mudaram (campos carregados em {carga:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Teste de resistência (soak) dos serviços em segundo plano.
+#
+#   python benchmarks/bench_resistencia.py [--horas 2] [--aceleracao 20] [--amostragem 30]
+#                                          [--max-memoria-mb 64] [--max-memoria-mb-hora 32]
+#                                          [--max-rss-mb 128] [--max-threads 4] [--max-fds 8]
+#
+# Roda um SistemaEmergencia com `iniciar_servicos` por horas, com todos os
+# intervalos e tempos divididos por `aceleracao` (simulador, verificação de
+# drones, missões, verificação de fogo, priorização, arquivamento e mapa), e
+# os transportes de alerta trocados por TransporteMemoria. A cada `amostragem`
+# segundos registra a memória rastreada (tracemalloc), o RSS, as threads e os
+# descritores de arquivo abertos; a cada `relatorio` segundos mostra os
+# locais de alocação que mais cresceram desde o fim do aquecimento.
+#
+# Ao final compara o crescimento com os orçamentos (a partir da amostra do fim
+# do aquecimento, quando pools e caches já foram criados) e sai com código 1
+# se algum for ultrapassado, listando as threads e descritores novos.
+
+import argparse
+import contextlib
+import csv
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Sentinel_Fire import SistemaEmergencia  # noqa: E402
+from sistema_alerta import TransporteMemoria  # noqa: E402
+
+MB = 2 ** 20
+
+# Alocações do próprio instrumental não entram no relatório
+FILTROS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class Amostra:
+    """Medições de um instante do teste"""
+
+    __slots__ = ('segundos', 'memoria', 'rss', 'threads', 'fds', 'ocorrencias', 'historico')
+
+    def __init__(self, segundos: float, sistema: SistemaEmergencia):
+        self.segundos = segundos
+        self.memoria = tracemalloc.get_traced_memory()[0]
+        self.rss = rss_bytes()
+        self.threads = threading.active_count()
+        self.fds = len(descritores_abertos())
+        with sistema._trava:
+            self.ocorrencias = len(sistema.fila_prioritaria) + len(sistema.resolvidas) + len(sistema.arquivo)
+        self.historico = len(sistema.historico)
+
+    def linha(self) -> dict:
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+
+def rss_bytes() -> int:
+    """Memória residente atual (no Linux por /proc; em outros sistemas, o pico)"""
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == "darwin" else pico * 1024
+
+
+def descritores_abertos() -> dict:
+    """Descritores abertos -> destino (vazio onde /proc/self/fd não existe)"""
+    try:
+        nomes = os.listdir("/proc/self/fd")
+    except OSError:
+        return {}
+    destinos = {}
+    for nome in nomes:
+        try:
+            destinos[nome] = os.readlink(f"/proc/self/fd/{nome}")
+        except OSError:
+            pass  # O próprio descritor da listagem já foi fechado
+    return destinos
+
+
+def inclinacao_por_hora(amostras, campo: str) -> float:
+    """Crescimento de `campo` por hora, pelo ajuste de mínimos quadrados"""
+    if len(amostras) < 2:
+        return 0.0
+    xs = [a.segundos / 3600 for a in amostras]
+    ys = [getattr(a, campo) for a in amostras]
+    media_x = sum(xs) / len(xs)
+    media_y = sum(ys) / len(ys)
+    variancia = sum((x - media_x) ** 2 for x in xs)
+    if variancia == 0:
+        return 0.0
+    return sum((x - media_x) * (y - media_y) for x, y in zip(xs, ys)) / variancia
+
+
+def acelerar(sistema: SistemaEmergencia, fator: float):
+    """Divide por `fator` os intervalos das tarefas periódicas e os tempos do sistema"""
+    sistema.tempo_missao /= fator
+    sistema.tempo_retorno_base /= fator
+    sistema.intervalo_verificacao_fogo /= fator
+    sistema.idade_arquivamento /= fator
+    for tarefa in sistema.agendador._periodicas.values():
+        tarefa.intervalo /= fator  # Lido a cada volta do laço da tarefa
+        tarefa.metricas.intervalo = tarefa.intervalo
+
+
+def principais_locais(inicial, atual, top: int):
+    """Locais de alocação que mais cresceram entre dois snapshots"""
+    diferencas = atual.filter_traces(FILTROS).compare_to(inicial.filter_traces(FILTROS), "lineno")
+    return [d for d in diferencas if d.size_diff > 0][:top]
+
+
+def imprimir_locais(diferencas, saida=None):
+    for diferenca in diferencas:
+        quadro = diferenca.traceback[0]
+        arquivo = os.path.relpath(quadro.filename, RAIZ) if quadro.filename.startswith(RAIZ) else quadro.filename
+        print(f"    {diferenca.size_diff / 1024:+10.1f} KB {diferenca.count_diff:+8d} blocos  "
+              f"{arquivo}:{quadro.lineno}", file=saida)
+
+
+def imprimir_amostra(amostra: Amostra, base: Amostra, saida=None):
+    print(f"[{amostra.segundos / 60:7.1f} min] memória {amostra.memoria / MB:7.1f} MB "
+          f"({(amostra.memoria - base.memoria) / MB:+.1f}), RSS {amostra.rss / MB:7.1f} MB "
+          f"({(amostra.rss - base.rss) / MB:+.1f}), threads {amostra.threads} ({amostra.threads - base.threads:+d}), "
+          f"fds {amostra.fds} ({amostra.fds - base.fds:+d}), {amostra.ocorrencias:,} ocorrências, "
+          f"{amostra.historico:,} entradas no histórico", file=saida, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de resistência dos serviços em segundo plano")
+    parser.add_argument('--horas', type=float, default=2.0)
+    parser.add_argument('--aceleracao', type=float, default=20.0,
+                        help="Divisor dos intervalos e tempos (20: uma ocorrência simulada a cada 0,25 s)")
+    parser.add_argument('--aquecimento', type=float, default=None,
+                        help="Segundos antes da amostra de referência (padrão: 5%% da duração, até 10 min)")
+    parser.add_argument('--amostragem', type=float, default=30.0, help="Segundos entre amostras")
+    parser.add_argument('--relatorio', type=float, default=600.0,
+                        help="Segundos entre relatórios dos locais de alocação")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--quadros', type=int, default=1, help="Quadros guardados por alocação (tracemalloc)")
+    parser.add_argument('--csv', default=None, help="Grava as amostras neste arquivo")
+    parser.add_argument('--verboso', action='store_true', help="Mantém as mensagens dos serviços no terminal")
+    # Orçamentos de crescimento a partir do fim do aquecimento
+    parser.add_argument('--max-memoria-mb', type=float, default=64.0, help="Memória rastreada (tracemalloc)")
+    parser.add_argument('--max-memoria-mb-hora', type=float, default=32.0,
+                        help="Inclinação da memória rastreada em MB por hora")
+    parser.add_argument('--max-rss-mb', type=float, default=128.0)
+    parser.add_argument('--max-threads', type=int, default=4)
+    parser.add_argument('--max-fds', type=int, default=8)
+    args = parser.parse_args()
+
+    duracao = args.horas * 3600
+    aquecimento = args.aquecimento if args.aquecimento is not None else min(duracao * 0.05, 600.0)
+
+    tracemalloc.start(args.quadros)
+    sistema = SistemaEmergencia()
+    sistema.sistema_alerta.transporte_email = TransporteMemoria()
+    sistema.sistema_alerta.transporte_sms = TransporteMemoria()
+    terminal = sys.stdout  # Relatório do teste; as mensagens dos serviços vão para o descarte
+    descarte = open(os.devnull, "w") if not args.verboso else None
+    print(f"Teste de resistência: {args.horas:g} h com aceleração {args.aceleracao:g}x, "
+          f"aquecimento de {aquecimento:.0f} s, amostras a cada {args.amostragem:g} s")
+
+    inicio = time.monotonic()
+    amostras = []
+    base = None
+    snapshot_base = None
+    threads_base = {}
+    fds_base = {}
+    proximo_relatorio = inicio + aquecimento + args.relatorio
+    with contextlib.redirect_stdout(descarte) if descarte else contextlib.nullcontext():
+        sistema._registrar_servicos()
+        acelerar(sistema, args.aceleracao)
+        sistema.iniciar_servicos()
+        try:
+            while True:
+                agora = time.monotonic()
+                decorrido = agora - inicio
+                if base is None and decorrido >= aquecimento:
+                    # Os snapshots custam memória ao processo: a referência é tirada depois de um
+                    # relatório de ensaio, para que o RSS dos relatórios seguintes não conte como vazamento
+                    snapshot_base = tracemalloc.take_snapshot()
+                    principais_locais(snapshot_base, tracemalloc.take_snapshot(), args.top)
+                    threads_base = {t.ident: t.name for t in threading.enumerate()}
+                    fds_base = descritores_abertos()
+                    base = Amostra(time.monotonic() - inicio, sistema)
+                    amostras.append(base)
+                    imprimir_amostra(base, base, terminal)
+                elif base is not None:
+                    amostra = Amostra(decorrido, sistema)
+                    amostras.append(amostra)
+                    imprimir_amostra(amostra, base, terminal)
+                    if agora >= proximo_relatorio:
+                        proximo_relatorio = agora + args.relatorio
+                        print("  Locais de alocação que mais cresceram:", file=terminal)
+                        imprimir_locais(principais_locais(snapshot_base, tracemalloc.take_snapshot(), args.top),
+                                        terminal)
+                if decorrido >= duracao:
+                    break
+                proximo = aquecimento if base is None else decorrido + args.amostragem
+                time.sleep(max(0.0, min(proximo, duracao) - (time.monotonic() - inicio)))
+        finally:
+            snapshot_final = tracemalloc.take_snapshot()
+            threads_final = {t.ident: t.name for t in threading.enumerate()}
+            fds_final = descritores_abertos()
+            sistema.parar_servicos()
+    if descarte:
+        descarte.close()
+    tracemalloc.stop()
+
+    if base is None or len(amostras) < 2:
+        print("Duração menor que o aquecimento: nenhuma comparação feita")
+        return 0
+
+    final = amostras[-1]
+    if args.csv:
+        with open(args.csv, "w", newline="") as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=Amostra.__slots__)
+            escritor.writeheader()
+            escritor.writerows(a.linha() for a in amostras)
+
+    taxa = inclinacao_por_hora(amostras, "memoria") / MB
+    medidas = [
+        ("memória rastreada", (final.memoria - base.memoria) / MB, args.max_memoria_mb, "MB"),
+        ("memória rastreada por hora", taxa, args.max_memoria_mb_hora, "MB/h"),
+        ("RSS", (final.rss - base.rss) / MB, args.max_rss_mb, "MB"),
+        ("threads", final.threads - base.threads, args.max_threads, ""),
+        ("descritores abertos", final.fds - base.fds, args.max_fds, ""),
+    ]
+    print(f"\nResultado após {final.segundos / 3600:.2f} h ({final.ocorrencias:,} ocorrências, "
+          f"{final.historico - base.historico:+,} entradas no histórico desde o aquecimento):")
+    estouros = []
+    for nome, crescimento, orcamento, unidade in medidas:
+        situacao = "OK" if crescimento <= orcamento else "ESTOURO"
+        print(f"  {nome:<27}: {crescimento:+10.1f} {unidade:<4} (orçamento {orcamento:g}) {situacao}")
+        if crescimento > orcamento:
+            estouros.append(nome)
+
+    print("  Locais de alocação que mais cresceram:")
+    imprimir_locais(principais_locais(snapshot_base, snapshot_final, args.top))
+    novas = [nome for ident, nome in threads_final.items() if ident not in threads_base]
+    if novas:
+        print(f"  Threads novas: {', '.join(sorted(novas))}")
+    novos = sorted(destino for fd, destino in fds_final.items() if fds_base.get(fd) != destino)
+    if novos:
+        print(f"  Descritores novos: {', '.join(novos[:args.top])}")
+
+    if estouros:
+        print(f"FALHOU: orçamento ultrapassado ({', '.join(estouros)})")
+        return 1
+    print("OK: crescimento dentro dos orçamentos")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,371 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Suíte de benchmarks das operações centrais do SistemaEmergencia.
+#
+#   python benchmarks/bench_sistema.py                       # todos os casos, 1k..1M
+#   python benchmarks/bench_sistema.py --casos registrar_ocorrencia rota_ocorrencias --tamanhos 1000 10000
+#   python benchmarks/bench_sistema.py --saida atual.json --comparar anterior.json
+#
+# Para cada caso e tamanho N, o sistema é preenchido com N ocorrências e são
+# cronometradas até --max-operacoes operações (casos que varrem todas as
+# ocorrências, como o mapa e as rotas, executam poucas repetições). São
+# reportados ops/s, latências p50/p99 e o pico de memória (tracemalloc, em uma
+# segunda passada para não distorcer as latências). Os resultados são salvos em
+# JSON para comparação entre execuções.
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sentinel_Fire import SistemaEmergencia  # noqa: E402
+from sistema_alerta import TransporteMemoria  # noqa: E402
+
+TAMANHOS = [1_000, 10_000, 100_000, 1_000_000]
+REGIOES = ["Amazônia", "Pantanal", "Cerrado", "Mata Atlântica", "Caatinga", "Pampa"]
+STATUS = ["Pendente", "Fogo ativo", "Fogo apagado", "Verificado"]
+
+
+class TemporizadoresNulos:
+    """Serviço de temporizadores que não agenda nada (missões não concluem)"""
+
+    def agendar(self, atraso, callback, *args):
+        return None
+
+    def parar(self, *args, **kwargs):
+        pass
+
+
+def novo_sistema() -> SistemaEmergencia:
+    sistema = SistemaEmergencia(temporizadores=TemporizadoresNulos())
+    sistema.sistema_alerta.transporte_email = TransporteMemoria()
+    sistema.sistema_alerta.transporte_sms = TransporteMemoria()
+    return sistema
+
+
+def preencher(sistema: SistemaEmergencia, n: int, semente: int = 0):
+    """Registra N ocorrências pelo caminho real e distribui os status
+
+    As confirmações e extinções seguem as mesmas transições do sistema, e as
+    resolvidas ("Fogo apagado", "Verificado") saem da camada ativa como em
+    produção (em lote, para o preparo com 1 milhão não custar O(N²)).
+    """
+    rng = random.Random(semente)
+    resolvidas = []
+    for _ in range(n):
+        oc = sistema.registrar_ocorrencia(
+            [rng.uniform(-33.75, 5.27), rng.uniform(-73.99, -34.79)],
+            rng.randint(1, 5),
+            rng.choice(REGIOES)
+        )
+        status = rng.choice(STATUS)
+        if status in ("Fogo ativo", "Fogo apagado"):  # Confirmado pela missão (simular_missao)
+            oc.status = "Fogo ativo"
+            oc.fogo_confirmado = True
+            oc.tempo_inicio_fogo = sistema.relogio()
+            sistema._transicao(oc, "confirmado")
+        if status == "Fogo apagado":  # Apagado (verificar_fogos_apagados)
+            oc.status = "Fogo apagado"
+            oc.fogo_apagado = True
+            oc.severidade = 1
+            oc.tempo_fim_fogo = sistema.relogio()
+            sistema._transicao(oc, "extinto")
+            resolvidas.append(oc)
+        elif status == "Verificado":  # Missão sem fogo
+            oc.status = "Verificado"
+            sistema._transicao(oc, "descartado")
+            resolvidas.append(oc)
+    sistema._resolver_lote(resolvidas)
+
+
+# ==================== Casos ====================
+
+class Caso:
+    """Caso de benchmark
+
+    Args:
+        nome: Identificação do caso
+        preparar: Recebe N e devolve o contexto (já preenchido)
+        operacao: Executa uma operação cronometrada sobre o contexto
+        operacoes: Número de operações cronometradas para um tamanho N
+        depois: Executado após cada operação, fora da medição (opcional)
+    """
+
+    def __init__(self, nome: str, preparar: Callable[[int], dict], operacao: Callable[[dict, int], None],
+                 operacoes: Callable[[int, int], int], depois: Optional[Callable[[dict, int], None]] = None):
+        self.nome = nome
+        self.preparar = preparar
+        self.operacao = operacao
+        self.operacoes = operacoes
+        self.depois = depois
+
+
+def _preparar_sistema(n: int) -> dict:
+    sistema = novo_sistema()
+    preencher(sistema, n)
+    return {"sistema": sistema}
+
+
+def _preparar_vazio(n: int) -> dict:
+    sistema = novo_sistema()
+    rng = random.Random(1)
+    entradas = [([rng.uniform(-33.75, 5.27), rng.uniform(-73.99, -34.79)], rng.randint(1, 5), rng.choice(REGIOES))
+                for _ in range(n)]
+    return {"sistema": sistema, "entradas": entradas}
+
+
+def _registrar(ctx: dict, i: int):
+    local, severidade, regiao = ctx["entradas"][i]
+    ctx["sistema"].registrar_ocorrencia(local, severidade, regiao)
+
+
+def _atender(ctx: dict, i: int):
+    ctx["sistema"].atender_ocorrencia()
+
+
+def _preparar_envio(n: int) -> dict:
+    ctx = _preparar_sistema(n)
+    ctx["alvos"] = list(ctx["sistema"].fila_prioritaria)
+    return ctx
+
+
+def _enviar_drone(ctx: dict, i: int):
+    ctx["resultado"] = ctx["sistema"].enviar_drone(ctx["alvos"][i % len(ctx["alvos"])])
+
+
+def _devolver_drone(ctx: dict, i: int):
+    """Missão stubada: devolve o drone à base fora da medição, pelo mesmo caminho do sistema"""
+    drone = ctx.get("resultado", {}).get("drone")
+    if drone:
+        ctx["sistema"]._retornar_base(drone)
+
+
+def _preparar_alertas(n: int) -> dict:
+    """Envio imediato: sem a janela de agrupamento, cada alerta chega aos transportes na hora"""
+    ctx = _preparar_sistema(n)
+    ctx["alvos"] = list(ctx["sistema"].fila_prioritaria)
+    ctx["sistema"].sistema_alerta.janela_agrupamento = 0
+    return ctx
+
+
+def _enviar_alertas(ctx: dict, i: int):
+    ctx["sistema"].sistema_alerta.enviar_alertas(ctx["alvos"][i % len(ctx["alvos"])], 'alerta')
+
+
+def _preparar_resumos(n: int) -> dict:
+    """Agrupamento padrão, sem limite de taxa: o fechamento da janela sempre entrega o resumo"""
+    ctx = _preparar_sistema(n)
+    ctx["alvos"] = list(ctx["sistema"].fila_prioritaria)
+    alerta = ctx["sistema"].sistema_alerta
+    alerta.capacidade_contato = alerta.capacidade_canal = 10 ** 9
+    return ctx
+
+
+def _enviar_resumos(ctx: dict, i: int):
+    """Acumula um alerta e fecha a janela (o que o temporizador faria após 60 s), entregando os resumos"""
+    alerta = ctx["sistema"].sistema_alerta
+    alerta.enviar_alertas(ctx["alvos"][i % len(ctx["alvos"])], 'alerta')
+    for chave in list(alerta._pendentes):
+        alerta._enviar_resumo(chave)
+
+
+def _atualizar_mapa(ctx: dict, i: int):
+    ctx["sistema"].monitoramento.atualizar_simulacao()
+
+
+def _preparar_rotas(n: int) -> dict:
+    import api_flask
+
+    ctx = _preparar_sistema(n)
+    api_flask.sistema = ctx["sistema"]
+    ctx["cliente"] = api_flask.app.test_client()
+    return ctx
+
+
+def _rota(caminho: str) -> Callable[[dict, int], None]:
+    def requisitar(ctx: dict, i: int):
+        resposta = ctx["cliente"].get(caminho)
+        resposta.get_data()
+        if resposta.status_code != 200:
+            raise RuntimeError(f"{caminho} retornou {resposta.status_code}")
+    return requisitar
+
+
+def _preparar_series(n: int) -> dict:
+    """N transições espalhadas ao longo de um ano, direto nas tabelas de agregação"""
+    ctx = _preparar_rotas(0)
+    sistema = ctx["sistema"]
+    rng = random.Random(2)
+    fim = sistema.relogio()
+    inicio = fim - 365 * 86400
+    for _ in range(n):
+        instante = rng.uniform(inicio, fim)
+        oc = SimpleNamespace(regiao=rng.choice(REGIOES), severidade=rng.randint(1, 5),
+                             tempo_inicio_fogo=instante - rng.uniform(60, 7200), tempo_fim_fogo=instante)
+        sistema.series.registrar(oc, rng.choice(["registro", "confirmado", "extinto"]), instante)
+    ctx["de"] = inicio
+    return ctx
+
+
+def _series_ano(ctx: dict, i: int):
+    resposta = ctx["cliente"].get(f"/analytics/series?regiao=Amazônia&bucket=1h&from={ctx['de']}")
+    resposta.get_data()
+    if resposta.status_code != 200:
+        raise RuntimeError(f"/analytics/series retornou {resposta.status_code}")
+
+
+def _ate(limite: int) -> Callable[[int, int], int]:
+    """Operações cronometradas: N limitado por --max-operacoes e por `limite`"""
+    return lambda n, maximo: max(1, min(n, maximo, limite))
+
+
+CASOS: Dict[str, Caso] = {caso.nome: caso for caso in [
+    Caso("registrar_ocorrencia", _preparar_vazio, _registrar, _ate(10 ** 9)),
+    Caso("atender_ocorrencia", _preparar_sistema, _atender, _ate(10 ** 9)),
+    Caso("enviar_drone", _preparar_envio, _enviar_drone, _ate(10 ** 9), depois=_devolver_drone),
+    Caso("enviar_alertas", _preparar_alertas, _enviar_alertas, _ate(10 ** 9)),
+    Caso("enviar_resumos", _preparar_resumos, _enviar_resumos, _ate(10 ** 9)),
+    Caso("mapa_atualizar_simulacao", _preparar_sistema, _atualizar_mapa, _ate(5)),
+    Caso("rota_ocorrencias", _preparar_rotas, _rota('/ocorrencias'), _ate(5)),
+    Caso("rota_historico", _preparar_rotas, _rota('/historico'), _ate(5)),
+    Caso("rota_mapa", _preparar_rotas, _rota('/mapa'), _ate(3)),
+    Caso("rota_series_ano", _preparar_series, _series_ano, _ate(20)),
+]}
+
+
+# ==================== Execução ====================
+
+def _percentil(valores: List[int], p: float) -> float:
+    return valores[min(len(valores) - 1, int(len(valores) * p))] / 1e6  # ns -> ms
+
+
+def medir(caso: Caso, n: int, max_operacoes: int, memoria: bool) -> dict:
+    """Executa um caso para um tamanho N e retorna as métricas"""
+    inicio_preparo = time.perf_counter()
+    ctx = caso.preparar(n)
+    preparo = time.perf_counter() - inicio_preparo
+    k = caso.operacoes(n, max_operacoes)
+
+    latencias = []
+    relogio = time.perf_counter_ns
+    for i in range(k):
+        inicio = relogio()
+        caso.operacao(ctx, i)
+        latencias.append(relogio() - inicio)
+        if caso.depois:
+            caso.depois(ctx, i)
+    del ctx
+
+    latencias.sort()
+    total = sum(latencias) / 1e9
+    resultado = {
+        "caso": caso.nome,
+        "tamanho": n,
+        "operacoes": k,
+        "ops_por_segundo": round(k / total, 2) if total else None,
+        "p50_ms": round(_percentil(latencias, 0.50), 4),
+        "p99_ms": round(_percentil(latencias, 0.99), 4),
+        "preparo_s": round(preparo, 3),
+        "pico_memoria_mb": None
+    }
+
+    if memoria:
+        tracemalloc.start()
+        ctx = caso.preparar(n)
+        for i in range(k):
+            caso.operacao(ctx, i)
+            if caso.depois:
+                caso.depois(ctx, i)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del ctx
+        resultado["pico_memoria_mb"] = round(pico / 1024 / 1024, 2)
+
+    return resultado
+
+
+def comparar(atual: List[dict], anterior_arquivo: str, tolerancia: float) -> int:
+    """Compara ops/s com uma execução anterior; retorna o número de regressões"""
+    with open(anterior_arquivo, encoding='utf-8') as f:
+        anterior = {(r["caso"], r["tamanho"]): r for r in json.load(f)["resultados"]}
+
+    regressoes = 0
+    print(f"\nComparação com {anterior_arquivo} (tolerância {tolerancia:.0%}):")
+    for r in atual:
+        base = anterior.get((r["caso"], r["tamanho"]))
+        if not base or not base.get("ops_por_segundo") or not r.get("ops_por_segundo"):
+            continue
+        variacao = r["ops_por_segundo"] / base["ops_por_segundo"] - 1
+        marca = ""
+        if variacao < -tolerancia:
+            marca = "  <-- REGRESSÃO"
+            regressoes += 1
+        print(f"  {r['caso']:<26} {r['tamanho']:>9,}  {base['ops_por_segundo']:>12,.1f} -> "
+              f"{r['ops_por_segundo']:>12,.1f} ops/s ({variacao:+.1%}){marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do SistemaEmergencia")
+    parser.add_argument('--casos', nargs='+', choices=sorted(CASOS), default=list(CASOS))
+    parser.add_argument('--tamanhos', nargs='+', type=int, default=TAMANHOS)
+    parser.add_argument('--max-operacoes', type=int, default=10_000,
+                        help="Máximo de operações cronometradas por caso e tamanho")
+    parser.add_argument('--orcamento', type=float, default=300.0,
+                        help="Pula tamanhos maiores de um caso cujo tamanho anterior levou mais que isso (s)")
+    parser.add_argument('--sem-memoria', action='store_true', help="Não mede o pico de memória")
+    parser.add_argument('--saida', default='bench_sistema.json', help="Arquivo JSON de resultados")
+    parser.add_argument('--comparar', help="Resultados anteriores para detectar regressões")
+    parser.add_argument('--tolerancia', type=float, default=0.10, help="Queda de ops/s tolerada (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    # As rotas gravam o mapa em templates/; usa um diretório temporário
+    diretorio_original = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="bench_sentinel_"))
+    saida = os.path.join(diretorio_original, args.saida)
+
+    resultados = []
+    print(f"{'caso':<26} {'N':>9} {'ops':>6} {'ops/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'pico MB':>9}")
+    for nome in args.casos:
+        caso = CASOS[nome]
+        for n in sorted(args.tamanhos):
+            inicio = time.perf_counter()
+            try:
+                r = medir(caso, n, args.max_operacoes, not args.sem_memoria)
+            except Exception as e:
+                r = {"caso": nome, "tamanho": n, "erro": str(e)}
+                print(f"{nome:<26} {n:>9,} ERRO: {e}")
+            else:
+                print(f"{nome:<26} {n:>9,} {r['operacoes']:>6} {r['ops_por_segundo']:>12,.1f} "
+                      f"{r['p50_ms']:>9.4f} {r['p99_ms']:>9.4f} {r['pico_memoria_mb'] or 0:>9.1f}")
+            resultados.append(r)
+            if time.perf_counter() - inicio > args.orcamento:
+                print(f"{nome:<26} tamanhos maiores pulados (orçamento de {args.orcamento:.0f}s excedido)")
+                break
+
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump({
+            "data": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "resultados": resultados
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados salvos em {saida}")
+
+    if args.comparar:
+        regressoes = comparar(resultados, os.path.join(diretorio_original, args.comparar), args.tolerancia)
+        sys.exit(1 if regressoes else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark da telemetria dos drones (telemetria.py).
+#
+#   python benchmarks/bench_telemetria.py [--drones 100] [--hz 10] [--minutos 30] [--segundos-http 60]
+#
+# Cada drone envia um lote por segundo com `hz` amostras (posição, altitude,
+# bateria, temperatura), em relógio virtual. Mede:
+#   1. a gravação direta no ArmazemTelemetria durante `minutos` de voo, com a
+#      memória (tracemalloc) ao fim de cada bloco de 5 min: deve ficar constante
+#      depois que os buffers são criados;
+#   2. o caminho HTTP (POST /drones/<id>/telemetria pelo cliente de teste do
+#      Flask) durante `segundos-http`, comparado à taxa necessária;
+#   3. as consultas de última posição de todos os drones e de trilha.
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetria import ArmazemTelemetria  # noqa: E402
+
+
+def lote(drone: int, segundo: int, hz: int, inicio: float, rng: random.Random) -> dict:
+    """Lote em colunas de um drone voando em círculo"""
+    instantes = [inicio + segundo + i / hz for i in range(hz)]
+    return {
+        "instante": instantes,
+        "lat": [-15.0 + drone * 0.01 + 0.001 * (t - inicio) % 0.5 for t in instantes],
+        "lon": [-47.0 + 0.001 * (t - inicio) % 0.5 for t in instantes],
+        "altitude": [120.0 + rng.uniform(-2, 2) for _ in instantes],
+        "bateria": [max(100.0 - 0.01 * (t - inicio), 0.0) for t in instantes],
+        "temperatura": [rng.uniform(20, 80) for _ in instantes],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da telemetria dos drones")
+    parser.add_argument('--drones', type=int, default=100)
+    parser.add_argument('--hz', type=int, default=10)
+    parser.add_argument('--minutos', type=int, default=30)
+    parser.add_argument('--segundos-http', type=int, default=60)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semente)
+    inicio = 1_800_000_000.0
+    taxa_necessaria = args.drones * args.hz
+    # Lotes pré-gerados para um minuto (reaproveitados deslocando o instante)
+    lotes = [[lote(d, s, args.hz, inicio, rng) for d in range(args.drones)] for s in range(60)]
+
+    # 1. Gravação direta
+    armazem = ArmazemTelemetria(relogio=lambda: inicio)
+    print(f"{args.drones} drones x {args.hz} Hz = {taxa_necessaria:,} amostras/s necessárias; "
+          f"{armazem.bytes_por_drone / 2 ** 10:.0f} KB de buffers por drone")
+    tracemalloc.start()
+    gravacao = 0.0
+    amostras = 0
+    for minuto in range(args.minutos):
+        for segundo in range(60):
+            deslocamento = minuto * 60
+            for d in range(args.drones):
+                colunas = dict(lotes[segundo][d])
+                colunas["instante"] = [t + deslocamento for t in colunas["instante"]]
+                t0 = time.perf_counter()
+                amostras += armazem.registrar(f"Drone {d}", colunas)["aceitas"]
+                gravacao += time.perf_counter() - t0
+        if (minuto + 1) % 5 == 0 or minuto == 0:
+            atual, pico = tracemalloc.get_traced_memory()
+            print(f"  {minuto + 1:3d} min de voo: {amostras:,} amostras, {amostras / gravacao:,.0f} amostras/s "
+                  f"({amostras / gravacao / taxa_necessaria:.0f}x o necessário), memória {atual / 2 ** 20:.1f} MB "
+                  f"(pico {pico / 2 ** 20:.1f} MB)")
+    tracemalloc.stop()
+
+    # 3. Consultas
+    t0 = time.perf_counter()
+    posicoes = armazem.posicoes()
+    tempo_posicoes = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    trilha = armazem.trilha("Drone 0", resolucao="1s", limite=600)
+    tempo_trilha = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    trilha_min = armazem.trilha("Drone 0", resolucao="1min", limite=None)
+    tempo_trilha_min = time.perf_counter() - t0
+    print(f"Última posição de {len(posicoes)} drones: {tempo_posicoes * 1000:.1f} ms; trilha de 10 min em 1 s "
+          f"({len(trilha['instante'])} pontos): {tempo_trilha * 1000:.1f} ms; trilha em 1 min "
+          f"({len(trilha_min['instante'])} pontos): {tempo_trilha_min * 1000:.1f} ms")
+
+    # 2. Caminho HTTP
+    import api_flask
+
+    cliente = api_flask.app.test_client()
+    t0 = time.perf_counter()
+    aceitas = 0
+    for segundo in range(args.segundos_http):
+        for d in range(args.drones):
+            resposta = cliente.post(f"/drones/Drone%20{d}/telemetria", json=lotes[segundo % 60][d])
+            aceitas += resposta.get_json()["resultado"]["aceitas"]
+    tempo = time.perf_counter() - t0
+    print(f"HTTP: {args.segundos_http * args.drones:,} lotes em {tempo:.1f} s, {aceitas / tempo:,.0f} amostras/s "
+          f"({aceitas / tempo / taxa_necessaria:.1f}x o necessário com um processo)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark do serviço de temporizadores com 100 mil temporizadores pendentes.
+#
+#   python benchmarks/bench_temporizadores.py [--quantidade 100000] [--janela 2.0]
+#
+# Mede a taxa de agendamento, a memória ocupada pelas entradas pendentes, o
+# número de threads e o atraso de disparo (p50/p99) em relação ao prazo.
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from temporizador import ServicoTemporizadores  # noqa: E402
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def nada():
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do serviço de temporizadores")
+    parser.add_argument('--quantidade', type=int, default=100_000)
+    parser.add_argument('--janela', type=float, default=2.0, help="Prazos distribuídos em [0, janela] segundos")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    # 1. Memória: temporizadores pendentes com prazo distante (nenhum dispara)
+    servico = ServicoTemporizadores(workers=args.workers)
+    threads_antes = threading.active_count()
+    tracemalloc.start()
+    for _ in range(args.quantidade):
+        servico.agendar(3600, nada)
+    memoria_atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    threads_pendentes = threading.active_count()
+    pendentes = servico.pendentes
+    servico.parar()
+
+    # 2. Taxa de agendamento e atraso de disparo
+    servico = ServicoTemporizadores(workers=args.workers)
+    atrasos = []
+    restantes = [args.quantidade]
+    concluido = threading.Event()
+    trava = threading.Lock()
+
+    def callback(prazo):
+        atraso = time.monotonic() - prazo
+        with trava:
+            atrasos.append(atraso)
+            restantes[0] -= 1
+            if restantes[0] == 0:
+                concluido.set()
+
+    inicio = time.perf_counter()
+    for _ in range(args.quantidade):
+        atraso = random.uniform(0, args.janela)
+        servico.agendar(atraso, callback, time.monotonic() + atraso)
+    duracao_agendamento = time.perf_counter() - inicio
+
+    concluido.wait(args.janela + 60)
+    servico.parar()
+
+    print(f"Temporizadores agendados : {args.quantidade}")
+    print(f"Taxa de agendamento      : {args.quantidade / duracao_agendamento:,.0f} ops/s")
+    print(f"Memória ({pendentes} pendentes): {memoria_atual / 1024 / 1024:.1f} MiB "
+          f"({memoria_atual / max(pendentes, 1):.0f} B/temporizador)")
+    print(f"Threads (antes/pendentes): {threads_antes}/{threads_pendentes}")
+    print(f"Disparados / falhas      : {servico.disparados} / {servico.falhas}")
+    print(f"Atraso de disparo p50    : {percentil(atrasos, 50) * 1000:.2f} ms")
+    print(f"Atraso de disparo p99    : {percentil(atrasos, 99) * 1000:.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Benchmark da vazão de leitura da API com 1 a N workers (servidor.py).
+#
+#   python benchmarks/bench_workers.py [--workers 1 2 4] [--clientes 8] [--duracao 5] [--ocorrencias 500]
+#
+# Para cada quantidade de workers sobe `servidor.py` com o estado compartilhado
+# em SQLite (diretório temporário), cria as ocorrências pela API e dispara
+# requisições GET de vários processos clientes durante --duracao segundos.
+# Reporta requisições/s, latências p50/p99 e o ganho em relação a 1 worker.
+# O ganho é limitado pelos núcleos da máquina (clientes e workers dividem a CPU).
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def requisitar(porta: int, metodo: str, rota: str, corpo: dict = None):
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+    try:
+        dados = json.dumps(corpo) if corpo is not None else None
+        conexao.request(metodo, rota, body=dados, headers={"Content-Type": "application/json"} if dados else {})
+        resposta = conexao.getresponse()
+        return resposta.status, resposta.read()
+    finally:
+        conexao.close()
+
+
+def aguardar(porta: int, timeout: float = 30.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            if requisitar(porta, "GET", "/ocorrencias")[0] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("Servidor não respondeu")
+
+
+def cliente(argumentos):
+    """Processo cliente: GETs sequenciais até o fim da janela; retorna as latências"""
+    porta, rota, fim = argumentos
+    latencias = []
+    erros = 0
+    while time.time() < fim:
+        inicio = time.perf_counter()
+        try:
+            status, _ = requisitar(porta, "GET", rota)
+        except OSError:
+            status = 0
+        if status == 200:
+            latencias.append(time.perf_counter() - inicio)
+        else:
+            erros += 1
+    return latencias, erros
+
+
+def medir(workers: int, args, diretorio: str) -> dict:
+    porta = porta_livre()
+    ambiente = dict(os.environ,
+                    SENTINEL_ESTADO=f"sqlite:{os.path.join(diretorio, f'estado_{workers}.db')}",
+                    SENTINEL_DB=os.path.join(diretorio, f"sentinel_{workers}.db"),
+                    SENTINEL_CAIXA_SAIDA=os.path.join(diretorio, f"caixa_saida_{workers}.db"))
+    processo = subprocess.Popen([sys.executable, os.path.join(RAIZ, "servidor.py"), "--workers", str(workers),
+                                 "--host", "127.0.0.1", "--porta", str(porta)],
+                                cwd=diretorio, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        aguardar(porta)
+        requisitar(porta, "POST", "/simular", {"quantidade": args.ocorrencias})
+        time.sleep(2.0)  # Publicação das leituras pelo líder
+
+        fim = time.time() + args.duracao
+        with multiprocessing.Pool(args.clientes) as pool:
+            resultados = pool.map(cliente, [(porta, args.rota, fim)] * args.clientes)
+        latencias = sorted(l for resultado, _ in resultados for l in resultado)
+        erros = sum(e for _, e in resultados)
+        return {
+            "workers": workers,
+            "req_s": len(latencias) / args.duracao,
+            "p50_ms": latencias[len(latencias) // 2] * 1000 if latencias else 0.0,
+            "p99_ms": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))] * 1000 if latencias else 0.0,
+            "erros": erros,
+        }
+    finally:
+        processo.terminate()
+        processo.wait(30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão de leitura com vários workers")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clientes', type=int, default=8)
+    parser.add_argument('--duracao', type=float, default=5.0)
+    parser.add_argument('--ocorrencias', type=int, default=500)
+    parser.add_argument('--rota', default="/ocorrencias")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_workers_")
+    print(f"Núcleos: {os.cpu_count()}, clientes: {args.clientes}, rota: {args.rota}, "
+          f"{args.ocorrencias} ocorrências, {args.duracao:.0f} s por medição")
+    base = None
+    for workers in args.workers:
+        resultado = medir(workers, args, diretorio)
+        base = base or resultado["req_s"]
+        print(f"{workers:>2} worker(s): {resultado['req_s']:>8,.0f} req/s  p50 {resultado['p50_ms']:6.2f} ms  "
+              f"p99 {resultado['p99_ms']:7.2f} ms  ganho {resultado['req_s'] / base:4.2f}x  erros {resultado['erros']}")
+
+
+if __name__ == '__main__':
+    main()
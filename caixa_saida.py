@@ -0,0 +1,315 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Caixa de saída durável dos alertas.
+#
+# Cada mensagem é gravada em uma tabela SQLite antes de qualquer tentativa de
+# envio; workers em segundo plano consomem a tabela, reagendam as falhas com
+# backoff exponencial e jitter e movem para a fila de mensagens mortas as que
+# esgotam as tentativas. Uma chave de idempotência por (ocorrência, contato,
+# canal, modelo) impede que o mesmo alerta seja enfileirado duas vezes. Cada
+# worker reserva a mensagem com um UPDATE condicional (só uma reserva vence,
+# mesmo com vários processos no mesmo arquivo), e as mensagens que estavam em
+# envio quando o processo caiu voltam a pendentes apenas no processo designado
+# para isso (o líder, via `iniciar(recuperar=True)`).
+
+import json
+import random
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS caixa_saida (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chave TEXT UNIQUE NOT NULL,
+    canal TEXT,
+    destino TEXT,
+    contato TEXT,
+    assunto TEXT,
+    mensagem TEXT,
+    ocorrencias TEXT,
+    estado TEXT,
+    tentativas INTEGER DEFAULT 0,
+    proxima_tentativa REAL,
+    ultimo_erro TEXT,
+    criada_em REAL,
+    atualizada_em REAL
+);
+CREATE INDEX IF NOT EXISTS idx_caixa_saida_estado_proxima ON caixa_saida (estado, proxima_tentativa);
+"""
+
+PENDENTE = "pendente"
+ENVIANDO = "enviando"
+ENTREGUE = "entregue"
+MORTA = "morta"
+
+
+class CaixaSaida:
+    """Fila durável de mensagens com novas tentativas e fila de mortas
+
+    Args:
+        caminho: Arquivo SQLite (":memory:" para uma caixa apenas em memória)
+        transmitir: Função (canal, destino, assunto, mensagem) que envia ou lança exceção
+        ao_entregar: Chamada com o registro (dict) após cada entrega bem-sucedida
+        ao_falhar: Chamada com (registro, exceção, morta) após cada falha
+        workers: Threads que enviam as mensagens
+        max_tentativas: Tentativas antes de mover a mensagem para as mortas
+        atraso_base / atraso_maximo: Backoff exponencial entre tentativas (segundos)
+        retencao: Segundos que as entregues ficam guardadas (janela de idempotência)
+    """
+
+    def __init__(self, caminho: str, transmitir: Callable[[str, str, str, str], None],
+                 ao_entregar: Callable[[dict], None] = None, ao_falhar: Callable[[dict, Exception, bool], None] = None,
+                 workers: int = 2, max_tentativas: int = 6, atraso_base: float = 1.0, atraso_maximo: float = 300.0,
+                 retencao: float = 86400.0, relogio: Callable[[], float] = time.time, rng: random.Random = None):
+        self.caminho = caminho
+        self.transmitir = transmitir
+        self.ao_entregar = ao_entregar
+        self.ao_falhar = ao_falhar
+        self.workers = workers
+        self.max_tentativas = max_tentativas
+        self.atraso_base = atraso_base
+        self.atraso_maximo = atraso_maximo
+        self.retencao = retencao
+        self.relogio = relogio
+        self.rng = rng or random.Random()
+        self._cond = threading.Condition()  # Protege a conexão e acorda os workers
+        self._threads: List[threading.Thread] = []
+        self._ativo = False
+        self._ultima_limpeza = 0.0
+        self.entregues = 0
+        self.falhas = 0
+        self.duplicadas = 0
+
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        if caminho != ":memory:":
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.executescript(ESQUEMA)
+        self._conexao.commit()
+
+    # ---------- Entrada ----------
+
+    def adicionar(self, chave: str, canal: str, destino: str, contato: str, assunto: str, mensagem: str,
+                  ocorrencias: List[int] = ()) -> bool:
+        """Grava a mensagem para envio
+
+        Returns:
+            bool: False se a chave de idempotência já existia (mensagem ignorada)
+        """
+        agora = self.relogio()
+        with self._cond:
+            cursor = self._conexao.execute(
+                "INSERT OR IGNORE INTO caixa_saida (chave, canal, destino, contato, assunto, mensagem, ocorrencias, "
+                "estado, tentativas, proxima_tentativa, criada_em, atualizada_em) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?)",
+                (chave, canal, destino, contato, assunto, mensagem, json.dumps(list(ocorrencias)),
+                 PENDENTE, agora, agora, agora))
+            self._conexao.commit()
+            if not cursor.rowcount:
+                self.duplicadas += 1
+                return False
+            if not self._ativo:
+                self._iniciar()
+            self._cond.notify()
+        return True
+
+    # ---------- Consulta ----------
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Quantidade de mensagens por estado"""
+        with self._cond:
+            linhas = self._conexao.execute("SELECT estado, COUNT(*) FROM caixa_saida GROUP BY estado").fetchall()
+        resultado = {PENDENTE: 0, ENVIANDO: 0, ENTREGUE: 0, MORTA: 0}
+        resultado.update({estado: quantidade for estado, quantidade in linhas})
+        return resultado
+
+    def maior_ocorrencia(self) -> int:
+        """Maior ID de ocorrência entre as mensagens gravadas (0 se não houver)
+
+        As chaves de idempotência usam o ID da ocorrência: quem abre a caixa
+        avança o gerador de IDs além dele para que uma ocorrência nova não
+        herde a chave de uma antiga e tenha os alertas descartados.
+        """
+        with self._cond:
+            linhas = self._conexao.execute("SELECT ocorrencias FROM caixa_saida").fetchall()
+        return max((max(json.loads(linha[0] or "[]"), default=0) for linha in linhas), default=0)
+
+    def mortas(self, limite: int = 100) -> List[dict]:
+        """Mensagens que esgotaram as tentativas, das mais recentes para as mais antigas"""
+        with self._cond:
+            linhas = self._conexao.execute(
+                "SELECT * FROM caixa_saida WHERE estado = ? ORDER BY atualizada_em DESC LIMIT ?",
+                (MORTA, limite)).fetchall()
+        return [self._registro(linha) for linha in linhas]
+
+    def reprocessar(self, item_id: int) -> bool:
+        """Devolve uma mensagem morta à fila, com as tentativas zeradas"""
+        with self._cond:
+            cursor = self._conexao.execute(
+                "UPDATE caixa_saida SET estado = ?, tentativas = 0, proxima_tentativa = ?, atualizada_em = ? "
+                "WHERE id = ? AND estado = ?", (PENDENTE, self.relogio(), self.relogio(), item_id, MORTA))
+            self._conexao.commit()
+            if not cursor.rowcount:
+                return False
+            if not self._ativo:
+                self._iniciar()
+            self._cond.notify()
+        return True
+
+    def descarregar(self, timeout: float = None) -> bool:
+        """Espera até não haver mensagens pendentes nem em envio
+
+        Returns:
+            bool: True se esvaziou antes do timeout
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            estatisticas = self.estatisticas()
+            if not estatisticas[PENDENTE] and not estatisticas[ENVIANDO]:
+                return True
+            if limite is not None and time.monotonic() >= limite:
+                return False
+            time.sleep(0.01)
+
+    @staticmethod
+    def _registro(linha: sqlite3.Row) -> dict:
+        registro = dict(linha)
+        registro["ocorrencias"] = json.loads(registro["ocorrencias"] or "[]")
+        return registro
+
+    # ---------- Workers ----------
+
+    def iniciar(self, recuperar: bool = False):
+        """Inicia os workers, retomando o que ficou pendente de execuções anteriores
+
+        Também é chamado automaticamente na primeira mensagem adicionada (sem recuperar).
+
+        Args:
+            recuperar: Devolve a pendentes as mensagens que ficaram em envio quando o
+                processo anterior parou. Só um processo deve fazê-lo (o líder): em
+                outro, desfaria reservas de envios ainda em andamento.
+        """
+        with self._cond:
+            if recuperar:
+                self._recuperar_em_envio()
+            if not self._ativo:
+                self._iniciar()
+
+    def _recuperar_em_envio(self) -> int:
+        """Devolve a pendentes as mensagens presas em envio (chamado com a trava)"""
+        cursor = self._conexao.execute("UPDATE caixa_saida SET estado = ?, atualizada_em = ? WHERE estado = ?",
+                                       (PENDENTE, self.relogio(), ENVIANDO))
+        self._conexao.commit()
+        if cursor.rowcount:
+            print(f"Caixa de saída: {cursor.rowcount} mensagens em envio devolvidas a pendentes")
+        return cursor.rowcount
+
+    def _iniciar(self):
+        """Inicia os workers (chamado com a trava)"""
+        self._ativo = True
+        self._threads = [threading.Thread(target=self._trabalhar, daemon=True, name=f"caixa_saida-{i}")
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def parar(self, timeout: float = 5.0):
+        """Encerra os workers; o que estiver pendente continua gravado para a próxima execução"""
+        with self._cond:
+            if not self._ativo:
+                return
+            self._ativo = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        self._threads = []
+
+    def _reservar(self) -> Optional[dict]:
+        """Marca como em envio a mensagem vencida mais antiga (chamado com a trava)
+
+        A reserva é um UPDATE condicionado ao estado pendente: se outro processo
+        reservou a mesma mensagem entre a leitura e a escrita, nenhuma linha muda
+        e a próxima candidata é tentada.
+        """
+        while True:
+            agora = self.relogio()
+            linha = self._conexao.execute(
+                "SELECT * FROM caixa_saida WHERE estado = ? AND proxima_tentativa <= ? "
+                "ORDER BY proxima_tentativa LIMIT 1", (PENDENTE, agora)).fetchone()
+            if linha is None:
+                return None
+            cursor = self._conexao.execute(
+                "UPDATE caixa_saida SET estado = ?, atualizada_em = ? WHERE id = ? AND estado = ?",
+                (ENVIANDO, agora, linha["id"], PENDENTE))
+            self._conexao.commit()
+            if cursor.rowcount == 1:
+                registro = self._registro(linha)
+                registro["estado"] = ENVIANDO
+                return registro
+
+    def _espera(self) -> float:
+        """Segundos até a próxima mensagem vencer (chamado com a trava)"""
+        proxima = self._conexao.execute(
+            "SELECT MIN(proxima_tentativa) FROM caixa_saida WHERE estado = ?", (PENDENTE,)).fetchone()[0]
+        if proxima is None:
+            return 1.0
+        return min(max(proxima - self.relogio(), 0.001), 1.0)
+
+    def _atraso(self, tentativas: int) -> float:
+        """Backoff exponencial com jitter: metade fixa, metade aleatória"""
+        atraso = min(self.atraso_maximo, self.atraso_base * 2 ** (tentativas - 1))
+        return atraso / 2 + self.rng.uniform(0, atraso / 2)
+
+    def _trabalhar(self):
+        while True:
+            with self._cond:
+                if not self._ativo:
+                    return
+                item = self._reservar()
+                if item is None:
+                    self._limpar_entregues()
+                    self._cond.wait(self._espera())
+                    continue
+
+            try:
+                self.transmitir(item["canal"], item["destino"], item["assunto"], item["mensagem"])
+            except Exception as e:
+                self._registrar_falha(item, e)
+            else:
+                with self._cond:
+                    self._conexao.execute(
+                        "UPDATE caixa_saida SET estado = ?, tentativas = tentativas + 1, atualizada_em = ? "
+                        "WHERE id = ?", (ENTREGUE, self.relogio(), item["id"]))
+                    self._conexao.commit()
+                    self.entregues += 1
+                if self.ao_entregar:
+                    self.ao_entregar(item)
+
+    def _registrar_falha(self, item: dict, erro: Exception):
+        tentativas = item["tentativas"] + 1
+        morta = tentativas >= self.max_tentativas
+        agora = self.relogio()
+        with self._cond:
+            self._conexao.execute(
+                "UPDATE caixa_saida SET estado = ?, tentativas = ?, proxima_tentativa = ?, ultimo_erro = ?, "
+                "atualizada_em = ? WHERE id = ?",
+                (MORTA if morta else PENDENTE, tentativas, agora if morta else agora + self._atraso(tentativas),
+                 str(erro), agora, item["id"]))
+            self._conexao.commit()
+            self.falhas += 1
+        if self.ao_falhar:
+            self.ao_falhar(item, erro, morta)
+
+    def _limpar_entregues(self):
+        """Remove entregues mais antigas que a retenção (no máximo uma vez por minuto)"""
+        agora = self.relogio()
+        if agora - self._ultima_limpeza < 60:
+            return
+        self._ultima_limpeza = agora
+        self._conexao.execute("DELETE FROM caixa_saida WHERE estado = ? AND atualizada_em < ?",
+                              (ENTREGUE, agora - self.retencao))
+        self._conexao.commit()
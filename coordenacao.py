@@ -0,0 +1,307 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Coordenação de vários workers (processos) da API sobre um estado compartilhado.
+#
+# Um único worker é o líder: mantém o SistemaEmergencia, executa os serviços em
+# segundo plano (despacho, verificação de fogos, mapa) e, a cada
+# `intervalo_publicacao`, publica no backend as respostas das rotas de leitura
+# baratas e procuradas (pedidas por algum seguidor nos últimos `janela_demanda`
+# segundos). Os seguidores respondem essas rotas direto do backend, em
+# paralelo, enquanto a cópia publicada estiver recente; as demais requisições
+# (escritas, consultas com parâmetros, históricos completos e o mapa) são
+# repassadas como comandos para o líder, que as executa e devolve a resposta.
+# Depois de cada escrita o líder republica as rotas leves antes de responder,
+# então quem escreveu já lê o resultado em qualquer worker. Se o líder parar
+# de renovar a liderança, um seguidor assume e reconstrói o estado a partir
+# da persistência (SENTINEL_DB), retomando as missões em voo.
+
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from flask import Flask, Response, request
+
+from metricas import REGISTRO, Medidor
+
+# Rotas publicadas pelo líder e intervalo mínimo entre publicações (segundos). Só
+# rotas de custo limitado: os históricos completos (crescem com tudo o que já foi
+# registrado) e o mapa (reconstrução do folium) são repassados como comandos.
+ROTAS_PUBLICADAS = {
+    "/ocorrencias": 1.0,
+    "/ocorrencias?camada=ativas": 1.0,
+    "/ocorrencias?camada=resolvidas": 1.0,
+    "/resumo": 1.0,
+    "/contatos": 1.0,
+    "/servicos": 1.0,
+    "/rastreamento/estagios": 1.0,
+    "/metrics": 1.0,
+}
+
+# Rotas com intervalo até este valor são republicadas logo após cada escrita
+INTERVALO_LEVE = 1.0
+
+# Métodos que não alteram o estado
+_METODOS_LEITURA = {"GET", "HEAD", "OPTIONS"}
+
+REQUISICOES_WORKER = REGISTRO.contador(
+    "sentinel_worker_requisicoes", "Requisições atendidas por um seguidor, por origem da resposta", ("origem",))
+
+# Métricas próprias de cada processo: no /metrics de um seguidor, as dele substituem as do líder
+METRICAS_DO_WORKER = ("sentinel_worker_", "sentinel_http_")
+
+# Cabeçalhos recalculados pelo servidor que responde
+_CABECALHOS_IGNORADOS = {"content-length", "date", "server", "connection"}
+
+
+class CoordenadorWorkers:
+    """Eleição do líder, publicação das leituras e repasse de comandos
+
+    Args:
+        app: Aplicação Flask (o coordenador instala um before_request)
+        estado: Backend de estado (EstadoMemoria ou EstadoSQLite)
+        ao_assumir: Chamada quando este processo se torna líder (inicia os serviços)
+        ao_deixar: Chamada quando perde a liderança (encerra os serviços)
+        rotas: Rotas publicadas {rota com consulta: intervalo}
+        ttl: Validade da liderança sem renovação (segundos)
+        janela_demanda: Rotas não pedidas por nenhum seguidor neste intervalo deixam de ser publicadas
+        timeout_comando: Espera máxima de um seguidor pela resposta do líder
+        retencao_comandos: Idade a partir da qual comandos não recolhidos são apagados (segundos)
+    """
+
+    def __init__(self, app: Flask, estado, ao_assumir: Callable[[], None], ao_deixar: Callable[[], None] = None,
+                 rotas: Dict[str, float] = None, ttl: float = 10.0, intervalo_publicacao: float = 0.5,
+                 intervalo_comandos: float = 0.01, timeout_comando: float = 10.0, retencao_comandos: float = 60.0,
+                 janela_demanda: float = 30.0):
+        self.app = app
+        self.estado = estado
+        self.ao_assumir = ao_assumir
+        self.ao_deixar = ao_deixar
+        self.rotas = dict(ROTAS_PUBLICADAS if rotas is None else rotas)
+        self.ttl = ttl
+        self.intervalo_publicacao = intervalo_publicacao
+        self.intervalo_comandos = intervalo_comandos
+        self.timeout_comando = timeout_comando
+        self.retencao_comandos = max(retencao_comandos, 3 * timeout_comando)  # Nunca antes do seguidor desistir
+        self.janela_demanda = janela_demanda
+        self._demandas: Dict[str, float] = {}  # Seguidor: última leitura registrada de cada rota
+        self.dono = f"{socket.gethostname()}:{os.getpid()}"
+        self.lider = False
+        self._ultima_publicacao: Dict[str, float] = {}
+        self._parar = threading.Event()
+        self._alterado = threading.Event()  # Escrita atendida pelo líder ainda não publicada
+        self._threads = []
+        self._trava = threading.Lock()
+        app.before_request(self._atender_seguidor)
+        app.after_request(self._marcar_escrita)
+        REGISTRO.registrar(Medidor("sentinel_worker_lider", "1 se este processo é o líder dos workers",
+                                   lambda: 1 if self.lider else 0))
+
+    # ---------- Ciclo de vida ----------
+
+    def iniciar(self):
+        """Disputa a liderança; seguidores continuam tentando enquanto o líder não renovar"""
+        if not self.estado.compartilhado:
+            self._assumir()
+            return
+        if self.estado.adquirir_lideranca(self.dono, self.ttl):
+            self._assumir()
+        self._iniciar_thread("lideranca", self._manter_lideranca)
+
+    def parar(self):
+        self._parar.set()
+        for thread in self._threads:
+            thread.join(self.ttl)
+        self._threads = []
+        if self.lider:
+            self._deixar()
+            self.estado.liberar_lideranca(self.dono)
+
+    def _iniciar_thread(self, nome: str, alvo: Callable):
+        thread = threading.Thread(target=alvo, daemon=True, name=nome)
+        thread.start()
+        self._threads.append(thread)
+
+    def _assumir(self):
+        with self._trava:
+            if self.lider:
+                return
+            self.lider = True
+        print(f"Worker {self.dono} assumiu a liderança")
+        self.ao_assumir()
+        if self.estado.compartilhado:
+            self.publicar(forcar=True)  # Substitui de imediato o que o líder anterior publicou
+            self._iniciar_thread("publicacao", self._publicar_periodicamente)
+            self._iniciar_thread("comandos", self._executar_comandos)
+
+    def _deixar(self):
+        with self._trava:
+            if not self.lider:
+                return
+            self.lider = False
+        print(f"Worker {self.dono} deixou a liderança")
+        if self.ao_deixar:
+            self.ao_deixar()
+
+    def _manter_lideranca(self):
+        """Renova a liderança (líder) ou tenta assumi-la quando vencer (seguidor)"""
+        while not self._parar.wait(self.ttl / 3):
+            try:
+                if self.estado.adquirir_lideranca(self.dono, self.ttl):
+                    self._assumir()
+                elif self.lider:
+                    print(f"Worker {self.dono} perdeu a liderança para {self.estado.lider()}")
+                    self._deixar()
+            except Exception as e:
+                print(f"Erro ao renovar a liderança: {str(e)}")
+
+    # ---------- Líder ----------
+
+    def publicar(self, forcar: bool = False, apenas_leves: bool = False) -> int:
+        """Publica as rotas procuradas cujo intervalo venceu; retorna quantas foram publicadas
+
+        Args:
+            forcar: Publica sem esperar o intervalo
+            apenas_leves: Só as rotas com intervalo até INTERVALO_LEVE (após uma escrita)
+        """
+        agora = time.monotonic()
+        procuradas = self.estado.rotas_lidas(time.time() - self.janela_demanda)
+        documentos = {}
+        with self.app.test_client() as cliente:
+            for rota, intervalo in self.rotas.items():
+                if rota not in procuradas or (apenas_leves and intervalo > INTERVALO_LEVE):
+                    continue
+                if not forcar and agora - self._ultima_publicacao.get(rota, float('-inf')) < intervalo:
+                    continue
+                resposta = cliente.get(rota)
+                documentos[rota] = (resposta.status_code, self._cabecalhos(resposta), resposta.get_data())
+                self._ultima_publicacao[rota] = agora
+        if documentos:
+            self.estado.publicar(documentos)
+        return len(documentos)
+
+    def _publicar_periodicamente(self):
+        while self.lider and not self._parar.is_set():
+            try:
+                if self._alterado.is_set():
+                    self._alterado.clear()
+                    self.publicar(forcar=True, apenas_leves=True)
+                self.publicar()
+            except Exception as e:
+                print(f"Erro ao publicar o estado: {str(e)}")
+            # Acorda antes do intervalo se o líder atender uma escrita
+            self._alterado.wait(self.intervalo_publicacao)
+            if self._parar.is_set():
+                return
+
+    def _marcar_escrita(self, resposta):
+        """after_request: escrita atendida pelo líder antecipa a próxima publicação"""
+        if self.lider and request.method not in _METODOS_LEITURA:
+            self._alterado.set()
+        return resposta
+
+    def _executar_comandos(self):
+        ultima_limpeza = time.monotonic()
+        with self.app.test_client() as cliente:
+            while self.lider and not self._parar.is_set():
+                try:
+                    comandos = self.estado.reservar_comandos()
+                except Exception as e:
+                    print(f"Erro ao ler comandos: {str(e)}")
+                    comandos = []
+                respostas = []
+                executados = []
+                for comando in comandos:
+                    try:
+                        if not self.estado.iniciar_comando(comando["id"]):
+                            continue  # O seguidor desistiu (timeout) antes da execução
+                        executados.append(comando)
+                        resposta = cliente.open(comando["rota"], method=comando["metodo"],
+                                                query_string=comando["consulta"], data=comando["corpo"],
+                                                content_type=comando["tipo_conteudo"])
+                        respostas.append((comando["id"], resposta.status_code, self._cabecalhos(resposta),
+                                          resposta.get_data()))
+                    except Exception as e:
+                        print(f"Erro ao executar comando {comando['id']}: {str(e)}")
+                        respostas.append((comando["id"], 500, {"Content-Type": "text/plain"}, str(e).encode()))
+                # Escritas: republica as rotas leves antes de responder (quem escreveu lê o novo estado)
+                if any(comando["metodo"] not in _METODOS_LEITURA for comando in executados):
+                    try:
+                        self._alterado.clear()
+                        self.publicar(forcar=True, apenas_leves=True)
+                    except Exception as e:
+                        print(f"Erro ao publicar o estado: {str(e)}")
+                for resposta in respostas:
+                    self.estado.concluir_comando(*resposta)
+                if time.monotonic() - ultima_limpeza > self.retencao_comandos:
+                    ultima_limpeza = time.monotonic()
+                    try:
+                        self.estado.limpar_comandos(self.retencao_comandos)
+                    except Exception as e:
+                        print(f"Erro ao limpar comandos: {str(e)}")
+                if not comandos:
+                    self._parar.wait(self.intervalo_comandos)
+
+    @staticmethod
+    def _cabecalhos(resposta) -> Dict[str, str]:
+        return {nome: valor for nome, valor in resposta.headers.items() if nome.lower() not in _CABECALHOS_IGNORADOS}
+
+    # ---------- Seguidor ----------
+
+    def _registrar_demanda(self, chave: str):
+        """Avisa o líder que a rota está sendo lida (no máximo uma escrita por segundo e rota)"""
+        agora = time.monotonic()
+        if agora - self._demandas.get(chave, float('-inf')) >= 1.0:
+            self._demandas[chave] = agora
+            self.estado.registrar_leitura(chave)
+
+    def _validade(self, chave: str) -> float:
+        """Idade máxima (segundos) de uma cópia publicada servida pelo seguidor"""
+        return 2 * self.rotas[chave] + self.intervalo_publicacao
+
+    def _atender_seguidor(self) -> Optional[Response]:
+        """before_request: o líder segue o fluxo normal; o seguidor lê do backend ou repassa"""
+        if self.lider or not self.estado.compartilhado:
+            return None
+        consulta = request.query_string.decode()
+        chave = f"{request.path}?{consulta}" if consulta else request.path
+        if request.method == "GET" and chave in self.rotas:
+            self._registrar_demanda(chave)
+            documento = self.estado.ler(chave)
+            # Cópia antiga (rota fora de demanda até agora, ou líder parado): repassa ao líder
+            if documento is not None and time.time() - documento.atualizado_em <= self._validade(chave):
+                REQUISICOES_WORKER.inc(rotulos=("publicada",))
+                return self._responder(documento)
+
+        comando_id = self.estado.enviar_comando(request.method, request.path, consulta, request.get_data(),
+                                                request.content_type)
+        documento = self.estado.aguardar_resposta(comando_id, self.timeout_comando)
+        if documento is None:
+            REQUISICOES_WORKER.inc(rotulos=("timeout",))
+            return Response('{"status": "error", "message": "Líder não respondeu"}', status=504,
+                            content_type="application/json")
+        REQUISICOES_WORKER.inc(rotulos=("lider",))
+        return self._responder(documento)
+
+    def _responder(self, documento) -> Response:
+        valor = documento.valor
+        if request.path == "/metrics" and documento.status == 200:
+            valor = self._mesclar_metricas(valor)
+        return Response(valor, status=documento.status, headers=documento.cabecalhos)
+
+    @staticmethod
+    def _mesclar_metricas(texto: bytes) -> bytes:
+        """Métricas do líder (sistema) com as métricas por processo trocadas pelas deste seguidor"""
+        def do_worker(linha: str) -> bool:
+            partes = linha.split()
+            if linha.startswith("# HELP ") or linha.startswith("# TYPE "):
+                nome = partes[2] if len(partes) > 2 else ""
+            else:
+                nome = partes[0].split("{")[0] if partes else ""
+            return nome.startswith(METRICAS_DO_WORKER)
+
+        linhas = [linha for linha in texto.decode().splitlines() if not do_worker(linha)]
+        locais = REGISTRO.exportar(lambda nome: nome.startswith(METRICAS_DO_WORKER))
+        return ("\n".join(linhas) + "\n" + locais).encode()
@@ -40,16 +40,34 @@ def chamar_backend(endpoint, method='get', json_data=None):
     except Exception as e:
         return None, str(e)
 
+# Exportação em colunas (Arrow IPC): o DataFrame usa os buffers do Arrow
+# direto, sem montar dicionários a partir do JSON
+def buscar_arrow(endpoint):
+    try:
+        import pyarrow as pa
+        response = requests.get(f"{BACKEND_URL}/{endpoint}")
+        if not response.ok:
+            return None
+        return pa.ipc.open_stream(response.content).read_all().to_pandas(types_mapper=pd.ArrowDtype)
+    except Exception:
+        return None  # Sem pyarrow (aqui ou no backend): usa o JSON
+
 # Funções para buscar dados da API com cache
 @st.cache_data(ttl=10)
 def fetch_ocorrencias():
+    df = buscar_arrow("export/ocorrencias.arrow")
+    if df is not None:
+        return df
     data, erro = chamar_backend("ocorrencias")
-    return data["ocorrencias"] if data and "ocorrencias" in data else []
+    return pd.DataFrame(data["ocorrencias"] if data and "ocorrencias" in data else [])
 
 @st.cache_data(ttl=10)
 def fetch_historico_drones():
+    df = buscar_arrow("export/historico_drones.arrow")
+    if df is not None:
+        return df
     data, erro = chamar_backend("historico_drones")
-    return data if data else {"historico": [], "total_acoes": 0}
+    return pd.DataFrame(data.get("historico", []) if data else [])
 
 # Layout do título com logo
 col1, col2 = st.columns([1, 10])
@@ -84,8 +102,7 @@ with st.sidebar:
             atualizar_mapa()
 
     # Mostrar informações resumidas
-    data = fetch_ocorrencias()
-    df = pd.DataFrame(data)
+    df = fetch_ocorrencias()
     if not df.empty:
         st.header("Resumo")
         st.metric("Focos Ativos", len(df[df['status'] == "Fogo ativo"]))
@@ -109,13 +126,12 @@ st.markdown("""
 
 # Seção do histórico de drones
 st.header("🛸 Histórico de Ações dos Drones")
-drones_data = fetch_historico_drones()
-df_drones = pd.DataFrame(drones_data.get("historico", []))
+df_drones = fetch_historico_drones()
 
 if not df_drones.empty:
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Total de Ações", drones_data.get("total_acoes", 0))
+        st.metric("Total de Ações", len(df_drones))
     with col2:
         if 'acao' in df_drones.columns:
             st.metric("Última Ação", df_drones.iloc[-1]["acao"])
@@ -134,10 +150,10 @@ if st.checkbox("Mostrar lista de ocorrências detalhada"):
 
 # Seção de focos apagados
 st.header("🔥 Histórico de Focos Apagados")
-focos_apagados = [oc for oc in data if oc.get('status') == "Fogo apagado"]
-if focos_apagados:
+focos_apagados = df[df['status'] == "Fogo apagado"] if not df.empty else df
+if not focos_apagados.empty:
     st.write(f"Total de focos apagados: {len(focos_apagados)}")
-    st.dataframe(pd.DataFrame(focos_apagados))
+    st.dataframe(focos_apagados)
 else:
     st.info("Nenhum fogo apagado recentemente")
 
@@ -0,0 +1,140 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Atribuição em lote de drones às ocorrências.
+#
+# Em vez de mandar o primeiro drone da fila para a ocorrência mais grave, o
+# despacho monta de uma vez a matriz de distâncias (haversine, vetorizada com
+# NumPy) entre as bases dos drones livres e as ocorrências elegíveis e resolve
+# a atribuição: algoritmo húngaro (scipy) quando disponível, senão guloso.
+# Custo de cada par = tempo de viagem / severidade.
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+_scipy = {}  # scipy.optimize.linear_sum_assignment, importado só na primeira atribuição húngara
+
+
+def resolvedor_hungaro():
+    """Função de atribuição do scipy, ou None se o scipy não estiver instalado
+
+    O scipy é opcional (sem ele o despacho usa a atribuição gulosa) e leva
+    centenas de milissegundos para importar, por isso só é carregado quando
+    a atribuição húngara é usada.
+    """
+    if "funcao" not in _scipy:
+        try:
+            from scipy.optimize import linear_sum_assignment as funcao
+        except ImportError:
+            funcao = None
+        _scipy["funcao"] = funcao
+    return _scipy["funcao"]
+
+RAIO_TERRA_KM = 6371.0
+
+# Bases padrão dos drones (latitude, longitude), atribuídas em rodízio
+BASES = [
+    ("Brasília", -15.79, -47.88),
+    ("Manaus", -3.12, -60.02),
+    ("Cuiabá", -15.60, -56.10),
+    ("Porto Alegre", -30.03, -51.23),
+    ("Recife", -8.05, -34.88),
+    ("São Paulo", -23.55, -46.63),
+    ("Palmas", -10.18, -48.33),
+    ("Campo Grande", -20.47, -54.62),
+]
+
+
+def matriz_haversine(origens: np.ndarray, destinos: np.ndarray) -> np.ndarray:
+    """Distâncias em km entre cada origem e cada destino
+
+    Args:
+        origens: Matriz (m, 2) de [latitude, longitude] em graus
+        destinos: Matriz (n, 2) de [latitude, longitude] em graus
+
+    Returns:
+        np.ndarray: Matriz (m, n) de distâncias
+    """
+    origens = np.radians(np.asarray(origens, dtype=np.float64))
+    destinos = np.radians(np.asarray(destinos, dtype=np.float64))
+    lat1 = origens[:, 0:1]
+    lon1 = origens[:, 1:2]
+    lat2 = destinos[:, 0]
+    lon2 = destinos[:, 1]
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def matriz_custos(bases: np.ndarray, locais: np.ndarray, severidades: Sequence[int],
+                  velocidade_kmh: float) -> np.ndarray:
+    """Tempo de viagem (h) de cada drone a cada ocorrência, dividido pela severidade"""
+    tempos = matriz_haversine(bases, locais) / velocidade_kmh
+    return tempos / np.maximum(np.asarray(severidades, dtype=np.float64), 1.0)
+
+
+def atribuir_guloso(custos: np.ndarray) -> List[Tuple[int, int]]:
+    """Escolhe repetidamente o par (drone, ocorrência) de menor custo ainda livre
+
+    Cada drone só pode perder para os outros m-1 drones, então bastam as m
+    ocorrências mais baratas de cada um (argpartition): ordena m·m custos em
+    vez de m·n.
+    """
+    m, n = custos.shape
+    limite = min(m, n)
+    if n > m:
+        colunas = np.argpartition(custos, m - 1, axis=1)[:, :m]
+    else:
+        colunas = np.broadcast_to(np.arange(n), (m, n))
+    candidatos = np.take_along_axis(custos, colunas, axis=1)
+    ordem = np.argsort(candidatos, axis=None, kind='stable')
+    linhas_ordem, posicoes = np.divmod(ordem, colunas.shape[1])
+    colunas_ordem = colunas[linhas_ordem, posicoes]
+
+    pares = []
+    drones_usados = set()
+    ocorrencias_usadas = set()
+    for i, j in zip(linhas_ordem.tolist(), colunas_ordem.tolist()):
+        if i in drones_usados or j in ocorrencias_usadas:
+            continue
+        drones_usados.add(i)
+        ocorrencias_usadas.add(j)
+        pares.append((i, j))
+        if len(pares) == limite:
+            break
+    return pares
+
+
+def atribuir_hungaro(custos: np.ndarray) -> List[Tuple[int, int]]:
+    """Atribuição de custo total mínimo (requer scipy)"""
+    linhas, colunas = resolvedor_hungaro()(custos)
+    return [(int(i), int(j)) for i, j in zip(linhas, colunas)]
+
+
+def atribuir(bases: Sequence, locais: Sequence, severidades: Sequence[int], velocidade_kmh: float = 120.0,
+             metodo: str = "auto") -> List[Tuple[int, int]]:
+    """Atribui drones (por posição de base) a ocorrências em uma única passada
+
+    Args:
+        bases: Posições [lat, lon] dos drones livres
+        locais: Posições [lat, lon] das ocorrências elegíveis
+        severidades: Severidade de cada ocorrência
+        velocidade_kmh: Velocidade de cruzeiro dos drones
+        metodo: "hungaro", "guloso" ou "auto" (húngaro se o scipy estiver instalado)
+
+    Returns:
+        List[Tuple[int, int]]: Pares (índice do drone, índice da ocorrência)
+    """
+    if not len(bases) or not len(locais):
+        return []
+    custos = matriz_custos(np.asarray(bases), np.asarray(locais), severidades, velocidade_kmh)
+    if metodo == "auto":
+        metodo = "hungaro" if resolvedor_hungaro() is not None else "guloso"
+    if metodo == "hungaro":
+        if resolvedor_hungaro() is None:
+            raise ImportError("scipy não está instalado; use metodo='guloso'")
+        return atribuir_hungaro(custos)
+    if metodo == "guloso":
+        return atribuir_guloso(custos)
+    raise ValueError(f"Método de atribuição desconhecido: {metodo}")
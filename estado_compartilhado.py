@@ -0,0 +1,312 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Backends de estado compartilhado entre processos da API.
+#
+# Com vários workers (processos) servindo a API, só um deles — o líder — mantém
+# o SistemaEmergencia vivo e executa os serviços em segundo plano. O backend
+# guarda o que os outros precisam para atender requisições sem esse estado:
+#   - documentos: respostas prontas das rotas de leitura, publicadas pelo líder;
+#   - leituras: último instante em que algum seguidor pediu cada rota publicada
+#     (o líder só publica as procuradas);
+#   - liderança: um arrendamento (dono + validade) renovado pelo líder;
+#   - comandos: requisições que os seguidores repassam para o líder executar.
+#     Ciclo: pendente -> reservado (lote lido pelo líder) -> executando -> concluido;
+#     o seguidor que desiste antes da execução marca o comando como abandonado, e
+#     o líder não o executa. Concluídos e abandonados não recolhidos são apagados
+#     por `limpar_comandos`.
+#
+# EstadoMemoria atende um único processo (sempre líder, nada a compartilhar);
+# EstadoSQLite usa um arquivo SQLite em modo WAL visível a todos os workers da
+# mesma máquina. Qualquer outro backend só precisa oferecer os mesmos métodos.
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    chave TEXT PRIMARY KEY,
+    versao INTEGER,
+    status INTEGER,
+    cabecalhos TEXT,
+    valor BLOB,
+    atualizado_em REAL
+);
+
+CREATE TABLE IF NOT EXISTS leituras (
+    chave TEXT PRIMARY KEY,
+    lido_em REAL
+);
+
+CREATE TABLE IF NOT EXISTS lideranca (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    dono TEXT,
+    expira_em REAL
+);
+
+CREATE TABLE IF NOT EXISTS comandos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    metodo TEXT,
+    rota TEXT,
+    consulta TEXT,
+    corpo BLOB,
+    tipo_conteudo TEXT,
+    estado TEXT,
+    status INTEGER,
+    cabecalhos TEXT,
+    resposta BLOB,
+    criado_em REAL
+);
+CREATE INDEX IF NOT EXISTS idx_comandos_estado ON comandos (estado, id);
+"""
+
+
+class Documento:
+    """Resposta publicada de uma rota de leitura"""
+
+    __slots__ = ("versao", "status", "cabecalhos", "valor", "atualizado_em")
+
+    def __init__(self, versao: int, status: int, cabecalhos: Dict[str, str], valor: bytes,
+                 atualizado_em: float = 0.0):
+        self.versao = versao
+        self.status = status
+        self.cabecalhos = cabecalhos
+        self.valor = valor
+        self.atualizado_em = atualizado_em  # Instante da publicação (segundos desde a época)
+
+
+class EstadoMemoria:
+    """Estado no próprio processo: um único worker, sempre líder"""
+
+    compartilhado = False
+
+    def __init__(self):
+        self._documentos: Dict[str, Documento] = {}
+        self._leituras: Dict[str, float] = {}
+        self._trava = threading.Lock()
+
+    def publicar(self, documentos: Dict[str, tuple]):
+        """Publica documentos {chave: (status, cabecalhos, valor)}"""
+        agora = time.time()
+        with self._trava:
+            for chave, (status, cabecalhos, valor) in documentos.items():
+                anterior = self._documentos.get(chave)
+                versao = anterior.versao + 1 if anterior else 1
+                self._documentos[chave] = Documento(versao, status, cabecalhos, valor, agora)
+
+    def ler(self, chave: str) -> Optional[Documento]:
+        return self._documentos.get(chave)
+
+    def registrar_leitura(self, chave: str):
+        self._leituras[chave] = time.time()
+
+    def rotas_lidas(self, desde: float) -> set:
+        return {chave for chave, lido_em in list(self._leituras.items()) if lido_em >= desde}
+
+    def adquirir_lideranca(self, dono: str, ttl: float) -> bool:
+        return True
+
+    def liberar_lideranca(self, dono: str):
+        pass
+
+    def lider(self) -> Optional[str]:
+        return None
+
+
+class EstadoSQLite:
+    """Estado compartilhado em um arquivo SQLite (WAL) entre processos da mesma máquina
+
+    Cada thread de cada processo abre a própria conexão. As leituras de
+    documentos consultam só a versão e reaproveitam o conteúdo já lido
+    enquanto ela não muda.
+
+    Args:
+        caminho: Arquivo do banco (criado se não existir)
+    """
+
+    compartilhado = True
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._local = threading.local()
+        self._cache: Dict[str, Documento] = {}
+        conexao = sqlite3.connect(caminho)
+        try:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.executescript(ESQUEMA)
+            conexao.commit()
+        finally:
+            conexao.close()
+
+    def _conexao(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=10.0)
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+        return conexao
+
+    # ---------- Documentos ----------
+
+    def publicar(self, documentos: Dict[str, tuple]):
+        """Publica documentos {chave: (status, cabecalhos, valor)} em uma transação"""
+        agora = time.time()
+        with self._conexao() as conexao:
+            conexao.executemany(
+                "INSERT INTO documentos (chave, versao, status, cabecalhos, valor, atualizado_em) "
+                "VALUES (?, 1, ?, ?, ?, ?) "
+                "ON CONFLICT(chave) DO UPDATE SET versao = versao + 1, status = excluded.status, "
+                "cabecalhos = excluded.cabecalhos, valor = excluded.valor, atualizado_em = excluded.atualizado_em",
+                [(chave, status, json.dumps(cabecalhos), valor, agora)
+                 for chave, (status, cabecalhos, valor) in documentos.items()])
+
+    def ler(self, chave: str) -> Optional[Documento]:
+        """Último documento publicado para a chave (None se nunca publicado)"""
+        conexao = self._conexao()
+        linha = conexao.execute("SELECT versao FROM documentos WHERE chave = ?", (chave,)).fetchone()
+        if linha is None:
+            return None
+        documento = self._cache.get(chave)
+        if documento is not None and documento.versao == linha[0]:
+            return documento
+        linha = conexao.execute("SELECT versao, status, cabecalhos, valor, atualizado_em FROM documentos "
+                                "WHERE chave = ?", (chave,)).fetchone()
+        documento = Documento(linha[0], linha[1], json.loads(linha[2]), bytes(linha[3]), linha[4])
+        self._cache[chave] = documento
+        return documento
+
+    def registrar_leitura(self, chave: str):
+        """Marca que um seguidor pediu a rota agora (o líder volta a publicá-la)"""
+        with self._conexao() as conexao:
+            conexao.execute("INSERT INTO leituras (chave, lido_em) VALUES (?, ?) "
+                            "ON CONFLICT(chave) DO UPDATE SET lido_em = excluded.lido_em", (chave, time.time()))
+
+    def rotas_lidas(self, desde: float) -> set:
+        """Rotas pedidas por algum seguidor a partir de `desde` (segundos desde a época)"""
+        return {linha[0] for linha in self._conexao().execute("SELECT chave FROM leituras WHERE lido_em >= ?",
+                                                                (desde,))}
+
+    # ---------- Liderança ----------
+
+    def adquirir_lideranca(self, dono: str, ttl: float) -> bool:
+        """Assume ou renova a liderança se estiver livre, vencida ou já for do mesmo dono"""
+        agora = time.time()
+        with self._conexao() as conexao:
+            conexao.execute("INSERT OR IGNORE INTO lideranca (id, dono, expira_em) VALUES (1, NULL, 0)")
+            cursor = conexao.execute(
+                "UPDATE lideranca SET dono = ?, expira_em = ? WHERE id = 1 AND (dono = ? OR dono IS NULL "
+                "OR expira_em < ?)", (dono, agora + ttl, dono, agora))
+            return cursor.rowcount == 1
+
+    def liberar_lideranca(self, dono: str):
+        with self._conexao() as conexao:
+            conexao.execute("UPDATE lideranca SET dono = NULL, expira_em = 0 WHERE id = 1 AND dono = ?", (dono,))
+
+    def lider(self) -> Optional[str]:
+        """Dono atual da liderança, se ainda válida"""
+        linha = self._conexao().execute("SELECT dono, expira_em FROM lideranca WHERE id = 1").fetchone()
+        if linha is None or linha[0] is None or linha[1] < time.time():
+            return None
+        return linha[0]
+
+    # ---------- Comandos (seguidor -> líder) ----------
+
+    def enviar_comando(self, metodo: str, rota: str, consulta: str, corpo: bytes, tipo_conteudo: str) -> int:
+        with self._conexao() as conexao:
+            cursor = conexao.execute(
+                "INSERT INTO comandos (metodo, rota, consulta, corpo, tipo_conteudo, estado, criado_em) "
+                "VALUES (?, ?, ?, ?, ?, 'pendente', ?)", (metodo, rota, consulta, corpo, tipo_conteudo, time.time()))
+            return cursor.lastrowid
+
+    def reservar_comandos(self, limite: int = 100) -> List[dict]:
+        """Comandos pendentes mais antigos, marcados como reservados (usado pelo líder)
+
+        Antes de executar cada um, o líder chama `iniciar_comando`: os que o
+        seguidor abandonou nesse meio-tempo não são executados.
+        """
+        conexao = self._conexao()
+        conexao.row_factory = sqlite3.Row
+        try:
+            with conexao:
+                linhas = conexao.execute(
+                    "SELECT id, metodo, rota, consulta, corpo, tipo_conteudo FROM comandos "
+                    "WHERE estado = 'pendente' ORDER BY id LIMIT ?", (limite,)).fetchall()
+                if linhas:
+                    conexao.executemany("UPDATE comandos SET estado = 'reservado' WHERE id = ? AND estado = 'pendente'",
+                                        [(linha["id"],) for linha in linhas])
+        finally:
+            conexao.row_factory = None
+        return [dict(linha) for linha in linhas]
+
+    def iniciar_comando(self, comando_id: int) -> bool:
+        """Passa um comando reservado para execução; False se o seguidor já o abandonou"""
+        with self._conexao() as conexao:
+            cursor = conexao.execute("UPDATE comandos SET estado = 'executando' WHERE id = ? AND estado = 'reservado'",
+                                     (comando_id,))
+            return cursor.rowcount == 1
+
+    def concluir_comando(self, comando_id: int, status: int, cabecalhos: Dict[str, str], resposta: bytes):
+        with self._conexao() as conexao:
+            conexao.execute("UPDATE comandos SET estado = 'concluido', status = ?, cabecalhos = ?, resposta = ? "
+                            "WHERE id = ? AND estado = 'executando'", (status, json.dumps(cabecalhos), resposta,
+                                                                        comando_id))
+
+    def aguardar_resposta(self, comando_id: int, timeout: float) -> Optional[Documento]:
+        """Espera o líder concluir o comando; remove-o e devolve a resposta (None no timeout)
+
+        No timeout, o comando ainda não iniciado é abandonado (o líder não o
+        executa, e repetir a requisição não aplica a escrita duas vezes). Se
+        o líder já o estiver executando, espera mais um `timeout` pela resposta
+        antes de desistir.
+        """
+        limite = time.monotonic() + timeout
+        prorrogado = False
+        espera = 0.001
+        conexao = self._conexao()
+        while True:
+            linha = conexao.execute("SELECT status, cabecalhos, resposta FROM comandos "
+                                    "WHERE id = ? AND estado = 'concluido'", (comando_id,)).fetchone()
+            if linha is not None:
+                with conexao:
+                    conexao.execute("DELETE FROM comandos WHERE id = ?", (comando_id,))
+                return Documento(0, linha[0], json.loads(linha[1]), bytes(linha[2] or b""))
+            if time.monotonic() >= limite:
+                estados = "('pendente', 'reservado', 'executando')" if prorrogado else "('pendente', 'reservado')"
+                with conexao:
+                    cursor = conexao.execute(f"UPDATE comandos SET estado = 'abandonado' WHERE id = ? "
+                                             f"AND estado IN {estados}", (comando_id,))
+                if cursor.rowcount:
+                    return None
+                estado = conexao.execute("SELECT estado FROM comandos WHERE id = ?", (comando_id,)).fetchone()
+                if estado is None or (prorrogado and estado[0] != "concluido"):
+                    return None
+                if estado[0] == "executando":  # Já em execução no líder: a escrita será aplicada
+                    limite = time.monotonic() + timeout
+                    prorrogado = True
+                continue  # Concluído entre a leitura e o abandono (ou prorrogado): lê de novo
+            time.sleep(espera)
+            espera = min(espera * 2, 0.05)
+
+    def limpar_comandos(self, idade: float) -> int:
+        """Apaga comandos criados há mais de `idade` segundos que ninguém vai recolher
+
+        Concluídos cuja resposta o seguidor não leu, abandonados e os deixados
+        reservados ou em execução por um líder que caiu. Retorna quantos apagou.
+        """
+        with self._conexao() as conexao:
+            cursor = conexao.execute("DELETE FROM comandos WHERE estado != 'pendente' AND criado_em < ?",
+                                     (time.time() - idade,))
+            return cursor.rowcount
+
+
+def criar_estado(url: Optional[str]):
+    """Cria o backend a partir de uma URL: "memoria" (padrão, também se vazia) ou "sqlite:<arquivo>" """
+    if not url or url == "memoria":
+        return EstadoMemoria()
+    if url.startswith("sqlite:"):
+        caminho = url[len("sqlite:"):]
+        return EstadoSQLite(caminho[2:] if caminho.startswith("//") else caminho)  # sqlite:///abs/estado.db
+    raise ValueError(f"Backend de estado desconhecido: {url} (use 'memoria' ou 'sqlite:<arquivo>')")
@@ -0,0 +1,186 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+import threading
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence
+
+# Tipos de evento do histórico do sistema: código -> nome (o nome é o filtro das rotas)
+TEXTO = 0  # Entrada livre (texto pronto, de chamadores antigos)
+REGIAO_CADASTRADA = 1
+OCORRENCIA_REGISTRADA = 2
+TAREFA_CONCLUIDA = 3
+DRONE_RETORNOU = 4
+ATENDIMENTO = 5
+CONTATO_ADICIONADO = 6
+FALHA_ALERTA = 7
+
+TIPOS = {
+    TEXTO: "texto",
+    REGIAO_CADASTRADA: "regiao_cadastrada",
+    OCORRENCIA_REGISTRADA: "ocorrencia_registrada",
+    TAREFA_CONCLUIDA: "tarefa_concluida",
+    DRONE_RETORNOU: "drone_retornou",
+    ATENDIMENTO: "atendimento",
+    CONTATO_ADICIONADO: "contato_adicionado",
+    FALHA_ALERTA: "falha_alerta",
+}
+CODIGOS = {nome: codigo for codigo, nome in TIPOS.items()}
+
+CANAIS = ("email", "sms")  # Valor do evento FALHA_ALERTA
+
+SEM_OCORRENCIA = -1
+
+
+class HistoricoEventos:
+    """Histórico do sistema em registros compactos
+
+    Cada entrada é um evento tipado (código, instante em milissegundos,
+    ocorrência, ator, região, um valor inteiro, local e um texto opcional)
+    guardado em colunas (`array`). Atores, regiões e textos viram códigos
+    de uma tabela interna, então um registro ocupa cerca de 50 bytes em vez
+    de uma string ou dicionário por entrada. O texto legível é montado só
+    quando a entrada é servida, e as consultas filtram por tipo, ocorrência
+    e intervalo de tempo sem interpretar texto.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.codigos = array('B')
+        self.instantes = array('q')  # Milissegundos desde a época
+        self.ocorrencias = array('q')  # SEM_OCORRENCIA quando o evento não tem ocorrência
+        self.atores = array('I')  # Código na tabela de textos (0: nenhum)
+        self.regioes = array('I')
+        self.textos = array('I')
+        self.valores = array('i')
+        self.latitudes = array('d')
+        self.longitudes = array('d')
+        self._textos: List[Optional[str]] = [None]
+        self._indice_textos: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __iter__(self) -> Iterator:
+        for i in range(len(self)):
+            yield self.renderizar(i)
+
+    def _codigo(self, texto: Optional[str]) -> int:
+        if texto is None:
+            return 0
+        codigo = self._indice_textos.get(texto)
+        if codigo is None:
+            codigo = self._indice_textos[texto] = len(self._textos)
+            self._textos.append(texto)
+        return codigo
+
+    def registrar(self, codigo: int, instante: float, ocorrencia: int = None, ator: str = None,
+                  regiao: str = None, valor: int = 0, local: Sequence[float] = None, texto: str = None) -> int:
+        """Grava um evento e retorna sua posição"""
+        with self._trava:
+            self.codigos.append(codigo)
+            self.instantes.append(int(instante * 1000))
+            self.ocorrencias.append(SEM_OCORRENCIA if ocorrencia is None else ocorrencia)
+            self.atores.append(self._codigo(ator))
+            self.regioes.append(self._codigo(regiao))
+            self.textos.append(self._codigo(texto))
+            self.valores.append(valor)
+            self.latitudes.append(float(local[0]) if local is not None else 0.0)
+            self.longitudes.append(float(local[1]) if local is not None else 0.0)
+            return len(self.codigos) - 1
+
+    # ---------- Leitura ----------
+
+    def renderizar(self, i: int):
+        """Entrada i no formato legível (texto, ou dicionário para atendimentos)"""
+        codigo = self.codigos[i]
+        textos = self._textos
+        if codigo == OCORRENCIA_REGISTRADA:
+            return f"Nova ocorrência ID {self.ocorrencias[i]}"
+        if codigo == DRONE_RETORNOU:
+            return f"Drone {textos[self.atores[i]]} retornou à base"
+        if codigo == TAREFA_CONCLUIDA:
+            return f"Tarefa concluída: {textos[self.textos[i]]} para ocorrência {self.ocorrencias[i]}"
+        if codigo == ATENDIMENTO:
+            return {
+                "tipo": "Atendimento",
+                "descricao": f"Fogo apagado em {textos[self.regioes[i]]}",
+                "severidade": self.valores[i],
+                "timestamp": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.instantes[i] / 1000)),
+                "local": [self.latitudes[i], self.longitudes[i]]
+            }
+        if codigo == REGIAO_CADASTRADA:
+            return f"Nova região cadastrada: {textos[self.regioes[i]]}"
+        if codigo == CONTATO_ADICIONADO:
+            return f"Novo contato adicionado: {textos[self.atores[i]]}"
+        if codigo == FALHA_ALERTA:
+            canal = 'e-mail' if CANAIS[self.valores[i]] == 'email' else 'SMS'
+            return f"Falha ao enviar {canal} para {textos[self.atores[i]]}: {textos[self.textos[i]]}"
+        return textos[self.textos[i]]
+
+    def evento(self, i: int) -> dict:
+        """Entrada i como evento estruturado (com o texto legível em "texto")"""
+        codigo = self.codigos[i]
+        renderizado = self.renderizar(i)
+        evento = {
+            "tipo": TIPOS[codigo],
+            "instante": self.instantes[i] / 1000,
+            "ocorrencia": None if self.ocorrencias[i] == SEM_OCORRENCIA else self.ocorrencias[i],
+            "ator": self._textos[self.atores[i]],
+            "regiao": self._textos[self.regioes[i]],
+            "texto": renderizado["descricao"] if isinstance(renderizado, dict) else renderizado,
+        }
+        if codigo == ATENDIMENTO:
+            evento["severidade"] = self.valores[i]
+            evento["local"] = [self.latitudes[i], self.longitudes[i]]
+        elif codigo == FALHA_ALERTA:
+            evento["canal"] = CANAIS[self.valores[i]]
+        return evento
+
+    def posicoes(self, tipos: Sequence[str] = None, ocorrencia: int = None, de: float = None,
+                 ate: float = None) -> List[int]:
+        """Posições das entradas que atendem a todos os filtros, em ordem de gravação
+
+        Raises:
+            ValueError: Tipo de evento desconhecido
+        """
+        with self._trava:
+            total = len(self.codigos)
+        if tipos is not None:
+            desconhecidos = [tipo for tipo in tipos if tipo not in CODIGOS]
+            if desconhecidos:
+                raise ValueError(f"Tipo de evento desconhecido: {', '.join(desconhecidos)}")
+            # Busca de cada código nos bytes da coluna (em C), sem percorrer as demais entradas
+            colunas = self.codigos[:total].tobytes()
+            selecionadas = []
+            for tipo in tipos:
+                alvo = bytes((CODIGOS[tipo],))
+                i = colunas.find(alvo)
+                while i != -1:
+                    selecionadas.append(i)
+                    i = colunas.find(alvo, i + 1)
+            if len(tipos) > 1:
+                selecionadas.sort()
+        else:
+            selecionadas = range(total)
+        if ocorrencia is not None:
+            selecionadas = [i for i in selecionadas if self.ocorrencias[i] == ocorrencia]
+        if de is not None or ate is not None:
+            minimo = float('-inf') if de is None else de * 1000
+            maximo = float('inf') if ate is None else ate * 1000
+            selecionadas = [i for i in selecionadas if minimo <= self.instantes[i] <= maximo]
+        return list(selecionadas)
+
+    def consultar(self, tipos: Sequence[str] = None, ocorrencia: int = None, de: float = None, ate: float = None,
+                  limite: int = None, estruturado: bool = False) -> List:
+        """Entradas filtradas, em ordem de gravação; `limite` mantém as mais recentes"""
+        selecionadas = self.posicoes(tipos, ocorrencia, de, ate)
+        if limite is not None:
+            selecionadas = selecionadas[-limite:] if limite > 0 else []
+        montar = self.evento if estruturado else self.renderizar
+        return [montar(i) for i in selecionadas]
+
+    def to_list(self) -> List:
+        """Todas as entradas no formato legível (mesmo formato da antiga lista de textos)"""
+        return [self.renderizar(i) for i in range(len(self))]
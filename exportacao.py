@@ -0,0 +1,243 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Exportação em colunas (Apache Arrow IPC e Parquet) das ocorrências e do
+# histórico dos drones.
+#
+# Os registros são convertidos em lotes (RecordBatch) direto dos atributos das
+# ocorrências ou das colunas do arquivo compacto, sem passar por dicionários
+# nem JSON. Região, status e ação viram colunas de dicionário. Cada lote é
+# escrito e enviado assim que fica pronto: a resposta HTTP vai saindo em
+# pedaços e a memória fica limitada a um lote. O IPC sai em stream com zstd;
+# o Parquet, com zstd e um row group por lote.
+#
+# O pyarrow é opcional e só é importado na primeira exportação.
+
+import itertools
+import operator
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from metricas import REGISTRO
+
+FORMATOS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+CAMADAS = ("ativas", "resolvidas", "arquivadas")
+TAMANHO_LOTE = 65_536
+COMPRESSAO = "zstd"
+
+LINHAS_EXPORTADAS = REGISTRO.contador(
+    "sentinel_exportacao_linhas", "Linhas exportadas em Arrow/Parquet", ("conjunto", "formato"))
+
+_pyarrow = {}  # Módulos pyarrow e pyarrow.parquet, importados na primeira exportação
+
+_ler_ocorrencia = operator.attrgetter("id", "severidade", "fogo_confirmado", "fogo_apagado", "area_projetada_1h",
+                                      "area_projetada_6h", "tempo_inicio_fogo", "tempo_fim_fogo")
+
+
+def pyarrow_disponivel() -> bool:
+    """Importa o pyarrow na primeira chamada; False se não estiver instalado"""
+    if "pa" not in _pyarrow:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            _pyarrow["pa"] = None
+        else:
+            _pyarrow["pa"], _pyarrow["pq"] = pyarrow, pyarrow.parquet
+    return _pyarrow["pa"] is not None
+
+
+def _modulo():
+    if not pyarrow_disponivel():
+        raise ImportError("pyarrow não está instalado (pip install pyarrow)")
+    return _pyarrow["pa"]
+
+
+def esquema_ocorrencias():
+    pa = _modulo()
+    texto = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("id", pa.int64()),
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+        ("severidade", pa.int8()),
+        ("regiao", texto),
+        ("status", texto),
+        ("camada", texto),
+        ("fogo_confirmado", pa.bool_()),
+        ("fogo_apagado", pa.bool_()),
+        ("area_projetada_1h", pa.float32()),  # km²; nulo nas arquivadas
+        ("area_projetada_6h", pa.float32()),
+        ("tempo_inicio_fogo", pa.float64()),  # Segundos desde a época (0 = sem fogo ativo)
+        ("tempo_fim_fogo", pa.float64()),
+        ("resolvida_em", pa.float64()),  # Nulo nas ativas
+    ])
+
+
+def esquema_historico_drones():
+    pa = _modulo()
+    texto = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("timestamp", pa.string()),
+        ("drone", texto),
+        ("acao", texto),
+        ("ocorrencia", pa.int64()),  # Nulo nas ações sem ocorrência
+    ])
+
+
+def _texto(valores: List[str]):
+    return _pyarrow["pa"].array(valores, type=_pyarrow["pa"].string()).dictionary_encode()
+
+
+def _constante(texto: str, n: int):
+    pa = _pyarrow["pa"]
+    return pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int32)), pa.array([texto]))
+
+
+def _lote_objetos(ocorrencias: List, camada: str, resolvidas_em: Optional[List[float]] = None):
+    """RecordBatch de ocorrências em memória (ativas ou resolvidas)"""
+    pa = _pyarrow["pa"]
+    n = len(ocorrencias)
+    valores = np.fromiter(itertools.chain.from_iterable(map(_ler_ocorrencia, ocorrencias)), dtype=np.float64,
+                          count=8 * n).reshape(n, 8)
+    locais = np.fromiter(itertools.chain.from_iterable(oc.local for oc in ocorrencias), dtype=np.float64,
+                         count=2 * n).reshape(n, 2)
+    return pa.RecordBatch.from_arrays([
+        pa.array(valores[:, 0].astype(np.int64)),
+        pa.array(locais[:, 0]),
+        pa.array(locais[:, 1]),
+        pa.array(valores[:, 1].astype(np.int8)),
+        _texto([oc.regiao for oc in ocorrencias]),
+        _texto([oc.status for oc in ocorrencias]),
+        _constante(camada, n),
+        pa.array(valores[:, 2] > 0),
+        pa.array(valores[:, 3] > 0),
+        pa.array(valores[:, 4].astype(np.float32)),
+        pa.array(valores[:, 5].astype(np.float32)),
+        pa.array(valores[:, 6]),
+        pa.array(valores[:, 7]),
+        pa.array(resolvidas_em, type=pa.float64()) if resolvidas_em is not None else pa.nulls(n, pa.float64()),
+    ], schema=esquema_ocorrencias())
+
+
+def _lote_arquivo(colunas: Dict):
+    """RecordBatch de uma fatia do arquivo compacto (as colunas já são arrays tipados)"""
+    pa = _pyarrow["pa"]
+    textos = pa.array(colunas["textos"], type=pa.string())
+    status = np.frombuffer(colunas["status"], dtype=np.uint16).astype(np.int32)
+    n = len(status)
+    confirmados = np.frombuffer(colunas["confirmados"], dtype=np.int8) > 0
+    return pa.RecordBatch.from_arrays([
+        pa.array(np.frombuffer(colunas["ids"], dtype=np.int64)),
+        pa.array(np.frombuffer(colunas["latitudes"], dtype=np.float64)),
+        pa.array(np.frombuffer(colunas["longitudes"], dtype=np.float64)),
+        pa.array(np.frombuffer(colunas["severidades"], dtype=np.int8)),
+        pa.DictionaryArray.from_arrays(
+            pa.array(np.frombuffer(colunas["regioes"], dtype=np.uint16).astype(np.int32)), textos),
+        pa.DictionaryArray.from_arrays(pa.array(status), textos),
+        _constante("arquivadas", n),
+        pa.array(confirmados),
+        pa.array(status == colunas["textos"].index("Fogo apagado") if "Fogo apagado" in colunas["textos"]
+                 else np.zeros(n, dtype=bool)),
+        pa.nulls(n, pa.float32()),
+        pa.nulls(n, pa.float32()),
+        pa.array(np.frombuffer(colunas["inicios_fogo"], dtype=np.float64)),
+        pa.array(np.frombuffer(colunas["fins_fogo"], dtype=np.float64)),
+        pa.array(np.frombuffer(colunas["resolvidas_em"], dtype=np.float64)),
+    ], schema=esquema_ocorrencias())
+
+
+def lotes_ocorrencias(sistema, camadas: Iterable[str] = ("ativas", "resolvidas"),
+                      tamanho_lote: int = TAMANHO_LOTE) -> Iterator:
+    """RecordBatches das ocorrências das camadas pedidas, na ordem de CAMADAS
+
+    Ativas e resolvidas são copiadas (referências) sob a trava do sistema no
+    início; o arquivo é lido em fatias até o tamanho que tinha nesse momento.
+    """
+    _modulo()
+    camadas = set(camadas)
+    with sistema._trava:
+        ativas = list(sistema.fila_prioritaria) if "ativas" in camadas else []
+        resolvidas = list(sistema.resolvidas.values()) if "resolvidas" in camadas else []
+    total_arquivo = len(sistema.arquivo) if "arquivadas" in camadas else 0
+
+    for inicio in range(0, len(ativas), tamanho_lote):
+        yield _lote_objetos(ativas[inicio:inicio + tamanho_lote], "ativas")
+    for inicio in range(0, len(resolvidas), tamanho_lote):
+        fatia = resolvidas[inicio:inicio + tamanho_lote]
+        yield _lote_objetos([oc for _, oc in fatia], "resolvidas", [instante for instante, _ in fatia])
+    for inicio in range(0, total_arquivo, tamanho_lote):
+        yield _lote_arquivo(sistema.arquivo.fatia_colunas(inicio, min(inicio + tamanho_lote, total_arquivo)))
+
+
+def lotes_historico_drones(tracker, tamanho_lote: int = TAMANHO_LOTE) -> Iterator:
+    """RecordBatches do histórico de ações dos drones, em ordem cronológica"""
+    pa = _modulo()
+    registros = iter(tracker.historico)
+    while True:
+        fatia = list(itertools.islice(registros, tamanho_lote))
+        if not fatia:
+            return
+        yield pa.RecordBatch.from_arrays([
+            pa.array([registro["timestamp"] for registro in fatia], type=pa.string()),
+            _texto([str(registro["drone"]) for registro in fatia]),
+            _texto([registro["acao"] for registro in fatia]),
+            pa.array([registro["ocorrencia"] if isinstance(registro["ocorrencia"], int) else None
+                      for registro in fatia], type=pa.int64()),
+        ], schema=esquema_historico_drones())
+
+
+class _Pedacos:
+    """Destino de escrita que acumula os bytes até o próximo envio"""
+
+    closed = False
+
+    def __init__(self):
+        self.partes: List[bytes] = []
+
+    def write(self, dados) -> int:
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def retirar(self) -> bytes:
+        dados = b"".join(self.partes)
+        self.partes.clear()
+        return dados
+
+
+def transmitir(lotes: Iterable, esquema, formato: str, conjunto: str = "") -> Iterator[bytes]:
+    """Serializa os lotes em Arrow IPC (stream) ou Parquet, entregando os bytes lote a lote
+
+    Raises:
+        ValueError: Formato desconhecido
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato deve ser um de: {', '.join(FORMATOS)}")
+    pa = _modulo()
+    destino = _Pedacos()
+    if formato == "arrow":
+        escritor = pa.ipc.new_stream(destino, esquema, options=pa.ipc.IpcWriteOptions(compression=COMPRESSAO))
+    else:
+        escritor = _pyarrow["pq"].ParquetWriter(destino, esquema, compression=COMPRESSAO)
+    linhas = 0
+    try:
+        for lote in lotes:
+            escritor.write_batch(lote)
+            linhas += lote.num_rows
+            dados = destino.retirar()
+            if dados:
+                yield dados
+    finally:
+        escritor.close()
+        LINHAS_EXPORTADAS.inc(linhas, (conjunto, formato))
+    yield destino.retirar()
@@ -0,0 +1,156 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Áreas de interesse (geocercas) dos contatos e índice espacial sobre elas.
+#
+# Um contato pode acompanhar um ponto com raio ou um polígono, em vez de um
+# bioma inteiro. O índice é uma grade regular em graus: cada área é registrada
+# nas células que o seu retângulo envolvente cobre, e a consulta de um ponto
+# olha só a célula dele e testa exatamente os poucos candidatos. Áreas muito
+# grandes (que cobririam mais de `max_celulas` células) ficam em uma lista à
+# parte, testada em toda consulta.
+
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+RAIO_TERRA_KM = 6371.0
+KM_POR_GRAU = math.pi * RAIO_TERRA_KM / 180  # ~111,2 km por grau de latitude
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distância em km entre dois pontos [lat, lon] em graus"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RAIO_TERRA_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+class Circulo:
+    """Ponto central com raio em km"""
+
+    __slots__ = ("lat", "lon", "raio_km", "limites")
+
+    def __init__(self, lat: float, lon: float, raio_km: float):
+        if raio_km <= 0:
+            raise ValueError("raio_km deve ser positivo")
+        self.lat = float(lat)
+        self.lon = float(lon)
+        self.raio_km = float(raio_km)
+        dlat = self.raio_km / KM_POR_GRAU
+        dlon = self.raio_km / (KM_POR_GRAU * max(math.cos(math.radians(self.lat)), 0.01))
+        self.limites = (self.lat - dlat, self.lon - dlon, self.lat + dlat, self.lon + dlon)
+
+    def contem(self, lat: float, lon: float) -> bool:
+        return haversine_km(self.lat, self.lon, lat, lon) <= self.raio_km
+
+
+class Poligono:
+    """Polígono simples de vértices [lat, lon] (fechado automaticamente)"""
+
+    __slots__ = ("vertices", "limites")
+
+    def __init__(self, vertices: Sequence[Sequence[float]]):
+        if len(vertices) < 3:
+            raise ValueError("O polígono precisa de pelo menos 3 vértices")
+        self.vertices = [(float(lat), float(lon)) for lat, lon in vertices]
+        lats = [lat for lat, _ in self.vertices]
+        lons = [lon for _, lon in self.vertices]
+        self.limites = (min(lats), min(lons), max(lats), max(lons))
+
+    def contem(self, lat: float, lon: float) -> bool:
+        """Teste do raio (par-ímpar) no plano lat/lon"""
+        dentro = False
+        anterior_lat, anterior_lon = self.vertices[-1]
+        for atual_lat, atual_lon in self.vertices:
+            if (atual_lon > lon) != (anterior_lon > lon):
+                cruzamento = (anterior_lat - atual_lat) * (lon - atual_lon) / (anterior_lon - atual_lon) + atual_lat
+                if lat < cruzamento:
+                    dentro = not dentro
+            anterior_lat, anterior_lon = atual_lat, atual_lon
+        return dentro
+
+
+def criar_area(dados: dict):
+    """Cria a área a partir do formato da API
+
+    {"tipo": "circulo", "centro": [lat, lon], "raio_km": 30} ou
+    {"tipo": "poligono", "vertices": [[lat, lon], ...]}
+
+    Raises:
+        ValueError: Tipo desconhecido ou dados inválidos
+    """
+    tipo = dados.get("tipo")
+    try:
+        if tipo == "circulo":
+            lat, lon = dados["centro"]
+            return Circulo(lat, lon, dados["raio_km"])
+        if tipo == "poligono":
+            return Poligono(dados["vertices"])
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Área inválida: {dados}") from e
+    raise ValueError(f"Tipo de área desconhecido: {tipo} (use 'circulo' ou 'poligono')")
+
+
+class IndiceGeocercas:
+    """Grade regular de áreas para achar, dado um ponto, as áreas que o contêm
+
+    Args:
+        tamanho_celula: Lado da célula em graus (0,25° ≈ 28 km)
+        max_celulas: Áreas que cobririam mais células que isso vão para a lista de grandes
+    """
+
+    def __init__(self, tamanho_celula: float = 0.25, max_celulas: int = 1024):
+        self.tamanho_celula = tamanho_celula
+        self.max_celulas = max_celulas
+        self._areas: List[tuple] = []  # posição -> (área, valor)
+        self._celulas: Dict[Tuple[int, int], List[int]] = {}
+        self._grandes: List[int] = []
+
+    def __len__(self):
+        return len(self._areas)
+
+    def _celula(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.tamanho_celula), math.floor(lon / self.tamanho_celula)
+
+    def adicionar(self, area, valor):
+        """Registra a área associada a `valor` (o mesmo valor pode ter várias áreas)"""
+        posicao = len(self._areas)
+        self._areas.append((area, valor))
+        lat_min, lon_min, lat_max, lon_max = area.limites
+        linha_min, coluna_min = self._celula(lat_min, lon_min)
+        linha_max, coluna_max = self._celula(lat_max, lon_max)
+        if (linha_max - linha_min + 1) * (coluna_max - coluna_min + 1) > self.max_celulas:
+            self._grandes.append(posicao)
+            return
+        for linha in range(linha_min, linha_max + 1):
+            for coluna in range(coluna_min, coluna_max + 1):
+                self._celulas.setdefault((linha, coluna), []).append(posicao)
+
+    def consultar(self, lat: float, lon: float) -> List:
+        """Valores cujas áreas contêm o ponto, na ordem em que foram adicionados (sem repetição)"""
+        candidatos = self._celulas.get(self._celula(lat, lon), ())
+        if self._grandes:
+            candidatos = sorted(set(candidatos).union(self._grandes))
+        resultado = []
+        vistos = set()
+        for posicao in candidatos:
+            area, valor = self._areas[posicao]
+            if id(valor) not in vistos and area.contem(lat, lon):
+                vistos.add(id(valor))
+                resultado.append(valor)
+        return resultado
+
+    def consultar_varrendo(self, lat: float, lon: float) -> List:
+        """Mesma resposta de `consultar`, testando todas as áreas (referência para benchmarks)"""
+        resultado = []
+        vistos = set()
+        for area, valor in self._areas:
+            if id(valor) not in vistos and area.contem(lat, lon):
+                vistos.add(id(valor))
+                resultado.append(valor)
+        return resultado
+
+
+def areas_validas(areas: Iterable[dict]) -> List:
+    """Converte a lista de áreas da API, validando todas antes de registrar qualquer uma"""
+    return [criar_area(dados) for dados in areas]
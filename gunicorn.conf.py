@@ -0,0 +1,29 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Configuração do gunicorn para a API com vários workers:
+#
+#   gunicorn -c gunicorn.conf.py api_flask:app
+#
+# Sem preload: cada worker importa a API depois do fork e só então disputa a
+# liderança, para que as threads dos serviços existam apenas no líder.
+
+import os
+
+os.environ.setdefault('SENTINEL_ESTADO', 'sqlite:sentinel_estado.db')
+os.environ.setdefault('SENTINEL_DB', 'sentinel.db')  # De onde um novo líder reconstrói o estado
+
+bind = os.environ.get('SENTINEL_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('SENTINEL_WORKERS', os.cpu_count() or 1))
+threads = 4
+preload_app = False
+
+
+def post_worker_init(worker):
+    import api_flask
+    api_flask.coordenador.iniciar()
+
+
+def worker_exit(server, worker):
+    import api_flask
+    api_flask.coordenador.parar()
@@ -0,0 +1,268 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Ingestão de focos de calor de satélite (arquivos CSV no formato do FIRMS).
+#
+# O arquivo é lido em lotes de linhas, sem carregar tudo na memória. Cada
+# detecção é comparada com as detecções recentes por um índice de hash
+# espaço-temporal: a chave é (faixa de tempo, célula da grade), com células do
+# tamanho do raio de fusão e faixas do tamanho da janela de tempo, de modo que
+# os candidatos estão sempre na célula do ponto, nas vizinhas e nas faixas
+# adjacentes. Uma detecção a até `raio_km` e `janela_horas` de outra é fundida
+# na mesma ocorrência (a severidade só sobe, aplicada uma vez por lote); caso contrário vira uma ocorrência
+# nova. Faixas de tempo mais antigas que a janela são descartadas a cada lote,
+# o que limita a memória do índice às detecções recentes.
+
+import calendar
+import csv
+import io
+import itertools
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from geocerca import KM_POR_GRAU, haversine_km
+from mapa_monitoramento import REGIOES
+from metricas import REGISTRO
+
+FOCOS_INGERIDOS = REGISTRO.contador(
+    "sentinel_focos_ingeridos", "Detecções de satélite ingeridas por resultado", ("resultado",))
+
+# Status de ocorrências encerradas: novas detecções no mesmo lugar abrem outra ocorrência
+STATUS_ENCERRADOS = ("Fogo apagado", "Verificado")
+
+# Nomes aceitos para cada coluna (cabeçalho do FIRMS e variações comuns)
+COLUNAS = {
+    "lat": ("latitude", "lat"),
+    "lon": ("longitude", "lon", "lng"),
+    "confianca": ("confidence", "confianca"),
+    "data": ("acq_date", "data"),
+    "hora": ("acq_time", "hora"),
+    "frp": ("frp",),
+}
+
+_CONFIANCA_TEXTO = {"l": 1, "low": 1, "n": 2, "nominal": 2, "h": 3, "high": 3}
+
+
+def severidade_deteccao(confianca: str, frp: Optional[float] = None) -> int:
+    """Severidade (1 a 5) de uma detecção
+
+    A confiança dá a base: baixa 1, nominal 2, alta 3 (VIIRS usa l/n/h e MODIS
+    0-100, com cortes em 30 e 80). A potência radiativa do fogo (FRP, em MW)
+    soma 1 a partir de 50 MW e 2 a partir de 200 MW.
+    """
+    base = _CONFIANCA_TEXTO.get(confianca.strip().lower())
+    if base is None:
+        valor = float(confianca)
+        base = 1 if valor < 30 else 2 if valor < 80 else 3
+    if frp is not None:
+        base += 2 if frp >= 200 else 1 if frp >= 50 else 0
+    return min(base, 5)
+
+
+def regiao_do_ponto(lat: float, lon: float) -> str:
+    """Bioma do ponto: o menor retângulo de bioma que o contém ou, fora de todos, o centro mais próximo"""
+    melhor, menor_area = None, None
+    for regiao, info in REGIOES.items():
+        (lat_min, lon_min), (lat_max, lon_max) = info['bounds']
+        if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
+            area = (lat_max - lat_min) * (lon_max - lon_min)
+            if menor_area is None or area < menor_area:
+                melhor, menor_area = regiao, area
+    if melhor is not None:
+        return melhor
+    return min(REGIOES, key=lambda r: (REGIOES[r]['centro'][0] - lat) ** 2 + (REGIOES[r]['centro'][1] - lon) ** 2)
+
+
+class IngestorFocos:
+    """Ingere arquivos de focos de calor fundindo detecções próximas no espaço e no tempo
+
+    Args:
+        sistema: SistemaEmergencia que recebe as ocorrências
+        raio_km: Distância máxima entre detecções da mesma ocorrência
+        janela_horas: Intervalo máximo entre detecções da mesma ocorrência
+        tamanho_lote: Linhas lidas do arquivo por vez
+    """
+
+    def __init__(self, sistema, raio_km: float = 2.0, janela_horas: float = 24.0, tamanho_lote: int = 10_000):
+        if raio_km <= 0 or janela_horas <= 0:
+            raise ValueError("raio_km e janela_horas devem ser positivos")
+        self.sistema = sistema
+        self.raio_km = raio_km
+        self.janela = janela_horas * 3600
+        self.tamanho_lote = tamanho_lote
+        self.tamanho_celula = raio_km / KM_POR_GRAU  # Graus de latitude
+        # faixa de tempo -> célula -> entradas [lat, lon, instante, ocorrência]
+        self._faixas: Dict[int, Dict[Tuple[int, int], List[list]]] = {}
+        self._ultimo_instante = None
+        self._datas: Dict[str, int] = {}
+        self._vizinhas: Dict[int, List[Tuple[int, int]]] = {}
+        self._trava = threading.Lock()  # Uma ingestão por vez (o índice não é compartilhado entre threads)
+
+    @property
+    def entradas(self) -> int:
+        """Detecções guardadas no índice (limitadas pela janela)"""
+        return sum(len(entradas) for celulas in self._faixas.values() for entradas in celulas.values())
+
+    def ingerir(self, arquivo, progresso: Callable[[dict], None] = None) -> dict:
+        """Lê um CSV (objeto de texto) em lotes e registra ou funde as detecções
+
+        Args:
+            arquivo: Arquivo aberto em modo texto com cabeçalho
+            progresso: Chamada com os contadores parciais após cada lote
+
+        Returns:
+            dict: linhas, novas, fundidas, severidade_elevada, invalidas, atrasadas, segundos
+
+        Raises:
+            ValueError: Cabeçalho sem latitude, longitude, confiança, data ou hora
+        """
+        with self._trava:
+            leitor = csv.reader(arquivo)
+            indices = self._colunas(next(leitor, []))
+            contadores = {"linhas": 0, "novas": 0, "fundidas": 0, "severidade_elevada": 0,
+                          "invalidas": 0, "atrasadas": 0}
+            inicio = time.perf_counter()
+            while True:
+                lote = list(itertools.islice(leitor, self.tamanho_lote))
+                if not lote:
+                    break
+                parcial = self._processar_lote(lote, indices)
+                for chave, valor in parcial.items():
+                    contadores[chave] += valor
+                for resultado in ("novas", "fundidas", "invalidas"):
+                    if parcial[resultado]:
+                        FOCOS_INGERIDOS.inc(parcial[resultado], (resultado,))
+                self._descartar_antigas()
+                if progresso is not None:
+                    progresso(dict(contadores, segundos=time.perf_counter() - inicio))
+            contadores["segundos"] = round(time.perf_counter() - inicio, 3)
+            return contadores
+
+    def ingerir_arquivo(self, caminho: str, progresso: Callable[[dict], None] = None) -> dict:
+        """Atalho para `ingerir` a partir do caminho do arquivo"""
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            return self.ingerir(arquivo, progresso)
+
+    def ingerir_binario(self, fluxo, progresso: Callable[[dict], None] = None) -> dict:
+        """Atalho para `ingerir` a partir de um fluxo de bytes (corpo de requisição, upload)"""
+        return self.ingerir(io.TextIOWrapper(fluxo, encoding='utf-8', newline=''), progresso)
+
+    def _colunas(self, cabecalho: List[str]) -> Dict[str, Optional[int]]:
+        nomes = [nome.strip().lower() for nome in cabecalho]
+        indices = {}
+        for campo, aceitos in COLUNAS.items():
+            indices[campo] = next((nomes.index(nome) for nome in aceitos if nome in nomes), None)
+        faltando = [campo for campo, indice in indices.items() if indice is None and campo != "frp"]
+        if faltando:
+            raise ValueError(f"Colunas obrigatórias ausentes no CSV: {', '.join(faltando)}")
+        return indices
+
+    def _instante(self, data: str, hora: str) -> float:
+        """Segundos desde a época (UTC) a partir de acq_date (AAAA-MM-DD) e acq_time (HHMM)"""
+        dia = self._datas.get(data)
+        if dia is None:
+            dia = self._datas[data] = calendar.timegm(time.strptime(data.strip(), "%Y-%m-%d"))
+        horas, minutos = divmod(int(hora.replace(':', '')), 100)
+        return dia + horas * 3600 + minutos * 60
+
+    def _deslocamentos(self, linha: int) -> List[Tuple[int, int]]:
+        """Células vizinhas a testar na faixa de latitude `linha`, começando pela própria
+
+        Um grau de longitude encolhe com o cosseno da latitude, então o raio pode
+        alcançar mais de uma coluna para cada lado.
+        """
+        deslocamentos = self._vizinhas.get(linha)
+        if deslocamentos is None:
+            lat = (abs(linha) + 1) * self.tamanho_celula
+            alcance = math.ceil(1 / max(math.cos(math.radians(min(lat, 89.0))), 0.01))
+            deslocamentos = [(0, 0)] + [(dl, dc) for dl in (-1, 0, 1) for dc in range(-alcance, alcance + 1)
+                                        if (dl, dc) != (0, 0)]
+            self._vizinhas[linha] = deslocamentos
+        return deslocamentos
+
+    def _processar_lote(self, lote: List[List[str]], indices: Dict[str, Optional[int]]) -> Dict[str, int]:
+        i_lat, i_lon, i_conf = indices["lat"], indices["lon"], indices["confianca"]
+        i_data, i_hora, i_frp = indices["data"], indices["hora"], indices["frp"]
+        novas = fundidas = invalidas = atrasadas = 0
+        elevacoes: Dict[int, list] = {}  # id da ocorrência -> [ocorrência, maior severidade vista no lote]
+        celula = self.tamanho_celula
+        janela = self.janela
+        raio = self.raio_km
+        faixas = self._faixas
+        for campos in lote:
+            try:
+                lat = float(campos[i_lat])
+                lon = float(campos[i_lon])
+                instante = self._instante(campos[i_data], campos[i_hora])
+                frp = float(campos[i_frp]) if i_frp is not None and campos[i_frp] else None
+                severidade = severidade_deteccao(campos[i_conf], frp)
+            except (ValueError, IndexError):
+                invalidas += 1
+                continue
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                invalidas += 1
+                continue
+
+            if self._ultimo_instante is None or instante > self._ultimo_instante:
+                self._ultimo_instante = instante
+            elif instante < self._ultimo_instante - 2 * janela:
+                atrasadas += 1  # Anterior às faixas já descartadas: pode duplicar uma ocorrência
+
+            linha, coluna = math.floor(lat / celula), math.floor(lon / celula)
+            faixa = int(instante // janela)
+            encontrada = None
+            for f in (faixa, faixa - 1, faixa + 1):
+                celulas = faixas.get(f)
+                if celulas is None:
+                    continue
+                for dl, dc in self._deslocamentos(linha):
+                    entradas = celulas.get((linha + dl, coluna + dc))
+                    if entradas is None:
+                        continue
+                    for entrada in entradas:
+                        ocorrencia = entrada[3]
+                        if (abs(instante - entrada[2]) <= janela
+                                and ocorrencia.status not in STATUS_ENCERRADOS
+                                and haversine_km(lat, lon, entrada[0], entrada[1]) <= raio):
+                            encontrada = entrada
+                            break
+                    if encontrada is not None:
+                        break
+                if encontrada is not None:
+                    break
+
+            if encontrada is None:
+                ocorrencia = self.sistema.registrar_ocorrencia([lat, lon], severidade, regiao_do_ponto(lat, lon))
+                faixas.setdefault(faixa, {}).setdefault((linha, coluna), []).append([lat, lon, instante, ocorrencia])
+                novas += 1
+                continue
+
+            fundidas += 1
+            ocorrencia = encontrada[3]
+            if f == faixa and dl == 0 and dc == 0:
+                # Mesma célula e faixa: basta avançar o instante da entrada existente
+                encontrada[2] = max(encontrada[2], instante)
+            else:
+                # O fogo se espalhou para outra célula ou faixa: guarda a nova detecção
+                faixas.setdefault(faixa, {}).setdefault((linha, coluna), []).append([lat, lon, instante, ocorrencia])
+            if severidade > ocorrencia.severidade:
+                pendente = elevacoes.get(ocorrencia.id)
+                if pendente is None:
+                    elevacoes[ocorrencia.id] = [ocorrencia, severidade]
+                elif severidade > pendente[1]:
+                    pendente[1] = severidade
+
+        # As elevações do lote são aplicadas juntas: o heap é refeito uma vez só
+        elevadas = len(self.sistema.elevar_severidades(elevacoes.values())) if elevacoes else 0
+        return {"linhas": len(lote), "novas": novas, "fundidas": fundidas, "severidade_elevada": elevadas,
+                "invalidas": invalidas, "atrasadas": atrasadas}
+
+    def _descartar_antigas(self):
+        """Remove as faixas de tempo que já não alcançam nenhuma detecção nova"""
+        if self._ultimo_instante is None:
+            return
+        limite = int(self._ultimo_instante // self.janela) - 2
+        for faixa in [f for f in self._faixas if f < limite]:
+            del self._faixas[faixa]
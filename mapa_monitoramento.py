@@ -1,32 +1,47 @@
 #Nome: Larissa Pereira Biusse
 #RM: 564068
 
-import folium
-from folium.plugins import MarkerCluster, HeatMap, MiniMap, Fullscreen
 import random
-import time
 import os
-import threading
 from typing import Tuple, Dict
 
+# folium (e o pandas que ele carrega) só é importado quando o mapa é usado pela
+# primeira vez: processos que nunca desenham o mapa não pagam essa importação.
+
+# Centro e retângulo envolvente [(lat_min, lon_min), (lat_max, lon_max)] de cada bioma
+REGIOES: Dict[str, Dict] = {
+    "Amazônia": {'centro': (-3.4653, -62.2159), 'bounds': [(-10, -74), (5, -50)]},
+    "Pantanal": {'centro': (-17.6797, -57.4518), 'bounds': [(-20, -60), (-15, -55)]},
+    "Cerrado": {'centro': (-15.8271, -47.2422), 'bounds': [(-20, -55), (-10, -40)]},
+    "Mata Atlântica": {'centro': (-22.9519, -43.2105), 'bounds': [(-25, -48), (-15, -38)]},
+    "Caatinga": {'centro': (-8.0, -39.5), 'bounds': [(-16, -45), (-3, -35)]},
+    "Pampa": {'centro': (-30.5, -54.0), 'bounds': [(-33.7, -57.6), (-28, -50)]}
+}
+
 
 class MapaMonitoramento:
     def __init__(self, sistema):
         self.sistema = sistema
         self.regioes_geometrias = self._definir_regioes()
-        self.mapa = self._inicializar_mapa()
+        self._mapa = None  # Criado no primeiro acesso a `mapa`
+        self.heatmap = None
+        self.marker_cluster = None
         self.markers = []
-        self.iniciar_simulacao()
+
+    @property
+    def mapa(self):
+        """Mapa folium, montado no primeiro uso"""
+        if self._mapa is None:
+            self._mapa = self._inicializar_mapa()
+        return self._mapa
 
     def _definir_regioes(self) -> Dict[str, Dict]:
-        return {
-            "Amazônia": {'centro': (-3.4653, -62.2159), 'bounds': [(-10, -74), (5, -50)]},
-            "Pantanal": {'centro': (-17.6797, -57.4518), 'bounds': [(-20, -60), (-15, -55)]},
-            "Cerrado": {'centro': (-15.8271, -47.2422), 'bounds': [(-20, -55), (-10, -40)]},
-            "Mata Atlântica": {'centro': (-22.9519, -43.2105), 'bounds': [(-25, -48), (-15, -38)]}
-        }
-
-    def _inicializar_mapa(self) -> folium.Map:
+        return {regiao: dict(info) for regiao, info in REGIOES.items()}
+
+    def _inicializar_mapa(self):
+        import folium
+        from folium.plugins import MarkerCluster, HeatMap, MiniMap, Fullscreen
+
         mapa = folium.Map(
             location=[-14.2350, -51.9253],
             zoom_start=4,
@@ -51,6 +66,8 @@ class MapaMonitoramento:
         return mapa
 
     def _adicionar_regioes(self, mapa):
+        import folium
+
         for regiao, info in self.regioes_geometrias.items():
             folium.Rectangle(
                 bounds=info['bounds'],
@@ -72,6 +89,8 @@ class MapaMonitoramento:
         return self.regioes_geometrias[regiao]['centro']
 
     def _criar_marcador_fogo(self, ocorrencia):
+        import folium
+
         lat, lng = self._gerar_posicao_realista(ocorrencia.regiao)
         cor = 'orange' if ocorrencia.severidade <= 2 else 'red' if ocorrencia.severidade <= 4 else 'black'
 
@@ -92,14 +111,16 @@ class MapaMonitoramento:
         )
 
     def limpar_marcadores(self):
-        self.marker_cluster._children.clear()
+        if self.marker_cluster is not None:
+            self.marker_cluster._children.clear()
         self.markers.clear()
 
     def atualizar_simulacao(self):
+        self.mapa  # Garante o mapa (e o agrupamento de marcadores) antes de atualizar
         self.limpar_marcadores()
         heatmap_data = []
 
-        for ocorrencia in self.sistema.fila_prioritaria:
+        for ocorrencia in list(self.sistema.fila_prioritaria):
             if ocorrencia.status == "Fogo ativo":
                 marker = self._criar_marcador_fogo(ocorrencia)
                 marker.add_to(self.marker_cluster)
@@ -110,6 +131,8 @@ class MapaMonitoramento:
         self.heatmap.data = heatmap_data
 
     def adicionar_marcador(self, lat, lon, cor='red', popup=''):
+        import folium
+
         icone = {
             'red': ('fire', 'red'),
             'green': ('check', 'green'),
@@ -122,16 +145,9 @@ class MapaMonitoramento:
             icon=folium.Icon(color=icone[1], icon=icone[0], prefix='fa')
         ).add_to(self.mapa)
 
-    def iniciar_simulacao(self):
-        def simular():
-            while True:
-                try:
-                    self.atualizar_simulacao()
-                except Exception as e:
-                    print(f"Erro ao atualizar mapa: {e}")
-                time.sleep(3)
-
-        threading.Thread(target=simular, daemon=True).start()
+    def iniciar_simulacao(self, intervalo: float = 3):
+        """Registra a atualização periódica do mapa no agendador do sistema"""
+        self.sistema.agendador.registrar_periodica("mapa", intervalo, self.atualizar_simulacao)
 
     def salvar_mapa(self, arquivo='templates/monitoramento.html'):
         os.makedirs(os.path.dirname(arquivo), exist_ok=True)
@@ -0,0 +1,232 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Métricas no formato de texto do Prometheus.
+#
+# Contadores e histogramas gravam em fragmentos locais de cada thread (sem
+# trava no caminho quente); a agregação só acontece na coleta (`exportar`).
+# Medidores são calculados por funções no momento da coleta.
+
+import bisect
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+LIMITES_PADRAO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence, extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float('inf'):
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _PorThread:
+    """Fragmentos de dados, um por thread, agregados na coleta
+
+    Fragmentos de threads encerradas são consolidados em um fragmento base,
+    para que servidores que criam uma thread por requisição não acumulem
+    fragmentos indefinidamente.
+    """
+
+    COMPACTAR_A_CADA = 256
+
+    def __init__(self, fabrica: Callable, combinar: Callable):
+        self._fabrica = fabrica
+        self._combinar = combinar  # combinar(destino, origem)
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._fragmentos: List[Tuple[threading.Thread, object]] = []
+        self._base = fabrica()
+
+    def atual(self):
+        try:
+            return self._local.fragmento
+        except AttributeError:
+            fragmento = self._fabrica()
+            self._local.fragmento = fragmento
+            with self._trava:
+                self._fragmentos.append((threading.current_thread(), fragmento))
+                if len(self._fragmentos) % self.COMPACTAR_A_CADA == 0:
+                    self._compactar()
+            return fragmento
+
+    def todos(self) -> list:
+        with self._trava:
+            self._compactar()
+            return [self._base] + [fragmento for _, fragmento in self._fragmentos]
+
+    def _compactar(self):
+        vivos = []
+        for thread, fragmento in self._fragmentos:
+            if thread.is_alive():
+                vivos.append((thread, fragmento))
+            else:
+                self._combinar(self._base, fragmento)
+        self._fragmentos = vivos
+
+
+class Contador:
+    """Contador monotônico com rótulos"""
+
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._dados = _PorThread(dict, self._combinar)
+
+    @staticmethod
+    def _combinar(destino: dict, origem: dict):
+        for chave, valor in list(origem.items()):
+            destino[chave] = destino.get(chave, 0.0) + valor
+
+    def inc(self, valor: float = 1.0, rotulos: tuple = ()):
+        fragmento = self._dados.atual()
+        fragmento[rotulos] = fragmento.get(rotulos, 0.0) + valor
+
+    def valores(self) -> Dict[tuple, float]:
+        total: Dict[tuple, float] = {}
+        for fragmento in self._dados.todos():
+            self._combinar(total, fragmento)
+        return total
+
+    def exportar(self) -> List[str]:
+        return [f"{self.nome}_total{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"
+                for chave, valor in sorted(self.valores().items())]
+
+
+class Histograma:
+    """Histograma de latências com baldes cumulativos na exportação"""
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), limites: Sequence[float] = LIMITES_PADRAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.limites = tuple(sorted(limites))
+        self._dados = _PorThread(dict, self._combinar)
+
+    def _combinar(self, destino: dict, origem: dict):
+        for chave, (baldes, soma) in list(origem.items()):
+            atual = destino.get(chave)
+            if atual is None:
+                destino[chave] = [list(baldes), soma]
+            else:
+                for i, quantidade in enumerate(baldes):
+                    atual[0][i] += quantidade
+                atual[1] += soma
+
+    def observar(self, valor: float, rotulos: tuple = ()):
+        fragmento = self._dados.atual()
+        serie = fragmento.get(rotulos)
+        if serie is None:
+            serie = fragmento[rotulos] = [[0] * (len(self.limites) + 1), 0.0]
+        serie[0][bisect.bisect_left(self.limites, valor)] += 1
+        serie[1] += valor
+
+    def valores(self) -> Dict[tuple, list]:
+        total: Dict[tuple, list] = {}
+        for fragmento in self._dados.todos():
+            self._combinar(total, fragmento)
+        return total
+
+    def exportar(self) -> List[str]:
+        linhas = []
+        for chave, (baldes, soma) in sorted(self.valores().items()):
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + (float('inf'),), baldes):
+                acumulado += quantidade
+                rotulos = _formatar_rotulos(self.rotulos, chave, f'le="{_formatar_numero(limite)}"')
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{rotulos} {acumulado}")
+        return linhas
+
+
+class Medidor:
+    """Medidor calculado na coleta
+
+    A função retorna um número ou um dicionário {tupla de rótulos: valor}.
+    """
+
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, funcao: Callable, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.funcao = funcao
+        self.rotulos = tuple(rotulos)
+
+    def exportar(self) -> List[str]:
+        valor = self.funcao()
+        if not isinstance(valor, dict):
+            valor = {(): valor}
+        return [f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(v)}"
+                for chave, v in sorted(valor.items())]
+
+
+class Registro:
+    """Conjunto de métricas exportadas juntas"""
+
+    def __init__(self):
+        self._metricas: Dict[str, object] = {}
+        self._trava = threading.Lock()
+
+    def registrar(self, metrica):
+        """Registra (ou substitui, se o nome já existir) uma métrica e a retorna"""
+        with self._trava:
+            self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self._obter(nome) or self.registrar(Contador(nome, ajuda, rotulos))
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                   limites: Sequence[float] = LIMITES_PADRAO) -> Histograma:
+        return self._obter(nome) or self.registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def _obter(self, nome: str):
+        with self._trava:
+            return self._metricas.get(nome)
+
+    def exportar(self, filtro: Callable[[str], bool] = None) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)
+
+        Args:
+            filtro: Exporta só as métricas cujo nome o satisfaz (padrão: todas)
+        """
+        with self._trava:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            if filtro is not None and not filtro(metrica.nome):
+                continue
+            try:
+                corpo = metrica.exportar()
+            except Exception as e:
+                linhas.append(f"# Falha ao coletar {metrica.nome}: {_escapar(e)}")
+                continue
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(corpo)
+        return "\n".join(linhas) + "\n"
+
+
+# Registro global do processo
+REGISTRO = Registro()
@@ -2,9 +2,23 @@
 #RM: 564068
 
 from dataclasses import dataclass, field
-import random
+import itertools
+import math
 from typing import List
 
+# Peso da área projetada em +6 h (log2 de 1 + km²) na prioridade, somado à severidade
+PESO_PROJECAO = 0.5
+
+# Gerador de IDs sequenciais: únicos no processo e reprodutíveis entre execuções
+_proximo_id = itertools.count(1000)
+
+
+def avancar_ids(ultimo: int):
+    """Garante que os próximos IDs sejam maiores que `ultimo` (ex.: IDs já gravados no banco)"""
+    global _proximo_id
+    proximo = next(_proximo_id)
+    _proximo_id = itertools.count(max(proximo, ultimo + 1))
+
 @dataclass
 class ContatoEmergencia:
     """Contatos para notificação de emergências"""
@@ -13,28 +27,46 @@ class ContatoEmergencia:
     telefone: str
     tipo: str  # "autoridade" ou "comunidade"
     regioes: List[str]  # Regiões que este contato monitora
+    # Áreas de interesse (geocercas): {"tipo": "circulo", "centro": [lat, lon], "raio_km": r}
+    # ou {"tipo": "poligono", "vertices": [[lat, lon], ...]}; ver geocerca.py
+    areas: List[dict] = field(default_factory=list)
 
 
 @dataclass(order=True)
 class Ocorrencia:
     """Classe que representa uma ocorrência de incêndio"""
-    prioridade: int
+    prioridade: float
     local: list
     severidade: int
     regiao: str
-    id: int = field(default_factory=lambda: random.randint(1000, 9999))
+    id: int = field(default_factory=lambda: next(_proximo_id))
     status: str = field(default="Pendente")
     fogo_confirmado: bool = field(default=False)
     fogo_apagado: bool = field(default=False)
     tempo_inicio_fogo: float = field(default=0.0)
     tempo_fim_fogo: float = field(default=0.0)
+    registrada_em: float = field(default=0.0)  # Instante do registro (idade na priorização)
+    # Área queimada projetada (km²) pelo modelo de propagação; ver propagacao.py
+    area_projetada_1h: float = field(default=0.0)
+    area_projetada_6h: float = field(default=0.0)
 
     def __post_init__(self):
         """Configura prioridade baseada na severidade e região"""
         if not isinstance(self.local, (list, tuple)) or len(self.local) != 2:
             raise ValueError("Local deve ser uma lista/tupla com [latitude, longitude]")
 
-        self.prioridade = -self.severidade  # Heap máximo
+        self.recalcular_prioridade()
+
+    def recalcular_prioridade(self):
+        """Prioridade inicial a partir da severidade, da área projetada e da região
+
+        Usada no registro; depois a pontuação em lote do sistema
+        (priorizacao.py) acrescenta idade, confirmação e proximidade de cidades.
+        """
+        urgencia = self.severidade
+        if self.area_projetada_6h > 0:
+            urgencia += PESO_PROJECAO * math.log2(1 + self.area_projetada_6h)
+        self.prioridade = -urgencia  # Heap máximo
         if self.regiao in ["Amazônia", "Pantanal"]:
             self.prioridade *= 2  # Prioridade dobrada para regiões críticas
 
@@ -0,0 +1,362 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Ocorrências ativas particionadas por região (bioma).
+#
+# Cada região tem fila prioritária (heap), trava e trabalhador próprios: o
+# despacho, a conclusão das missões e as verificações de fogo de uma região
+# rodam na thread da sua partição. Uma rajada na Amazônia enche só a fila de
+# trabalho da Amazônia, e o Pampa continua sendo atendido no seu ritmo.
+# Consultas globais (/ocorrencias, /resumo) juntam os resultados das partições.
+#
+# Os trabalhadores compartilham o GIL. A parte numérica do despacho (a
+# atribuição drone x ocorrência, uma função pura sobre matrizes) pode rodar
+# em um processo por partição (`processos=True`) para usar mais núcleos.
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+from metricas import REGISTRO
+
+TRABALHOS_PARTICAO = REGISTRO.contador(
+    "sentinel_particao_trabalhos", "Trabalhos executados pelas partições, por região e tipo", ("regiao", "tipo"))
+
+
+class ParticaoRegiao:
+    """Ocorrências ativas de uma região, com fila de trabalho e thread próprias
+
+    Args:
+        regiao: Região (bioma) da partição
+        processo: Executa `calcular` em um processo próprio
+    """
+
+    def __init__(self, regiao: str, processo: bool = False):
+        self.regiao = regiao
+        self.processo = processo
+        self.fila: List = []  # Heap das ocorrências ativas da região
+        self.trava = threading.RLock()  # Protege a fila (a de cada região é independente)
+        self.com_candidatos = False  # Se o último despacho encontrou ocorrências a atender
+        self.rodada = 0  # Última rodada de despacho em que a partição foi atendida
+        self._trabalhos: deque = deque()
+        self._unicos: set = set()  # Tipos "únicos" já enfileirados (um despacho pendente basta)
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._ativa = False
+        self._executor = None
+        self.executados = 0
+        self.falhas = 0
+        self.tempo_total = 0.0
+        self.tempo_maximo = 0.0
+
+    def __len__(self):
+        return len(self.fila)
+
+    # ---------- Fila prioritária ----------
+
+    def inserir(self, ocorrencia):
+        with self.trava:
+            heapq.heappush(self.fila, ocorrencia)
+            self.com_candidatos = True
+
+    def remover(self, ocorrencia) -> bool:
+        """Retira uma ocorrência por identidade (O(n) da região) e refaz o heap"""
+        with self.trava:
+            fila = self.fila
+            for i, oc in enumerate(fila):
+                if oc is ocorrencia:
+                    ultima = fila.pop()
+                    if i < len(fila):
+                        fila[i] = ultima
+                        heapq.heapify(fila)
+                    return True
+        return False
+
+    def remover_varias(self, ocorrencias) -> int:
+        """Retira várias ocorrências da região de uma vez (uma passada e um heapify)"""
+        alvos = {id(oc) for oc in ocorrencias}
+        with self.trava:
+            antes = len(self.fila)
+            self.fila[:] = [oc for oc in self.fila if id(oc) not in alvos]
+            heapq.heapify(self.fila)
+            return antes - len(self.fila)
+
+    # ---------- Trabalhador ----------
+
+    @property
+    def em_execucao(self) -> bool:
+        return self._ativa
+
+    @property
+    def pendentes(self) -> int:
+        return len(self._trabalhos)
+
+    def iniciar(self):
+        with self._cond:
+            if self._ativa:
+                return
+            self._ativa = True
+            self._thread = threading.Thread(target=self._trabalhar, daemon=True, name=f"particao-{self.regiao}")
+            self._thread.start()
+
+    def parar(self, timeout: float = 5.0):
+        """Encerra o trabalhador (trabalhos ainda na fila são descartados)"""
+        with self._cond:
+            self._ativa = False
+            self._trabalhos.clear()
+            self._unicos.clear()
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def executar(self, tipo: str, funcao: Callable, *args, unico: bool = False):
+        """Executa `funcao(*args)` no trabalhador da partição (na hora, se ele não estiver ativo)
+
+        Args:
+            tipo: Nome do trabalho (métricas)
+            unico: Ignora o pedido se já houver um trabalho deste tipo aguardando
+        """
+        if not self._ativa:
+            self._rodar(tipo, funcao, args)
+            return
+        with self._cond:
+            if unico:
+                if tipo in self._unicos:
+                    return
+                self._unicos.add(tipo)
+            self._trabalhos.append((tipo, funcao, args, unico))
+            self._cond.notify()
+
+    def calcular(self, funcao: Callable, *args):
+        """Chama uma função pura (argumentos serializáveis) no processo da partição, se houver"""
+        if not self.processo:
+            return funcao(*args)
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        return self._executor.submit(funcao, *args).result()
+
+    def _trabalhar(self):
+        while True:
+            with self._cond:
+                while self._ativa and not self._trabalhos:
+                    self._cond.wait()
+                if not self._ativa:
+                    return
+                tipo, funcao, args, unico = self._trabalhos.popleft()
+                if unico:
+                    self._unicos.discard(tipo)
+            self._rodar(tipo, funcao, args)
+
+    def _rodar(self, tipo: str, funcao: Callable, args: tuple):
+        inicio = time.perf_counter()
+        try:
+            funcao(*args)
+        except Exception as e:
+            falhou = True
+            print(f"Erro no trabalho {tipo} da partição {self.regiao}: {str(e)}")
+        else:
+            falhou = False
+        duracao = time.perf_counter() - inicio
+        with self.trava:  # Os contadores também são lidos por outras threads em `estatisticas`
+            self.falhas += falhou
+            self.executados += 1
+            self.tempo_total += duracao
+            if duracao > self.tempo_maximo:
+                self.tempo_maximo = duracao
+        TRABALHOS_PARTICAO.inc(rotulos=(self.regiao, tipo))
+
+    # ---------- Consultas ----------
+
+    def resumo(self) -> dict:
+        """Contagens da região (somáveis entre partições)"""
+        with self.trava:
+            ativas = list(self.fila)
+        por_status: Dict[str, int] = {}
+        severidade_total = 0
+        severidade_maxima = 0
+        for oc in ativas:
+            por_status[oc.status] = por_status.get(oc.status, 0) + 1
+            severidade_total += oc.severidade
+            severidade_maxima = max(severidade_maxima, oc.severidade)
+        return {
+            "ativas": len(ativas),
+            "por_status": por_status,
+            "severidade_total": severidade_total,
+            "severidade_maxima": severidade_maxima,
+        }
+
+    def estatisticas(self) -> dict:
+        with self.trava:
+            return {
+                "regiao": self.regiao,
+                "ativas": len(self.fila),
+                "em_execucao": self._ativa,
+                "processo": self.processo,
+                "trabalhos_pendentes": len(self._trabalhos),
+                "executados": self.executados,
+                "falhas": self.falhas,
+                "tempo_medio": round(self.tempo_total / self.executados, 6) if self.executados else 0.0,
+                "tempo_maximo": round(self.tempo_maximo, 6),
+            }
+
+
+class FilaParticionada:
+    """Fila prioritária global como a união das partições por região
+
+    Lida como a lista de antes (`len`, iteração, `list()`), mas as escritas
+    vão para a partição da região da ocorrência. As partições são criadas na
+    primeira ocorrência de cada região.
+
+    Args:
+        processos: Cada partição calcula a atribuição em um processo próprio
+    """
+
+    def __init__(self, processos: bool = False):
+        self.processos = processos
+        self._particoes: Dict[str, ParticaoRegiao] = {}
+        self._trava = threading.Lock()
+        self._rodizio = itertools.count()
+        self.rodada = 0
+        self._ativa = False
+
+    def __len__(self):
+        return sum(len(p.fila) for p in list(self._particoes.values()))
+
+    def __bool__(self):
+        return any(p.fila for p in list(self._particoes.values()))
+
+    def __iter__(self) -> Iterator:
+        for particao in list(self._particoes.values()):
+            with particao.trava:
+                ativas = list(particao.fila)
+            yield from ativas
+
+    def particao(self, regiao: str) -> ParticaoRegiao:
+        """Partição da região (criada, e iniciada se as demais estiverem, no primeiro uso)"""
+        particao = self._particoes.get(regiao)
+        if particao is None:
+            with self._trava:
+                particao = self._particoes.get(regiao)
+                if particao is None:
+                    particao = self._particoes[regiao] = ParticaoRegiao(regiao, self.processos)
+                    if self._ativa:
+                        particao.iniciar()
+        return particao
+
+    def particoes(self) -> List[ParticaoRegiao]:
+        return list(self._particoes.values())
+
+    def em_rodizio(self) -> List[ParticaoRegiao]:
+        """Partições começando por uma diferente a cada chamada (nenhuma região vem sempre antes)"""
+        particoes = self.particoes()
+        if not particoes:
+            return []
+        inicio = next(self._rodizio) % len(particoes)
+        return particoes[inicio:] + particoes[:inicio]
+
+    def nova_rodada(self) -> int:
+        """Inicia uma rodada de despacho por todas as partições e retorna seu número"""
+        self.rodada += 1
+        return self.rodada
+
+    def disputando(self, rodada: int = None) -> int:
+        """Partições com ocorrências a atender no último despacho (só as ainda não atendidas na rodada)"""
+        return sum(1 for p in list(self._particoes.values())
+                   if p.com_candidatos and (rodada is None or p.rodada != rodada))
+
+    # ---------- Escrita ----------
+
+    def inserir(self, ocorrencia):
+        self.particao(ocorrencia.regiao).inserir(ocorrencia)
+
+    def remover(self, ocorrencia) -> bool:
+        particao = self._particoes.get(ocorrencia.regiao)
+        return particao is not None and particao.remover(ocorrencia)
+
+    def remover_varias(self, ocorrencias) -> int:
+        """Retira várias ocorrências, agrupadas por região; retorna quantas saíram"""
+        por_regiao: Dict[str, list] = {}
+        for ocorrencia in ocorrencias:
+            por_regiao.setdefault(ocorrencia.regiao, []).append(ocorrencia)
+        removidas = 0
+        for regiao, grupo in por_regiao.items():
+            particao = self._particoes.get(regiao)
+            if particao is not None:
+                removidas += particao.remover_varias(grupo)
+        return removidas
+
+    def retirar(self):
+        """Retira a ocorrência mais prioritária entre todas as regiões (None se vazia)"""
+        while True:
+            candidatas = []
+            for p in self.particoes():
+                with p.trava:  # Topo lido sob a trava: outra thread pode esvaziar a fila entre o teste e a leitura
+                    if p.fila:
+                        candidatas.append((p.fila[0], p))
+            if not candidatas:
+                return None
+            topo, particao = min(candidatas, key=lambda par: par[0])
+            with particao.trava:
+                if particao.fila and particao.fila[0] is topo:
+                    return heapq.heappop(particao.fila)
+            # O topo mudou entre a escolha e a trava (outra thread): escolhe de novo
+
+    def clear(self):
+        for particao in self.particoes():
+            with particao.trava:
+                particao.fila.clear()
+
+    # ---------- Trabalhadores ----------
+
+    def iniciar(self):
+        with self._trava:
+            self._ativa = True
+            particoes = list(self._particoes.values())
+        for particao in particoes:
+            particao.iniciar()
+
+    def parar(self, timeout: float = 5.0):
+        with self._trava:
+            self._ativa = False
+            particoes = list(self._particoes.values())
+        for particao in particoes:
+            particao.parar(timeout)
+
+    # ---------- Consultas globais ----------
+
+    def resumo(self) -> dict:
+        """Resumo global montado a partir do resumo de cada partição"""
+        por_regiao = {p.regiao: p.resumo() for p in self.particoes()}
+        por_status: Dict[str, int] = {}
+        for parcial in por_regiao.values():
+            for status, quantidade in parcial["por_status"].items():
+                por_status[status] = por_status.get(status, 0) + quantidade
+        ativas = sum(parcial["ativas"] for parcial in por_regiao.values())
+        severidade_total = sum(parcial["severidade_total"] for parcial in por_regiao.values())
+        return {
+            "ativas": ativas,
+            "por_status": por_status,
+            "severidade_media": round(severidade_total / ativas, 2) if ativas else 0.0,
+            "severidade_maxima": max((parcial["severidade_maxima"] for parcial in por_regiao.values()), default=0),
+            "regioes": {
+                regiao: {
+                    "ativas": parcial["ativas"],
+                    "por_status": parcial["por_status"],
+                    "severidade_media": round(parcial["severidade_total"] / parcial["ativas"], 2)
+                    if parcial["ativas"] else 0.0,
+                    "severidade_maxima": parcial["severidade_maxima"],
+                }
+                for regiao, parcial in por_regiao.items()
+            },
+        }
+
+    def estatisticas(self) -> List[dict]:
+        return [p.estatisticas() for p in self.particoes()]
@@ -0,0 +1,367 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Persistência opcional em SQLite (modo WAL) para consultas históricas.
+#
+# O caminho quente (registro de ocorrências, callbacks das missões) apenas
+# coloca uma tupla em uma fila; uma thread escritora agrupa as tuplas em
+# lotes e grava cada lote em uma única transação. As consultas abrem uma
+# conexão de leitura por thread, que no modo WAL não bloqueia a escritora.
+# Um novo líder dos workers reconstrói o estado em memória a partir do banco
+# (`carregar_estado`; ver SistemaEmergencia.restaurar).
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from metricas import REGISTRO
+
+REGISTROS_PERSISTIDOS = REGISTRO.contador(
+    "sentinel_persistencia_registros", "Registros gravados no SQLite por tabela", ("tabela",))
+DURACAO_LOTES = REGISTRO.histograma(
+    "sentinel_persistencia_lote_segundos", "Duração da gravação de cada lote no SQLite")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS ocorrencias (
+    id INTEGER PRIMARY KEY,
+    latitude REAL,
+    longitude REAL,
+    severidade INTEGER,
+    severidade_maxima INTEGER,
+    regiao TEXT,
+    status TEXT,
+    fogo_confirmado INTEGER,
+    tempo_inicio_fogo REAL,
+    tempo_fim_fogo REAL,
+    timestamp REAL,
+    atualizada_em REAL
+);
+CREATE INDEX IF NOT EXISTS idx_ocorrencias_regiao_timestamp ON ocorrencias (regiao, timestamp);
+CREATE INDEX IF NOT EXISTS idx_ocorrencias_status ON ocorrencias (status);
+
+CREATE TABLE IF NOT EXISTS historico (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL,
+    tipo TEXT,
+    conteudo TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_historico_timestamp ON historico (timestamp);
+
+CREATE TABLE IF NOT EXISTS historico_drones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL,
+    drone TEXT,
+    acao TEXT,
+    ocorrencia_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_historico_drones_ocorrencia ON historico_drones (ocorrencia_id);
+CREATE INDEX IF NOT EXISTS idx_historico_drones_timestamp ON historico_drones (timestamp);
+
+CREATE TABLE IF NOT EXISTS contatos (
+    nome TEXT,
+    email TEXT,
+    telefone TEXT,
+    tipo TEXT,
+    regioes TEXT,
+    areas TEXT,
+    atualizado_em REAL,
+    PRIMARY KEY (nome, email)
+);
+"""
+
+# A primeira gravação define `timestamp` (registro); as seguintes só atualizam o estado
+SQL_OCORRENCIA = """
+INSERT INTO ocorrencias (id, latitude, longitude, severidade, severidade_maxima, regiao, status,
+                         fogo_confirmado, tempo_inicio_fogo, tempo_fim_fogo, timestamp, atualizada_em)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    severidade = excluded.severidade,
+    severidade_maxima = MAX(severidade_maxima, excluded.severidade_maxima),
+    status = excluded.status,
+    fogo_confirmado = excluded.fogo_confirmado,
+    tempo_inicio_fogo = excluded.tempo_inicio_fogo,
+    tempo_fim_fogo = excluded.tempo_fim_fogo,
+    atualizada_em = excluded.atualizada_em
+"""
+SQL_HISTORICO = "INSERT INTO historico (timestamp, tipo, conteudo) VALUES (?, ?, ?)"
+SQL_DRONE = "INSERT INTO historico_drones (timestamp, drone, acao, ocorrencia_id) VALUES (?, ?, ?, ?)"
+SQL_CONTATO = """
+INSERT INTO contatos (nome, email, telefone, tipo, regioes, areas, atualizado_em) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(nome, email) DO UPDATE SET
+    telefone = excluded.telefone,
+    tipo = excluded.tipo,
+    regioes = excluded.regioes,
+    areas = excluded.areas,
+    atualizado_em = excluded.atualizado_em
+"""
+
+# Status das ocorrências que continuam na camada ativa (as demais estão resolvidas)
+STATUS_ATIVOS = ("Pendente", "Em verificação", "Fogo ativo")
+
+_SQL_POR_TABELA = {
+    "ocorrencias": SQL_OCORRENCIA,
+    "historico": SQL_HISTORICO,
+    "historico_drones": SQL_DRONE,
+    "contatos": SQL_CONTATO,
+}
+
+
+class PersistenciaSQLite:
+    """Armazenamento histórico em SQLite com escrita em lotes
+
+    Args:
+        caminho: Arquivo do banco (precisa ser um arquivo: as conexões de
+            leitura e a de escrita são independentes)
+        tamanho_lote: Máximo de registros gravados por transação
+        intervalo: Espera máxima da escritora por novos registros (segundos)
+    """
+
+    def __init__(self, caminho: str, tamanho_lote: int = 1000, intervalo: float = 0.5):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self._fila: "queue.SimpleQueue" = queue.SimpleQueue()  # Sem trava de Python: put é O(1) e barato
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.gravados = 0
+        self.falhas = 0
+
+        conexao = sqlite3.connect(caminho)
+        try:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.executescript(ESQUEMA)
+            conexao.commit()
+        finally:
+            conexao.close()
+
+    # ---------- Escrita (caminho quente: apenas enfileira) ----------
+
+    def _enfileirar(self, tabela: str, valores: tuple):
+        if self._thread is None:
+            self.iniciar()
+        self._fila.put((tabela, valores))
+
+    def salvar_ocorrencia(self, ocorrencia, instante: float):
+        """Grava (ou atualiza) o estado atual da ocorrência"""
+        self._enfileirar("ocorrencias", (
+            ocorrencia.id, float(ocorrencia.local[0]), float(ocorrencia.local[1]),
+            ocorrencia.severidade, ocorrencia.severidade, ocorrencia.regiao, ocorrencia.status,
+            1 if ocorrencia.fogo_confirmado else 0, ocorrencia.tempo_inicio_fogo, ocorrencia.tempo_fim_fogo,
+            instante, instante
+        ))
+
+    def salvar_historico(self, entrada, instante: float, tipo: str = None):
+        """Grava uma entrada do histórico do sistema (texto ou dicionário)
+
+        Args:
+            tipo: Tipo do evento (eventos.TIPOS); sem ele, o "tipo" do dicionário ou "texto"
+        """
+        if isinstance(entrada, dict):
+            conteudo = json.dumps(entrada, ensure_ascii=False, default=str)
+            tipo = tipo or entrada.get("tipo", "registro")
+        else:
+            tipo, conteudo = tipo or "texto", str(entrada)
+        self._enfileirar("historico", (instante, tipo, conteudo))
+
+    def salvar_acao_drone(self, drone_id: str, acao: str, ocorrencia_id: Optional[int], instante: float):
+        """Grava uma ação do DroneTracker"""
+        self._enfileirar("historico_drones", (instante, drone_id, acao, ocorrencia_id))
+
+    def salvar_contato(self, contato, instante: float):
+        """Grava (ou atualiza) um contato de emergência cadastrado"""
+        self._enfileirar("contatos", (
+            contato.nome, contato.email, contato.telefone, contato.tipo,
+            json.dumps(list(contato.regioes), ensure_ascii=False), json.dumps(list(contato.areas), ensure_ascii=False),
+            instante
+        ))
+
+    @property
+    def pendentes(self) -> int:
+        """Registros enfileirados ainda não gravados"""
+        return self._fila.qsize()
+
+    def iniciar(self):
+        """Inicia a thread escritora (chamado automaticamente na primeira gravação)"""
+        with self._trava:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._escrever, daemon=True, name="persistencia")
+                self._thread.start()
+
+    def descarregar(self):
+        """Bloqueia até que todos os registros enfileirados estejam gravados"""
+        if self._thread is not None:
+            marcador = threading.Event()
+            self._fila.put(marcador)
+            marcador.wait()
+
+    def parar(self, timeout: float = 5.0):
+        """Grava o que estiver pendente e encerra a thread escritora"""
+        with self._trava:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._fila.put(None)
+        thread.join(timeout)
+
+    def _escrever(self):
+        conexao = sqlite3.connect(self.caminho)
+        conexao.execute("PRAGMA synchronous=NORMAL")  # Seguro no modo WAL e bem mais rápido
+        try:
+            while True:
+                try:
+                    primeiro = self._fila.get(timeout=self.intervalo)
+                except queue.Empty:
+                    continue
+                lote = [primeiro]
+                while len(lote) < self.tamanho_lote:
+                    try:
+                        lote.append(self._fila.get_nowait())
+                    except queue.Empty:
+                        break
+                # Itens de controle: None encerra; um Event é sinalizado após a gravação
+                registros = [item for item in lote if isinstance(item, tuple)]
+                self._gravar_lote(conexao, registros)
+                for item in lote:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                if None in lote:
+                    return
+        finally:
+            conexao.close()
+
+    def _gravar_lote(self, conexao: sqlite3.Connection, lote: List[tuple]):
+        if not lote:
+            return
+        por_tabela = {}
+        for tabela, valores in lote:
+            por_tabela.setdefault(tabela, []).append(valores)
+        inicio = time.perf_counter()
+        try:
+            with conexao:  # Uma transação por lote
+                # Ocorrências mantêm a ordem de chegada (várias transições por id no mesmo lote)
+                for tabela, linhas in por_tabela.items():
+                    conexao.executemany(_SQL_POR_TABELA[tabela], linhas)
+        except sqlite3.Error as e:
+            self.falhas += len(lote)
+            print(f"Erro ao gravar lote no SQLite: {str(e)}")
+            return
+        DURACAO_LOTES.observar(time.perf_counter() - inicio)
+        self.gravados += len(lote)
+        for tabela, linhas in por_tabela.items():
+            REGISTROS_PERSISTIDOS.inc(len(linhas), (tabela,))
+
+    # ---------- Consultas (filtros executados no SQL) ----------
+
+    def _leitura(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho)
+            conexao.row_factory = sqlite3.Row
+            self._local.conexao = conexao
+        return conexao
+
+    def _consultar(self, sql: str, condicoes: List[str], parametros: list, ordem: str, limite: int) -> List[dict]:
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += f" ORDER BY {ordem} LIMIT ?"
+        return [dict(linha) for linha in self._leitura().execute(sql, parametros + [limite])]
+
+    def consultar_ocorrencias(self, regiao: str = None, status: str = None, severidade_min: int = None,
+                              de: float = None, ate: float = None, limite: int = 100) -> List[dict]:
+        """Ocorrências por região, status, severidade máxima atingida e instante de registro
+
+        Args:
+            de / ate: Intervalo do instante de registro (segundos desde a época)
+        """
+        condicoes, parametros = [], []
+        if regiao is not None:
+            condicoes.append("regiao = ?")
+            parametros.append(regiao)
+        if status is not None:
+            condicoes.append("status = ?")
+            parametros.append(status)
+        if severidade_min is not None:
+            condicoes.append("severidade_maxima >= ?")
+            parametros.append(severidade_min)
+        if de is not None:
+            condicoes.append("timestamp >= ?")
+            parametros.append(de)
+        if ate is not None:
+            condicoes.append("timestamp <= ?")
+            parametros.append(ate)
+        return self._consultar("SELECT * FROM ocorrencias", condicoes, parametros, "timestamp DESC", limite)
+
+    def consultar_historico(self, tipo: str = None, de: float = None, ate: float = None,
+                            limite: int = 100) -> List[dict]:
+        """Entradas do histórico do sistema, das mais recentes para as mais antigas"""
+        condicoes, parametros = [], []
+        if tipo is not None:
+            condicoes.append("tipo = ?")
+            parametros.append(tipo)
+        if de is not None:
+            condicoes.append("timestamp >= ?")
+            parametros.append(de)
+        if ate is not None:
+            condicoes.append("timestamp <= ?")
+            parametros.append(ate)
+        return self._consultar("SELECT * FROM historico", condicoes, parametros, "timestamp DESC, id DESC", limite)
+
+    def consultar_historico_drones(self, drone: str = None, ocorrencia_id: int = None, de: float = None,
+                                   ate: float = None, limite: int = 100) -> List[dict]:
+        """Ações dos drones, das mais recentes para as mais antigas"""
+        condicoes, parametros = [], []
+        if drone is not None:
+            condicoes.append("drone = ?")
+            parametros.append(drone)
+        if ocorrencia_id is not None:
+            condicoes.append("ocorrencia_id = ?")
+            parametros.append(ocorrencia_id)
+        if de is not None:
+            condicoes.append("timestamp >= ?")
+            parametros.append(de)
+        if ate is not None:
+            condicoes.append("timestamp <= ?")
+            parametros.append(ate)
+        return self._consultar("SELECT * FROM historico_drones", condicoes, parametros,
+                               "timestamp DESC, id DESC", limite)
+
+    # ---------- Estado para um novo líder ----------
+
+    def carregar_estado(self, resolvidas_desde: float = 0.0) -> dict:
+        """Estado gravado para um novo líder retomar o sistema
+
+        Args:
+            resolvidas_desde: Resolvidas atualizadas antes deste instante ficam só no banco
+
+        Returns:
+            dict: "ativas" e "resolvidas" (linhas de ocorrências), "missoes" ({id da
+            ocorrência em verificação: (drone, instante do despacho)}), "contatos"
+            e "ultimo_id" (maior id de ocorrência gravado)
+        """
+        conexao = self._leitura()
+        marcadores = ", ".join("?" * len(STATUS_ATIVOS))
+        ativas = [dict(linha) for linha in conexao.execute(
+            f"SELECT * FROM ocorrencias WHERE status IN ({marcadores}) ORDER BY id", STATUS_ATIVOS)]
+        resolvidas = [dict(linha) for linha in conexao.execute(
+            f"SELECT * FROM ocorrencias WHERE status NOT IN ({marcadores}) AND atualizada_em >= ? "
+            "ORDER BY atualizada_em", STATUS_ATIVOS + (resolvidas_desde,))]
+        # Último despacho de cada ocorrência ainda em verificação (o drone que está em voo)
+        missoes = {}
+        for linha in conexao.execute(
+                "SELECT ocorrencia_id, drone, timestamp FROM historico_drones WHERE acao = 'Missão iniciada' "
+                "AND ocorrencia_id IN (SELECT id FROM ocorrencias WHERE status = 'Em verificação') ORDER BY id"):
+            missoes[linha["ocorrencia_id"]] = (linha["drone"], linha["timestamp"])
+        contatos = [dict(linha, regioes=json.loads(linha["regioes"]), areas=json.loads(linha["areas"]))
+                    for linha in conexao.execute("SELECT * FROM contatos ORDER BY atualizado_em")]
+        ultimo_id = conexao.execute("SELECT MAX(id) FROM ocorrencias").fetchone()[0]
+        return {
+            "ativas": ativas,
+            "resolvidas": resolvidas,
+            "missoes": missoes,
+            "contatos": contatos,
+            "ultimo_id": ultimo_id or 0,
+        }
@@ -0,0 +1,186 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Pontuação de prioridade das ocorrências ativas, calculada em lote.
+#
+# As ocorrências viram colunas (NumPy) e uma pontuação substituível calcula a
+# urgência de todas de uma vez. A pontuação padrão combina severidade, área
+# projetada, idade, confirmação do fogo, proximidade de cidades e o peso do
+# bioma. Só as ocorrências cuja urgência mudou mais que uma tolerância voltam
+# para o heap, cada uma subindo ou descendo a partir da sua posição; se muitas
+# mudaram, o heap é refeito de uma vez.
+#
+# Qualquer objeto com `pontuar(colunas) -> np.ndarray` (urgência, maior = mais
+# urgente) pode substituir a pontuação padrão em `SistemaEmergencia.pontuacao`.
+
+import heapq
+import itertools
+import operator
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from geocerca import KM_POR_GRAU
+
+# Cidades usadas na proximidade de áreas povoadas: (nome, latitude, longitude)
+LOCALIDADES = [
+    ("São Paulo", -23.55, -46.63), ("Rio de Janeiro", -22.91, -43.17), ("Brasília", -15.79, -47.88),
+    ("Salvador", -12.97, -38.50), ("Fortaleza", -3.72, -38.54), ("Belo Horizonte", -19.92, -43.94),
+    ("Manaus", -3.12, -60.02), ("Curitiba", -25.43, -49.27), ("Recife", -8.05, -34.88),
+    ("Goiânia", -16.68, -49.25), ("Belém", -1.46, -48.49), ("Porto Alegre", -30.03, -51.23),
+    ("São Luís", -2.53, -44.30), ("Maceió", -9.67, -35.74), ("Campo Grande", -20.47, -54.62),
+    ("Natal", -5.79, -35.21), ("Teresina", -5.09, -42.80), ("João Pessoa", -7.12, -34.86),
+    ("Cuiabá", -15.60, -56.10), ("Aracaju", -10.91, -37.07), ("Florianópolis", -27.60, -48.55),
+    ("Porto Velho", -8.76, -63.90), ("Macapá", 0.03, -51.07), ("Rio Branco", -9.97, -67.81),
+    ("Vitória", -20.32, -40.34), ("Boa Vista", 2.82, -60.67), ("Palmas", -10.18, -48.33),
+    ("Santarém", -2.44, -54.71), ("Marabá", -5.37, -49.12), ("Corumbá", -19.01, -57.65),
+    ("Sinop", -11.86, -55.50), ("Altamira", -3.20, -52.21), ("Imperatriz", -5.53, -47.48),
+]
+
+# Peso multiplicativo de cada bioma (Amazônia e Pantanal continuam com o dobro)
+PESOS_BIOMA = {"Amazônia": 2.0, "Pantanal": 2.0}
+
+
+_NUMERICOS = ("severidade", "area_projetada_1h", "area_projetada_6h", "registrada_em", "fogo_confirmado",
+              "prioridade")
+_ler_numericos = operator.attrgetter(*_NUMERICOS)
+
+
+def colunas_ocorrencias(ocorrencias: Sequence, agora: float) -> Dict[str, np.ndarray]:
+    """Atributos das ocorrências como colunas para a pontuação em lote
+
+    Colunas: severidade, area_1h, area_6h, idade_h, confirmado, lat, lon,
+    regiao (lista de str) e prioridade (valor atual no heap).
+    """
+    n = len(ocorrencias)
+    # fromiter sobre os valores encadeados evita montar uma lista de tuplas intermediária
+    numericos = np.fromiter(itertools.chain.from_iterable(map(_ler_numericos, ocorrencias)), dtype=np.float64,
+                            count=n * len(_NUMERICOS)).reshape(n, len(_NUMERICOS))
+    locais = np.fromiter(itertools.chain.from_iterable(oc.local for oc in ocorrencias), dtype=np.float64,
+                         count=2 * n).reshape(n, 2)
+    registrada = numericos[:, 3]
+    return {
+        "severidade": numericos[:, 0],
+        "area_1h": numericos[:, 1],
+        "area_6h": numericos[:, 2],
+        "idade_h": np.where(registrada > 0, np.maximum(agora - registrada, 0.0) / 3600.0, 0.0),
+        "confirmado": numericos[:, 4] > 0,
+        "lat": locais[:, 0],
+        "lon": locais[:, 1],
+        "regiao": [oc.regiao for oc in ocorrencias],
+        "prioridade": numericos[:, 5],
+    }
+
+
+class PontuacaoPadrao:
+    """Urgência = (severidade + área + idade + confirmação + proximidade) × peso do bioma
+
+    Args:
+        peso_area: Multiplica log2(1 + área projetada em +6 h, km²)
+        peso_idade: Acréscimo máximo pela idade, alcançado em `idade_saturacao_h`
+        peso_confirmacao: Acréscimo quando o fogo foi confirmado pelo drone
+        peso_proximidade: Acréscimo junto a uma cidade, decaindo com exp(-d / escala_proximidade_km)
+        pesos_bioma: Peso multiplicativo por bioma (padrão 1)
+        localidades: (nome, lat, lon) das áreas povoadas
+    """
+
+    def __init__(self, peso_area: float = 0.5, peso_idade: float = 1.0, idade_saturacao_h: float = 6.0,
+                 peso_confirmacao: float = 1.0, peso_proximidade: float = 2.0, escala_proximidade_km: float = 25.0,
+                 pesos_bioma: Dict[str, float] = None, localidades: Sequence[tuple] = None):
+        self.peso_area = peso_area
+        self.peso_idade = peso_idade
+        self.idade_saturacao_h = idade_saturacao_h
+        self.peso_confirmacao = peso_confirmacao
+        self.peso_proximidade = peso_proximidade
+        self.escala_proximidade_km = escala_proximidade_km
+        self.pesos_bioma = PESOS_BIOMA if pesos_bioma is None else pesos_bioma
+        self._cidades = np.array([(lat, lon) for _, lat, lon in (localidades or LOCALIDADES)], dtype=np.float64)
+
+    def distancia_povoado(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Distância (km) de cada ponto à cidade mais próxima
+
+        Aproximação equirretangular em float32: nas distâncias em que a
+        proximidade pesa (dezenas de km) o erro é desprezível e o cálculo é
+        várias vezes mais barato que o haversine para n × cidades pares.
+        """
+        cidades = self._cidades.astype(np.float32)
+        lat = lat.astype(np.float32)[:, None]
+        dlat = lat - cidades[None, :, 0]
+        dlon = (lon.astype(np.float32)[:, None] - cidades[None, :, 1]) * np.cos(np.radians(lat))
+        return np.sqrt((dlat * dlat + dlon * dlon).min(axis=1)) * np.float32(KM_POR_GRAU)
+
+    def pontuar(self, colunas: Dict[str, np.ndarray]) -> np.ndarray:
+        urgencia = colunas["severidade"] + self.peso_area * np.log2(1.0 + colunas["area_6h"])
+        urgencia += self.peso_idade * np.minimum(colunas["idade_h"] / self.idade_saturacao_h, 1.0)
+        urgencia += self.peso_confirmacao * colunas["confirmado"]
+        distancia = self.distancia_povoado(colunas["lat"], colunas["lon"])
+        urgencia += self.peso_proximidade * np.exp(-distancia / self.escala_proximidade_km)
+        pesos = np.fromiter((self.pesos_bioma.get(regiao, 1.0) for regiao in colunas["regiao"]), dtype=np.float64,
+                            count=len(colunas["regiao"]))
+        return urgencia * pesos
+
+
+def _subir(fila: list, i: int, posicoes: Dict[int, int]):
+    item = fila[i]
+    while i > 0:
+        pai = (i - 1) // 2
+        if not item < fila[pai]:
+            break
+        fila[i] = fila[pai]
+        posicoes[id(fila[i])] = i
+        i = pai
+    fila[i] = item
+    posicoes[id(item)] = i
+
+
+def _descer(fila: list, i: int, posicoes: Dict[int, int]):
+    item = fila[i]
+    n = len(fila)
+    while True:
+        filho = 2 * i + 1
+        if filho >= n:
+            break
+        if filho + 1 < n and fila[filho + 1] < fila[filho]:
+            filho += 1
+        if not fila[filho] < item:
+            break
+        fila[i] = fila[filho]
+        posicoes[id(fila[i])] = i
+        i = filho
+    fila[i] = item
+    posicoes[id(item)] = i
+
+
+def reposicionar(fila: list, alteradas: Sequence, prioridades: Sequence[float], limiar_heapify: float = 0.125) -> int:
+    """Aplica novas prioridades e restaura o heap mexendo só nas ocorrências alteradas
+
+    Cada alterada sobe ou desce a partir da sua posição (O(log n)); quando
+    mais de `limiar_heapify` da fila mudou, é mais barato refazer o heap.
+    Ocorrências que já saíram da fila só recebem o novo valor.
+
+    Returns:
+        int: Quantidade de ocorrências reposicionadas
+    """
+    if len(alteradas) > limiar_heapify * len(fila):
+        for ocorrencia, prioridade in zip(alteradas, prioridades):
+            ocorrencia.prioridade = prioridade
+        heapq.heapify(fila)
+        return len(alteradas)
+    posicoes = {id(oc): i for i, oc in enumerate(fila)}
+    for ocorrencia, prioridade in zip(alteradas, prioridades):
+        anterior = ocorrencia.prioridade
+        ocorrencia.prioridade = prioridade
+        i = posicoes.get(id(ocorrencia))
+        if i is None:
+            continue
+        if prioridade < anterior:
+            _subir(fila, i, posicoes)
+        else:
+            _descer(fila, i, posicoes)
+    return len(alteradas)
+
+
+def alteradas(ocorrencias: Sequence, atuais: np.ndarray, novas: np.ndarray, tolerancia: float) -> List[tuple]:
+    """Pares (ocorrência, nova prioridade) cuja prioridade mudou mais que a tolerância"""
+    indices = np.flatnonzero(np.abs(novas - atuais) > tolerancia)
+    return [(ocorrencias[i], float(novas[i])) for i in indices.tolist()]
@@ -0,0 +1,221 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Projeção da propagação do fogo em torno das ocorrências ativas.
+#
+# Autômato celular em uma grade local centrada em cada ocorrência, executado
+# em lote (NumPy) para todas as ocorrências de uma vez. A taxa de propagação
+# segue a forma do modelo de Rothermel simplificada: taxa base do combustível,
+# amortecida pela umidade (polinômio de Rothermel para η_M) e multiplicada pelo
+# fator de vento 1 + φ·cos θ na direção em que o vento sopra (recuo contra o
+# vento). A cada passo, cada célula acumula o avanço vindo do vizinho em chamas
+# mais rápido das 8 direções e pega fogo quando o acumulado chega a 1.
+#
+# O tamanho da célula de cada lote é escolhido para que a frente mais rápida
+# avance no máximo uma célula por passo (condição CFL), então a grade sempre
+# comporta as 6 horas projetadas. Vento e combustível vêm de arquivos CSV em
+# grade regular; sem arquivo, vale o combustível típico do bioma e vento calmo.
+
+import csv
+import math
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Modelo de combustível -> (taxa de propagação sem vento em m/min, umidade de extinção)
+MODELOS_COMBUSTIVEL: Dict[str, Tuple[float, float]] = {
+    "campo": (18.0, 0.25),
+    "savana": (9.0, 0.30),
+    "arbustivo": (6.0, 0.25),
+    "umido": (4.0, 0.40),
+    "floresta": (1.5, 0.30),
+    "floresta_umida": (0.8, 0.35),
+}
+
+COMBUSTIVEL_POR_BIOMA = {
+    "Amazônia": "floresta_umida",
+    "Cerrado": "savana",
+    "Pantanal": "umido",
+    "Mata Atlântica": "floresta",
+    "Caatinga": "arbustivo",
+    "Pampa": "campo",
+}
+COMBUSTIVEL_PADRAO = "savana"
+UMIDADE_PADRAO = 0.08  # Umidade do combustível morto (fração) quando não há arquivo
+
+# Vizinhos (linha, coluna) e rumo de cada um em radianos (0 = norte, sentido horário);
+# a linha cresce para o sul
+VIZINHOS = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+RUMOS = np.radians([0.0, 45.0, 90.0, 135.0, 180.0, 225.0, 270.0, 315.0])
+DISTANCIAS = np.array([1.0, math.sqrt(2)] * 4)
+
+
+def amortecimento_umidade(umidade: np.ndarray, umidade_extincao: np.ndarray) -> np.ndarray:
+    """Coeficiente η_M de Rothermel (1 seco, 0 na umidade de extinção)"""
+    r = np.clip(umidade / umidade_extincao, 0.0, 1.0)
+    return np.clip(1 - 2.59 * r + 5.11 * r ** 2 - 3.52 * r ** 3, 0.0, 1.0)
+
+
+def fator_vento(velocidade_kmh: np.ndarray) -> np.ndarray:
+    """Coeficiente φ do vento: a frente a favor do vento avança (1 + φ) vezes a taxa base"""
+    return 0.06 * np.asarray(velocidade_kmh, dtype=np.float64) ** 1.3
+
+
+class CamposAmbientais:
+    """Vento e combustível em uma grade regular, lidos de arquivos CSV
+
+    vento:       lat,lon,velocidade_kmh,direcao_graus  (direção de onde o vento vem)
+    combustível: lat,lon,modelo,umidade                (modelo de MODELOS_COMBUSTIVEL)
+
+    Cada ocorrência usa o ponto da grade mais próximo (arredondamento para a
+    `resolucao`); pontos sem dado usam vento calmo e o combustível do bioma.
+    """
+
+    def __init__(self, resolucao: float = 0.25):
+        self.resolucao = resolucao
+        self._vento: Dict[Tuple[int, int], Tuple[float, float]] = {}
+        self._combustivel: Dict[Tuple[int, int], Tuple[str, float]] = {}
+
+    def _chave(self, lat: float, lon: float) -> Tuple[int, int]:
+        return round(lat / self.resolucao), round(lon / self.resolucao)
+
+    def carregar_vento(self, caminho: str) -> int:
+        """Lê o CSV de vento; retorna a quantidade de pontos"""
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            for linha in csv.DictReader(arquivo):
+                self._vento[self._chave(float(linha['lat']), float(linha['lon']))] = (
+                    float(linha['velocidade_kmh']), float(linha['direcao_graus']))
+        return len(self._vento)
+
+    def carregar_combustivel(self, caminho: str) -> int:
+        """Lê o CSV de combustível; retorna a quantidade de pontos
+
+        Raises:
+            ValueError: Modelo de combustível desconhecido
+        """
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            for linha in csv.DictReader(arquivo):
+                modelo = linha['modelo'].strip()
+                if modelo not in MODELOS_COMBUSTIVEL:
+                    raise ValueError(f"Modelo de combustível desconhecido: {modelo} "
+                                     f"(use {', '.join(MODELOS_COMBUSTIVEL)})")
+                umidade = float(linha['umidade']) if linha.get('umidade') else UMIDADE_PADRAO
+                self._combustivel[self._chave(float(linha['lat']), float(linha['lon']))] = (modelo, umidade)
+        return len(self._combustivel)
+
+    def parametros(self, locais: Sequence[Sequence[float]], regioes: Sequence[str]):
+        """Taxa base amortecida (m/min), velocidade (km/h) e direção de origem do vento (graus) de cada local"""
+        taxas = np.empty(len(locais))
+        extincao = np.empty(len(locais))
+        umidades = np.empty(len(locais))
+        velocidades = np.zeros(len(locais))
+        direcoes = np.zeros(len(locais))
+        for i, ((lat, lon), regiao) in enumerate(zip(locais, regioes)):
+            chave = self._chave(lat, lon)
+            modelo, umidade = self._combustivel.get(
+                chave, (COMBUSTIVEL_POR_BIOMA.get(regiao, COMBUSTIVEL_PADRAO), UMIDADE_PADRAO))
+            taxas[i], extincao[i] = MODELOS_COMBUSTIVEL[modelo]
+            umidades[i] = umidade
+            vento = self._vento.get(chave)
+            if vento is not None:
+                velocidades[i], direcoes[i] = vento
+        return taxas * amortecimento_umidade(umidades, extincao), velocidades, direcoes
+
+
+class ModeloPropagacao:
+    """Projeta a área queimada em +1 h e +6 h de várias ocorrências de uma vez
+
+    Args:
+        campos: Vento e combustível (padrão: sem arquivos)
+        passos_hora: Passos do autômato por hora (a grade tem 2·(6·passos_hora + 2 + r) + 1 células
+            de lado, com r o maior raio inicial do lote, em células)
+        celula_minima_m: Menor lado de célula, para fogos muito lentos
+        lote: Máximo de ocorrências processadas juntas (limita a memória a lote × grade²)
+        razao_lote: Razão máxima entre a frente mais rápida e a mais lenta de um lote
+    """
+
+    HORIZONTES = (1, 6)
+
+    def __init__(self, campos: Optional[CamposAmbientais] = None, passos_hora: int = 2,
+                 celula_minima_m: float = 30.0, lote: int = 1024, razao_lote: float = 2.0):
+        self.campos = campos or CamposAmbientais()
+        self.passos_hora = passos_hora
+        self.celula_minima_m = celula_minima_m
+        self.lote = lote
+        self.razao_lote = razao_lote
+        self.passos = self.HORIZONTES[-1] * passos_hora
+        self.centro = self.passos + 2  # Margem de 2 células; cada lote soma o maior raio do fogo inicial
+        self.lado = 2 * self.centro + 1
+
+    def projetar(self, locais: Sequence[Sequence[float]], severidades: Sequence[int],
+                 regioes: Sequence[str]) -> np.ndarray:
+        """Área projetada em km² em +1 h e +6 h
+
+        Returns:
+            np.ndarray: Matriz (n, 2) na ordem das ocorrências recebidas
+        """
+        n = len(locais)
+        areas = np.zeros((n, len(self.HORIZONTES)))
+        if n == 0:
+            return areas
+        taxas, velocidades, direcoes = self.campos.parametros(locais, regioes)
+        phi = fator_vento(velocidades)
+        severidades = np.asarray(severidades, dtype=np.float64)
+
+        # Lotes de ocorrências com velocidades parecidas (até `razao_lote` vezes a
+        # mais lenta do lote): a célula de cada lote acompanha a frente mais rápida
+        # dele, e as mais lentas ainda avançam uma fração razoável de célula por passo
+        frentes = taxas * (1 + phi)
+        ordem = np.argsort(frentes, kind="stable")
+        ordenadas = frentes[ordem]
+        inicio = 0
+        while inicio < n:
+            limite = ordenadas[inicio] * self.razao_lote
+            fim = min(int(np.searchsorted(ordenadas, limite, side="right")), inicio + self.lote)
+            fim = max(fim, inicio + 1)
+            indices = ordem[inicio:fim]
+            areas[indices] = self._projetar_lote(taxas[indices], phi[indices], direcoes[indices],
+                                                 severidades[indices])
+            inicio = fim
+        return areas
+
+    def _projetar_lote(self, taxas: np.ndarray, phi: np.ndarray, direcoes: np.ndarray,
+                       severidades: np.ndarray) -> np.ndarray:
+        minutos_passo = 60.0 / self.passos_hora
+        celula = max(float(np.max(taxas * (1 + phi))) * minutos_passo, self.celula_minima_m)
+
+        # Taxa em cada uma das 8 direções: a favor do vento (1 + φ·cos θ), contra (1 / (1 + φ·|cos θ|))
+        rumo_fogo = np.radians(direcoes + 180.0)  # O fogo avança para onde o vento sopra
+        cosseno = np.cos(RUMOS[None, :] - rumo_fogo[:, None])
+        fator = np.where(cosseno > 0, 1 + phi[:, None] * cosseno, 1 / (1 + phi[:, None] * np.abs(cosseno)))
+        avanco = (taxas[:, None] * fator * minutos_passo / (celula * DISTANCIAS[None, :])).astype(np.float32)
+
+        # Fogo inicial: disco de 100 m por nível de severidade (ao menos a célula central);
+        # a grade do lote ganha de margem o maior raio, além do avanço máximo de uma célula por passo
+        raios = np.floor(severidades * 100.0 / celula).astype(int)
+        raio_maximo = int(raios.max())
+        b, c = len(taxas), self.centro + raio_maximo
+        lado = 2 * c + 1
+        queimando = np.zeros((b, lado, lado), dtype=np.float32)
+        dl, dc = np.ogrid[-raio_maximo:raio_maximo + 1, -raio_maximo:raio_maximo + 1]
+        disco = (dl * dl + dc * dc)[None, :, :] <= (raios * raios)[:, None, None]
+        queimando[:, c - raio_maximo:c + raio_maximo + 1, c - raio_maximo:c + raio_maximo + 1] = disco
+        progresso = queimando.copy()
+
+        areas = []
+        area_celula = (celula / 1000.0) ** 2
+        for passo in range(1, self.passos + 1):
+            # A frente anda no máximo uma célula por passo: só a janela central pode mudar
+            alcance = min(passo + max(raio_maximo, 1), c - 1)
+            ini, fim = c - alcance, c + alcance + 1
+            incremento = np.zeros((b, fim - ini, fim - ini), dtype=np.float32)
+            for k, (dl, dc) in enumerate(VIZINHOS):
+                # Célula (l, c) recebe fogo do vizinho (l - dl, c - dc), que avança na direção k
+                origem = queimando[:, ini - dl:fim - dl, ini - dc:fim - dc]
+                np.maximum(incremento, origem * avanco[:, k, None, None], out=incremento)
+            janela = progresso[:, ini:fim, ini:fim]
+            janela += incremento
+            queimando[:, ini:fim, ini:fim] = janela >= 1.0
+            if passo % self.passos_hora == 0 and passo // self.passos_hora in self.HORIZONTES:
+                areas.append(queimando.sum(axis=(1, 2), dtype=np.float64) * area_celula)
+        return np.stack(areas, axis=1)
@@ -0,0 +1,126 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional
+
+from metricas import REGISTRO
+
+DURACAO_ESTAGIOS = REGISTRO.histograma(
+    "sentinel_incidente_estagio_segundos", "Duração de cada estágio do ciclo de vida das ocorrências", ("estagio",),
+    limites=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600))
+
+# Estágios medidos: (nome, evento inicial, eventos finais)
+ESTAGIOS = [
+    ("registro_ate_despacho", "registro", ("despacho",)),
+    ("missao", "despacho", ("confirmado", "descartado")),
+    ("registro_ate_primeiro_alerta", "registro", ("alerta_entregue",)),
+    ("confirmacao_ate_extincao", "confirmado", ("extinto", "atendimento")),
+    ("total", "registro", ("extinto", "atendimento")),
+]
+
+
+class RastreadorIncidentes:
+    """Linha do tempo de cada ocorrência, do registro ao atendimento
+
+    Cada marca é um par (evento, instante monotônico em ns) anexado à lista
+    da ocorrência. Ao marcar a primeira ocorrência de um evento final, a
+    duração do estágio correspondente é registrada no histograma e na janela
+    usada para os percentis.
+    """
+
+    def __init__(self, relogio_ns: Callable[[], int] = time.monotonic_ns, max_incidentes: int = 100_000,
+                 max_eventos: int = 64, janela: int = 10_000):
+        """
+        Args:
+            relogio_ns: Relógio monotônico em nanossegundos
+            max_incidentes: Ocorrências mantidas (as mais antigas são descartadas)
+            max_eventos: Marcas mantidas por ocorrência
+            janela: Durações recentes mantidas por estágio para os percentis
+        """
+        self.relogio_ns = relogio_ns
+        self.max_incidentes = max_incidentes
+        self.max_eventos = max_eventos
+        self._incidentes: "OrderedDict[int, List[tuple]]" = OrderedDict()
+        self._trava = threading.Lock()
+        self._duracoes: Dict[str, deque] = {nome: deque(maxlen=janela) for nome, _, _ in ESTAGIOS}
+        self._estagios_por_fim: Dict[str, List[tuple]] = {}
+        for nome, inicio, fins in ESTAGIOS:
+            for fim in fins:
+                self._estagios_por_fim.setdefault(fim, []).append((nome, inicio, fins))
+
+        # Referência para converter instantes monotônicos em horário de parede
+        self._base_ns = relogio_ns()
+        self._base_parede = time.time()
+
+    def marcar(self, ocorrencia_id: int, evento: str):
+        """Registra um evento na linha do tempo da ocorrência
+
+        Eventos de ocorrências sem "registro" (ex.: alertas de teste) são ignorados.
+        """
+        agora = self.relogio_ns()
+        marcas = self._incidentes.get(ocorrencia_id)
+        if marcas is None:
+            if evento != "registro":
+                return
+            with self._trava:
+                marcas = self._incidentes[ocorrencia_id] = []
+                if len(self._incidentes) > self.max_incidentes:
+                    self._incidentes.popitem(last=False)
+
+        estagios = self._estagios_por_fim.get(evento)
+        if estagios:
+            for nome, inicio, fins in estagios:
+                instante_inicio = None
+                ja_encerrado = False
+                for ev, instante in marcas:
+                    if ev == inicio and instante_inicio is None:
+                        instante_inicio = instante
+                    elif ev in fins:
+                        ja_encerrado = True
+                        break
+                if instante_inicio is not None and not ja_encerrado:
+                    duracao = (agora - instante_inicio) / 1e9
+                    self._duracoes[nome].append(duracao)
+                    DURACAO_ESTAGIOS.observar(duracao, (nome,))
+
+        if len(marcas) < self.max_eventos:
+            marcas.append((evento, agora))
+
+    def linha_do_tempo(self, ocorrencia_id: int) -> Optional[dict]:
+        """Eventos da ocorrência com deslocamento desde o registro"""
+        marcas = self._incidentes.get(ocorrencia_id)
+        if marcas is None:
+            return None
+        marcas = list(marcas)
+        inicio = marcas[0][1]
+        return {
+            "ocorrencia": ocorrencia_id,
+            "eventos": [{
+                "evento": evento,
+                "timestamp": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(
+                    self._base_parede + (instante - self._base_ns) / 1e9)),
+                "desde_registro_ms": round((instante - inicio) / 1e6, 3)
+            } for evento, instante in marcas]
+        }
+
+    def estatisticas(self) -> Dict[str, dict]:
+        """Distribuição de latência (em ms) de cada estágio na janela recente"""
+        resultado = {}
+        for nome, duracoes in self._duracoes.items():
+            valores = sorted(duracoes)
+            n = len(valores)
+            if not n:
+                resultado[nome] = {"n": 0}
+                continue
+            resultado[nome] = {
+                "n": n,
+                "media_ms": round(sum(valores) / n * 1000, 3),
+                "p50_ms": round(valores[int(n * 0.50)] * 1000, 3),
+                "p95_ms": round(valores[min(n - 1, int(n * 0.95))] * 1000, 3),
+                "p99_ms": round(valores[min(n - 1, int(n * 0.99))] * 1000, 3),
+                "max_ms": round(valores[-1] * 1000, 3)
+            }
+        return resultado
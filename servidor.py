@@ -0,0 +1,82 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Servidor com vários processos (workers) para a API.
+#
+#   SENTINEL_ESTADO=sqlite:sentinel_estado.db SENTINEL_DB=sentinel.db python servidor.py --workers 4 --porta 5000
+#
+# O processo principal abre o socket e cria os workers com fork (Linux/macOS);
+# cada worker importa a API depois do fork, disputa a liderança e atende
+# requisições no mesmo socket. Com gunicorn o efeito é o mesmo (gunicorn.conf.py).
+
+import argparse
+import os
+import signal
+import socket
+import sys
+
+
+def executar_worker(sock: socket.socket, host: str, porta: int):
+    """Corpo de cada worker: importa a API, disputa a liderança e serve requisições"""
+    from werkzeug.serving import make_server
+
+    import api_flask
+
+    api_flask.coordenador.iniciar()
+    servidor = make_server(host, porta, api_flask.app, threaded=True, fd=sock.fileno())
+    try:
+        servidor.serve_forever()
+    finally:
+        api_flask.coordenador.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API Sentinel Fire com vários workers")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--porta', type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        os.environ.setdefault('SENTINEL_ESTADO', 'sqlite:sentinel_estado.db')
+        os.environ.setdefault('SENTINEL_DB', 'sentinel.db')  # De onde um novo líder reconstrói o estado
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.porta))
+    sock.listen(1024)
+    sock.set_inheritable(True)
+
+    filhos = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, lambda sinal, quadro: sys.exit(0))  # Libera a liderança ao sair
+            try:
+                executar_worker(sock, args.host, args.porta)
+            finally:
+                os._exit(0)
+        filhos.append(pid)
+    print(f"{args.workers} workers em http://{args.host}:{args.porta}/ (estado: {os.environ.get('SENTINEL_ESTADO')})")
+
+    def encerrar(sinal, quadro):
+        for pid in filhos:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, encerrar)
+    signal.signal(signal.SIGINT, encerrar)
+    for pid in filhos:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    sock.close()
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
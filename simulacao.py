@@ -0,0 +1,325 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Simulação de eventos discretos com relógio virtual.
+#
+# Executa a mesma lógica do SistemaEmergencia (registro, despacho de drones,
+# missões, verificação de fogos e alertas) sem esperar pelo relógio real:
+# o tempo avança direto para o próximo evento. Todas as fontes aleatórias são
+# fluxos com semente, então a mesma semente reproduz exatamente a mesma execução.
+#
+#   python simulacao.py --dias 30 --semente 42 --drones 3 --json resultado.json
+
+import argparse
+import heapq
+import itertools
+import json
+import random
+import time
+from collections import deque
+from typing import Callable, Dict, List
+
+from temporizador import Temporizador
+
+REGIOES = ["Amazônia", "Pantanal", "Cerrado", "Mata Atlântica", "Caatinga", "Pampa"]
+
+
+def _percentis(valores: List[float]) -> Dict[str, float]:
+    """Resumo de uma distribuição de latências (em segundos virtuais)"""
+    if not valores:
+        return {"n": 0, "media": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    valores = sorted(valores)
+    n = len(valores)
+    return {
+        "n": n,
+        "media": round(sum(valores) / n, 3),
+        "p50": round(valores[int(n * 0.50)], 3),
+        "p95": round(valores[min(n - 1, int(n * 0.95))], 3),
+        "p99": round(valores[min(n - 1, int(n * 0.99))], 3),
+        "max": round(valores[-1], 3)
+    }
+
+
+class RelogioVirtual:
+    """Relógio controlado pelo motor de simulação (chamável como time.time)"""
+
+    def __init__(self, inicio: float = 0.0):
+        self.agora = inicio
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+class MotorSimulacao:
+    """Motor de eventos discretos
+
+    Substitui, dentro do SistemaEmergencia, tanto o serviço de temporizadores
+    (`agendar`/`parar`) quanto o agendador de serviços (`disparar`): todos os
+    callbacks viram eventos em um heap ordenado por tempo virtual.
+    """
+
+    def __init__(self, semente: int = 0, inicio: float = None):
+        self.semente = semente
+        self.relogio = RelogioVirtual(time.time() if inicio is None else inicio)
+        self._fila: List[tuple] = []  # (tempo, sequência, Temporizador)
+        self._seq = itertools.count()
+        self._eventos: Dict[str, List[Callable]] = {}
+        self._fluxos: Dict[str, random.Random] = {}
+        self.eventos_processados = 0
+
+    def fluxo(self, nome: str) -> random.Random:
+        """Fluxo aleatório independente e reprodutível, derivado da semente"""
+        if nome not in self._fluxos:
+            self._fluxos[nome] = random.Random(f"{self.semente}:{nome}")
+        return self._fluxos[nome]
+
+    # ---------- Interface de temporizadores ----------
+
+    def agendar(self, atraso: float, callback: Callable, *args) -> Temporizador:
+        temporizador = Temporizador(self.relogio.agora + max(atraso, 0.0), callback, args)
+        heapq.heappush(self._fila, (temporizador.prazo, next(self._seq), temporizador))
+        return temporizador
+
+    def parar(self, *args, **kwargs):
+        self._fila.clear()
+
+    @property
+    def pendentes(self) -> int:
+        return len(self._fila)
+
+    # ---------- Interface de eventos do agendador ----------
+
+    @property
+    def em_execucao(self) -> bool:
+        return True
+
+    def registrar_evento(self, evento: str, funcao: Callable, nome: str = None):
+        self._eventos.setdefault(evento, []).append(funcao)
+
+    def disparar(self, evento: str, *args):
+        for funcao in self._eventos.get(evento, []):
+            self.agendar(0, funcao, *args)
+
+    def registrar_periodica(self, nome: str, intervalo: float, funcao: Callable, atraso_erro: float = None):
+        def executar():
+            funcao()
+            self.agendar(intervalo, executar)
+
+        self.agendar(intervalo, executar)
+
+    # ---------- Execução ----------
+
+    def executar_ate(self, fim: float):
+        """Processa eventos em ordem até o tempo virtual `fim`"""
+        fila = self._fila
+        while fila and fila[0][0] <= fim:
+            prazo, _, temporizador = heapq.heappop(fila)
+            if temporizador.cancelado:
+                continue
+            self.relogio.agora = prazo
+            temporizador.callback(*temporizador.args)
+            self.eventos_processados += 1
+        self.relogio.agora = fim
+
+
+class SimulacaoOperacoes:
+    """Cenário de operação do SistemaEmergencia em tempo virtual
+
+    Gera ocorrências por um processo de Poisson, despacha drones pelos
+    mesmos métodos do sistema e coleta métricas de vazão e latência ao final.
+    """
+
+    def __init__(self, semente: int = 0, drones: int = 3, intervalo_ocorrencias: float = 300.0,
+                 intervalo_verificacao_drones: float = None, contatos_extras: int = 0):
+        """
+        Args:
+            semente: Semente dos fluxos aleatórios
+            drones: Tamanho da frota
+            intervalo_ocorrencias: Intervalo médio entre novas ocorrências (segundos)
+            intervalo_verificacao_drones: Período da verificação de drones; None usa
+                apenas os eventos "nova_ocorrencia" e "drone_disponivel"
+            contatos_extras: Contatos adicionais (todas as regiões) para dimensionar alertas
+        """
+        # Importação tardia: o módulo principal carrega o mapa e os transportes reais
+        from Sentinel_Fire import SistemaEmergencia
+        from modelos import ContatoEmergencia
+        from sistema_alerta import TransporteMemoria
+
+        self.motor = MotorSimulacao(semente)
+        self.intervalo_ocorrencias = intervalo_ocorrencias
+
+        self.sistema = SistemaEmergencia(relogio=self.motor.relogio, temporizadores=self.motor)
+        self.sistema.agendador = self.motor
+        self.sistema.rng_ocorrencias = self.motor.fluxo("ocorrencias")
+        self.sistema.rng_missoes = self.motor.fluxo("missoes")
+        self.sistema.rng_fogos = self.motor.fluxo("fogos")
+        self.sistema.drones_disponiveis = deque(f"Drone {i}" for i in range(1, drones + 1))
+
+        alerta = self.sistema.sistema_alerta
+        alerta.transporte_email = TransporteMemoria()
+        alerta.transporte_sms = TransporteMemoria()
+        for i in range(contatos_extras):
+            alerta.adicionar_contato(ContatoEmergencia(
+                nome=f"Contato {i}", email=f"contato{i}@exemplo.com", telefone=f"+550000{i:05d}",
+                tipo="comunidade", regioes=list(REGIOES)
+            ))
+
+        # Mesmos gatilhos do agendador de produção
+        self.motor.registrar_evento("nova_ocorrencia", self.sistema.verificar_drones_automaticamente)
+        self.motor.registrar_evento("drone_disponivel", self.sistema.verificar_drones_automaticamente)
+        self.motor.registrar_periodica("arquivamento", self.sistema.intervalo_arquivamento,
+                                       self.sistema.arquivar_resolvidas)
+        if intervalo_verificacao_drones:
+            self.motor.registrar_periodica("drone_checker", intervalo_verificacao_drones,
+                                           self.sistema.verificar_drones_automaticamente)
+
+        # Instrumentação: instantes de registro e de despacho de cada ocorrência
+        self._registro: Dict[int, float] = {}
+        self._despacho: Dict[int, float] = {}
+        self.despachos = 0
+        self.fila_maxima = 0
+        enviar_drone = self.sistema.enviar_drone
+
+        def enviar_drone_instrumentado(ocorrencia, drone=None):
+            resultado = enviar_drone(ocorrencia, drone)
+            if resultado["status"] == "success":
+                self.despachos += 1
+                self._despacho.setdefault(ocorrencia.id, self.motor.relogio.agora)
+            return resultado
+
+        self.sistema.enviar_drone = enviar_drone_instrumentado
+
+    def _nova_ocorrencia(self):
+        rng = self.sistema.rng_ocorrencias
+        ocorrencia = self.sistema.registrar_ocorrencia(
+            [rng.uniform(-33.75, 5.27), rng.uniform(-73.99, -34.79)],
+            rng.randint(1, 5),
+            rng.choice(REGIOES)
+        )
+        self._registro[ocorrencia.id] = self.motor.relogio.agora
+        self.fila_maxima = max(self.fila_maxima, len(self.sistema.fila_prioritaria))
+        self.motor.agendar(self.motor.fluxo("chegadas").expovariate(1.0 / self.intervalo_ocorrencias),
+                           self._nova_ocorrencia)
+
+    def executar(self, duracao: float) -> dict:
+        """Simula `duracao` segundos de operação e retorna as métricas"""
+        inicio_virtual = self.motor.relogio.agora
+        inicio_real = time.perf_counter()
+        self.motor.agendar(0, self._nova_ocorrencia)
+        self.motor.executar_ate(inicio_virtual + duracao)
+        return self.metricas(duracao, time.perf_counter() - inicio_real)
+
+    def metricas(self, duracao_virtual: float, duracao_real: float) -> dict:
+        # Ativas e resolvidas ainda em memória (o arquivo guarda apenas colunas compactas)
+        fila = list(self.sistema.fila_prioritaria) + [oc for _, oc in self.sistema.resolvidas.values()]
+        alerta = self.sistema.sistema_alerta
+        status: Dict[str, int] = {}
+        for oc in fila:
+            status[oc.status] = status.get(oc.status, 0) + 1
+        arquivo = self.sistema.arquivo
+        for codigo in arquivo.status:
+            texto = arquivo._textos[codigo]
+            status[texto] = status.get(texto, 0) + 1
+
+        ate_despacho = [self._despacho[i] - t for i, t in self._registro.items() if i in self._despacho]
+        ate_confirmacao = [oc.tempo_inicio_fogo - self._registro[oc.id] for oc in fila
+                           if oc.fogo_confirmado and oc.id in self._registro]
+        ate_confirmacao += [inicio - self._registro[i] for i, confirmado, inicio
+                            in zip(arquivo.ids, arquivo.confirmados, arquivo.inicios_fogo)
+                            if confirmado and inicio > 0 and i in self._registro]
+        ate_extincao = [oc.tempo_fim_fogo - oc.tempo_inicio_fogo for oc in fila
+                        if oc.fogo_apagado and oc.tempo_inicio_fogo > 0 and oc.tempo_fim_fogo > 0]
+        ate_extincao += [fim - inicio for inicio, fim in zip(arquivo.inicios_fogo, arquivo.fins_fogo)
+                         if inicio > 0 and fim > 0]
+        nunca_despachadas = sum(1 for oc in fila if oc.severidade > 3 and oc.id not in self._despacho)
+
+        return {
+            "semente": self.motor.semente,
+            "duracao_virtual_s": duracao_virtual,
+            "duracao_real_s": round(duracao_real, 3),
+            "aceleracao": round(duracao_virtual / duracao_real, 1) if duracao_real else None,
+            "eventos_processados": self.motor.eventos_processados,
+            "eventos_por_segundo": round(self.motor.eventos_processados / duracao_real, 1) if duracao_real else None,
+            "ocorrencias": len(self._registro),
+            "ocorrencias_por_status": status,
+            "camadas": {
+                "ativas": len(self.sistema.fila_prioritaria),
+                "resolvidas": len(self.sistema.resolvidas),
+                "arquivadas": len(arquivo)
+            },
+            "fila_maxima": self.fila_maxima,
+            "despachos": self.despachos,
+            "graves_sem_despacho": nunca_despachadas,
+            "alertas": {
+                "email": alerta.transporte_email.total,
+                "sms": alerta.transporte_sms.total,
+                "por_hora_virtual": round((alerta.transporte_email.total + alerta.transporte_sms.total)
+                                          / (duracao_virtual / 3600), 2)
+            },
+            "latencias_s": {
+                "registro_ate_despacho": _percentis(ate_despacho),
+                "registro_ate_confirmacao": _percentis(ate_confirmacao),
+                "confirmacao_ate_extincao": _percentis(ate_extincao)
+            },
+            "estagios_ms": self.sistema.rastreador.estatisticas()
+        }
+
+
+def conferir(resultado: dict) -> List[str]:
+    """Problemas que tornam as métricas de capacidade sem sentido (lista vazia: tudo certo)
+
+    Uma execução com despachos precisa confirmar fogos e apagá-los; se nenhum
+    fogo chega a "Fogo apagado", algo prende as ocorrências no ciclo de verificação.
+    """
+    problemas = []
+    latencias = resultado["latencias_s"]
+    if resultado["despachos"] == 0:
+        problemas.append("nenhum despacho")
+    if latencias["registro_ate_confirmacao"]["n"] == 0:
+        problemas.append("nenhum fogo confirmado")
+    if latencias["confirmacao_ate_extincao"]["n"] == 0:
+        problemas.append("nenhum fogo apagado")
+    if resultado["despachos"] > resultado["ocorrencias"]:
+        problemas.append(f"{resultado['despachos']} despachos para {resultado['ocorrencias']} ocorrências "
+                         f"(ocorrências reenviadas)")
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação de eventos discretos do Sentinel Fire")
+    parser.add_argument('--dias', type=float, default=30, help="Período simulado em dias")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--drones', type=int, default=3)
+    parser.add_argument('--intervalo-ocorrencias', type=float, default=300.0,
+                        help="Intervalo médio entre ocorrências, em segundos")
+    parser.add_argument('--intervalo-drones', type=float, default=None,
+                        help="Período da verificação de drones (padrão: apenas por evento)")
+    parser.add_argument('--contatos', type=int, default=0, help="Contatos extras para dimensionar alertas")
+    parser.add_argument('--json', help="Arquivo para salvar as métricas")
+    parser.add_argument('--conferir', action='store_true',
+                        help="Sai com código 1 se a execução não confirmar nem apagar fogos")
+    args = parser.parse_args()
+
+    simulacao = SimulacaoOperacoes(
+        semente=args.semente,
+        drones=args.drones,
+        intervalo_ocorrencias=args.intervalo_ocorrencias,
+        intervalo_verificacao_drones=args.intervalo_drones,
+        contatos_extras=args.contatos
+    )
+    resultado = simulacao.executar(args.dias * 86400)
+
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+    if args.conferir:
+        problemas = conferir(resultado)
+        for problema in problemas:
+            print(f"FALHOU: {problema}")
+        if problemas:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,26 @@
 #Nome: Larissa Pereira Biusse
 #RM: 564068
 
-from email.mime.text import MIMEText
-import smtplib
-from typing import List, Optional
+from collections import OrderedDict, deque
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional
 
-from twilio.rest import Client
+from caixa_saida import CaixaSaida
+import eventos
+from geocerca import IndiceGeocercas, areas_validas
+from metricas import REGISTRO
+from modelos import ContatoEmergencia, Ocorrencia, avancar_ids
 
-from modelos import ContatoEmergencia, Ocorrencia
+ALERTAS_ENVIADOS = REGISTRO.contador(
+    "sentinel_alertas", "Alertas enviados por canal e resultado", ("canal", "resultado"))
+DURACAO_ENVIO_ALERTAS = REGISTRO.histograma(
+    "sentinel_alerta_envio_segundos", "Duração do envio de cada alerta por canal", ("canal",))
+ALERTAS_AGRUPADOS = REGISTRO.contador(
+    "sentinel_alertas_agrupados", "Alertas acumulados para envio em resumo, por canal", ("canal",))
+ALERTAS_ADIADOS = REGISTRO.contador(
+    "sentinel_alertas_adiados", "Resumos adiados por limite de envio, por canal e limite", ("canal", "limite"))
 
 
 class Node:
@@ -22,9 +35,14 @@ class LinkedList:
     def __init__(self):
         self.head: Optional[Node] = None
         self.tail: Optional[Node] = None
+        self.tamanho = 0
+
+    def __len__(self):
+        return self.tamanho
 
     def append(self, data):
         """Adiciona novo nó ao final da lista"""
+        self.tamanho += 1
         new_node = Node(data)
         if not self.head:
             self.head = new_node
@@ -43,6 +61,94 @@ class LinkedList:
         return result
 
 
+class TransporteSMTP:
+    """Transporte de e-mail via servidor SMTP"""
+
+    def __init__(self, config: dict):
+        self.config = config
+
+    def enviar(self, destino: str, assunto: str, mensagem: str):
+        import smtplib  # Importados no primeiro envio real (simulações e testes não usam SMTP)
+        from email.mime.text import MIMEText
+
+        msg = MIMEText(mensagem)
+        msg['Subject'] = assunto
+        msg['From'] = self.config['usuario']
+        msg['To'] = destino
+
+        with smtplib.SMTP(self.config['servidor'], self.config['porta'], timeout=self.config.get('timeout', 30)) as server:
+            if self.config.get('tls', True):
+                server.starttls()
+            if self.config.get('senha'):
+                server.login(self.config['usuario'], self.config['senha'])
+            server.send_message(msg)
+
+
+class TransporteTwilio:
+    """Transporte de SMS via Twilio"""
+
+    def __init__(self, config: dict):
+        self.config = config
+
+    def enviar(self, destino: str, assunto: str, mensagem: str):
+        from twilio.rest import Client  # Importação pesada, feita só no primeiro SMS
+
+        client = Client(self.config['account_sid'], self.config['auth_token'])
+        client.messages.create(
+            body=mensagem,
+            from_=self.config['from_number'],
+            to=destino
+        )
+
+
+class TransporteMemoria:
+    """Transporte local que apenas registra as mensagens (simulação e benchmarks)"""
+
+    def __init__(self, limite: int = 1000):
+        self.total = 0
+        self.enviados = deque(maxlen=limite)  # Últimas mensagens (destino, assunto, mensagem)
+
+    def enviar(self, destino: str, assunto: str, mensagem: str):
+        self.total += 1
+        self.enviados.append((destino, assunto, mensagem))
+
+
+class BaldeTokens:
+    """Limitador de taxa por balde de tokens
+
+    Args:
+        capacidade: Máximo de envios em rajada
+        taxa: Tokens repostos por segundo
+        relogio: Fonte de tempo (o relógio do sistema, virtual na simulação)
+    """
+
+    __slots__ = ('capacidade', 'taxa', 'relogio', 'tokens', 'atualizado')
+
+    def __init__(self, capacidade: float, taxa: float, relogio: Callable[[], float]):
+        self.capacidade = capacidade
+        self.taxa = taxa
+        self.relogio = relogio
+        self.tokens = capacidade
+        self.atualizado = relogio()
+
+    def _repor(self):
+        agora = self.relogio()
+        self.tokens = min(self.capacidade, self.tokens + (agora - self.atualizado) * self.taxa)
+        self.atualizado = agora
+
+    def espera(self, quantidade: float = 1) -> float:
+        """Segundos até haver `quantidade` tokens disponíveis (0 se já houver)"""
+        self._repor()
+        if self.tokens >= quantidade:
+            return 0.0
+        return (quantidade - self.tokens) / self.taxa if self.taxa > 0 else float('inf')
+
+    def consumir(self, quantidade: float = 1):
+        """Retira tokens; o saldo pode ficar negativo (a dívida é paga pela reposição)"""
+        self._repor()
+        self.tokens -= quantidade
+
+
 class SistemaAlerta:
     """Sistema de envio de alertas por e-mail e SMS"""
     def __init__(self, sistema_emergencia):
@@ -51,6 +157,11 @@ class SistemaAlerta:
         self.sistema = sistema_emergencia
         self.contatos = LinkedList() # Referência ao sistema principal
 
+        # Índices dos destinatários: por bioma e por geocerca (as consultas não percorrem a lista)
+        self._por_regiao: Dict[str, List[ContatoEmergencia]] = {}
+        self.geocercas = IndiceGeocercas()
+        self._ordem_contatos: Dict[int, int] = {}  # id(contato) -> ordem de cadastro
+
         # Configurações de serviços externos
         self.email_config = {
             'servidor': 'smtp.emergencia.com',
@@ -68,74 +179,295 @@ class SistemaAlerta:
         self.templates = {
             'email': {
                 'alerta': "ALERTA: Foco de incêndio detectado em {regiao} - {local}. Severidade: {severidade}",
+                'alerta_confirmado': "ALERTA CONFIRMADO: Incêndio confirmado por drone em {regiao} - {local}. Severidade: {severidade}",
                 'confirmacao': "CONFIRMAÇÃO: Incêndio em {regiao} foi controlado",
                 'alerta_preliminar': "ALERTA PRELIMINAR: Possível foco em {regiao} - {local}"
             },
             'sms': {
                 'alerta': "[ALERTA CRÍTICO] Fogo em {regiao}! Severidade: {severidade}. Local: {local}",
+                'alerta_confirmado': "[CONFIRMADO] Fogo em {regiao} confirmado por drone! Severidade: {severidade}. Local: {local}",
                 'confirmacao': "[CONTROLE] Incêndio em {regiao} foi controlado",
                 'alerta_preliminar': "[ALERTA] Possível fogo em {regiao}. Verificação em andamento"
             }
         }
 
-    def adicionar_contato(self, contato: ContatoEmergencia):
-        """Adiciona um novo contato para receber alertas"""
+        # Resumos: vários alertas para o mesmo destino viram uma única mensagem
+        self.templates['email']['resumo'] = ("RESUMO DE ALERTAS: {quantidade} ocorrências em {regioes} "
+                                             "({confirmados} confirmadas). Severidade máxima: {severidade}\n{itens}")
+        self.templates['sms']['resumo'] = ("[RESUMO] {quantidade} focos em {regioes} ({confirmados} confirmados). "
+                                           "Severidade máx.: {severidade}")
+
+        # Transportes de envio, criados no primeiro uso a partir de email_config/sms_config
+        # (substituíveis por TransporteMemoria em simulações e testes)
+        self._transporte_email = None
+        self._transporte_sms = None
+
+        # Agrupamento e limites de envio. Alertas de severidade 5 não esperam nem são limitados.
+        self.janela_agrupamento = 60.0  # Segundos acumulando alertas por destino (0 envia na hora)
+        self.capacidade_contato = 3  # Rajada de mensagens por destino e canal
+        self.taxa_contato = 1 / 300  # Mensagens por segundo repostas por destino e canal (1 a cada 5 min)
+        self.capacidade_canal = 100  # Rajada de mensagens por canal (limite do provedor)
+        self.taxa_canal = 10.0  # Mensagens por segundo repostas por canal
+        self.itens_resumo = 10  # Ocorrências listadas no corpo do resumo por e-mail
+        self._trava = threading.Lock()
+        # (canal, destino) -> {id da ocorrência: (contato, ocorrência, tipo)}; repetições da mesma
+        # ocorrência na janela substituem a anterior, então o resumo tem uma linha por ocorrência
+        self._pendentes: Dict[tuple, dict] = {}
+        self._baldes: Dict[tuple, BaldeTokens] = {}  # (canal, destino) ou (canal,) -> balde
+        self._urgentes: "OrderedDict[tuple, None]" = OrderedDict()  # (ocorrência, tipo) já enviados na hora
+
+        # Caixa de saída durável (opcional): com ela as mensagens são gravadas e enviadas por workers,
+        # com novas tentativas; sem ela o envio é feito na hora, uma única tentativa
+        self.caixa_saida: Optional[CaixaSaida] = None
+
+    @property
+    def transporte_email(self):
+        if self._transporte_email is None:
+            self._transporte_email = TransporteSMTP(self.email_config)
+        return self._transporte_email
+
+    @transporte_email.setter
+    def transporte_email(self, transporte):
+        self._transporte_email = transporte
+
+    @property
+    def transporte_sms(self):
+        if self._transporte_sms is None:
+            self._transporte_sms = TransporteTwilio(self.sms_config)
+        return self._transporte_sms
+
+    @transporte_sms.setter
+    def transporte_sms(self, transporte):
+        self._transporte_sms = transporte
+
+    def usar_caixa_saida(self, caminho: str, **opcoes) -> CaixaSaida:
+        """Passa a enviar as mensagens pela caixa de saída durável em `caminho`
+
+        Args:
+            caminho: Arquivo SQLite da caixa de saída
+            **opcoes: Repassadas à CaixaSaida (workers, max_tentativas, atraso_base...)
+        """
+        self.caixa_saida = CaixaSaida(caminho, self._transmitir, ao_entregar=self._ao_entregar,
+                                      ao_falhar=self._ao_falhar, **opcoes)
+        # IDs reiniciam a cada execução sem SENTINEL_DB: os novos não podem repetir chaves já gravadas
+        avancar_ids(self.caixa_saida.maior_ocorrencia())
+        return self.caixa_saida
+
+    def adicionar_contato(self, contato: ContatoEmergencia, persistir: bool = True):
+        """Adiciona um novo contato para receber alertas
+
+        O contato recebe os alertas dos biomas em `regioes` e das ocorrências
+        dentro de qualquer uma das suas `areas`.
+
+        Args:
+            persistir: Grava o contato na persistência, se houver (os padrão e os
+                restaurados do banco não precisam)
+
+        Raises:
+            ValueError: Alguma área é inválida (nada é registrado)
+        """
+        areas = areas_validas(contato.areas)
         self.contatos.append(contato)
-        self.sistema.historico.append(f"Novo contato adicionado: {contato.nome}")
+        self._ordem_contatos[id(contato)] = len(self._ordem_contatos)
+        for regiao in contato.regioes:
+            self._por_regiao.setdefault(regiao, []).append(contato)
+        for area in areas:
+            self.geocercas.adicionar(area, contato)
+        self.sistema._registrar_evento(eventos.CONTATO_ADICIONADO, ator=contato.nome)
+        if persistir and self.sistema.persistencia is not None:
+            self.sistema.persistencia.salvar_contato(contato, self.sistema.relogio())
+
+    def limpar_contatos(self):
+        """Remove todos os contatos e os índices de destinatários"""
+        self.contatos = LinkedList()
+        self._por_regiao = {}
+        self.geocercas = IndiceGeocercas()
+        self._ordem_contatos = {}
+
+    def destinatarios(self, ocorrencia: Ocorrencia) -> List[ContatoEmergencia]:
+        """Contatos que acompanham o bioma da ocorrência ou uma área que contém o local
 
+        Returns:
+            List[ContatoEmergencia]: Sem repetição, na ordem de cadastro
+        """
+        por_regiao = self._por_regiao.get(ocorrencia.regiao, [])
+        local = ocorrencia.local
+        if not len(self.geocercas) or not isinstance(local, (list, tuple)) or len(local) != 2:
+            return list(por_regiao)
+        por_area = self.geocercas.consultar(float(local[0]), float(local[1]))
+        if not por_area:
+            return list(por_regiao)
+        contatos = {id(contato): contato for contato in por_regiao}
+        contatos.update((id(contato), contato) for contato in por_area)
+        return sorted(contatos.values(), key=lambda contato: self._ordem_contatos[id(contato)])
 
-    def enviar_alertas(self, ocorrencia: Ocorrencia, tipo: str = 'alerta'):
-        """Envia alertas para todos os contatos relevantes"""
+
+    def enviar_alertas(self, ocorrencia: Ocorrencia, tipo: str = 'alerta', imediato: bool = False):
+        """Envia alertas para todos os contatos relevantes
+
+        Com `janela_agrupamento` > 0, os alertas de cada destino são acumulados
+        e enviados como um único resumo ao fim da janela. O primeiro alerta de
+        cada tipo de uma ocorrência de severidade 5 (ou `imediato=True`) é
+        enviado na hora, sem agrupamento nem limite de taxa; repetições do
+        mesmo alerta entram no resumo.
+        """
         # Só envia SMS se a severidade for >= 4
         send_sms = ocorrencia.severidade >= 4
+        direto = imediato or self.janela_agrupamento <= 0 or (
+            ocorrencia.severidade >= 5 and self._primeiro_urgente(ocorrencia.id, tipo))
 
-        current = self.contatos.head
-        while current:
-            contato = current.data
-            if ocorrencia.regiao in contato.regioes:
+        for contato in self.destinatarios(ocorrencia):
+            if direto:
                 self._enviar_email(contato, ocorrencia, tipo)
                 if send_sms:  # Só envia SMS se atender ao critério
                     self._enviar_sms(contato, ocorrencia, tipo)
-            current = current.next
+            else:
+                self._agrupar("email", contato.email, contato, ocorrencia, tipo)
+                if send_sms:
+                    self._agrupar("sms", contato.telefone, contato, ocorrencia, tipo)
+
+    def _primeiro_urgente(self, ocorrencia_id: int, tipo: str) -> bool:
+        chave = (ocorrencia_id, tipo)
+        with self._trava:
+            if chave in self._urgentes:
+                return False
+            self._urgentes[chave] = None
+            if len(self._urgentes) > 10_000:
+                self._urgentes.popitem(last=False)
+            return True
+
+    def _agrupar(self, canal: str, destino: str, contato: ContatoEmergencia, ocorrencia: Ocorrencia, tipo: str):
+        """Acumula o alerta no resumo pendente do destino (agenda o envio no primeiro)"""
+        chave = (canal, destino)
+        with self._trava:
+            pendentes = self._pendentes.get(chave)
+            primeiro = pendentes is None
+            if primeiro:
+                pendentes = self._pendentes[chave] = {}
+            pendentes[ocorrencia.id] = (contato, ocorrencia, tipo)
+        ALERTAS_AGRUPADOS.inc(rotulos=(canal,))
+        if primeiro:
+            self.sistema.temporizadores.agendar(self.janela_agrupamento, self._enviar_resumo, chave)
+
+    def _balde(self, chave: tuple, capacidade: float, taxa: float) -> BaldeTokens:
+        balde = self._baldes.get(chave)
+        if balde is None:
+            balde = self._baldes[chave] = BaldeTokens(capacidade, taxa, self.sistema.relogio)
+        return balde
+
+    def _enviar_resumo(self, chave: tuple):
+        """Envia o resumo pendente de um destino (callback do temporizador)
+
+        Se o destino ou o canal estiver sem tokens, o resumo continua
+        acumulando e o envio é reagendado para quando houver token.
+        """
+        canal = chave[0]
+        with self._trava:
+            balde_contato = self._balde(chave, self.capacidade_contato, self.taxa_contato)
+            balde_canal = self._balde((canal,), self.capacidade_canal, self.taxa_canal)
+            espera_contato = balde_contato.espera()
+            espera = max(espera_contato, balde_canal.espera())
+            if espera == 0:
+                itens = list(self._pendentes.pop(chave, {}).values())
+                if itens:
+                    balde_contato.consumir()
+                    balde_canal.consumir()
+        if espera > 0:
+            ALERTAS_ADIADOS.inc(rotulos=(canal, "contato" if espera_contato == espera else "canal"))
+            self.sistema.temporizadores.agendar(espera, self._enviar_resumo, chave)
+            return
+        if not itens:
+            return
+
+        contato, ocorrencia, tipo = itens[-1]
+        if len(itens) == 1:
+            # Um único alerta na janela: mensagem normal
+            if canal == "email":
+                self._enviar_email(contato, ocorrencia, tipo)
+            else:
+                self._enviar_sms(contato, ocorrencia, tipo)
+            return
+
+        ocorrencias = {oc.id: oc for _, oc, _ in itens}
+        regioes = sorted({oc.regiao for oc in ocorrencias.values()})
+        mensagem = self.templates[canal]['resumo'].format(
+            quantidade=len(ocorrencias),
+            regioes=", ".join(regioes),
+            confirmados=sum(1 for oc in ocorrencias.values() if oc.fogo_confirmado),
+            severidade=max(oc.severidade for oc in ocorrencias.values()),
+            itens="\n".join(f"- {oc.id}: {oc.regiao} {oc.local} severidade {oc.severidade} ({oc.status})"
+                            for oc in list(ocorrencias.values())[:self.itens_resumo])
+        )
+        self._entregar(canal, contato, f"RESUMO DE ALERTAS - {', '.join(regioes)}", mensagem,
+                       list(ocorrencias), 'resumo')
 
 
     def _enviar_email(self, contato: ContatoEmergencia, ocorrencia: Ocorrencia, tipo: str):
         """Envia e-mail de alerta"""
-        try:
-            msg = MIMEText(self.templates['email'][tipo].format(
-                regiao=ocorrencia.regiao,
-                local=ocorrencia.local,
-                severidade=ocorrencia.severidade
-            ))
-            msg['Subject'] = f"ALERTA DE QUEIMADA - {ocorrencia.regiao}"
-            msg['From'] = self.email_config['usuario']
-            msg['To'] = contato.email
-
-            with smtplib.SMTP(self.email_config['servidor'], self.email_config['porta']) as server:
-                server.starttls()
-                server.login(self.email_config['usuario'], self.email_config['senha'])
-                server.send_message(msg)
-
-            self.sistema.drone_tracker.registrar("Sistema", f"E-mail enviado para {contato.nome}", ocorrencia.id)
-        except Exception as e:
-            self.sistema.historico.append(f"Falha ao enviar e-mail para {contato.nome}: {str(e)}")
+        self._entregar("email", contato, f"ALERTA DE QUEIMADA - {ocorrencia.regiao}",
+                       self.templates['email'][tipo].format(
+                           regiao=ocorrencia.regiao,
+                           local=ocorrencia.local,
+                           severidade=ocorrencia.severidade
+                       ), [ocorrencia.id], tipo)
 
     def _enviar_sms(self, contato: ContatoEmergencia, ocorrencia: Ocorrencia, tipo: str):
         """Envia SMS de alerta"""
+        self._entregar("sms", contato, f"ALERTA DE QUEIMADA - {ocorrencia.regiao}",
+                       self.templates['sms'][tipo].format(
+                           regiao=ocorrencia.regiao,
+                           local=ocorrencia.local,
+                           severidade=ocorrencia.severidade
+                       ), [ocorrencia.id], tipo)
 
+    def _entregar(self, canal: str, contato: ContatoEmergencia, assunto: str, mensagem: str,
+                  ocorrencias_ids: List[int], modelo: str):
+        """Envia uma mensagem pelo canal (ou a grava na caixa de saída, se houver)"""
+        destino = contato.email if canal == "email" else contato.telefone
+        if self.caixa_saida is not None:
+            self.caixa_saida.adicionar(self._chave_idempotencia(ocorrencias_ids, destino, canal, modelo),
+                                       canal, destino, contato.nome, assunto, mensagem, ocorrencias_ids)
+            return
+
+        registro = {"canal": canal, "destino": destino, "contato": contato.nome, "ocorrencias": ocorrencias_ids}
         try:
-            client = Client(self.sms_config['account_sid'], self.sms_config['auth_token'])
-
-            message = client.messages.create(
-                body=self.templates['sms'][tipo].format(
-                    regiao=ocorrencia.regiao,
-                    local=ocorrencia.local,
-                    severidade=ocorrencia.severidade
-                ),
-                from_=self.sms_config['from_number'],
-                to=contato.telefone
-            )
-
-            self.sistema.drone_tracker.registrar("Sistema", f"SMS enviado para {contato.nome}", ocorrencia.id)
+            self._transmitir(canal, destino, assunto, mensagem)
         except Exception as e:
-            self.sistema.historico.append(f"Falha ao enviar SMS para {contato.nome}: {str(e)}")
\ No newline at end of file
+            self._ao_falhar(registro, e, True)
+        else:
+            self._ao_entregar(registro)
+
+    @staticmethod
+    def _chave_idempotencia(ocorrencias_ids: List[int], destino: str, canal: str, modelo: str) -> str:
+        """Chave por (ocorrência, contato, canal, modelo); resumos usam um hash das ocorrências"""
+        if len(ocorrencias_ids) == 1:
+            ocorrencias = str(ocorrencias_ids[0])
+        else:
+            ocorrencias = hashlib.sha1(",".join(map(str, sorted(ocorrencias_ids))).encode()).hexdigest()
+        return f"{ocorrencias}:{destino}:{canal}:{modelo}"
+
+    def _transmitir(self, canal: str, destino: str, assunto: str, mensagem: str):
+        """Envia pelo transporte do canal (lança exceção em caso de falha)"""
+        transporte = self.transporte_email if canal == "email" else self.transporte_sms
+        inicio = time.perf_counter()
+        try:
+            transporte.enviar(destino, assunto, mensagem)
+        finally:
+            DURACAO_ENVIO_ALERTAS.observar(time.perf_counter() - inicio, (canal,))
+
+    def _ao_entregar(self, registro: dict):
+        canal = registro["canal"]
+        ALERTAS_ENVIADOS.inc(rotulos=(canal, "sucesso"))
+        nome_canal = "E-mail" if canal == "email" else "SMS"
+        for ocorrencia_id in registro["ocorrencias"]:
+            self.sistema.rastreador.marcar(ocorrencia_id, "alerta_entregue")
+            self.sistema.drone_tracker.registrar("Sistema", f"{nome_canal} enviado para {registro['contato']}",
+                                                 ocorrencia_id)
+
+    def _ao_falhar(self, registro: dict, erro: Exception, definitiva: bool):
+        """Falha de uma tentativa; só a definitiva (sem novas tentativas) vai para o histórico"""
+        canal = registro["canal"]
+        ALERTAS_ENVIADOS.inc(rotulos=(canal, "morta" if definitiva and self.caixa_saida is not None else "falha"))
+        if definitiva:
+            self.sistema._registrar_evento(eventos.FALHA_ALERTA, ator=registro["contato"],
+                                           valor=eventos.CANAIS.index(canal), texto=str(erro))
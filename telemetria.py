@@ -0,0 +1,272 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+# Telemetria dos drones em alta frequência (posição, bateria e temperatura).
+#
+# Cada drone tem buffers circulares de tamanho fixo (matrizes NumPy) em três
+# resoluções: amostras brutas, baldes de 1 s e baldes de 1 min. As amostras
+# chegam em lotes; o lote é gravado no buffer bruto e reduzido em cascata
+# (bruta -> 1 s -> 1 min) de forma vetorizada. Em cada balde ficam a posição,
+# a altitude e a bateria da última amostra e a maior temperatura. Como os
+# buffers são preenchidos em círculo, a memória por drone é constante, não
+# importa por quanto tempo ele transmita.
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from metricas import REGISTRO
+
+CAMPOS = ("instante", "lat", "lon", "altitude", "bateria", "temperatura")
+_INSTANTE, _LAT, _LON, _TEMPERATURA = 0, 1, 2, 5
+
+# Resolução -> período do balde em segundos (0 = amostras brutas)
+RESOLUCOES = {"bruta": 0.0, "1s": 1.0, "1min": 60.0}
+
+AMOSTRAS_TELEMETRIA = REGISTRO.contador(
+    "sentinel_telemetria_amostras", "Amostras de telemetria recebidas por resultado", ("resultado",))
+
+
+class BufferCircular:
+    """Matriz (capacidade, campos) preenchida em círculo; guarda as `capacidade` linhas mais recentes"""
+
+    def __init__(self, capacidade: int, campos: int = len(CAMPOS)):
+        self.capacidade = capacidade
+        self.dados = np.full((capacidade, campos), np.nan)
+        self.total = 0  # Linhas já escritas (a posição de escrita é total % capacidade)
+
+    def __len__(self):
+        return min(self.total, self.capacidade)
+
+    def escrever(self, linhas: np.ndarray):
+        k = len(linhas)
+        if k > self.capacidade:
+            self.total += k - self.capacidade
+            linhas = linhas[-self.capacidade:]
+            k = self.capacidade
+        posicao = self.total % self.capacidade
+        primeira = min(k, self.capacidade - posicao)
+        self.dados[posicao:posicao + primeira] = linhas[:primeira]
+        self.dados[:k - primeira] = linhas[primeira:]
+        self.total += k
+
+    def ordenadas(self) -> np.ndarray:
+        """Cópia das linhas guardadas, da mais antiga para a mais recente"""
+        if self.total <= self.capacidade:
+            return self.dados[:self.total].copy()
+        posicao = self.total % self.capacidade
+        return np.concatenate((self.dados[posicao:], self.dados[:posicao]))
+
+    def ultima(self) -> Optional[np.ndarray]:
+        return self.dados[(self.total - 1) % self.capacidade] if self.total else None
+
+
+class Reducao:
+    """Agrega linhas em baldes de `periodo` segundos e guarda os baldes completos em um buffer circular
+
+    O balde em andamento fica pendente até chegar uma linha de um balde posterior.
+    """
+
+    def __init__(self, periodo: float, capacidade: int):
+        self.periodo = periodo
+        self.buffer = BufferCircular(capacidade)
+        self.pendente: Optional[np.ndarray] = None
+
+    def acrescentar(self, linhas: np.ndarray) -> np.ndarray:
+        """Agrega linhas em ordem de tempo; retorna os baldes que ficaram completos"""
+        baldes = np.floor(linhas[:, _INSTANTE] / self.periodo)
+        inicios = np.flatnonzero(np.r_[True, baldes[1:] != baldes[:-1]])
+        ultimas = np.r_[inicios[1:] - 1, len(linhas) - 1]
+        agregadas = linhas[ultimas]  # Indexação com array: já é uma cópia
+        agregadas[:, _INSTANTE] = baldes[inicios] * self.periodo
+        agregadas[:, _TEMPERATURA] = np.fmax.reduceat(linhas[:, _TEMPERATURA], inicios)
+        if self.pendente is not None:
+            if self.pendente[_INSTANTE] == agregadas[0, _INSTANTE]:
+                agregadas[0, _TEMPERATURA] = np.fmax(agregadas[0, _TEMPERATURA], self.pendente[_TEMPERATURA])
+            else:
+                agregadas = np.vstack((self.pendente, agregadas))
+        self.pendente = agregadas[-1]
+        completas = agregadas[:-1]
+        if len(completas):
+            self.buffer.escrever(completas)
+        return completas
+
+    def ordenadas(self) -> np.ndarray:
+        """Baldes completos mais o balde em andamento"""
+        linhas = self.buffer.ordenadas()
+        return linhas if self.pendente is None else np.vstack((linhas, self.pendente))
+
+
+class TelemetriaDrone:
+    """Buffers de um drone: amostras brutas e reduções de 1 s e 1 min"""
+
+    def __init__(self, capacidade_bruta: int, capacidade_1s: int, capacidade_1min: int):
+        self.trava = threading.Lock()
+        self.bruta = BufferCircular(capacidade_bruta)
+        self.reducoes = {"1s": Reducao(RESOLUCOES["1s"], capacidade_1s),
+                         "1min": Reducao(RESOLUCOES["1min"], capacidade_1min)}
+
+    def registrar(self, linhas: np.ndarray) -> int:
+        """Grava amostras já ordenadas por instante; descarta as anteriores à última gravada
+
+        Returns:
+            int: Quantidade aceita
+        """
+        with self.trava:
+            ultima = self.bruta.ultima()
+            if ultima is not None:
+                linhas = linhas[linhas[:, _INSTANTE] > ultima[_INSTANTE]]
+            if len(linhas):
+                self.bruta.escrever(linhas)
+                completas = self.reducoes["1s"].acrescentar(linhas)
+                if len(completas):
+                    self.reducoes["1min"].acrescentar(completas)
+            return len(linhas)
+
+    def linhas(self, resolucao: str) -> np.ndarray:
+        with self.trava:
+            if resolucao == "bruta":
+                return self.bruta.ordenadas()
+            return self.reducoes[resolucao].ordenadas()
+
+    def ultima(self) -> Optional[np.ndarray]:
+        with self.trava:
+            ultima = self.bruta.ultima()
+            return None if ultima is None else ultima.copy()
+
+
+def _linha_para_dict(linha: np.ndarray) -> dict:
+    return {campo: (None if np.isnan(valor) else float(valor)) for campo, valor in zip(CAMPOS, linha.tolist())}
+
+
+def amostras_para_matriz(amostras, agora: float) -> np.ndarray:
+    """Converte o corpo da requisição em uma matriz (n, len(CAMPOS))
+
+    Aceita uma lista de amostras ({"instante", "lat", "lon", ...}) ou colunas
+    ({"instante": [...], "lat": [...], ...}). Campos ausentes ficam NaN e
+    amostras sem instante recebem `agora`.
+
+    Raises:
+        ValueError: Formato inválido ou colunas com tamanhos diferentes
+    """
+    try:
+        if isinstance(amostras, list):
+            matriz = np.array([[amostra.get(campo, np.nan) for campo in CAMPOS] for amostra in amostras],
+                              dtype=np.float64).reshape(len(amostras), len(CAMPOS))
+        elif isinstance(amostras, dict):
+            tamanhos = {len(amostras[campo]) for campo in CAMPOS if campo in amostras}
+            if len(tamanhos) != 1:
+                raise ValueError("as colunas de telemetria devem ter o mesmo tamanho")
+            n = tamanhos.pop()
+            matriz = np.full((n, len(CAMPOS)), np.nan)
+            for i, campo in enumerate(CAMPOS):
+                if campo in amostras:
+                    matriz[:, i] = np.asarray(amostras[campo], dtype=np.float64)
+        else:
+            raise ValueError("envie uma lista de amostras ou um objeto com colunas")
+    except (TypeError, AttributeError) as e:
+        raise ValueError(f"amostra de telemetria inválida: {e}") from None
+    instantes = matriz[:, _INSTANTE]
+    instantes[np.isnan(instantes)] = agora
+    return matriz
+
+
+class ArmazemTelemetria:
+    """Telemetria de todos os drones, com memória fixa por drone
+
+    Args:
+        capacidade_bruta: Amostras brutas por drone (3000 = 5 min a 10 Hz)
+        capacidade_1s: Baldes de 1 s por drone (3600 = 1 h)
+        capacidade_1min: Baldes de 1 min por drone (1440 = 24 h)
+        max_drones: Limite de drones distintos (a memória total fica limitada)
+        relogio: Instante das amostras enviadas sem `instante`
+    """
+
+    def __init__(self, capacidade_bruta: int = 3000, capacidade_1s: int = 3600, capacidade_1min: int = 1440,
+                 max_drones: int = 1000, relogio=time.time):
+        self.capacidades = (capacidade_bruta, capacidade_1s, capacidade_1min)
+        self.max_drones = max_drones
+        self.relogio = relogio
+        self._drones: Dict[str, TelemetriaDrone] = {}
+        self._trava = threading.Lock()
+
+    def __len__(self):
+        return len(self._drones)
+
+    @property
+    def bytes_por_drone(self) -> int:
+        return sum(self.capacidades) * len(CAMPOS) * 8
+
+    def _drone(self, drone_id: str) -> TelemetriaDrone:
+        telemetria = self._drones.get(drone_id)
+        if telemetria is None:
+            with self._trava:
+                telemetria = self._drones.get(drone_id)
+                if telemetria is None:
+                    if len(self._drones) >= self.max_drones:
+                        raise ValueError(f"Limite de {self.max_drones} drones com telemetria atingido")
+                    telemetria = self._drones[drone_id] = TelemetriaDrone(*self.capacidades)
+        return telemetria
+
+    def registrar(self, drone_id: str, amostras) -> Dict[str, int]:
+        """Grava um lote de amostras de um drone
+
+        Returns:
+            dict: aceitas, atrasadas (anteriores à última gravada) e invalidas (sem lat/lon)
+
+        Raises:
+            ValueError: Corpo inválido ou limite de drones atingido
+        """
+        matriz = amostras_para_matriz(amostras, self.relogio())
+        validas = ~(np.isnan(matriz[:, _LAT]) | np.isnan(matriz[:, _LON]))
+        invalidas = int(len(matriz) - validas.sum())
+        matriz = matriz[validas]
+        matriz = matriz[np.argsort(matriz[:, _INSTANTE], kind="stable")]
+        aceitas = self._drone(drone_id).registrar(matriz) if len(matriz) else 0
+        resultado = {"aceitas": aceitas, "atrasadas": len(matriz) - aceitas, "invalidas": invalidas}
+        for chave, quantidade in resultado.items():
+            if quantidade:
+                AMOSTRAS_TELEMETRIA.inc(quantidade, (chave,))
+        return resultado
+
+    def ultima_posicao(self, drone_id: str) -> Optional[dict]:
+        telemetria = self._drones.get(drone_id)
+        ultima = telemetria.ultima() if telemetria else None
+        return None if ultima is None else dict(drone=drone_id, **_linha_para_dict(ultima))
+
+    def posicoes(self) -> List[dict]:
+        """Última amostra de cada drone"""
+        posicoes = (self.ultima_posicao(drone_id) for drone_id in list(self._drones))
+        return [posicao for posicao in posicoes if posicao is not None]
+
+    def trilha(self, drone_id: str, resolucao: str = "1s", de: float = None, ate: float = None,
+               limite: Optional[int] = 1000) -> Optional[Dict[str, list]]:
+        """Trilha recente de um drone em colunas, da amostra mais antiga para a mais recente
+
+        Args:
+            resolucao: "bruta", "1s" ou "1min"
+            de / ate: Intervalo de instantes (epoch)
+            limite: Máximo de amostras (as mais recentes)
+
+        Returns:
+            dict: {campo: [valores]} ou None se o drone não enviou telemetria
+
+        Raises:
+            ValueError: Resolução desconhecida
+        """
+        if resolucao not in RESOLUCOES:
+            raise ValueError(f"resolucao deve ser uma de: {', '.join(RESOLUCOES)}")
+        telemetria = self._drones.get(drone_id)
+        if telemetria is None:
+            return None
+        linhas = telemetria.linhas(resolucao)
+        instantes = linhas[:, _INSTANTE]
+        inicio = 0 if de is None else int(np.searchsorted(instantes, de, side="left"))
+        fim = len(linhas) if ate is None else int(np.searchsorted(instantes, ate, side="right"))
+        if limite is not None:
+            inicio = max(inicio, fim - limite)
+        linhas = linhas[inicio:fim]
+        return {campo: [None if valor != valor else valor for valor in linhas[:, i].tolist()]
+                for i, campo in enumerate(CAMPOS)}
@@ -0,0 +1,151 @@
+#Nome: Larissa Pereira Biusse
+#RM: 564068
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from metricas import REGISTRO
+
+DURACAO_CALLBACKS = REGISTRO.histograma(
+    "sentinel_temporizador_callback_segundos", "Duração dos callbacks do serviço de temporizadores", ("callback",))
+
+
+class Temporizador:
+    """Entrada agendada no serviço de temporizadores
+
+    Objeto leve (sem thread nem pilha própria): apenas o prazo, a função e
+    seus argumentos. Pode ser cancelado antes de disparar.
+    """
+
+    __slots__ = ('prazo', 'callback', 'args', 'cancelado')
+
+    def __init__(self, prazo: float, callback: Callable, args: tuple):
+        self.prazo = prazo
+        self.callback = callback
+        self.args = args
+        self.cancelado = False
+
+    def cancelar(self):
+        """Cancela o temporizador (removido de forma preguiçosa do heap)"""
+        self.cancelado = True
+
+
+class ServicoTemporizadores:
+    """Serviço de temporizadores baseado em heap
+
+    Uma única thread despachante dorme até o prazo mais próximo do heap e
+    entrega os callbacks vencidos a um pool fixo de workers. Substitui o
+    padrão de uma thread com `time.sleep` por missão de drone.
+
+    Complexidade: agendar O(log n), disparo O(log n) por temporizador.
+    """
+
+    def __init__(self, workers: int = 4, relogio: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            workers: Tamanho do pool que executa os callbacks
+            relogio: Fonte de tempo monotônica (em segundos)
+        """
+        self.workers = workers
+        self.relogio = relogio
+        self._heap: List[tuple] = []  # (prazo, sequência, Temporizador)
+        self._seq = itertools.count()  # Desempate estável para prazos iguais
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._ativo = False
+        self.disparados = 0
+        self.falhas = 0
+
+    def agendar(self, atraso: float, callback: Callable, *args) -> Temporizador:
+        """Agenda `callback(*args)` para daqui a `atraso` segundos
+
+        O serviço é iniciado automaticamente no primeiro agendamento.
+        """
+        temporizador = Temporizador(self.relogio() + max(atraso, 0.0), callback, args)
+        with self._cond:
+            if not self._ativo:
+                self._iniciar()
+            heapq.heappush(self._heap, (temporizador.prazo, next(self._seq), temporizador))
+            # Só acorda o despachante se o novo prazo for o mais próximo
+            if self._heap[0][2] is temporizador:
+                self._cond.notify()
+        return temporizador
+
+    @property
+    def pendentes(self) -> int:
+        """Quantidade de entradas no heap (inclui canceladas ainda não removidas)"""
+        return len(self._heap)
+
+    def parar(self, esperar: bool = True):
+        """Encerra o despachante e o pool, descartando temporizadores pendentes"""
+        with self._cond:
+            if not self._ativo:
+                return
+            self._ativo = False
+            self._heap.clear()
+            self._cond.notify()
+        thread, pool = self._thread, self._pool
+        self._thread = self._pool = None
+        if esperar and thread is not threading.current_thread():
+            thread.join()
+        pool.shutdown(wait=esperar)
+
+    def _iniciar(self):
+        self._ativo = True
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="temporizador")
+        self._thread = threading.Thread(target=self._despachar, daemon=True, name="temporizadores")
+        self._thread.start()
+
+    def _despachar(self):
+        while True:
+            with self._cond:
+                if not self._ativo:
+                    return
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                agora = self.relogio()
+                espera = self._heap[0][0] - agora
+                if espera > 0:
+                    self._cond.wait(espera)
+                    continue
+                # Retira de uma vez todos os temporizadores vencidos
+                vencidos = []
+                while self._heap and self._heap[0][0] <= agora:
+                    temporizador = heapq.heappop(self._heap)[2]
+                    if not temporizador.cancelado:
+                        vencidos.append(temporizador)
+                pool = self._pool
+            # Distribui os vencidos em lotes entre os workers do pool
+            tamanho_lote = max(1, -(-len(vencidos) // self.workers))
+            for i in range(0, len(vencidos), tamanho_lote):
+                try:
+                    pool.submit(self._executar_lote, vencidos[i:i + tamanho_lote])
+                except RuntimeError:  # Pool encerrado por `parar` durante o despacho
+                    return
+
+    def _executar_lote(self, temporizadores: List[Temporizador]):
+        disparados = falhas = 0  # Somados aos contadores do serviço sob a trava, uma vez por lote
+        try:
+            for temporizador in temporizadores:
+                if temporizador.cancelado:
+                    continue
+                nome = getattr(temporizador.callback, '__name__', 'callback')
+                inicio = time.perf_counter()
+                try:
+                    temporizador.callback(*temporizador.args)
+                except Exception as e:
+                    falhas += 1
+                    print(f"Erro no temporizador {nome}: {str(e)}")
+                finally:
+                    disparados += 1
+                    DURACAO_CALLBACKS.observar(time.perf_counter() - inicio, (nome,))
+        finally:
+            with self._cond:
+                self.disparados += disparados
+                self.falhas += falhas